@@ -78,6 +78,9 @@ if TYPE_CHECKING:
     from .types import TextType
     from .types import ViewType
 
+# Startup is reported by "--perf" once these phases have finished.
+STARTUP_PHASES = ('paint', 'status')
+
 
 def setup_environment() -> operations.IOperations:
     """Set environment variables to control git's behavior"""
@@ -479,8 +482,6 @@ def application_init(
             context.model.update_status()
 
     timer.stop('init')
-    if args.perf:
-        timer.display('init')
     return context
 
 
@@ -490,6 +491,8 @@ def new_context(
     app_name: str = 'Git Cola',
 ) -> ApplicationContext:
     """Create top-level ApplicationContext objects"""
+    timer = Timer()
+    timer.start('context')
     context = ApplicationContext(args)
     context.timestamp = time.time()
     context.settings = args.settings or Settings.read()
@@ -501,7 +504,8 @@ def new_context(
     context.model = main.create(context)
     context.app_name = app_name
     context.app = new_application(context, args)
-    context.timer = Timer()
+    context.timer = timer
+    timer.stop('context')
 
     return context
 
@@ -571,7 +575,13 @@ def application_run(
     stop: Callable | None = None,
 ) -> int:
     """Run the application main loop"""
+    timer = context.timer
+    timer.start('show')
     initialize_view(context, view)
+    timer.stop('show')
+    # The first paint happens when the event loop processes the show events.
+    timer.start('paint')
+    QtCore.QTimer.singleShot(0, partial(finish_startup_phase, context, 'paint'))
     # Startup callbacks
     if start:
         start(context, view)
@@ -734,7 +744,26 @@ def async_update(context: ApplicationContext) -> None:
     update_index = context.cfg.get('cola.updateindex', True)
     update_status = partial(context.model.update_status, update_index=update_index)
     task = qtutils.SimpleTask(update_status)
-    context.runtask.start(task)
+    context.timer.start('status')
+    context.runtask.start(
+        task, finish=lambda _: finish_startup_phase(context, 'status')
+    )
+
+
+def finish_startup_phase(context: ApplicationContext, key: str) -> None:
+    """Stop a startup phase timer and report the phases once startup is done
+
+    Startup is done once the main window has been painted and the initial
+    status has been loaded. "--perf" displays the time spent in each phase.
+    """
+    timer = context.timer
+    timer.stop(key)
+    if (
+        context.args.perf
+        and key in STARTUP_PHASES
+        and all(timer.is_stopped(phase) for phase in STARTUP_PHASES)
+    ):
+        timer.display_report()
 
 
 def startup_message() -> None:
@@ -745,6 +774,8 @@ def startup_message() -> None:
         msg2 = 'info: set GIT_COLA_TRACE=1 for less-verbose output'
         Interaction.log(msg1)
         Interaction.log(msg2)
+    elif trace == 'profile':
+        Interaction.log('info: git command profiling enabled')
     elif trace:
         msg1 = 'info: debug level 1'
         msg2 = 'info: set GIT_COLA_TRACE=2 for trace mode'
@@ -781,20 +812,24 @@ def initialize(socket: server.SocketClient | None = None) -> str:
 
 
 class Timer:
-    """Simple performance timer"""
+    """Simple performance timer
+
+    Timers are reported in the order in which they were first started.
+    """
 
     def __init__(self) -> None:
         self._data = {}
 
     def start(self, key: str) -> None:
         """Start a timer"""
-        now = time.time()
-        self._data[key] = [now, now]
+        now = time.perf_counter()
+        self._data[key] = [now, now, False]
 
     def stop(self, key: str) -> float:
         """Stop a timer and return its elapsed time"""
         entry = self._data[key]
-        entry[1] = time.time()
+        entry[1] = time.perf_counter()
+        entry[2] = True
         return self.elapsed(key)
 
     def elapsed(self, key: str) -> float:
@@ -802,11 +837,35 @@ class Timer:
         entry = self._data[key]
         return entry[1] - entry[0]
 
+    def is_stopped(self, key: str) -> bool:
+        """Has a timer been started and stopped?"""
+        entry = self._data.get(key)
+        return entry is not None and entry[2]
+
+    def report(self) -> list[tuple[str, float]]:
+        """Return the name and elapsed time of the stopped timers"""
+        return [
+            (key, entry[1] - entry[0]) for key, entry in self._data.items() if entry[2]
+        ]
+
+    def total(self) -> float:
+        """Return the time from the first start until the last stop"""
+        entries = [entry for entry in self._data.values() if entry[2]]
+        if not entries:
+            return 0.0
+        return max(entry[1] for entry in entries) - min(entry[0] for entry in entries)
+
     def display(self, key) -> None:
         """Display a timer"""
         elapsed = self.elapsed(key)
         sys.stdout.write(f'{key}: {elapsed:.5f}s\n')
 
+    def display_report(self) -> None:
+        """Display the stopped timers and their total time"""
+        for key, elapsed in self.report():
+            sys.stdout.write(f'{key}: {elapsed:.5f}s\n')
+        sys.stdout.write(f'total: {self.total():.5f}s\n')
+
 
 class NullArgs:
     """Stub arguments for interactive API use"""
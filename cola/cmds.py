@@ -18,6 +18,7 @@ from . import compat
 from . import core
 from . import display
 from . import gitcmds
+from . import gitprofile
 from . import icons
 from . import resources
 from . import textwrap
@@ -1544,7 +1545,7 @@ class DiffImage(EditModel):
                 else:
                     image = gitcmds.write_blob_path(context, head, old_oid, filename)
                     if image:
-                        images.append((image, True))
+                        images.append((image, True, old_oid))
 
             if new_oid != missing_blob_oid:
                 found_in_annex = False
@@ -1559,11 +1560,11 @@ class DiffImage(EditModel):
                 if not found_in_annex:
                     image = gitcmds.write_blob(context, new_oid, filename)
                     if image:
-                        images.append((image, True))
+                        images.append((image, True, new_oid))
 
         return images
 
-    def unmerged_images(self) -> list[tuple[str, bool]]:
+    def unmerged_images(self) -> list[tuple[str, bool] | tuple[str, bool, str]]:
         context = self.context
         head = self.model.head
         missing_blob_oid = self.model.missing_blob_oid
@@ -1623,12 +1624,12 @@ class DiffImage(EditModel):
                             context, merge_head, oid, filename
                         )
                         if image:
-                            images.append((image, True))
+                            images.append((image, True, oid))
 
         images.append((filename, False))
         return images
 
-    def modified_images(self) -> list[tuple[str, bool]]:
+    def modified_images(self) -> list[tuple[str, bool] | tuple[str, bool, str]]:
         context = self.context
         head = self.model.head
         missing_blob_oid = self.model.missing_blob_oid
@@ -1649,7 +1650,7 @@ class DiffImage(EditModel):
                 if oid != missing_blob_oid:
                     image = gitcmds.write_blob_path(context, head, oid, filename)
                     if image:
-                        images.append((image, True))  # HEAD
+                        images.append((image, True, oid))  # HEAD
 
         images.append((filename, False))  # worktree
         return images
@@ -3593,8 +3594,9 @@ def do(
 ) -> tuple[int, str, str] | tuple[int, core.UStr, core.UStr] | None:
     """Run a command in-place"""
     try:
-        cmd = cls(*args, **opts)
-        return cmd.do()
+        with gitprofile.action(getattr(cls, '__name__', '')):
+            cmd = cls(*args, **opts)
+            return cmd.do()
     except Exception as e:
         msg, details = utils.format_exception(e)
         if hasattr(cls, '__name__'):
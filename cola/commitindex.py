@@ -0,0 +1,537 @@
+"""An index of commit metadata for searching the history
+
+Searching commit messages, authors, committers and dates with "git log --all"
+walks the entire history for every query. The index reads the metadata for all
+commits once per repository and is updated incrementally when refs move so
+that these searches are answered from memory. The index is stored on disk so
+that it survives across sessions.
+"""
+from __future__ import annotations
+import array
+import bisect
+import heapq
+import itertools
+import marshal
+import os
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from . import core
+from . import resources
+from . import utils
+from .git import STDOUT
+from .i18n import N_
+
+if TYPE_CHECKING:
+    from .app import ApplicationContext
+
+# Fields are separated by the ASCII unit separator and commits by NUL (-z).
+_FIELD_SEPARATOR = '\x1f'
+_FORMAT = '%x1f'.join(('%H', '%aN', '%aE', '%at', '%cN', '%cE', '%ct', '%s', '%B'))
+_FIELD_COUNT = 9
+# Bump the version when the stored index format changes.
+_VERSION = 1
+
+
+class Segment:
+    """Commit messages that were added to the index together
+
+    The messages are joined into a single string, newest first, so that a
+    regular expression can scan all of them in a single call.
+    """
+
+    def __init__(self, first: int, messages: list[str]) -> None:
+        # Commits are numbered from the oldest commit. The segment holds the
+        # commits first .. first + len(messages) - 1, newest first.
+        self.first = first
+        self.count = len(messages)
+        self.offsets = array.array('q')
+        offset = 0
+        for message in messages:
+            self.offsets.append(offset)
+            offset += len(message) + 1
+        self.text = '\n'.join(messages)
+
+    @classmethod
+    def from_state(cls, first: int, offsets: bytes, text: str) -> Segment:
+        """Create a segment from the values returned by state()"""
+        segment = cls(first, [])
+        segment.offsets.frombytes(offsets)
+        segment.count = len(segment.offsets)
+        segment.text = text
+        return segment
+
+    def state(self) -> tuple[int, bytes, str]:
+        """Return the values needed to recreate the segment"""
+        return (self.first, self.offsets.tobytes(), self.text)
+
+    def search(self, pattern: re.Pattern) -> Iterator[int]:
+        """Yield the numbers of the commits whose message matches, newest first"""
+        offsets = self.offsets
+        text = self.text
+        last = self.first + self.count - 1
+        pos = 0
+        while True:
+            match = pattern.search(text, pos)
+            if match is None:
+                break
+            idx = bisect.bisect_right(offsets, match.start()) - 1
+            yield last - idx
+            # Skip to the next commit.
+            if idx + 1 >= self.count:
+                break
+            pos = offsets[idx + 1]
+
+
+class CommitIndex:
+    """Commit metadata for all of the commits reachable from any ref
+
+    Commits are numbered from the oldest to the newest in "git log --all"
+    order and results are returned newest first, as "git log" does.
+    Author and committer identities are stored once and map to the commits
+    that use them so that only the distinct identities are matched.
+
+    The index is written to disk after it is built and after every
+    "save_threshold" commits are added. A stored index is brought up to date
+    with the refs when it is loaded.
+    """
+
+    save_threshold = 1000
+
+    def __init__(self, context: ApplicationContext, path: str | None = None) -> None:
+        self.context = context
+        self.path = path
+        self.lock = threading.Lock()
+        self.tips: set[str] | None = None
+        self.saved_count = 0
+        self.builds = 0
+        self.loads = 0
+        self.updates = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.oids: list[str] = []
+        self.subjects: list[str] = []
+        self.authors = array.array('q')
+        self.author_dates = array.array('q')
+        self.commit_dates = array.array('q')
+        # Identities are "Name <email>" strings mapped to their ID.
+        self.identities: dict[str, int] = {}
+        self.identity_names: list[str] = []
+        self.author_commits: list[array.array] = []
+        self.committer_commits: list[array.array] = []
+        # Commit dates and commit numbers sorted by date for date range queries.
+        self.dates_sorted = array.array('q')
+        self.dates_commits = array.array('q')
+        self.segments: list[Segment] = []
+
+    def __len__(self) -> int:
+        return len(self.oids)
+
+    def update(self) -> bool:
+        """Synchronize the index with the refs and return True if it changed"""
+        with self.lock:
+            changed = self._update()
+            if changed and len(self) - self.saved_count >= self.save_threshold:
+                self.write()
+            return changed
+
+    def _update(self) -> bool:
+        tips = self._read_tips()
+        if self.tips is None and not self.read():
+            self._build(tips)
+            return True
+        if tips == self.tips:
+            return False
+        removed = self.tips - tips
+        if removed and self._unreachable(removed, tips):
+            # Rewritten or deleted history is rare so the index is rebuilt.
+            self._build(tips)
+            return True
+        added = tips - self.tips
+        if added:
+            new_commits = self._read_commits(
+                '--stdin', _stdin_lines=sorted(added) + [f'^{oid}' for oid in self.tips]
+            )
+            if new_commits is None:
+                self._build(tips)
+                return True
+            self._add(new_commits)
+        self.tips = tips
+        self.updates += 1
+        return True
+
+    def _build(self, tips: set[str]) -> None:
+        """Read the metadata for all commits"""
+        self._reset()
+        commits = self._read_commits('--all')
+        self._add(commits or [])
+        self.tips = tips
+        self.saved_count = 0
+        self.builds += 1
+        self.write()
+
+    def filename(self) -> str:
+        """Return the path to the stored index for the current repository"""
+        path = self.path or resources.cache_home('commitindex')
+        digest = utils.sha256hex(core.abspath(self.context.git.git_path()))
+        return os.path.join(path, digest + '.idx')
+
+    def read(self) -> bool:
+        """Load the stored index and return True if it was loaded"""
+        try:
+            with core.xopen(self.filename(), 'rb') as fh:
+                state = marshal.load(fh)
+            self._set_state(state)
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            self._reset()
+            return False
+        self.saved_count = len(self)
+        self.loads += 1
+        return True
+
+    def write(self) -> None:
+        """Store the index on disk"""
+        filename = self.filename()
+        tmp_path = f'{filename}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            cache_dir = os.path.dirname(filename)
+            if not core.isdir(cache_dir):
+                core.makedirs(cache_dir)
+            with core.xopen(tmp_path, 'wb') as fh:
+                marshal.dump(self._state(), fh)
+            os.replace(core.mkpath(tmp_path), core.mkpath(filename))
+        except (OSError, ValueError):
+            if core.exists(tmp_path):
+                core.remove(tmp_path)
+            return
+        self.saved_count = len(self)
+
+    def _state(self) -> dict:
+        """Return the index as a dict of values that can be marshalled"""
+        return {
+            'version': _VERSION,
+            'tips': sorted(self.tips or ()),
+            'oids': self.oids,
+            'subjects': self.subjects,
+            'authors': self.authors.tobytes(),
+            'author_dates': self.author_dates.tobytes(),
+            'commit_dates': self.commit_dates.tobytes(),
+            'identity_names': self.identity_names,
+            'author_commits': [commits.tobytes() for commits in self.author_commits],
+            'committer_commits': [
+                commits.tobytes() for commits in self.committer_commits
+            ],
+            'dates_sorted': self.dates_sorted.tobytes(),
+            'dates_commits': self.dates_commits.tobytes(),
+            'segments': [segment.state() for segment in self.segments],
+        }
+
+    def _set_state(self, state: dict) -> None:
+        """Restore the index from the values returned by _state()"""
+        if state['version'] != _VERSION:
+            raise ValueError(state['version'])
+        self._reset()
+        self.oids = state['oids']
+        self.subjects = state['subjects']
+        self.authors.frombytes(state['authors'])
+        self.author_dates.frombytes(state['author_dates'])
+        self.commit_dates.frombytes(state['commit_dates'])
+        self.identity_names = state['identity_names']
+        self.identities = {name: idx for idx, name in enumerate(self.identity_names)}
+        for commits in state['author_commits']:
+            self.author_commits.append(_array(commits))
+        for commits in state['committer_commits']:
+            self.committer_commits.append(_array(commits))
+        self.dates_sorted.frombytes(state['dates_sorted'])
+        self.dates_commits.frombytes(state['dates_commits'])
+        self.segments = [Segment.from_state(*values) for values in state['segments']]
+        count = len(self.oids)
+        if not (
+            len(self.subjects)
+            == len(self.authors)
+            == len(self.commit_dates)
+            == len(self.dates_commits)
+            == count
+            and len(self.author_commits) == len(self.identity_names)
+            and sum(segment.count for segment in self.segments) == count
+        ):
+            raise ValueError('inconsistent commit index')
+        self.tips = set(state['tips'])
+
+    def _read_tips(self) -> set[str]:
+        """Return the object IDs of HEAD and every ref"""
+        git = self.context.git
+        out = git.for_each_ref(format='%(objectname)', _readonly=True)[STDOUT]
+        tips = set(out.split())
+        status, out, _ = git.rev_parse('HEAD', verify=True, _readonly=True)
+        if status == 0 and out.strip():
+            tips.add(out.strip())
+        return tips
+
+    def _unreachable(self, removed: set[str], tips: set[str]) -> bool:
+        """Are any commits no longer reachable from the refs?"""
+        lines = sorted(removed) + [f'^{oid}' for oid in tips]
+        status, out, _ = _run_with_stdin(
+            self.context, 'rev_list', lines, '--stdin', max_count=1
+        )
+        return status != 0 or bool(out.strip())
+
+    def _read_commits(
+        self, *args, _stdin_lines: list[str] | None = None
+    ) -> list[list[str]] | None:
+        """Read commits from "git log", newest first"""
+        kwargs = {'z': True, 'no_color': True, 'format': _FORMAT}
+        if _stdin_lines is not None:
+            status, out, _ = _run_with_stdin(
+                self.context, 'log', _stdin_lines, *args, **kwargs
+            )
+            if status != 0:
+                return None
+            records = out.split('\0') if out else []
+        else:
+            git = self.context.git
+            records = git.stream(
+                'log', *args, _separator='\0', _readonly=True, **kwargs
+            )
+        commits = []
+        for record in records:
+            fields = record.split(_FIELD_SEPARATOR, _FIELD_COUNT - 1)
+            if len(fields) == _FIELD_COUNT:
+                commits.append(fields)
+        return commits
+
+    def _add(self, commits: list[list[str]]) -> None:
+        """Add commits, newest first, that are newer than the indexed commits"""
+        if not commits:
+            return
+        first = len(self.oids)
+        messages = []
+        for number, fields in enumerate(reversed(commits), first):
+            oid, aname, aemail, adate, cname, cemail, cdate, subject, message = fields
+            author = self._identity(f'{aname} <{aemail}>')
+            committer = self._identity(f'{cname} <{cemail}>')
+            self.oids.append(oid)
+            self.subjects.append(subject)
+            self.authors.append(author)
+            self.author_dates.append(_int(adate))
+            self.commit_dates.append(_int(cdate))
+            self.author_commits[author].append(number)
+            self.committer_commits[committer].append(number)
+            messages.append(message)
+        messages.reverse()
+        self.segments.insert(0, Segment(first, messages))
+        self._index_dates(first)
+
+    def _index_dates(self, first: int) -> None:
+        """Add the commit dates of the commits starting at "first" to the date index"""
+        commit_dates = self.commit_dates
+        count = len(commit_dates) - first
+        if count > len(self.dates_sorted) // 8:
+            # Sorting is faster than inserting many dates one at a time.
+            numbers = sorted(range(len(commit_dates)), key=commit_dates.__getitem__)
+            self.dates_commits = array.array('q', numbers)
+            self.dates_sorted = array.array('q', (commit_dates[i] for i in numbers))
+            return
+        for number in range(first, len(commit_dates)):
+            commit_date = commit_dates[number]
+            idx = bisect.bisect_right(self.dates_sorted, commit_date)
+            self.dates_sorted.insert(idx, commit_date)
+            self.dates_commits.insert(idx, number)
+
+    def _identity(self, identity: str) -> int:
+        """Return the ID for an identity"""
+        value = self.identities.get(identity)
+        if value is None:
+            value = self.identities[identity] = len(self.identity_names)
+            self.identity_names.append(identity)
+            self.author_commits.append(array.array('q'))
+            self.committer_commits.append(array.array('q'))
+        return value
+
+    def grep(self, query: str, max_count: int, skip: int = 0) -> list[tuple[str, str]]:
+        """Search commit messages like "git log --all --grep=<query>" """
+        pattern = compile_pattern(query)
+        with self.lock:
+            numbers = itertools.chain.from_iterable(
+                segment.search(pattern) for segment in self.segments
+            )
+            return self._results(numbers, max_count, skip)
+
+    def author(
+        self, query: str, max_count: int, skip: int = 0
+    ) -> list[tuple[str, str]]:
+        """Search authors like "git log --all --author=<query>" """
+        with self.lock:
+            return self._identity_search(query, self.author_commits, max_count, skip)
+
+    def committer(
+        self, query: str, max_count: int, skip: int = 0
+    ) -> list[tuple[str, str]]:
+        """Search committers like "git log --all --committer=<query>" """
+        with self.lock:
+            return self._identity_search(query, self.committer_commits, max_count, skip)
+
+    def _identity_search(
+        self, query: str, commits: list[array.array], max_count: int, skip: int
+    ) -> list[tuple[str, str]]:
+        pattern = compile_pattern(query)
+        matches = [
+            reversed(commits[idx])
+            for idx, identity in enumerate(self.identity_names)
+            if pattern.search(identity)
+        ]
+        numbers = heapq.merge(*matches, reverse=True)
+        return self._results(numbers, max_count, skip)
+
+    def date_range(
+        self, start: int, end: int, max_count: int, skip: int = 0
+    ) -> list[tuple[str, str]]:
+        """Search commit dates between two timestamps, inclusive
+
+        Use date_limits() to convert the dates for "git log --after --before".
+        """
+        with self.lock:
+            lo = bisect.bisect_left(self.dates_sorted, start)
+            hi = bisect.bisect_right(self.dates_sorted, end)
+            numbers = heapq.nlargest(skip + max_count, self.dates_commits[lo:hi])
+            return self._results(numbers, max_count, skip)
+
+    def _results(
+        self, numbers: Iterable[int], max_count: int, skip: int = 0
+    ) -> list[tuple[str, str]]:
+        """Return (oid, summary) pairs in the format used by the search dialog
+
+        The first "skip" results are skipped so that results can be paged.
+        """
+        now = time.time()
+        result = []
+        for number in itertools.islice(numbers, skip, skip + max_count):
+            author = self.identity_names[self.authors[number]]
+            name = author.rsplit(' <', 1)[0]
+            reldate = relative_date(self.commit_dates[number], now)
+            summary = f'{name} - {self.subjects[number]} - {reldate}'
+            result.append((self.oids[number], summary))
+        return result
+
+
+def date_limits(
+    context: ApplicationContext, after: str, before: str
+) -> tuple[int, int] | None:
+    """Convert dates to timestamps the way "git log --after --before" does"""
+    status, out, _ = context.git.rev_parse(after=after, before=before, _readonly=True)
+    limits = {}
+    for line in out.split():
+        name, _, value = line.partition('=')
+        limits[name] = _int(value)
+    if status != 0 or len(limits) != 2:
+        return None
+    return limits.get('--max-age', 0), limits.get('--min-age', 0)
+
+
+def compile_pattern(query: str) -> re.Pattern:
+    """Compile a git basic regular expression into a Python pattern
+
+    In basic regular expressions "+", "?", "|", "(", ")", "{" and "}" are
+    literal characters and are special only when escaped with a backslash.
+    """
+    special = '+?|(){}'
+    result = []
+    chars = iter(query)
+    for char in chars:
+        if char == '\\':
+            escaped = next(chars, '')
+            if escaped in special and escaped:
+                result.append(escaped)
+            else:
+                result.append(char + escaped)
+        elif char in special:
+            result.append('\\' + char)
+        else:
+            result.append(char)
+    try:
+        return re.compile(''.join(result), re.MULTILINE)
+    except re.error:
+        return re.compile(re.escape(query))
+
+
+def relative_date(timestamp: float, now: float) -> str:
+    """Format a timestamp relative to now like git's "%ar" format"""
+    diff = int(now - timestamp)
+    if diff < 0:
+        return N_('in the future')
+    if diff < 90:
+        return _plural(diff, N_('%d second ago'), N_('%d seconds ago'))
+    diff = (diff + 30) // 60
+    if diff < 90:
+        return _plural(diff, N_('%d minute ago'), N_('%d minutes ago'))
+    diff = (diff + 30) // 60
+    if diff < 36:
+        return _plural(diff, N_('%d hour ago'), N_('%d hours ago'))
+    diff = (diff + 12) // 24
+    if diff < 14:
+        return _plural(diff, N_('%d day ago'), N_('%d days ago'))
+    if diff < 70:
+        weeks = (diff + 3) // 7
+        return _plural(weeks, N_('%d week ago'), N_('%d weeks ago'))
+    if diff < 365:
+        months = (diff + 15) // 30
+        return _plural(months, N_('%d month ago'), N_('%d months ago'))
+    if diff < 1825:
+        total_months = (diff * 12 * 2 + 365) // (365 * 2)
+        years = total_months // 12
+        months = total_months % 12
+        if months:
+            years_text = _plural(years, N_('%d year'), N_('%d years'))
+            months_text = _plural(months, N_('%d month ago'), N_('%d months ago'))
+            return f'{years_text}, {months_text}'
+        return _plural(years, N_('%d year ago'), N_('%d years ago'))
+    years = (diff + 183) // 365
+    return _plural(years, N_('%d year ago'), N_('%d years ago'))
+
+
+def _plural(count: int, singular: str, plural: str) -> str:
+    return (singular if count == 1 else plural) % count
+
+
+def _array(data: bytes) -> array.array:
+    """Create an array of integers from the bytes returned by tobytes()"""
+    values = array.array('q')
+    values.frombytes(data)
+    return values
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _run_with_stdin(
+    context: ApplicationContext, cmd: str, lines: list[str], *args, **kwargs
+) -> tuple[int, str, str]:
+    """Run a git command that reads revisions from stdin"""
+    with tempfile.TemporaryFile() as stdin:
+        stdin.write(core.encode('\n'.join(lines) + '\n'))
+        stdin.seek(0)
+        return getattr(context.git, cmd)(*args, _stdin=stdin, _readonly=True, **kwargs)
+
+
+_indexes: dict[str, CommitIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def commit_index(context: ApplicationContext) -> CommitIndex:
+    """Return the commit index for the current repository"""
+    key = context.git.git_path()
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = CommitIndex(context)
+    return index
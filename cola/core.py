@@ -4,6 +4,7 @@ The @interruptable functions retry when system calls are interrupted,
 e.g. when python raises an IOError or OSError with errno == EINTR.
 """
 from __future__ import annotations
+import codecs
 import ctypes
 import functools
 import itertools
@@ -12,7 +13,10 @@ import os
 import platform
 import subprocess
 import sys
+import threading
+import time
 from collections.abc import Callable
+from collections.abc import Iterator
 from typing import TYPE_CHECKING
 from typing import Any
 
@@ -295,19 +299,261 @@ def run_command(cmd: list[UStr | str], *args, **kwargs) -> tuple[int, UStr, UStr
     The results are formatted as a 3-tuple: (exit_code, output, errors)
     The other arguments are passed on to start_command().
 
+    When a "timings" dict is passed it is filled with the time spent starting
+    the process ("spawn"), waiting for its output ("run") and decoding the
+    output ("decode") along with the size of its output in bytes.
+
     """
     encoding = kwargs.pop('encoding', None)
+    timings = kwargs.pop('timings', None)
+    start_time = time.perf_counter()
     try:
         process = start_command(cmd, *args, **kwargs)
     except FileNotFoundError as err:
         return (EXIT_UNAVAILABLE, UStr('', ENCODING), UStr(f'{err}', ENCODING))
+    spawn_time = time.perf_counter()
     (output, errors) = communicate(process)
+    run_time = time.perf_counter()
+    if timings is not None:
+        timings['bytes_out'] = len(output or b'')
+        timings['bytes_err'] = len(errors or b'')
     output = decode(output, encoding=encoding)
     errors = decode(errors, encoding=encoding)
     exit_code = process.returncode
+    if timings is not None:
+        timings['spawn'] = spawn_time - start_time
+        timings['run'] = run_time - spawn_time
+        timings['decode'] = time.perf_counter() - run_time
     return (exit_code, output or UStr('', ENCODING), errors or UStr('', ENCODING))
 
 
+class CommandStream:
+    """Read the output of a command as it is produced
+
+    Iterating over the stream yields the command's output incrementally.
+    When a separator such as "\\n" or "\\0" is given, the output is split into
+    records that are decoded individually. Otherwise the output is decoded
+    into chunks using an incremental decoder.
+
+    Reading stops after "max_bytes" of output and the remaining records are
+    discarded. The command is killed when the stream is closed before the
+    command has finished, e.g. when the caller stops iterating early.
+    The exit status and errors are available once the stream is closed.
+
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        process: subprocess.Popen | None,
+        encoding: str | None = None,
+        separator: str | None = None,
+        max_bytes: int | None = None,
+        timings: dict[str, Any] | None = None,
+    ) -> None:
+        self.process = process
+        self.encoding = encoding
+        self.separator = separator
+        self.max_bytes = max_bytes
+        self.timings = timings
+        self.on_close: Callable[[CommandStream], None] | None = None
+        self.status: int | None = None
+        self.err = UStr('', ENCODING)
+        self.bytes_out = 0
+        self.closed = False
+        self.killed = False
+        self.truncated = False
+        self._eof = False
+        self._parts: list[bytes] = []
+        self._errors: list[bytes] = []
+        self._run_time = 0.0
+        self._decode_time = 0.0
+        self._decoder = None
+        if separator is None and encoding != 'bytes':
+            try:
+                decoder_class = codecs.getincrementaldecoder(encoding or ENCODING)
+            except LookupError:
+                self.encoding = encoding = ENCODING
+                decoder_class = codecs.getincrementaldecoder(encoding)
+            self._decoder = decoder_class(errors='replace')
+        self._stderr_thread = None
+        if process is not None and process.stderr is not None:
+            # Drain stderr in the background so that the command cannot block
+            # on a full stderr pipe while stdout is being read.
+            self._stderr_thread = threading.Thread(
+                target=self._read_stderr, args=(process.stderr,), daemon=True
+            )
+            self._stderr_thread.start()
+
+    def __iter__(self) -> Iterator[UStr | bytes]:
+        try:
+            while True:
+                items = self.read()
+                if items is None:
+                    break
+                yield from items
+        finally:
+            self.close()
+
+    def __enter__(self) -> CommandStream:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # Release the command and any locks held on its behalf.
+        if not getattr(self, 'closed', True):
+            self.close()
+
+    def read(self) -> list[UStr | bytes] | None:
+        """Read the next chunk of output and return the items that it completes
+
+        None is returned once all of the output has been read.
+        """
+        if self._eof or self.closed:
+            return None
+        data = self._read_chunk()
+        if data:
+            if self.separator is None:
+                return self._decode_chunk(data)
+            return self._split_records(data)
+        self._eof = True
+        # Partial records and characters are only complete when the output ended.
+        if self.truncated:
+            return []
+        if self.separator is None:
+            return self._decode_chunk(b'', final=True)
+        remainder = b''.join(self._parts)
+        self._parts = []
+        return [self._decode(remainder)] if remainder else []
+
+    def close(self) -> int | None:
+        """Finish reading, killing the command if it is still running"""
+        if self.closed:
+            return self.status
+        self.closed = True
+        process = self.process
+        if process is not None:
+            self._finish(process)
+        if self.on_close is not None:
+            self.on_close(self)
+        return self.status
+
+    def cancel(self) -> None:
+        """Kill the command so that a read blocked in another thread returns
+
+        The thread that reads the stream is still responsible for closing it.
+        """
+        process = self.process
+        if process is None or self.closed or self._eof:
+            return
+        self.killed = True
+        try:
+            process.kill()
+        except OSError:
+            pass
+
+    def _finish(self, process: subprocess.Popen) -> None:
+        if not self._eof and process.poll() is None:
+            self.killed = True
+            process.kill()
+        if process.stdout is not None:
+            process.stdout.close()
+        if process.stdin is not None:
+            process.stdin.close()
+        self.status = process.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join()
+        errors = b''.join(self._errors)
+        self.err = decode(errors, encoding=self.encoding) or UStr('', ENCODING)
+        if self.timings is not None:
+            self.timings['run'] = self._run_time
+            self.timings['decode'] = self._decode_time
+            self.timings['bytes_out'] = self.bytes_out
+            self.timings['bytes_err'] = len(errors)
+
+    def _read_stderr(self, stderr) -> None:
+        try:
+            for data in iter(functools.partial(stderr.read1, self.chunk_size), b''):
+                self._errors.append(data)
+        except (OSError, ValueError):
+            pass
+
+    def _read_chunk(self) -> bytes:
+        """Read a chunk of raw output, or b'' at EOF or once max_bytes is reached"""
+        stdout = self.process.stdout if self.process is not None else None
+        if stdout is None:
+            return b''
+        size = self.chunk_size
+        if self.max_bytes is not None:
+            size = min(size, self.max_bytes - self.bytes_out)
+            if size <= 0:
+                # Peek for more output to tell whether it was truncated.
+                self.truncated = bool(stdout.read1(1))
+                return b''
+        start_time = time.perf_counter()
+        data = stdout.read1(size)
+        self._run_time += time.perf_counter() - start_time
+        self.bytes_out += len(data)
+        return data
+
+    def _split_records(self, data: bytes) -> list[UStr | bytes]:
+        separator = encode(self.separator)
+        self._parts.append(data)
+        if separator not in data:
+            return []
+        records = b''.join(self._parts).split(separator)
+        self._parts = [records.pop()]
+        return [self._decode(record) for record in records]
+
+    def _decode_chunk(self, data: bytes, final: bool = False) -> list[UStr | bytes]:
+        if self._decoder is None:
+            return [data] if data else []
+        start_time = time.perf_counter()
+        text = self._decoder.decode(data, final=final)
+        self._decode_time += time.perf_counter() - start_time
+        return [UStr(text, self.encoding or ENCODING)] if text else []
+
+    def _decode(self, record: bytes) -> UStr | bytes:
+        start_time = time.perf_counter()
+        result = decode(record, encoding=self.encoding)
+        self._decode_time += time.perf_counter() - start_time
+        return result
+
+
+def stream_command(cmd: list[UStr | str], *args, **kwargs) -> CommandStream:
+    """Start the given command and return a CommandStream for its output
+
+    The "encoding", "separator", "max_bytes" and "timings" arguments are
+    passed to the CommandStream. The other arguments are passed on to
+    start_command().
+
+    """
+    encoding = kwargs.pop('encoding', None)
+    separator = kwargs.pop('separator', None)
+    max_bytes = kwargs.pop('max_bytes', None)
+    timings = kwargs.pop('timings', None)
+    start_time = time.perf_counter()
+    try:
+        process = start_command(cmd, *args, **kwargs)
+    except FileNotFoundError as err:
+        stream = CommandStream(None, encoding=encoding)
+        stream.status = EXIT_UNAVAILABLE
+        stream.err = UStr(f'{err}', ENCODING)
+        return stream
+    if timings is not None:
+        timings['spawn'] = time.perf_counter() - start_time
+    return CommandStream(
+        process,
+        encoding=encoding,
+        separator=separator,
+        max_bytes=max_bytes,
+        timings=timings,
+    )
+
+
 @interruptable
 def _fork_posix(
     args: list[str],
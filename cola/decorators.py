@@ -1,6 +1,8 @@
 from __future__ import annotations
+import collections
 import errno
 import functools
+import threading
 from collections.abc import Callable
 from typing import TYPE_CHECKING
 from typing import Any
@@ -8,7 +10,19 @@ from typing import Any
 if TYPE_CHECKING:
     from qtpy.QtGui import QIcon
 
-__all__ = ('decorator', 'interruptable', 'memoize')
+__all__ = (
+    'LRUCache',
+    'MemoizeCache',
+    'REPOSITORY_SCOPE',
+    'cache_stats',
+    'clear_caches',
+    'decorator',
+    'interruptable',
+    'memoize',
+)
+
+# Results that are cleared when the current repository changes.
+REPOSITORY_SCOPE = 'repository'
 
 
 def decorator(caller: Callable, func: Callable | None = None) -> Callable:
@@ -41,15 +55,146 @@ def decorator(caller: Callable, func: Callable | None = None) -> Callable:
     return _decorated
 
 
-def memoize(func: Callable) -> Callable:
+class LRUCache:
+    """A thread-safe least-recently-used cache
+
+    The cache holds at most "max_size" entries when a limit is specified.
+    When "max_bytes" is specified the cache is also bounded by the total size
+    of its values as measured by "sizeof". Values larger than "max_bytes" are
+    not cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ) -> None:
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries: collections.OrderedDict[Any, Any] = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Any) -> bool:
+        """Is a value cached for the key? The statistics are not updated"""
+        with self.lock:
+            return key in self.entries
+
+    def _sizeof(self, value: Any) -> int:
+        return self.sizeof(value) if self.sizeof is not None else 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value for a key and count the hit or miss"""
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Cache a value and evict the least recently used values"""
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self.lock:
+            entries = self.entries
+            if key in entries:
+                self.size -= self._sizeof(entries.pop(key))
+            entries[key] = value
+            self.size += size
+            while (self.max_size is not None and len(entries) > self.max_size) or (
+                self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                _, old_value = entries.popitem(last=False)
+                self.size -= self._sizeof(old_value)
+                self.evictions += 1
+
+    def items(self) -> list[tuple[Any, Any]]:
+        """Return the entries from the least to the most recently used"""
+        with self.lock:
+            return list(self.entries.items())
+
+    def clear(self) -> None:
+        """Forget the cached values"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def reset_stats(self) -> None:
+        """Reset the hit, miss and eviction counts"""
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+class MemoizeCache(LRUCache):
+    """A least-recently-used cache of memoized results
+
+    The cache holds at most "max_size" results when a limit is specified.
+    Caches that share a "scope" can be cleared together using clear_caches(),
+    e.g. when switching to a different repository.
+    """
+
+    def __init__(
+        self, name: str, max_size: int | None = None, scope: str | None = None
+    ) -> None:
+        super().__init__(max_size=max_size)
+        self.name = name
+        self.scope = scope
+
+    def stats(self) -> dict[str, int | None]:
+        """Return the cache statistics"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.entries),
+                'max_size': self.max_size,
+            }
+
+
+# All of the caches created by @memoize.
+_caches: list[MemoizeCache] = []
+_missing = object()
+
+
+def memoize(
+    func: Callable | None = None,
+    max_size: int | None = None,
+    scope: str | None = None,
+) -> Callable:
     """
     A decorator for memoizing function calls
 
     https://en.wikipedia.org/wiki/Memoization
 
+    Use @memoize(max_size=N) to bound the number of cached results and
+    @memoize(scope=name) to have clear_caches(name) invalidate the results.
+    The decorated function's "cache" attribute is its MemoizeCache.
+
     """
-    func.cache = {}
-    return decorator(_memoize, func)
+    if func is None:
+        return functools.partial(memoize, max_size=max_size, scope=scope)
+    name = f'{func.__module__}.{func.__qualname__}'
+    cache = func.cache = MemoizeCache(name, max_size=max_size, scope=scope)
+    _caches.append(cache)
+    decorated = decorator(_memoize, func)
+    decorated.cache = cache
+    return decorated
 
 
 def _memoize(func: Callable, *args, **opts) -> QIcon | bool | str:
@@ -59,13 +204,25 @@ def _memoize(func: Callable, *args, **opts) -> QIcon | bool | str:
     else:
         key = args
     cache = func.cache  # attribute added by memoize
-    try:
-        result = cache[key]
-    except KeyError:
-        result = cache[key] = func(*args, **opts)
+    result = cache.get(key, _missing)
+    if result is _missing:
+        result = func(*args, **opts)
+        cache.put(key, result)
     return result
 
 
+def clear_caches(scope: str | None = None) -> None:
+    """Clear the memoized results for a scope, or all results by default"""
+    for cache in _caches:
+        if scope is None or cache.scope == scope:
+            cache.clear()
+
+
+def cache_stats() -> dict[str, dict[str, int | None]]:
+    """Return the statistics for every memoized function by name"""
+    return {cache.name: cache.stats() for cache in _caches}
+
+
 @decorator
 def interruptable(func: Callable, *args, **opts) -> Any:
     """Handle interruptible system calls
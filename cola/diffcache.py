@@ -0,0 +1,187 @@
+"""Cache for the diffs of commits
+
+The diff of a commit never changes for a given set of diff options, so diffs
+are cached by the object IDs, path filter and options that produced them.
+Diffs are kept in memory in least-recently-used order and can optionally be
+stored compressed on disk so that they survive across sessions.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import zlib
+from typing import Any
+
+from . import core
+from . import resources
+from . import utils
+from .decorators import LRUCache
+
+# Bump the version when the cached diff format changes.
+_VERSION = 1
+
+
+class DiffCache:
+    """A two-level cache for diffs that is bounded by size
+
+    The in-memory cache is bounded by the memory used by the cached diffs.
+    The disk store is bounded by the size of the compressed files and the
+    least recently used files are removed when the store grows too large.
+    """
+
+    max_bytes = 64 * 1024 * 1024
+    max_disk_bytes = 256 * 1024 * 1024
+
+    def __init__(self, max_bytes: int | None = None, path: str | None = None) -> None:
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self.path = path
+        self.memory = LRUCache(max_bytes=self.max_bytes, sizeof=sys.getsizeof)
+        self.disk_size: int | None = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def contains(self, key: Any) -> bool:
+        """Is the diff for a key in memory? The statistics are not updated"""
+        return key in self.memory
+
+    def peek(self, key: Any) -> str | None:
+        """Return the diff for a key from memory without counting a miss"""
+        value = self.memory.get(key)
+        if value is not None:
+            with self.lock:
+                self.hits += 1
+        return value
+
+    def get(self, key: Any, disk: bool = False) -> str | None:
+        """Return the cached diff for a key or None on a cache miss"""
+        value = self.peek(key)
+        if value is not None:
+            return value
+        if disk:
+            value = self.read(key)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+        if value is not None:
+            self.memory.put(key, value)
+        return value
+
+    def put(self, key: Any, value: str, disk: bool = False) -> None:
+        """Cache the diff for a key"""
+        self.memory.put(key, value)
+        if disk:
+            self.write(key, value)
+
+    def clear(self) -> None:
+        """Forget the diffs cached in memory and reset the statistics"""
+        self.memory.clear()
+        self.memory.reset_stats()
+        with self.lock:
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache statistics"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.memory.evictions,
+                'count': len(self.memory),
+                'size': self.memory.size,
+            }
+
+    def filename(self, key: Any) -> str:
+        """Return the path to the disk store file for a key"""
+        path = self.path or resources.cache_home('diff')
+        digest = utils.sha256hex(repr((_VERSION, key)))
+        return os.path.join(path, digest + '.zz')
+
+    def read(self, key: Any) -> str | None:
+        """Read a diff from the disk store"""
+        filename = self.filename(key)
+        try:
+            with core.xopen(filename, 'rb') as fh:
+                data = fh.read()
+            value = zlib.decompress(data).decode('utf-8', 'surrogateescape')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+        # Refresh the modification time so that recently used diffs are pruned last.
+        try:
+            os.utime(core.mkpath(filename))
+        except OSError:
+            pass
+        return value
+
+    def write(self, key: Any, value: str) -> None:
+        """Write a diff to the disk store"""
+        filename = self.filename(key)
+        data = zlib.compress(value.encode('utf-8', 'surrogateescape'))
+        tmp_path = f'{filename}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            cache_dir = os.path.dirname(filename)
+            if not core.isdir(cache_dir):
+                core.makedirs(cache_dir)
+            with core.xopen(tmp_path, 'wb') as fh:
+                fh.write(data)
+            os.replace(core.mkpath(tmp_path), core.mkpath(filename))
+        except OSError:
+            if core.exists(tmp_path):
+                core.remove(tmp_path)
+            return
+        with self.lock:
+            if self.disk_size is None:
+                self.disk_size = _disk_usage(cache_dir)
+            else:
+                self.disk_size += len(data)
+            prune = self.disk_size > self.max_disk_bytes
+        if prune:
+            self.prune(cache_dir)
+
+    def prune(self, cache_dir: str) -> None:
+        """Remove the least recently used files from the disk store"""
+        files = _disk_files(cache_dir)
+        files.sort()
+        size = sum(file_size for _, file_size, _ in files)
+        limit = self.max_disk_bytes * 3 // 4
+        for _, file_size, path in files:
+            if size <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+        with self.lock:
+            self.disk_size = size
+
+
+def _disk_files(cache_dir: str) -> list[tuple[int, int, str]]:
+    """Return the (mtime, size, path) details for the files in the disk store"""
+    result = []
+    try:
+        entries = os.scandir(cache_dir)
+    except OSError:
+        return result
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith('.zz'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            result.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    return result
+
+
+def _disk_usage(cache_dir: str) -> int:
+    """Return the total size of the files in the disk store"""
+    return sum(file_size for _, file_size, _ in _disk_files(cache_dir))
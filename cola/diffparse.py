@@ -1,7 +1,11 @@
 from __future__ import annotations
+import bisect
 import math
 import re
+from array import array
 from collections import Counter
+from collections import OrderedDict
+from collections.abc import Iterable
 from collections.abc import Iterator
 from itertools import groupby
 from typing import Any
@@ -11,6 +15,9 @@ DIFF_ADDITION = '+'
 DIFF_DELETION = '-'
 DIFF_NO_NEWLINE = '\\'
 
+INITIAL_STATE = 0
+DIFF_STATE = 1
+
 
 def parse_range_str(range_str: str) -> tuple[int, int]:
     if ',' in range_str:
@@ -98,20 +105,41 @@ class DiffLines:
         )
 
     def parse(self, diff_text: str) -> list[tuple[int, int] | tuple[int, int, int]]:
+        self.merge = False
+        self.old.reset()
+        self.new.reset()
+        self.ours.reset()
+        self.theirs.reset()
+        self.additions.reset()
+        self.removals.reset()
+        return self.parse_lines(diff_text.split('\n'))
+
+    def parse_lines(
+        self,
+        texts: Iterable[str],
+        state: int = INITIAL_STATE,
+        empty_lines: bool = False,
+    ) -> list[tuple[int, int] | tuple[int, int, int]]:
+        """Parse diff lines starting from the current line number counters
+
+        "state" is DIFF_STATE when the lines continue a hunk. Empty lines only
+        advance the counters unless "empty_lines" is True, in which case they
+        get an entry like any other line.
+        """
         lines: list[tuple[int, int] | tuple[int, int, int]] = []
-        diff_state = 1
-        state = initial_state = 0
-        merge = self.merge = False
+        diff_state = DIFF_STATE
+        initial_state = INITIAL_STATE
+        merge = self.merge
         no_newline = r'\ No newline at end of file'
 
-        old = self.old.reset()
-        new = self.new.reset()
-        ours = self.ours.reset()
-        theirs = self.theirs.reset()
-        additions = self.additions.reset()
-        removals = self.removals.reset()
+        old = self.old
+        new = self.new
+        ours = self.ours
+        theirs = self.theirs
+        additions = self.additions
+        removals = self.removals
 
-        for text in diff_text.split('\n'):
+        for text in texts:
             if text.startswith('@@ -'):
                 parts = text.split(' ', 4)
                 if parts[0] == '@@' and parts[3] == '@@':
@@ -164,6 +192,11 @@ class DiffLines:
             elif merge and text.startswith('  '):
                 lines.append((ours.tick(), theirs.tick(), new.tick()))
             elif not text:
+                if empty_lines:
+                    if merge:
+                        lines.append((ours.value, theirs.value, new.value))
+                    else:
+                        lines.append((old.value, new.value))
                 new.tick()
                 old.tick()
                 ours.tick()
@@ -178,6 +211,366 @@ class DiffLines:
         return lines
 
 
+# Hunk headers that are recognized by DiffLines.parse_lines().
+_HUNK_RANGE = r'(\d+(?:,\d+)?)'
+_HUNK_HEADER_RE = re.compile(
+    rf'(?:@@ -{_HUNK_RANGE} \+{_HUNK_RANGE} @@'
+    rf'|@@@ -{_HUNK_RANGE} -{_HUNK_RANGE} \+{_HUNK_RANGE} @@@)(?: |$)',
+    re.MULTILINE,
+)
+# Lines that end a hunk and return DiffLines.parse_lines() to its initial state.
+_NO_NEWLINE = r'\\ No newline at end of file[^\S\n]*$'
+_HUNK_BREAK_RE = re.compile(rf'\n(?![ +\-]|{_NO_NEWLINE}|$)', re.MULTILINE)
+_MERGE_HUNK_BREAK_RE = re.compile(
+    rf'\n(?!- | -|--|\+\+|\+ | \+|  |{_NO_NEWLINE}|$)', re.MULTILINE
+)
+
+
+class DiffLineTable:
+    """A compact table of diff line numbers that is resolved lazily
+
+    The diff is scanned once to index its hunks and to record the line number
+    counters at the start of each chunk of lines. The line numbers for a chunk
+    are only computed when they are requested, typically when its lines become
+    visible, and the most recently used chunks are kept in typed arrays.
+    """
+
+    EMPTY = DiffLines.EMPTY
+    DASH = DiffLines.DASH
+    chunk_size = 32 * 1024  # Characters per chunk.
+    cache_size = 16  # Number of resolved chunks to keep.
+
+    def __init__(self, diff_text: str = '') -> None:
+        self.text = diff_text
+        self.merge = False
+        self.additions = 0
+        self.removals = 0
+        self.max_value = -1
+        self.line_count = 0
+        # The offset and first line of each chunk, whether the chunk starts
+        # inside of a hunk and the values of the line number counters if so.
+        self.chunk_offsets = array('q')
+        self.chunk_lines = array('q')
+        self.chunk_states = array('b')
+        self.chunk_values = array('q')
+        # The header line of each hunk and whether it is part of a merge diff.
+        self.hunk_lines = array('q')
+        self.hunk_merge = array('b')
+        # Line numbers that have been resolved, keyed by chunk.
+        self.chunks: OrderedDict[int, array] = OrderedDict()
+        self.resolved = 0
+        self._index_chunks()
+        self._index_hunks()
+
+    def __len__(self) -> int:
+        return self.line_count
+
+    @property
+    def width(self) -> int:
+        """Return the number of line number columns"""
+        return 3 if self.merge else 2
+
+    def digits(self) -> int:
+        return digits(self.max_value)
+
+    def numbers(self, line: int) -> tuple[int, ...]:
+        """Return the line numbers for the specified line"""
+        if line < 0 or line >= self.line_count:
+            raise IndexError(line)
+        chunk = bisect.bisect_right(self.chunk_lines, line) - 1
+        values = self._chunk(chunk)
+        width = self.width
+        start = (line - self.chunk_lines[chunk]) * width
+        return tuple(values[start : start + width])
+
+    def _index_chunks(self) -> None:
+        """Split the text into chunks that start on line boundaries"""
+        text = self.text
+        start = 0
+        line = 0
+        while True:
+            self.chunk_offsets.append(start)
+            self.chunk_lines.append(line)
+            end = text.find('\n', start + self.chunk_size)
+            if end < 0:
+                break
+            line += text.count('\n', start, end) + 1
+            start = end + 1
+        self.line_count = line + text.count('\n', start) + 1
+        chunk_count = len(self.chunk_offsets)
+        self.chunk_states = array('b', bytes(chunk_count))
+        self.chunk_values = array('q', bytes(chunk_count * 3 * 8))
+
+    def _hunk_headers(self) -> Iterator[re.Match[str]]:
+        """Find the hunk headers in the text"""
+        text = self.text
+        offset = 0
+        while offset >= 0:
+            match = _HUNK_HEADER_RE.match(text, offset)
+            if match is not None:
+                yield match
+            offset = text.find('\n@@', offset)
+            if offset >= 0:
+                offset += 1
+
+    def _index_hunks(self) -> None:
+        """Count each hunk's lines and the counters where its chunks start"""
+        text = self.text
+        length = len(text)
+        chunk_offsets = self.chunk_offsets
+        chunk_count = len(chunk_offsets)
+        headers = list(self._hunk_headers())
+        merge = False
+        line = 0
+        pos = 0
+        for idx, match in enumerate(headers):
+            offset = match.start()
+            line += text.count('\n', pos, offset)
+            pos = offset
+            self.hunk_lines.append(line)
+
+            ranges = match.groups()
+            if ranges[0] is None:
+                self.merge = merge = True
+                ranges = ranges[2:]
+            else:
+                ranges = ranges[:2]
+            starts = []
+            for range_str in ranges:
+                start, count = parse_range_str(range_str)
+                starts.append(start)
+                self.max_value = max(start + count - 1, self.max_value)
+            self.hunk_merge.append(merge)
+
+            # The hunk's lines run until the next header or a line that ends it.
+            body = text.find('\n', match.end())
+            body = length if body < 0 else body + 1
+            if idx + 1 < len(headers):
+                end = headers[idx + 1].start()
+            else:
+                end = length
+            if merge:
+                break_re = _MERGE_HUNK_BREAK_RE
+            else:
+                break_re = _HUNK_BREAK_RE
+            if body < end:
+                hunk_break = break_re.search(text, body - 1, end)
+                if hunk_break is not None:
+                    end = hunk_break.start() + 1
+
+            totals = [0, 0, 0, 0, 0]
+            counted = body
+            chunk = bisect.bisect_left(chunk_offsets, body)
+            while chunk < chunk_count:
+                chunk_start = chunk_offsets[chunk]
+                # Hunks that run to the end of the text include its last line.
+                if chunk_start > end or (chunk_start == end and end != length):
+                    break
+                self._add_counts(totals, counted, chunk_start, merge)
+                counted = chunk_start
+                self.chunk_states[chunk] = DIFF_STATE
+                for column, start in enumerate(starts):
+                    self.chunk_values[chunk * 3 + column] = start + totals[column]
+                chunk += 1
+            self._add_counts(totals, counted, end, merge)
+            self.removals += totals[3]
+            self.additions += totals[4]
+
+    def _add_counts(self, totals: list[int], start: int, end: int, merge: bool) -> None:
+        """Count the lines of a hunk between two offsets
+
+        The amounts that the line number counters advance by are added to the
+        first totals followed by the number of removals and additions.
+        """
+        text = self.text
+
+        def count(prefix):
+            value = text.count('\n' + prefix, start, end - 1 + len(prefix))
+            if text.startswith(prefix, start, end):
+                value += 1
+            return value
+
+        lines = text.count('\n', start, end)
+        no_newline = count('\\')
+        if merge:
+            ours = count('- ')
+            theirs = count(' -')
+            both = count('--')
+            new = count('++')
+            theirs_new = count('+ ')
+            ours_new = count(' +')
+            totals[0] += lines - theirs - new - theirs_new - no_newline
+            totals[1] += lines - ours - new - ours_new - no_newline
+            totals[2] += lines - ours - theirs - both - no_newline
+            totals[3] += ours + theirs + both
+            totals[4] += new + theirs_new + ours_new
+        else:
+            removals = count('-')
+            additions = count('+')
+            totals[0] += lines - additions - no_newline
+            totals[1] += lines - removals - no_newline
+            totals[3] += removals
+            totals[4] += additions
+
+    def _chunk(self, chunk: int) -> array:
+        """Return the line numbers for a chunk, resolving them if needed"""
+        values = self.chunks.get(chunk)
+        if values is not None:
+            self.chunks.move_to_end(chunk)
+            return values
+
+        text = self.text
+        start = self.chunk_offsets[chunk]
+        if chunk + 1 < len(self.chunk_offsets):
+            end = self.chunk_offsets[chunk + 1] - 1
+        else:
+            end = len(text)
+
+        parser = DiffLines()
+        hunk = bisect.bisect_left(self.hunk_lines, self.chunk_lines[chunk]) - 1
+        if hunk >= 0:
+            parser.merge = bool(self.hunk_merge[hunk])
+        state = self.chunk_states[chunk]
+        if state == DIFF_STATE:
+            if parser.merge:
+                counters = (parser.ours, parser.theirs, parser.new)
+            else:
+                counters = (parser.old, parser.new)
+            for column, counter in enumerate(counters):
+                counter.value = self.chunk_values[chunk * 3 + column]
+
+        width = self.width
+        values = array('q')
+        for line in parser.parse_lines(text[start:end].split('\n'), state, True):
+            if len(line) < width:
+                line = line + (self.EMPTY,)
+            values.extend(line)
+
+        self.chunks[chunk] = values
+        self.resolved += 1
+        if len(self.chunks) > self.cache_size:
+            self.chunks.popitem(last=False)
+        return values
+
+
+class DiffPages:
+    """Split a diff into pages of whole lines and index its files and hunks
+
+    A page ends before a file or hunk header when one is found in the second
+    half of the page. The lines of the file and hunk headers are kept in typed
+    arrays so that they can be found without scanning the text.
+    """
+
+    def __init__(self, diff_text: str, page_size: int = 0) -> None:
+        self.text = diff_text
+        self.page_size = page_size  # Characters per page. Zero disables paging.
+        self.line_count = diff_text.count('\n') + 1
+        self.page_offsets = array('q')
+        self.page_lines = array('q')
+        self.file_lines = array('q')
+        self.hunk_lines = array('q')
+        self.header_offsets = array('q')
+        self._index_headers()
+        self._index_pages()
+
+    def __len__(self) -> int:
+        return len(self.page_offsets)
+
+    def page_for_line(self, line: int) -> int:
+        """Return the page that contains the specified line"""
+        return max(0, bisect.bisect_right(self.page_lines, line) - 1)
+
+    def text_for_pages(self, first: int, last: int) -> str:
+        """Return the text for a range of pages"""
+        start = self.page_offsets[first]
+        if last + 1 < len(self.page_offsets):
+            return self.text[start : self.page_offsets[last + 1] - 1]
+        return self.text[start:]
+
+    def next_file(self, line: int) -> int | None:
+        """Return the line of the next file header after a line"""
+        return _next_value(self.file_lines, line)
+
+    def previous_file(self, line: int) -> int | None:
+        """Return the line of the previous file header before a line"""
+        return _previous_value(self.file_lines, line)
+
+    def next_hunk(self, line: int) -> int | None:
+        """Return the line of the next hunk header after a line"""
+        return _next_value(self.hunk_lines, line)
+
+    def previous_hunk(self, line: int) -> int | None:
+        """Return the line of the previous hunk header before a line"""
+        return _previous_value(self.hunk_lines, line)
+
+    def _index_headers(self) -> None:
+        """Record the offsets and lines of the file and hunk headers"""
+        text = self.text
+        files = _line_offsets(text, 'diff ')
+        hunks = _line_offsets(text, '@@')
+        line = 0
+        pos = 0
+        for offset in sorted(files + hunks):
+            line += text.count('\n', pos, offset)
+            pos = offset
+            self.header_offsets.append(offset)
+            if text.startswith('@@', offset):
+                self.hunk_lines.append(line)
+            else:
+                self.file_lines.append(line)
+
+    def _index_pages(self) -> None:
+        """Split the text into pages"""
+        text = self.text
+        length = len(text)
+        page_size = self.page_size
+        headers = self.header_offsets
+        start = 0
+        line = 0
+        while True:
+            self.page_offsets.append(start)
+            self.page_lines.append(line)
+            limit = start + page_size
+            if not page_size or limit >= length:
+                break
+            idx = bisect.bisect_right(headers, limit) - 1
+            if idx >= 0 and headers[idx] > start + page_size // 2:
+                end = headers[idx]
+            else:
+                end = text.find('\n', limit) + 1
+                if end <= 0 or end >= length:
+                    break
+            line += text.count('\n', start, end)
+            start = end
+
+
+def _line_offsets(text: str, prefix: str) -> list[int]:
+    """Return the offsets of the lines that start with a prefix"""
+    offsets = [0] if text.startswith(prefix) else []
+    pattern = '\n' + prefix
+    offset = text.find(pattern)
+    while offset >= 0:
+        offsets.append(offset + 1)
+        offset = text.find(pattern, offset + 1)
+    return offsets
+
+
+def _next_value(values: array, value: int) -> int | None:
+    """Return the first value that is greater than a value"""
+    idx = bisect.bisect_right(values, value)
+    if idx < len(values):
+        return values[idx]
+    return None
+
+
+def _previous_value(values: array, value: int) -> int | None:
+    """Return the last value that is less than a value"""
+    idx = bisect.bisect_left(values, value) - 1
+    if idx >= 0:
+        return values[idx]
+    return None
+
+
 class FormatDigits:
     """Format numbers for use in diff line numbers"""
 
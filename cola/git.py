@@ -10,6 +10,7 @@ from typing import TYPE_CHECKING
 from typing import Any
 
 from . import core
+from . import gitprofile
 from . import operations
 from .compat import WIN32
 from .compat import int_types
@@ -45,6 +46,11 @@ OID_LENGTH_SHA256 = 64
 _index_lock = threading.Lock()
 
 
+def index_lock() -> threading.Lock:
+    """Return the lock that serializes the commands that can write to the repository"""
+    return _index_lock
+
+
 def dashify(value: str) -> str:
     return value.replace('_', '-')
 
@@ -285,6 +291,7 @@ class Git:
         _stderr: int | None = subprocess.PIPE,
         _stdout: int | None = subprocess.PIPE,
         _readonly: bool = False,
+        _lock: threading.Lock | None = None,
         _no_win32_startupinfo: bool = False,
     ) -> tuple[int, core.UStr, core.UStr]:
         """
@@ -295,6 +302,8 @@ class Git:
         :param _decode: whether to decode output, defaults to True.
         :param _encoding: default encoding, defaults to None (utf-8).
         :param _readonly: avoid taking the index lock. Assume the command is read-only.
+        :param _lock: hold this lock instead of the index lock, e.g. when the
+            caller already holds the index lock on behalf of the command.
         :param _raw: do not strip trailing whitespace.
         :param _stdin: optional stdin filehandle.
         :returns (status, out, err): exit status, stdout, stderr
@@ -304,21 +313,22 @@ class Git:
         if not _cwd:
             _cwd = ops.getcwd()
 
-        extra = {}
+        extra = _detach_kwargs()
 
-        if hasattr(os, 'setsid'):
-            # SSH uses the SSH_ASKPASS variable only if the process is really
-            # detached from the TTY (stdin redirection and setting the
-            # SSH_ASKPASS environment variable is not enough).  To detach a
-            # process from the console it should fork and call os.setsid().
-            extra['preexec_fn'] = os.setsid
+        profiler = gitprofile.profiler()
+        profiling = profiler.enabled
+        if profiling:
+            extra['timings'] = timings = {}
+            profile_start = profiler.now()
 
         start_time = time.time()
 
         # Start the process
         # Guard against thread-unsafe .git/index.lock files
+        lock = _index_lock if _lock is None else _lock
         if not _readonly:
-            _index_lock.acquire()
+            lock.acquire()
+        lock_time = time.time()
         try:
             status, out, err = ops.run_command(
                 command,
@@ -334,38 +344,106 @@ class Git:
         finally:
             # Let the next thread in
             if not _readonly:
-                _index_lock.release()
+                lock.release()
 
         end_time = time.time()
         elapsed_time = abs(end_time - start_time)
 
+        if profiling:
+            profiler.record(
+                command,
+                profile_start,
+                elapsed_time,
+                lock_wait=abs(lock_time - start_time),
+                timings=timings,
+                status=status,
+            )
+
         if not _raw and out is not None:
             out = core.UStr(out.rstrip('\n'), out.encoding)
 
-        cola_trace = GIT_COLA_TRACE
-        if cola_trace == 'trace':
-            msg = f'trace: {elapsed_time:.3f}s: {core.list2cmdline(command)}'
-            Interaction.log_status(status, msg, '')
-        elif cola_trace == 'full':
-            if out or err:
-                ops.print_stderr(
-                    "# %.3fs: %s -> %d: '%s' '%s'"
-                    % (elapsed_time, ' '.join(command), status, out, err)
-                )
-            else:
-                ops.print_stderr(
-                    '# %.3fs: %s -> %d' % (elapsed_time, ' '.join(command), status)
-                )
-        elif cola_trace:
-            core.print_stderr('# {:.3f}s: {}'.format(elapsed_time, ' '.join(command)))
+        _trace_command(ops, command, elapsed_time, status, out, err)
 
         # Allow access to the command's status code
         return (status, out, err)
 
+    @staticmethod
+    def execute_stream(
+        command: list[TextType],
+        ops: operations.IOperations = operations.LocalOperations(),
+        _add_env: dict[str, str] | None = None,
+        _cwd: TextType | None = None,
+        _encoding: str | None = None,
+        _max_bytes: int | None = None,
+        _readonly: bool = False,
+        _separator: str | None = None,
+        _stdin: int | None = None,
+        _no_win32_startupinfo: bool = False,
+    ) -> core.CommandStream:
+        """
+        Execute a command and return a stream for reading its output
+
+        The stream yields decoded chunks of output, or records when a separator
+        such as "\\n" or "\\0" is specified. The command is killed when the
+        stream is closed before all of its output has been read.
+
+        :param command: argument list to execute.
+        :param _cwd: working directory, defaults to the current directory.
+        :param _encoding: default encoding, defaults to None (utf-8).
+        :param _max_bytes: stop reading after this many bytes of output.
+        :param _readonly: avoid taking the index lock. Assume the command is read-only.
+        :param _separator: split the output into records using this separator.
+        :param _stdin: optional stdin filehandle.
+        :returns: a CommandStream. The index lock is held until it is closed.
+
+        """
+        if not _cwd:
+            _cwd = ops.getcwd()
+
+        extra = _detach_kwargs()
+
+        profiler = gitprofile.profiler()
+        timings = profile_start = None
+        if profiler.enabled:
+            extra['timings'] = timings = {}
+            profile_start = profiler.now()
+
+        start_time = time.time()
+
+        # Guard against thread-unsafe .git/index.lock files
+        if not _readonly:
+            _index_lock.acquire()
+        lock_time = time.time()
+        try:
+            stream = ops.stream_command(
+                command,
+                add_env=_add_env,
+                cwd=_cwd,
+                encoding=_encoding,
+                separator=_separator,
+                max_bytes=_max_bytes,
+                stdin=_stdin,
+                no_win32_startupinfo=_no_win32_startupinfo,
+                **extra,
+            )
+        except BaseException:
+            if not _readonly:
+                _index_lock.release()
+            raise
+
+        stream.on_close = partial(
+            _finish_stream,
+            ops,
+            command,
+            _readonly,
+            start_time,
+            lock_time,
+            profile_start,
+            timings,
+        )
+        return stream
+
     def git(self, cmd: str, *args, **kwargs) -> tuple[int, TextType, TextType]:
-        # Handle optional arguments prior to calling transform_kwargs
-        # otherwise they'll end up in args, which is bad.
-        _kwargs = {'_cwd': self.getcwd()}
         execute_kwargs = (
             '_add_env',
             '_cwd',
@@ -376,9 +454,57 @@ class Git:
             '_stderr',
             '_raw',
             '_readonly',
+            '_lock',
+            '_no_win32_startupinfo',
+        )
+        call, _kwargs = self._prepare_command(cmd, args, kwargs, execute_kwargs)
+        try:
+            result: tuple[int, TextType, TextType] = self.execute(
+                call, self.ops, **_kwargs  # type: ignore[arg-type]
+            )
+        except OSError as exc:
+            if WIN32 and exc.errno == errno.ENOENT:
+                # see if git exists at all. On win32 it can fail with ENOENT in
+                # case of argv overflow. We should be safe from that but use
+                # defensive coding for the worst-case scenario. On UNIX
+                # we have ENAMETOOLONG but that doesn't exist on Windows.
+                if _git_is_installed(self.ops):
+                    raise
+                _print_win32_git_hint(self.ops)
+            result = (1, '', f"error: unable to execute '{GIT}'")
+        return result
+
+    def stream(self, cmd: str, *args, **kwargs) -> core.CommandStream:
+        """Run a git command and return a stream for reading its output
+
+        This is the streaming equivalent of git(), e.g.
+        git.stream('log', z=True, _separator='\\0') yields one record per commit.
+
+        """
+        execute_kwargs = (
+            '_add_env',
+            '_cwd',
+            '_encoding',
+            '_max_bytes',
+            '_readonly',
+            '_separator',
+            '_stdin',
             '_no_win32_startupinfo',
         )
+        call, _kwargs = self._prepare_command(cmd, args, kwargs, execute_kwargs)
+        return self.execute_stream(call, self.ops, **_kwargs)  # type: ignore[arg-type]
 
+    def _prepare_command(
+        self,
+        cmd: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        execute_kwargs: tuple[str, ...],
+    ) -> tuple[list[Any], dict[str, Any]]:
+        """Return the command line and the execute() arguments for a git command"""
+        # Handle optional arguments prior to calling transform_kwargs
+        # otherwise they'll end up in args, which is bad.
+        _kwargs = {'_cwd': self.getcwd()}
         for kwarg in execute_kwargs:
             if kwarg in kwargs:
                 _kwargs[kwarg] = kwargs.pop(kwarg)
@@ -397,21 +523,73 @@ class Git:
         opt_args = transform_kwargs(**kwargs)
         call = git_args + opt_args
         call.extend(args)
-        try:
-            result: tuple[int, TextType, TextType] = self.execute(
-                call, self.ops, **_kwargs  # type: ignore[arg-type]
+        return call, _kwargs
+
+
+def _detach_kwargs() -> dict[str, Any]:
+    """Return the arguments that detach git commands from the terminal"""
+    extra = {}
+    if hasattr(os, 'setsid'):
+        # SSH uses the SSH_ASKPASS variable only if the process is really
+        # detached from the TTY (stdin redirection and setting the
+        # SSH_ASKPASS environment variable is not enough).  To detach a
+        # process from the console it should fork and call os.setsid().
+        extra['preexec_fn'] = os.setsid
+    return extra
+
+
+def _trace_command(
+    ops: operations.IOperations,
+    command: list[TextType],
+    elapsed_time: float,
+    status: int,
+    out: TextType,
+    err: TextType,
+) -> None:
+    """Report a git command according to GIT_COLA_TRACE"""
+    cola_trace = GIT_COLA_TRACE
+    if cola_trace == 'trace':
+        msg = f'trace: {elapsed_time:.3f}s: {core.list2cmdline(command)}'
+        Interaction.log_status(status, msg, '')
+    elif cola_trace == 'full':
+        if out or err:
+            ops.print_stderr(
+                "# %.3fs: %s -> %d: '%s' '%s'"
+                % (elapsed_time, ' '.join(command), status, out, err)
             )
-        except OSError as exc:
-            if WIN32 and exc.errno == errno.ENOENT:
-                # see if git exists at all. On win32 it can fail with ENOENT in
-                # case of argv overflow. We should be safe from that but use
-                # defensive coding for the worst-case scenario. On UNIX
-                # we have ENAMETOOLONG but that doesn't exist on Windows.
-                if _git_is_installed(self.ops):
-                    raise
-                _print_win32_git_hint(self.ops)
-            result = (1, '', f"error: unable to execute '{GIT}'")
-        return result
+        else:
+            ops.print_stderr(
+                '# %.3fs: %s -> %d' % (elapsed_time, ' '.join(command), status)
+            )
+    elif cola_trace and cola_trace != 'profile':
+        core.print_stderr('# {:.3f}s: {}'.format(elapsed_time, ' '.join(command)))
+
+
+def _finish_stream(
+    ops: operations.IOperations,
+    command: list[TextType],
+    readonly: bool,
+    start_time: float,
+    lock_time: float,
+    profile_start: float | None,
+    timings: dict[str, Any] | None,
+    stream: core.CommandStream,
+) -> None:
+    """Release the index lock and report a streamed command once it is closed"""
+    if not readonly:
+        _index_lock.release()
+    elapsed_time = abs(time.time() - start_time)
+    status = stream.status if stream.status is not None else -1
+    if profile_start is not None:
+        gitprofile.profiler().record(
+            command,
+            profile_start,
+            elapsed_time,
+            lock_wait=abs(lock_time - start_time),
+            timings=timings,
+            status=status,
+        )
+    _trace_command(ops, command, elapsed_time, status, '', stream.err)
 
 
 def _git_is_installed(ops: operations.IOperations):
@@ -477,7 +655,7 @@ def win32_git_error_hint() -> str:
     )
 
 
-@memoize
+@memoize(max_size=1)
 def _print_win32_git_hint(ops: operations.IOperations) -> None:
     hint = '\n' + win32_git_error_hint() + '\n'
     ops.print_stderr("error: unable to execute 'git'" + hint)
@@ -3,6 +3,9 @@ import collections
 import copy
 import fnmatch
 import os
+import re
+import stat
+import string
 import struct
 from binascii import unhexlify
 from collections.abc import Callable
@@ -115,6 +118,7 @@ class GitConfig(QtCore.QObject):
         self._cache_paths = []
         self._attr_cache = {}
         self._binary_cache = {}
+        self._file_reader = ConfigFileReader(context)
 
     def reset(self) -> None:
         self._cache_key = None
@@ -158,25 +162,28 @@ class GitConfig(QtCore.QObject):
 
         self.reset_values()
 
-        show_scope = version.check_git(self.context, 'config-show-scope')
-        show_origin = version.check_git(self.context, 'config-show-origin')
-        if show_scope:
-            reader = _read_config_with_scope
-        elif show_origin:
-            reader = _read_config_with_origin
-        else:
-            reader = _read_config_fallback
+        # Config files are parsed in-process. "git config" is only needed when
+        # the in-process reader cannot reproduce Git's view of the config.
+        cache_paths = set()
+        config = self._file_reader.read(cache_paths, self._renamed_keys)
+        if config is None:
+            show_scope = version.check_git(self.context, 'config-show-scope')
+            show_origin = version.check_git(self.context, 'config-show-origin')
+            if show_scope:
+                reader = _read_config_with_scope
+            elif show_origin:
+                reader = _read_config_with_origin
+            else:
+                reader = _read_config_fallback
+            config = reader(self.context, cache_paths, self._renamed_keys)
 
         unknown_scope = 'unknown'
         system_scope = 'system'
         global_scope = 'global'
         local_scope = 'local'
         worktree_scope = 'worktree'
-        cache_paths = set()
 
-        for current_scope, current_key, current_value, continuation in reader(
-            self.context, cache_paths, self._renamed_keys
-        ):
+        for current_scope, current_key, current_value, continuation in config:
             # Store the values for fast cached lookup.
             self._all[current_key] = current_value
 
@@ -690,6 +697,443 @@ def _read_config_from_null_list(
         yield (name, _config_to_python(value))
 
 
+class ConfigError(ValueError):
+    """Config that must be read using "git config" instead of in-process"""
+
+
+_CONFIG_SPACE = ' \t\n\v\f\r'
+_CONFIG_KEY_CHARS = frozenset(string.ascii_letters + string.digits + '-')
+_CONFIG_ESCAPES = {'n': '\n', 't': '\t', 'b': '\b', '"': '"', '\\': '\\'}
+_DIR_SEPARATORS = ('/', os.sep)
+
+
+def parse_config(text: str) -> list[tuple[str, str | None]]:
+    """Parse the contents of a git config file into (key, value) pairs
+
+    Section and variable names are lowercased and subsection names are
+    kept as-is, which matches the keys reported by "git config --list".
+    Variables without an "=" (implicit true) have a value of None.
+    ConfigError is raised for content that Git would reject.
+    """
+    text = text.replace('\r\n', '\n')
+    text = text.removeprefix('\ufeff')
+    size = len(text)
+    entries = []
+    section = ''
+    pos = 0
+    while pos < size:
+        char = text[pos]
+        pos += 1
+        if char in _CONFIG_SPACE:
+            continue
+        if char in '#;':
+            pos = _end_of_line(text, pos)
+            continue
+        if char == '[':
+            section, pos = _parse_config_section(text, pos)
+            continue
+        if char not in string.ascii_letters or not section:
+            raise ConfigError(f'bad config line: {char!r}')
+        start = pos - 1
+        while pos < size and text[pos] in _CONFIG_KEY_CHARS:
+            pos += 1
+        name = text[start:pos].lower()
+        while pos < size and text[pos] in ' \t':
+            pos += 1
+        if pos >= size or text[pos] == '\n':
+            value = None
+        elif text[pos] == '=':
+            value, pos = _parse_config_value(text, pos + 1)
+        else:
+            raise ConfigError(f'bad config variable: {section}.{name}')
+        entries.append((f'{section}.{name}', value))
+    return entries
+
+
+def _end_of_line(text: str, pos: int) -> int:
+    """Return the position after the end of the current line"""
+    end = text.find('\n', pos)
+    if end < 0:
+        return len(text)
+    return end + 1
+
+
+def _parse_config_section(text: str, pos: int) -> tuple[str, int]:
+    """Parse a "[section]" or '[section "subsection"]' header"""
+    size = len(text)
+    start = pos
+    while pos < size:
+        char = text[pos]
+        pos += 1
+        if char == ']':
+            section = text[start : pos - 1].lower()
+            if not section:
+                break
+            return section, pos
+        if char in _CONFIG_SPACE:
+            return _parse_config_subsection(text, pos, text[start : pos - 1].lower())
+        if char not in _CONFIG_KEY_CHARS and char != '.':
+            break
+    raise ConfigError('bad config section header')
+
+
+def _parse_config_subsection(text: str, pos: int, section: str) -> tuple[str, int]:
+    """Parse the quoted subsection name in a '[section "subsection"]' header"""
+    size = len(text)
+    if text[pos - 1] == '\n':
+        raise ConfigError('bad config section header')
+    while pos < size and text[pos] in _CONFIG_SPACE:
+        if text[pos] == '\n':
+            raise ConfigError('bad config section header')
+        pos += 1
+    if pos >= size or text[pos] != '"':
+        raise ConfigError('bad config section header')
+    pos += 1
+    chars = []
+    while pos < size:
+        char = text[pos]
+        pos += 1
+        if char == '"':
+            if pos < size and text[pos] == ']':
+                return f'{section}.{"".join(chars)}', pos + 1
+            break
+        if char == '\\' and pos < size:
+            char = text[pos]
+            pos += 1
+        if char == '\n':
+            break
+        chars.append(char)
+    raise ConfigError('bad config section header')
+
+
+def _parse_config_value(text: str, pos: int) -> tuple[str, int]:
+    """Parse a value, handling quotes, escapes, comments and continuations"""
+    size = len(text)
+    chars = []
+    quote = False
+    comment = False
+    space = 0
+    while True:
+        char = text[pos] if pos < size else '\n'
+        pos += 1
+        if char == '\n':
+            if quote:
+                raise ConfigError('unterminated quote in config value')
+            return ''.join(chars), pos
+        if comment:
+            continue
+        if char in _CONFIG_SPACE and not quote:
+            # Whitespace runs are kept as spaces only when they are followed by
+            # more content. Leading and trailing whitespace is dropped.
+            if chars:
+                space += 1
+            continue
+        if not quote and char in '#;':
+            comment = True
+            continue
+        if space:
+            chars.append(' ' * space)
+            space = 0
+        if char == '\\':
+            char = text[pos] if pos < size else '\n'
+            pos += 1
+            if char == '\n':
+                continue
+            try:
+                chars.append(_CONFIG_ESCAPES[char])
+            except KeyError as exc:
+                raise ConfigError(f'bad escape in config value: {char!r}') from exc
+            continue
+        if char == '"':
+            quote = not quote
+            continue
+        chars.append(char)
+
+
+def wildmatch(pattern: str, text: str, icase: bool = False) -> bool:
+    """Match text against a Git pathname wildcard pattern
+
+    "*" and "?" do not match "/" and "**" matches across directories
+    when it is a whole path component.
+    """
+    regex = []
+    size = len(pattern)
+    idx = 0
+    while idx < size:
+        char = pattern[idx]
+        idx += 1
+        if char == '*':
+            if pattern.startswith('*', idx):
+                idx += 1
+                leading = idx == 2 or pattern[idx - 3] == '/'
+                if leading and idx == size:
+                    regex.append('.*')
+                    continue
+                if leading and pattern[idx] == '/':
+                    regex.append('(?:.*/)?')
+                    idx += 1
+                    continue
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '[':
+            start = idx + 1 if pattern[idx : idx + 1] in ('!', '^') else idx
+            end = pattern.find(']', start + 1)
+            if end < 0:
+                regex.append(re.escape(char))
+                continue
+            chars = pattern[idx:end]
+            idx = end + 1
+            negate = chars[0] in '!^'
+            if negate:
+                chars = chars[1:]
+            chars = chars.replace('\\', '\\\\').replace('^', '\\^')
+            regex.append(f'[{"^/" if negate else ""}{chars}]')
+        elif char == '\\' and idx < size:
+            regex.append(re.escape(pattern[idx]))
+            idx += 1
+        else:
+            regex.append(re.escape(char))
+    flags = re.DOTALL | (re.IGNORECASE if icase else 0)
+    return re.match(''.join(regex) + r'\Z', text, flags) is not None
+
+
+def _env_bool(name: str) -> bool:
+    """Interpret an environment variable as a Git boolean"""
+    return _config_bool(core.getenv(name) or 'false')
+
+
+def _config_bool(value: str | None) -> bool:
+    """Interpret a raw config value as a Git boolean"""
+    if value is None:
+        return True
+    value = value.lower()
+    if value in ('true', 'yes', 'on'):
+        return True
+    if value in ('false', 'no', 'off', ''):
+        return False
+    try:
+        return int(value) != 0
+    except ValueError:
+        return False
+
+
+class ConfigFileReader:
+    """Read the system, global, local and worktree config files in-process
+
+    Each file's parsed entries are cached by its stat signature so that
+    only the files that changed are parsed again. "git config" is still
+    used for cases that are not handled here, e.g. remote repositories,
+    config supplied through the environment and "hasconfig:" includes.
+    """
+
+    max_include_depth = 10
+
+    def __init__(self, context: ApplicationContext) -> None:
+        self.context = context
+        self._parsed: dict[str, tuple[tuple[int, ...], list]] = {}
+        self._system_path: str | None = None
+        self._system_path_resolved = False
+
+    def read(
+        self, cache_paths: set[Any], renamed_keys: dict[Any, Any]
+    ) -> list[tuple[str, str, ConfigValue, bool]] | None:
+        """Return (scope, key, value, continuation) tuples for all config values
+
+        None is returned when the config must be read using "git config".
+        """
+        paths = set()
+        entries = []
+        try:
+            for scope, path in self._config_paths():
+                self._read_file(scope, path, entries, paths, 0)
+            worktree_config = self._worktree_config_path(entries)
+            if worktree_config:
+                self._read_file('worktree', worktree_config, entries, paths, 0)
+        except (ConfigError, OSError, UnicodeError):
+            return None
+
+        cache_paths.update(paths)
+        result = []
+        for scope, key, value in entries:
+            renamed_keys[key.lower()] = key
+            if value is None:
+                # A variable without a value is interpreted as "true".
+                value = True
+            else:
+                value = _config_to_python(value)
+            result.append((scope, key, value, False))
+        return result
+
+    def _config_paths(self) -> list[tuple[str, str]]:
+        """Return the (scope, path) config files in the order read by Git"""
+        if self.context.ops.is_remote():
+            raise ConfigError('remote repositories are read using "git config"')
+        for name in ('GIT_CONFIG', 'GIT_CONFIG_COUNT', 'GIT_CONFIG_PARAMETERS'):
+            if core.getenv(name):
+                raise ConfigError(f'{name} is read using "git config"')
+        paths = []
+        if not _env_bool('GIT_CONFIG_NOSYSTEM'):
+            system_path = core.getenv('GIT_CONFIG_SYSTEM') or self._system_config()
+            if not system_path:
+                raise ConfigError('unknown system config location')
+            paths.append(('system', system_path))
+        global_path = core.getenv('GIT_CONFIG_GLOBAL')
+        if global_path:
+            paths.append(('global', global_path))
+        else:
+            paths.append(('global', resources.xdg_config_home('git', 'config')))
+            paths.append(('global', core.expanduser(os.path.join('~', '.gitconfig'))))
+        local_path = self.context.git.git_path('config')
+        if local_path:
+            paths.append(('local', local_path))
+        return paths
+
+    def _system_config(self) -> str | None:
+        """Return the location of the system config file"""
+        if self._system_path_resolved:
+            return self._system_path
+        context = self.context
+        if version.check_git(context, 'var-config-system'):
+            status, out, _ = context.git.var('GIT_CONFIG_SYSTEM', _readonly=True)
+            path = out.strip() if status == 0 else None
+        elif utils.is_win32():
+            # The location depends on where Git for Windows is installed.
+            path = None
+        elif utils.is_darwin() and 'Apple' in version.git_version_str(context):
+            # Apple Git also reads an Xcode-provided config in the "unknown" scope.
+            path = None
+        else:
+            path = '/etc/gitconfig'
+        self._system_path = path
+        self._system_path_resolved = True
+        return path
+
+    def _worktree_config_path(self, entries: list) -> str | None:
+        """Return the path to config.worktree when extensions.worktreeConfig is set"""
+        enabled = False
+        for scope, key, value in entries:
+            if scope == 'local' and key == 'extensions.worktreeconfig':
+                enabled = _config_bool(value)
+        if not enabled:
+            return None
+        return self.context.git.git_path('config.worktree', common=False)
+
+    def _read_file(
+        self, scope: str, path: str, entries: list, paths: set[str], depth: int
+    ) -> None:
+        """Append the entries from a config file and the files that it includes"""
+        paths.add(path)
+        for key, value in self._parse_file(path):
+            entries.append((scope, key, value))
+            include_path = self._include_path(key, value, path, paths)
+            if not include_path:
+                continue
+            if depth >= self.max_include_depth:
+                raise ConfigError('exceeded maximum include depth')
+            self._read_file(scope, include_path, entries, paths, depth + 1)
+
+    def _parse_file(self, path: str) -> list[tuple[str, str | None]]:
+        """Parse a config file, reusing the previous result when it is unchanged"""
+        try:
+            st = core.stat(path)
+        except OSError:
+            # Missing files are skipped by Git.
+            self._parsed.pop(path, None)
+            return []
+        if stat.S_ISDIR(st.st_mode):
+            raise ConfigError(f'{path} is a directory')
+        signature = (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino)
+        cached = self._parsed.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        entries = parse_config(core.read(path))
+        self._parsed[path] = (signature, entries)
+        return entries
+
+    def _include_path(
+        self, key: str, value: str | None, path: str, paths: set[str]
+    ) -> str | None:
+        """Return the file included by an include.path or includeIf.*.path entry"""
+        if key != 'include.path':
+            if not key.startswith('includeif.') or not key.endswith('.path'):
+                return None
+            condition = key[len('includeif.') : -len('.path')]
+            if not self._include_condition(condition, path, paths):
+                return None
+        if value is None or value.startswith('%('):
+            raise ConfigError(f'unsupported include: {key}')
+        include_path = core.expanduser(value)
+        if not os.path.isabs(include_path):
+            include_path = os.path.join(os.path.dirname(path), include_path)
+        return include_path
+
+    def _include_condition(self, condition: str, path: str, paths: set[str]) -> bool:
+        """Evaluate an includeIf condition"""
+        if condition.startswith('gitdir:'):
+            return self._include_gitdir(condition[len('gitdir:') :], path)
+        if condition.startswith('gitdir/i:'):
+            return self._include_gitdir(condition[len('gitdir/i:') :], path, True)
+        if condition.startswith('onbranch:'):
+            return self._include_onbranch(condition[len('onbranch:') :], paths)
+        if condition.startswith('hasconfig:'):
+            raise ConfigError(f'unsupported include condition: {condition}')
+        # Unknown conditions are ignored by Git.
+        return False
+
+    def _include_gitdir(self, pattern: str, path: str, icase: bool = False) -> bool:
+        """Evaluate an includeIf.gitdir condition"""
+        git_dir = self.context.git.paths.git_dir
+        if not git_dir or not pattern:
+            return False
+        if utils.is_win32():
+            raise ConfigError('gitdir conditions are evaluated by "git config"')
+        prefix = 0
+        if pattern[0] == '~' and pattern[1:2] in _DIR_SEPARATORS:
+            pattern = core.expanduser(pattern)
+        if pattern[0] == '.' and pattern[1:2] in _DIR_SEPARATORS:
+            dirname = os.path.dirname(core.realpath(path))
+            pattern = dirname + pattern[1:]
+            prefix = len(dirname) + 1
+        elif not os.path.isabs(pattern):
+            pattern = '**/' + pattern
+        if pattern.endswith(_DIR_SEPARATORS):
+            pattern += '**'
+        for text in (core.realpath(git_dir), core.abspath(git_dir)):
+            if prefix:
+                # The prefix from "./" is matched literally.
+                if icase:
+                    literal = pattern[:prefix].lower() == text[:prefix].lower()
+                else:
+                    literal = pattern[:prefix] == text[:prefix]
+                if not literal:
+                    continue
+            if wildmatch(pattern[prefix:], text[prefix:], icase=icase):
+                return True
+        return False
+
+    def _include_onbranch(self, pattern: str, paths: set[str]) -> bool:
+        """Evaluate an includeIf.onbranch condition"""
+        git_dir = self.context.git.paths.git_dir
+        if not git_dir or not pattern:
+            return False
+        head = os.path.join(git_dir, 'HEAD')
+        # Switching branches changes the result so HEAD is part of the cache key.
+        paths.add(head)
+        ref_prefix = 'ref: refs/heads/'
+        try:
+            ref = core.read(head).strip()
+        except OSError:
+            return False
+        if ref == ref_prefix + '.invalid':
+            raise ConfigError('reftable repositories are read using "git config"')
+        if not ref.startswith(ref_prefix):
+            return False
+        if pattern.endswith('/'):
+            pattern += '**'
+        return wildmatch(pattern, ref[len(ref_prefix) :])
+
+
 def python_to_git(value) -> str:
     if isinstance(value, bool):
         return 'true' if value else 'false'
@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 from typing import Any
 
 from . import core
+from . import diffcache
 from . import textwrap
 from . import utils
 from . import version
@@ -107,6 +108,49 @@ def changed_files(context: ApplicationContext, oid: str) -> list[str]:
     return result
 
 
+def changed_files_batch(
+    context: ApplicationContext, oids: list[str]
+) -> dict[str, list[str]]:
+    """Return {oid: filenames} for several commits using a single git process
+
+    Merge commits are compared against their first parent and root commits are
+    compared against the empty tree, which matches changed_files().
+    The keys are the full object IDs of the commits.
+    """
+    if not oids:
+        return {}
+    status, out, _ = context.git.log(
+        *oids,
+        '--',
+        no_walk='unsorted',
+        m=True,
+        first_parent=True,
+        name_only=True,
+        no_renames=True,
+        no_color=True,
+        z=True,
+        format='%x00%H',
+        _readonly=True,
+    )
+    if status != 0:
+        return {}
+    # Each commit is emitted as "\0<oid>\0" followed by "\n<path>\0<path>\0...".
+    result = {}
+    paths = None
+    expect_oid = False
+    for token in out.split('\0'):
+        if not token:
+            expect_oid = True
+        elif expect_oid:
+            paths = result[token] = []
+            expect_oid = False
+        elif paths is not None:
+            if not paths and token.startswith('\n'):
+                token = token[1:]
+            paths.append(token)
+    return result
+
+
 def diff_tree(
     context: ApplicationContext, *args
 ) -> tuple[TextType, TextType, TextType]:
@@ -352,6 +396,111 @@ def tracked_branch(
     return None
 
 
+_UPSTREAM_TRACK_REGEX = re.compile(r'(ahead|behind) (\d+)')
+
+
+def ahead_behind(context: ApplicationContext) -> dict[str, tuple[str, int, int]]:
+    """Return {branch: (upstream, ahead, behind)} for all local tracking branches
+
+    The commit counts are cached on the model by the object IDs of the branch
+    and its upstream so that git only walks history for branches whose refs have
+    moved. The model forgets the counts when the repository changes.
+    """
+    refs_heads = 'refs/heads/'
+    _, out, _ = context.git.for_each_ref(
+        'refs/heads',
+        'refs/remotes',
+        format='%(refname)%00%(objectname)%00%(upstream)',
+        _readonly=True,
+    )
+    oids = {}
+    upstreams = {}
+    for line in out.splitlines():
+        try:
+            refname, oid, upstream = line.split('\0')
+        except ValueError:
+            continue
+        oids[refname] = oid
+        if upstream and refname.startswith(refs_heads):
+            upstreams[refname] = upstream
+
+    cache = context.model.ahead_behind_cache
+    counts = {}
+    keys = {}
+    missing = []
+    for refname, upstream in upstreams.items():
+        upstream_oid = oids.get(upstream)
+        if not upstream_oid:
+            continue  # The upstream branch is gone.
+        key = keys[refname] = (oids[refname], upstream_oid)
+        if key in cache:
+            counts[key] = cache[key]
+        else:
+            missing.append(refname)
+
+    if len(missing) > 1 and version.check_git(context, 'upstream-track-nobracket'):
+        # A single for-each-ref computes the counts for every branch at once.
+        tracked = _upstream_track(context)
+        for refname in missing:
+            counts[keys[refname]] = tracked.get(refname, (0, 0))
+    else:
+        for refname in missing:
+            counts[keys[refname]] = _rev_list_left_right_count(
+                context, refname, upstreams[refname]
+            )
+    # Only retain entries for the current refs to keep the cache bounded.
+    context.model.ahead_behind_cache = counts
+
+    result = {}
+    for refname, key in keys.items():
+        ahead, behind = counts[key]
+        branch = refname[len(refs_heads) :]
+        upstream = upstreams[refname]
+        for prefix in ('refs/remotes/', refs_heads):
+            if upstream.startswith(prefix):
+                upstream = upstream[len(prefix) :]
+                break
+        result[branch] = (upstream, ahead, behind)
+    return result
+
+
+def _upstream_track(context: ApplicationContext) -> dict[str, tuple[int, int]]:
+    """Return {refname: (ahead, behind)} using for-each-ref %(upstream:track)
+
+    The counts for every local branch are computed by a single git process.
+    """
+    _, out, _ = context.git.for_each_ref(
+        'refs/heads',
+        format='%(refname)%00%(upstream:track,nobracket)',
+        _readonly=True,
+    )
+    result = {}
+    for line in out.splitlines():
+        refname, _, track = line.partition('\0')
+        values = dict(_UPSTREAM_TRACK_REGEX.findall(track))
+        result[refname] = (int(values.get('ahead', 0)), int(values.get('behind', 0)))
+    return result
+
+
+def _rev_list_left_right_count(
+    context: ApplicationContext, refname: str, upstream: str
+) -> tuple[int, int]:
+    """Return (ahead, behind) from "rev-list --left-right --count"
+
+    This is used when only a single branch needs to be counted and for older Git.
+    """
+    status, out, _ = context.git.rev_list(
+        f'{refname}...{upstream}', left_right=True, count=True, _readonly=True
+    )
+    if status != 0:
+        return (0, 0)
+    try:
+        ahead, behind = out.split()
+        return (int(ahead), int(behind))
+    except ValueError:
+        return (0, 0)
+
+
 def parse_remote_branch(branch: str) -> tuple[str, str]:
     """Split a remote branch apart into (remote, name) components"""
     rgx = re.compile(r'^(?P<remote>[^/]+)/(?P<branch>.+)$')
@@ -483,10 +632,75 @@ def diff_info(
     return diff_range(context, oid + '~', oid, filename=filename)
 
 
+_diff_cache = diffcache.DiffCache()
+_OID_RE = re.compile(r'[0-9a-f]{40}|[0-9a-f]{64}')
+
+
+def diff_cache() -> diffcache.DiffCache:
+    """Return the cache for the diffs of commits"""
+    return _diff_cache
+
+
+def _diff_cache_key(
+    context: ApplicationContext, start: str, end: str, filename: str | None
+) -> tuple[Any, ...] | None:
+    """Return the cache key for the diff of a commit range
+
+    Only diffs between commits named by their full object IDs are immutable.
+    None is returned for the worktree, the index and symbolic refs.
+    """
+    if not _OID_RE.fullmatch(end) or not _OID_RE.fullmatch(start.removesuffix('~')):
+        return None
+    cfg = context.cfg
+    if filename:
+        encoding = cfg.file_encoding(filename)
+    else:
+        encoding = cfg.gui_encoding()
+    opts = common_diff_opts(context)
+    config = cfg.find('diff.*')
+    config.update(cfg.find('i18n.*'))
+    return (
+        start,
+        end,
+        filename,
+        encoding,
+        tuple(sorted(opts.items())),
+        tuple(sorted(config.items())),
+    )
+
+
+def cached_diff_range(
+    context: ApplicationContext, start: str, end: str, filename: str | None = None
+) -> str | None:
+    """Return the diff for a commit range when it is cached in memory"""
+    key = _diff_cache_key(context, start, end, filename)
+    if key is None:
+        return None
+    return _diff_cache.peek(key)
+
+
+def is_diff_range_cached(
+    context: ApplicationContext, start: str, end: str, filename: str | None = None
+) -> bool:
+    """Is the diff for a commit range cached in memory?
+
+    Unlike cached_diff_range() this does not count as a cache hit.
+    """
+    key = _diff_cache_key(context, start, end, filename)
+    return key is not None and _diff_cache.contains(key)
+
+
 def diff_range(
     context: ApplicationContext, start: str, end: str, filename: str | None = None
 ) -> str:
     """Return the diff for the specified commit range"""
+    key = _diff_cache_key(context, start, end, filename)
+    if key is not None:
+        disk = prefs.diff_cache(context)
+        diff = _diff_cache.get(key, disk=disk)
+        if diff is not None:
+            return diff
+
     if end == dag.WORKTREE or end == dag.STAGE:
         commitmsg = context.model.commitmsg
         if commitmsg:
@@ -501,7 +715,10 @@ def diff_range(
     if description:
         description += '\n\n'
 
-    return description + oid_diff_range(context, start, end, filename=filename)
+    diff = description + oid_diff_range(context, start, end, filename=filename)
+    if key is not None and diff:
+        _diff_cache.put(key, diff, disk=disk)
+    return diff
 
 
 def diff_helper(
@@ -957,15 +1174,37 @@ def parse_rev_list(raw_revs) -> list[tuple[str, str]]:
 
 
 def log_helper(
-    context: ApplicationContext, all: bool = False, extra_args=None
+    context: ApplicationContext,
+    all: bool = False,
+    extra_args=None,
+    skip: int = 0,
+    max_count: int | None = None,
+    grep: str | None = None,
+    pickaxe: str | None = None,
 ) -> tuple[list[str], list[str]]:
-    """Return parallel arrays containing oids and summaries."""
+    """Return parallel arrays containing oids and summaries.
+
+    "skip" and "max_count" select a page of the log. "grep" limits the log to
+    commits whose message contains the text and "pickaxe" limits the log to
+    commits that change the number of occurrences of the text.
+    """
     revs = []
     summaries = []
     args = []
     if extra_args:
         args = extra_args
-    output = log(context, pretty='oneline', all=all, *args)
+    output = log(
+        context,
+        pretty='oneline',
+        all=all,
+        skip=skip or None,
+        max_count=max_count,
+        grep=grep or None,
+        fixed_strings=bool(grep),
+        regexp_ignore_case=bool(grep),
+        S=pickaxe or None,
+        *args,
+    )
     for line in output.splitlines():
         match = REV_LIST_REGEX.match(line)
         if match:
@@ -0,0 +1,326 @@
+"""Profile the git commands that are run by git-cola
+
+Profiling is enabled by the GIT_COLA_TRACE environment variable. Every git
+invocation is recorded with its timings, output size, the function that ran
+it and the user action that caused it. The records can be summarized by
+action and exported as JSON or in the Chrome trace event format, which can be
+loaded into chrome://tracing or https://ui.perfetto.dev.
+"""
+from __future__ import annotations
+import collections
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from . import core
+
+# Modules whose frames are skipped when looking for the caller of a command.
+_INTERNAL_MODULES = {
+    'cola.core',
+    'cola.git',
+    'cola.gitprofile',
+    'cola.operations',
+    'cola.qtutils',
+    'functools',
+}
+
+
+class Invocation:
+    """The details of a single git command"""
+
+    __slots__ = (
+        'action',
+        'bytes_err',
+        'bytes_out',
+        'caller',
+        'command',
+        'decode',
+        'lock_wait',
+        'run',
+        'spawn',
+        'start',
+        'status',
+        'thread',
+        'wall',
+    )
+
+    def __init__(
+        self,
+        command: list[str],
+        action: str,
+        caller: str,
+        start: float,
+        wall: float,
+        lock_wait: float = 0.0,
+        spawn: float = 0.0,
+        run: float = 0.0,
+        decode: float = 0.0,
+        bytes_out: int = 0,
+        bytes_err: int = 0,
+        status: int = 0,
+        thread: int = 0,
+    ) -> None:
+        self.command = command
+        self.action = action
+        self.caller = caller
+        self.start = start
+        self.wall = wall
+        self.lock_wait = lock_wait
+        self.spawn = spawn
+        self.run = run
+        self.decode = decode
+        self.bytes_out = bytes_out
+        self.bytes_err = bytes_err
+        self.status = status
+        self.thread = thread
+
+    @property
+    def subcommand(self) -> str:
+        """Return the git subcommand, e.g. "diff" for "git -c x=y diff" """
+        args = iter(self.command[1:])
+        for arg in args:
+            if arg == '-c':
+                next(args, None)
+                continue
+            if not arg.startswith('-'):
+                return arg
+        return os.path.basename(self.command[0]) if self.command else ''
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the invocation as a JSON-serializable dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profiler:
+    """Record git invocations and summarize them by user action"""
+
+    max_records = 100000
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.epoch = time.perf_counter()
+        self.records: collections.deque[Invocation] = collections.deque(
+            maxlen=self.max_records
+        )
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def current_action(self) -> str:
+        """Return the user action that is running in the current thread"""
+        return getattr(self.local, 'action', '')
+
+    @contextlib.contextmanager
+    def action(self, name: str) -> Iterator[None]:
+        """Attribute the git commands run in this context to a user action"""
+        if not self.enabled or not name:
+            yield
+            return
+        previous = self.current_action()
+        # Nested commands are attributed to the outermost action.
+        if not previous:
+            self.local.action = name
+        try:
+            yield
+        finally:
+            self.local.action = previous
+
+    def now(self) -> float:
+        """Return the time in seconds since the profiler was created"""
+        return time.perf_counter() - self.epoch
+
+    def record(
+        self,
+        command: list[str],
+        start: float,
+        wall: float,
+        lock_wait: float = 0.0,
+        timings: dict[str, Any] | None = None,
+        status: int = 0,
+    ) -> Invocation:
+        """Record a git invocation"""
+        caller, context = find_caller()
+        action = self.current_action() or context
+        timings = timings or {}
+        invocation = Invocation(
+            [core.decode(arg) for arg in command],
+            action,
+            caller,
+            start,
+            wall,
+            lock_wait=lock_wait,
+            spawn=timings.get('spawn', 0.0),
+            run=timings.get('run', 0.0),
+            decode=timings.get('decode', 0.0),
+            bytes_out=timings.get('bytes_out', 0),
+            bytes_err=timings.get('bytes_err', 0),
+            status=status,
+            thread=threading.get_ident(),
+        )
+        with self.lock:
+            self.records.append(invocation)
+        return invocation
+
+    def clear(self) -> None:
+        """Forget the recorded invocations"""
+        with self.lock:
+            self.records.clear()
+
+    def invocations(self) -> list[Invocation]:
+        """Return a snapshot of the recorded invocations"""
+        with self.lock:
+            return list(self.records)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Summarize the invocations by action and by call site
+
+        Actions are sorted by their total wall time, slowest first. Each action
+        lists its call sites, the caller and git subcommand pairs, likewise.
+        """
+        actions: dict[str, dict[str, Any]] = {}
+        for invocation in self.invocations():
+            action = actions.get(invocation.action)
+            if action is None:
+                action = actions[invocation.action] = _new_totals(invocation.action)
+                action['sites'] = {}
+            site_name = f'{invocation.caller}: git {invocation.subcommand}'
+            site = action['sites'].get(site_name)
+            if site is None:
+                site = action['sites'][site_name] = _new_totals(site_name)
+            _add_totals(action, invocation)
+            _add_totals(site, invocation)
+
+        result = sorted(actions.values(), key=_wall_time, reverse=True)
+        for action in result:
+            action['sites'] = sorted(
+                action['sites'].values(), key=_wall_time, reverse=True
+            )
+        return result
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the invocations and their summary as a JSON-serializable dict"""
+        return {
+            'invocations': [invocation.as_dict() for invocation in self.invocations()],
+            'summary': self.summary(),
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Return the invocations in the Chrome trace event format"""
+        pid = os.getpid()
+        events = []
+        for invocation in self.invocations():
+            events.append({
+                'name': f'git {invocation.subcommand}',
+                'cat': invocation.action or 'git',
+                'ph': 'X',
+                'ts': invocation.start * 1e6,
+                'dur': invocation.wall * 1e6,
+                'pid': pid,
+                'tid': invocation.thread,
+                'args': {
+                    'command': core.list2cmdline(invocation.command),
+                    'caller': invocation.caller,
+                    'status': invocation.status,
+                    'lock_wait_ms': invocation.lock_wait * 1e3,
+                    'spawn_ms': invocation.spawn * 1e3,
+                    'run_ms': invocation.run * 1e3,
+                    'decode_ms': invocation.decode * 1e3,
+                    'bytes_out': invocation.bytes_out,
+                    'bytes_err': invocation.bytes_err,
+                },
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_json(self, path: str) -> None:
+        """Write the invocations and their summary to a JSON file"""
+        _write_json(path, self.to_json())
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the invocations to a Chrome trace file"""
+        _write_json(path, self.to_chrome_trace())
+
+
+def _new_totals(name: str) -> dict[str, Any]:
+    """Return the initial totals for an action or call site"""
+    return {
+        'name': name,
+        'count': 0,
+        'wall': 0.0,
+        'lock_wait': 0.0,
+        'spawn': 0.0,
+        'run': 0.0,
+        'decode': 0.0,
+        'bytes_out': 0,
+    }
+
+
+def _add_totals(totals: dict[str, Any], invocation: Invocation) -> None:
+    """Add an invocation to the totals for an action or call site"""
+    totals['count'] += 1
+    totals['wall'] += invocation.wall
+    totals['lock_wait'] += invocation.lock_wait
+    totals['spawn'] += invocation.spawn
+    totals['run'] += invocation.run
+    totals['decode'] += invocation.decode
+    totals['bytes_out'] += invocation.bytes_out
+
+
+def _wall_time(totals: dict[str, Any]) -> float:
+    return totals['wall']
+
+
+def _write_json(path: str, data: dict[str, Any]) -> None:
+    with core.xopen(path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, indent=1)
+
+
+def find_caller() -> tuple[str, str]:
+    """Return the function that ran a git command and its widget context
+
+    The caller is the innermost function outside of the modules that run
+    commands, e.g. "cola.gitcmds.diff_info". The context is the innermost
+    widget function, which stands in for the user action when no command
+    is running.
+    """
+    caller = ''
+    context = ''
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module not in _INTERNAL_MODULES and module.startswith('cola'):
+            code = frame.f_code
+            name = f'{module}.{getattr(code, "co_qualname", code.co_name)}'
+            if not caller:
+                caller = name
+            if module.startswith('cola.widgets.'):
+                context = name
+                break
+        frame = frame.f_back
+    return caller, context
+
+
+_profiler = Profiler(enabled=bool(core.getenv('GIT_COLA_TRACE', '')))
+
+
+def profiler() -> Profiler:
+    """Return the git command profiler"""
+    return _profiler
+
+
+def enabled() -> bool:
+    """Is git command profiling enabled?"""
+    return _profiler.enabled
+
+
+def action(name: str) -> contextlib.AbstractContextManager[None]:
+    """Attribute the git commands run in this context to a user action"""
+    return _profiler.action(name)
+
+
+def current_action() -> str:
+    """Return the user action that is running in the current thread"""
+    return _profiler.current_action()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 import hashlib
+import json
+import os
 import time
 from typing import TYPE_CHECKING
 from typing import Any
@@ -9,10 +11,12 @@ from qtpy import QtGui
 from qtpy import QtNetwork
 from qtpy import QtWidgets
 from qtpy.QtCore import Qt
+from qtpy.QtCore import Signal
 
 from . import core
 from . import icons
 from . import qtutils
+from . import resources
 from .compat import parse
 from .models import prefs
 from .widgets import defs
@@ -24,14 +28,17 @@ if TYPE_CHECKING:
     from .app import ApplicationContext
 
 
+AVATAR_URL = 'https://gravatar.com/avatar/'
+DEFAULT_AVATAR_URL = 'https://git-cola.github.io/images/git-64x64.jpg'
+
+
 class Gravatar:
     @staticmethod
-    def url_for_email(email, imgsize) -> str:
+    def url_for_email(email, imgsize, base_url=AVATAR_URL) -> str:
         email_hash = sha256_hexdigest(email)
-        default_url = 'https://git-cola.github.io/images/git-64x64.jpg'
-        encoded_url = parse.quote(core.encode(default_url), core.encode(''))
+        encoded_url = parse.quote(core.encode(DEFAULT_AVATAR_URL), core.encode(''))
         query = '?s=%d&d=%s' % (imgsize, core.decode(encoded_url))
-        url = 'https://gravatar.com/avatar/' + email_hash + query
+        url = base_url + email_hash + query
         return url
 
 
@@ -53,39 +60,301 @@ def sha256_hexdigest(value: str) -> core.UStr:
     return core.decode(hashlib.sha256(normalized).hexdigest())
 
 
-class GravatarLabel(QtWidgets.QLabel):
-    # Re-request an email whose lookup failed only after this many seconds.
-    RETRY_INTERVAL_SECONDS = 5 * 60
+class Avatar:
+    """An avatar image and the HTTP validators that were returned with it
+
+    Emails without an avatar are remembered with their data set to None.
+    """
+
+    def __init__(
+        self,
+        data: bytes | None,
+        etag: str = '',
+        last_modified: str = '',
+        fetched: float = 0.0,
+    ) -> None:
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched = fetched
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Can the avatar be used without revalidating it?"""
+        return 0.0 <= time.time() - self.fetched < ttl
+
+    def to_bytes(self) -> bytes:
+        """Serialize the avatar for the disk store"""
+        header = {
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'fetched': self.fetched,
+            'missing': self.data is None,
+        }
+        return core.encode(json.dumps(header)) + b'\n' + (self.data or b'')
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> Avatar:
+        """Deserialize an avatar from the disk store"""
+        header_bytes, _, data = value.partition(b'\n')
+        header = json.loads(core.decode(header_bytes))
+        return cls(
+            None if header['missing'] else data,
+            etag=header['etag'],
+            last_modified=header['last_modified'],
+            fetched=float(header['fetched']),
+        )
+
+
+class AvatarStore(QtCore.QObject):
+    """An application-wide avatar cache that is shared by all GravatarLabels
+
+    Avatars are keyed by the email and image size and are kept in memory and in
+    a size-bounded disk store so that they are reused across windows and
+    sessions. Avatars older than the TTL are revalidated using the ETag and
+    Last-Modified validators from the previous response. Network errors are
+    only remembered in memory and are retried after retry_interval seconds.
+    """
+
+    # Emitted with the (email, size) of an avatar that was fetched or changed.
+    avatar_changed = Signal(str, int)
+
+    ttl = prefs.Defaults.avatar_cache_days * 24 * 60 * 60
+    max_disk_bytes = prefs.Defaults.avatar_cache_size * 1024 * 1024
+    retry_interval = 5 * 60
+
+    def __init__(
+        self, path: str | None = None, base_url: str = AVATAR_URL, parent: Any = None
+    ) -> None:
+        QtCore.QObject.__init__(self, parent)
+        self.path = path
+        self.base_url = base_url
+        self.avatars: dict[tuple[str, int], Avatar] = {}
+        # Avatars whose request failed mapped to the time of the failure.
+        self.failed: dict[tuple[str, int], float] = {}
+        # In-flight request URLs mapped back to the (email, size) that issued them.
+        self.requested: dict[str, tuple[str, int]] = {}
+        self.disk_size: int | None = None
+        self.network: Any = None
+
+    def configure(self, context: ApplicationContext) -> None:
+        """Apply the avatar cache preferences"""
+        self.ttl = prefs.avatar_cache_days(context) * 24 * 60 * 60
+        self.max_disk_bytes = prefs.avatar_cache_size(context) * 1024 * 1024
+
+    def network_manager(self) -> Any:
+        """Return the network manager that is shared by all avatar requests"""
+        if self.network is None:
+            self.network = QtNetwork.QNetworkAccessManager(self)
+            self.network.finished.connect(self.network_finished)
+        return self.network
+
+    def get(self, email: str, size: int) -> Avatar | None:
+        """Return the cached avatar for an email from memory or from disk"""
+        key = (email, size)
+        avatar = self.avatars.get(key)
+        if avatar is None:
+            avatar = self.read(key)
+            if avatar is not None:
+                self.avatars[key] = avatar
+        return avatar
+
+    def fetch(self, email: str, size: int) -> None:
+        """Request an avatar unless it is fresh, pending or has recently failed"""
+        key = (email, size)
+        url = Gravatar.url_for_email(email, size, base_url=self.base_url)
+        if url in self.requested:
+            return
+        failed_at = self.failed.get(key)
+        if failed_at is not None:
+            if time.time() - failed_at < self.retry_interval:
+                return
+            del self.failed[key]
+        avatar = self.get(email, size)
+        if avatar is not None and avatar.is_fresh(self.ttl):
+            return
+
+        request = QtNetwork.QNetworkRequest(QtCore.QUrl(url))
+        # Redirects to the default image identify emails without an avatar.
+        request.setAttribute(
+            QtNetwork.QNetworkRequest.RedirectPolicyAttribute,
+            QtNetwork.QNetworkRequest.ManualRedirectPolicy,
+        )
+        if avatar is not None:
+            if avatar.etag:
+                request.setRawHeader(b'If-None-Match', core.encode(avatar.etag))
+            if avatar.last_modified:
+                request.setRawHeader(
+                    b'If-Modified-Since', core.encode(avatar.last_modified)
+                )
+        self.requested[url] = key
+        self.network_manager().get(request)
+
+    def network_finished(self, reply: Any) -> None:
+        """Cache the avatar from a reply and notify the labels"""
+        url = reply.url().toString()
+        key = self.requested.pop(url, None)
+        # Schedule reply destruction on the next event-loop tick. Qt docs say
+        # not to delete the reply inside the finished slot.
+        # https://doc.qt.io/qt-6/qnetworkaccessmanager.html#finished
+        reply.deleteLater()
+        if key is None:
+            return
+        email, size = key
+        no_error = qtutils.enum_value(QtNetwork.QNetworkReply.NetworkError.NoError)
+        reply_error = qtutils.enum_value(reply.error())
+        status = reply.attribute(QtNetwork.QNetworkRequest.HttpStatusCodeAttribute)
+        cached = self.avatars.get(key)
+        now = time.time()
+
+        if reply_error != no_error or (status == 304 and cached is None):
+            self.failed[key] = now
+            return
+        self.failed.pop(key, None)
+        if status == 304:
+            # The cached avatar is still current.
+            cached.fetched = now
+            self.write(key, cached)
+            return
+        # A redirect to the default image means that no avatar exists.
+        location = qtutils.network_reply_header(reply, 'Location')
+        relocated = bool(location) and location != url
+        avatar = Avatar(
+            None if relocated else bytes(reply.readAll()),
+            etag=qtutils.network_reply_header(reply, 'ETag'),
+            last_modified=qtutils.network_reply_header(reply, 'Last-Modified'),
+            fetched=now,
+        )
+        self.avatars[key] = avatar
+        self.write(key, avatar)
+        self.avatar_changed.emit(email, size)
+
+    def filename(self, key: tuple[str, int]) -> str:
+        """Return the path to the disk store file for an avatar"""
+        path = self.path or resources.cache_home('avatars')
+        email, size = key
+        return os.path.join(path, '%s-%d.avatar' % (sha256_hexdigest(email), size))
+
+    def read(self, key: tuple[str, int]) -> Avatar | None:
+        """Read an avatar from the disk store"""
+        filename = self.filename(key)
+        try:
+            with core.xopen(filename, 'rb') as fh:
+                avatar = Avatar.from_bytes(fh.read())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # Refresh the modification time so that recently used avatars are pruned last.
+        try:
+            os.utime(core.mkpath(filename))
+        except OSError:
+            pass
+        return avatar
+
+    def write(self, key: tuple[str, int], avatar: Avatar) -> None:
+        """Write an avatar to the disk store"""
+        filename = self.filename(key)
+        data = avatar.to_bytes()
+        tmp_path = f'{filename}.{os.getpid()}.tmp'
+        cache_dir = os.path.dirname(filename)
+        try:
+            if not core.isdir(cache_dir):
+                core.makedirs(cache_dir)
+            with core.xopen(tmp_path, 'wb') as fh:
+                fh.write(data)
+            os.replace(core.mkpath(tmp_path), core.mkpath(filename))
+        except OSError:
+            if core.exists(tmp_path):
+                core.remove(tmp_path)
+            return
+        if self.disk_size is None:
+            self.disk_size = sum(size for _, size, _ in _avatar_files(cache_dir))
+        else:
+            self.disk_size += len(data)
+        if self.disk_size > self.max_disk_bytes:
+            self.prune(cache_dir)
 
-    def __init__(self, context: ApplicationContext, parent: Any = None) -> None:
+    def prune(self, cache_dir: str) -> None:
+        """Remove the least recently used avatars from the disk store"""
+        files = _avatar_files(cache_dir)
+        files.sort()
+        size = sum(file_size for _, file_size, _ in files)
+        limit = self.max_disk_bytes * 3 // 4
+        for _, file_size, path in files:
+            if size <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+        self.disk_size = size
+
+
+def _avatar_files(cache_dir: str) -> list[tuple[int, int, str]]:
+    """Return the (mtime, size, path) details for the files in the disk store"""
+    result = []
+    try:
+        entries = os.scandir(cache_dir)
+    except OSError:
+        return result
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith('.avatar'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            result.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    return result
+
+
+_avatar_store: AvatarStore | None = None
+
+
+def avatar_store(context: ApplicationContext) -> AvatarStore:
+    """Return the avatar store that is shared by the whole application"""
+    global _avatar_store
+    if _avatar_store is None:
+        # The store lives as long as the application.
+        _avatar_store = AvatarStore(parent=QtCore.QCoreApplication.instance())
+        _avatar_store.destroyed.connect(_forget_avatar_store)
+    _avatar_store.configure(context)
+    return _avatar_store
+
+
+def _forget_avatar_store(*_args: Any) -> None:
+    """Forget the avatar store once the application has deleted it"""
+    global _avatar_store
+    _avatar_store = None
+
+
+class GravatarLabel(QtWidgets.QLabel):
+    def __init__(
+        self,
+        context: ApplicationContext,
+        parent: Any = None,
+        store: AvatarStore | None = None,
+    ) -> None:
         QtWidgets.QLabel.__init__(self, parent)
 
         self.context = context
-        # The email whose avatar is currently meant to be displayed. Replies
-        # for any other email update the cache but must not repaint the label.
+        # The email whose avatar is currently meant to be displayed. Avatars
+        # for any other email must not repaint the label.
         self.email: str | None = None
         self.imgsize = defs.medium_icon
-        # Per-email pixmap cache. The single source of truth for what to show;
-        # populated for successful, default and missing-avatar lookups alike so
-        # an email is never requested twice once resolved.
+        # Avatars are fetched and cached by the application-wide store so that
+        # every label and window shares a single network manager and cache.
+        if store is None:
+            store = avatar_store(context)
+        self.store = store
+        self.store.avatar_changed.connect(self.avatar_changed)
+        # Per-email pixmap cache so that avatars are only decoded once.
         self.pixmaps: dict[str, QPixmap] = {}
-        # Emails whose lookup failed, mapped to the time of failure. These are
-        # not cached as pixmaps so that the default icon is reused, but they
-        # are remembered to avoid hammering the network; retried after
-        # RETRY_INTERVAL_SECONDS.
-        self.failed: dict[str, int] = {}
-        # In-flight request URLs mapped back to the email that issued them, so
-        # a reply can identify its own email instead of relying on self.email,
-        # which may have moved on to a newer selection.
-        self.requested: dict[str, str] = {}
         self._default_pixmap_bytes = None
         # The default icon, decoded once and reused, so cache-misses don't
         # re-decode PNG bytes on every commit.
         self._default_pixmap: QPixmap | None = None
 
-        self.network = QtNetwork.QNetworkAccessManager()
-        self.network.finished.connect(self.network_finished)
-
     def set_email(self, email: str) -> None:
         """Update the author icon based on the specified email"""
         # Normalize as Gravatar does so case/whitespace variants of the same
@@ -96,35 +365,47 @@ class GravatarLabel(QtWidgets.QLabel):
         if pixmap is not None:
             self.setPixmap(pixmap)
             return
-        # A recent failed lookup shows the default icon without re-requesting.
-        failed_at = self.failed.get(email)
-        if failed_at is not None:
-            if (int(time.time()) - failed_at) < self.RETRY_INTERVAL_SECONDS:
-                self.set_pixmap_from_default()
-                return
-            # The retry window has elapsed; allow another attempt.
-            del self.failed[email]
-        # Show the default icon while the avatar is fetched. This must repaint
-        # even when an avatar is already displayed: the email has changed to an
-        # author we have not resolved yet, so continuing to show the previous
-        # author's avatar would attribute the wrong face to this commit.
-        # network_finished() swaps in the real avatar once the reply arrives.
-        self.set_pixmap_from_default()
-        self.request(email)
-
-    def request(self, email) -> None:
-        if prefs.enable_gravatar(self.context):
-            url = Gravatar.url_for_email(email, self.imgsize)
-            # A request for this email is already in flight; don't issue a
-            # duplicate. The pending reply will repaint if still current.
-            if url in self.requested:
-                return
-            # Remember which email this URL belongs to so the reply can be
-            # attributed correctly even if the selection has since changed.
-            self.requested[url] = email
-            self.network.get(QtNetwork.QNetworkRequest(QtCore.QUrl(url)))
-        else:
+        if not prefs.enable_gravatar(self.context):
             self.pixmaps[email] = self.set_pixmap_from_default()
+            return
+        avatar = self.store.get(email, self.imgsize)
+        if avatar is None:
+            # Show the default icon while the avatar is fetched. This must
+            # repaint even when an avatar is already displayed: the email has
+            # changed to an author we have not resolved yet, so continuing to
+            # show the previous author's avatar would attribute the wrong face
+            # to this commit. avatar_changed() swaps in the real avatar.
+            self.set_pixmap_from_default()
+        else:
+            self.setPixmap(self.pixmap_for_avatar(email, avatar))
+        # Stale avatars are displayed while they are revalidated.
+        self.store.fetch(email, self.imgsize)
+
+    def avatar_changed(self, email: str, size: int) -> None:
+        """Repaint the label when the store has fetched the current avatar"""
+        if size != self.imgsize:
+            return
+        self.pixmaps.pop(email, None)
+        # A late reply for a previous author must not clobber the avatar
+        # shown for the current one.
+        if email != self.email:
+            return
+        avatar = self.store.get(email, size)
+        if avatar is not None:
+            self.setPixmap(self.pixmap_for_avatar(email, avatar))
+
+    def pixmap_for_avatar(self, email: str, avatar: Avatar) -> QPixmap:
+        """Decode and cache the pixmap for an avatar"""
+        if avatar.data is None:
+            pixmap = self.default_pixmap()
+        else:
+            # Scale to the label's size so swapping avatars never resizes the
+            # label and nudges the layout, which reads as flicker.
+            pixmap = self._scale_to_imgsize(self.pixmap_from_bytes(avatar.data))
+            if pixmap.isNull():
+                pixmap = self.default_pixmap()
+        self.pixmaps[email] = pixmap
+        return pixmap
 
     def default_pixmap_as_bytes(self) -> QByteArray:
         if self._default_pixmap_bytes is None:
@@ -141,54 +422,6 @@ class GravatarLabel(QtWidgets.QLabel):
             byte_array = self._default_pixmap_bytes
         return byte_array
 
-    def network_finished(self, reply: Any) -> None:
-        # Identify the email from the reply's own request URL rather than
-        # self.email, which may have advanced to a newer selection while this
-        # request was in flight. Without this, a slow reply could be attributed
-        # to (and cached under) the wrong author.
-        url = reply.url().toString()
-        email = self.requested.pop(url, None)
-
-        location = qtutils.network_reply_header(reply, 'Location')
-        if location and email is not None:
-            request_location = Gravatar.url_for_email(email, self.imgsize)
-            relocated = location != request_location
-        else:
-            relocated = False
-        no_error = qtutils.enum_value(QtNetwork.QNetworkReply.NetworkError.NoError)
-        reply_error = qtutils.enum_value(reply.error())
-
-        if reply_error == no_error and not relocated:
-            # A real avatar was returned. Cache it permanently for this email.
-            response = reply.readAll()
-            # Scale to the label's size so swapping avatars never resizes the
-            # label and nudges the layout, which reads as flicker.
-            pixmap = self._scale_to_imgsize(self.pixmap_from_bytes(response))
-            if email is not None:
-                self.pixmaps[email] = pixmap
-                self.failed.pop(email, None)
-        else:
-            # No avatar exists for this email (relocated to the default, or the
-            # request errored). Record the miss so the default icon is reused
-            # and the email is not re-requested until the retry window lapses.
-            pixmap = self.default_pixmap()
-            if email is not None:
-                self.failed[email] = int(time.time())
-
-        # Only repaint if this reply is for the email that is currently meant
-        # to be displayed. A late reply for a previous author must not clobber
-        # the avatar shown for the current one.
-        if email is not None and email == self.email:
-            self.setPixmap(pixmap)
-
-        # Schedule reply destruction on the next event-loop tick. Without this,
-        # Qt eventually tears the SSL socket down while the QNetworkReply is
-        # still attached, producing a "QIODevice::read (QSslSocket): device
-        # not open" warning. Qt docs explicitly say not to delete the reply
-        # inside the finished slot -- use deleteLater() instead.
-        # https://doc.qt.io/qt-6/qnetworkaccessmanager.html#finished
-        reply.deleteLater()
-
     def pixmap_from_bytes(self, data: QByteArray) -> QPixmap:
         """Build a QPixmap from raw image bytes"""
         pixmap = QtGui.QPixmap()
@@ -19,6 +19,7 @@ from .i18n import N_
 from .interaction import Interaction
 from .widgets import completion
 from .widgets import editremotes
+from .widgets import selectcommits
 from .widgets import switcher
 from .widgets.browse import BrowseBranch
 from .widgets.selectcommits import select_commits
@@ -85,9 +86,9 @@ def checkout_branch(context: ApplicationContext, default: Any = None) -> None:
 
 def cherry_pick(context: ApplicationContext) -> None:
     """Launch the 'Cherry-Pick' dialog."""
-    revs, summaries = gitcmds.log_helper(context, all=True)
+    model = selectcommits.Model(context, all=True)
     commits = select_commits(
-        context, N_('Cherry-Pick Commit'), revs, summaries, multiselect=False
+        context, N_('Cherry-Pick Commit'), model, multiselect=False
     )
     if not commits:
         return
@@ -180,9 +181,9 @@ def prompt_for_new_bare_repo(ops: operations.IOperations) -> str | None:
 
 def export_patches(context: ApplicationContext) -> None:
     """Run 'git format-patch' on a list of commits."""
-    revs, summaries = gitcmds.log_helper(context)
+    model = selectcommits.Model(context)
     to_export_and_output = select_commits_and_output(
-        context, N_('Export Patches'), revs, summaries
+        context, N_('Export Patches'), model
     )
     if not to_export_and_output['to_export']:
         return
@@ -191,7 +192,7 @@ def export_patches(context: ApplicationContext) -> None:
         cmds.FormatPatch,
         context,
         reversed(to_export_and_output['to_export']),
-        reversed(revs),
+        reversed(to_export_and_output['revs']),
         output=to_export_and_output['output'],
     )
 
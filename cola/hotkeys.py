@@ -100,6 +100,10 @@ BACKSPACE = hotkey(Qt.Key_Backspace)
 TRASH = hotkey(Qt.CTRL | Qt.Key_Backspace)
 DELETE_FILE = hotkey(Qt.CTRL | Qt.SHIFT | Qt.Key_Backspace)
 DELETE_FILE_SECONDARY = hotkey(Qt.CTRL | Qt.Key_Backspace)
+PREVIOUS_FILE = hotkey(Qt.Key_BraceLeft)
+NEXT_FILE = hotkey(Qt.Key_BraceRight)
+PREVIOUS_HUNK = hotkey(Qt.Key_BracketLeft)
+NEXT_HUNK = hotkey(Qt.Key_BracketRight)
 PREFERENCES = hotkey(Qt.CTRL | Qt.Key_Comma)
 END_OF_LINE = hotkey(Qt.Key_Dollar)
 DOWN = hotkey(Qt.Key_Down)
@@ -6,14 +6,15 @@
 # https://bugs.debian.org/cgi-bin/bugreport.cgi?bug=1140489
 # was a report where the user's LC_MESSAGES was not resetting the translations.
 from __future__ import annotations
+import array
 import ctypes
+import io
 import locale
+import mmap
 import os
-
-try:
-    import polib
-except ImportError:
-    from . import polib
+import struct
+import sys
+from typing import Any
 
 from . import core
 from . import resources
@@ -49,21 +50,219 @@ class State:
 class Translation:
     def __init__(self, lang: str | None) -> None:
         self.lang = lang
-        self.messages = {}
+        self.catalog: Catalog | dict[str, str] = {}
         self.filename = get_filename_for_locale(lang)
         if self.filename:
             self.load()
 
     def load(self) -> None:
-        """Read the .po file content into memory"""
-        po = polib.pofile(self.filename, encoding='utf-8')
-        messages = self.messages
-        messages.clear()  # reset state to make this function reentrant.
-        for entry in po.translated_entries():
-            messages[entry.msgid] = entry.msgstr
+        """Load the compiled catalog for the .po file
+
+        The .po file is only parsed when its compiled catalog is missing from
+        the cache. Catalogs are keyed by the .po file's signature so that they
+        are rebuilt, and the stale catalog removed, when the translations change.
+        """
+        self.catalog = resources.load_compiled(
+            'i18n',
+            self.filename,
+            self.sources(),
+            '.mo',
+            lambda: compile_catalog(read_po_messages(self.filename)),
+            Catalog.open,
+            Catalog,
+        )
+
+    def sources(self) -> list[tuple[Any, ...]]:
+        """Return the signatures of the inputs that the catalog is compiled from"""
+        try:
+            st = core.stat(self.filename)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        return [
+            ('format', _MO_MAGIC, sys.byteorder),
+            ('file', self.filename, signature),
+        ]
 
     def gettext(self, value: str) -> str:
-        return self.messages.get(value, value)
+        if not value:
+            return value
+        return self.catalog.get(value, value)
+
+
+_MO_MAGIC = 0x950412DE
+_MO_HEADER = struct.Struct('=7I')
+_MO_TYPECODE = 'I'
+
+
+def read_po_messages(filename: str) -> dict[str, str]:
+    """Read the translated messages from a .po file"""
+    # polib is only needed when a catalog is compiled so it is imported lazily.
+    try:
+        import polib
+    except ImportError:
+        from . import polib
+
+    po = polib.pofile(filename, encoding='utf-8')
+    return {entry.msgid: entry.msgstr for entry in po.translated_entries()}
+
+
+def _hash_string(value: bytes) -> int:
+    """The hashpjw() function used for the hash table in .mo files"""
+    hval = 0
+    for char in value:
+        hval = ((hval << 4) + char) & 0xFFFFFFFF
+        high = hval & 0xF0000000
+        if high:
+            hval ^= high >> 24
+            hval ^= high
+    return hval
+
+
+def _next_prime(value: int) -> int:
+    """Return the smallest odd prime number that is not smaller than value"""
+    value = max(value, 3) | 1
+    while any(value % divisor == 0 for divisor in range(3, int(value**0.5) + 1, 2)):
+        value += 2
+    return value
+
+
+def compile_catalog(messages: dict[str, str]) -> bytes:
+    """Compile messages into the GNU .mo format, including its hash table
+
+    The .mo file is written in native byte order, which is what "msgfmt" does.
+    """
+    header = 'Content-Type: text/plain; charset=UTF-8\n'
+    items = sorted(
+        [(b'', header.encode('utf-8'))]
+        + [
+            (key.encode('utf-8'), value.encode('utf-8'))
+            for key, value in messages.items()
+            if key
+        ]
+    )
+    count = len(items)
+    hash_size = _next_prime(count * 4 // 3)
+    msgids_offset = _MO_HEADER.size
+    msgstrs_offset = msgids_offset + count * 8
+    hash_offset = msgstrs_offset + count * 8
+    data_offset = hash_offset + hash_size * 4
+
+    msgid_table = array.array(_MO_TYPECODE)
+    msgstr_table = array.array(_MO_TYPECODE)
+    data = io.BytesIO()
+    for column, table in ((0, msgid_table), (1, msgstr_table)):
+        for item in items:
+            value = item[column]
+            table.extend((len(value), data_offset + data.tell()))
+            data.write(value)
+            data.write(b'\0')
+
+    hash_table = array.array(_MO_TYPECODE, bytes(hash_size * 4))
+    for idx, (msgid, _) in enumerate(items):
+        hval = _hash_string(msgid)
+        slot = hval % hash_size
+        incr = 1 + (hval % (hash_size - 2))
+        while hash_table[slot]:
+            slot = (slot + incr) % hash_size
+        hash_table[slot] = idx + 1
+
+    output = io.BytesIO()
+    output.write(
+        _MO_HEADER.pack(
+            _MO_MAGIC, 0, count, msgids_offset, msgstrs_offset, hash_size, hash_offset
+        )
+    )
+    output.write(msgid_table.tobytes())
+    output.write(msgstr_table.tobytes())
+    output.write(hash_table.tobytes())
+    output.write(data.getvalue())
+    return output.getvalue()
+
+
+class Catalog:
+    """A read-only view of a compiled .mo catalog
+
+    The data is typically a memory-mapped cache file. Lookups use the catalog's
+    hash table so that only the strings that are requested are read and decoded.
+    """
+
+    def __init__(self, data: Any) -> None:
+        if len(data) < _MO_HEADER.size:
+            raise ValueError('i18n: truncated catalog')
+        (
+            magic,
+            _revision,
+            count,
+            msgids_offset,
+            msgstrs_offset,
+            hash_size,
+            hash_offset,
+        ) = _MO_HEADER.unpack_from(data, 0)
+        if magic != _MO_MAGIC or hash_size < 3:
+            raise ValueError('i18n: invalid catalog')
+        if len(data) < hash_offset + hash_size * 4:
+            raise ValueError('i18n: truncated catalog')
+        view = memoryview(data)
+        self.count = count
+        self._data = data
+        self._view = view
+        self._msgids = view[msgids_offset : msgids_offset + count * 8].cast(
+            _MO_TYPECODE
+        )
+        self._msgstrs = view[msgstrs_offset : msgstrs_offset + count * 8].cast(
+            _MO_TYPECODE
+        )
+        self._hash_table = view[hash_offset : hash_offset + hash_size * 4].cast(
+            _MO_TYPECODE
+        )
+        self._cache: dict[str, str | None] = {}
+
+    @classmethod
+    def open(cls, path: str) -> Catalog:
+        """Memory-map a compiled catalog file"""
+        with core.xopen(path, 'rb') as fh:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, table: memoryview, idx: int) -> bytes:
+        length = table[idx * 2]
+        offset = table[idx * 2 + 1]
+        return bytes(self._view[offset : offset + length])
+
+    def _find(self, msgid: bytes) -> int:
+        """Return the index of msgid in the catalog, or -1 when it is not found"""
+        hash_table = self._hash_table
+        hash_size = len(hash_table)
+        hval = _hash_string(msgid)
+        slot = hval % hash_size
+        incr = 1 + (hval % (hash_size - 2))
+        for _ in range(hash_size):
+            idx = hash_table[slot] - 1
+            if idx < 0:
+                break
+            if self._string(self._msgids, idx) == msgid:
+                return idx
+            slot = (slot + incr) % hash_size
+        return -1
+
+    def get(self, msgid: str, default: str | None = None) -> str | None:
+        """Return the translation for msgid"""
+        try:
+            value = self._cache[msgid]
+        except KeyError:
+            idx = self._find(msgid.encode('utf-8'))
+            if idx < 0:
+                value = None
+            else:
+                value = self._string(self._msgstrs, idx).decode('utf-8')
+            self._cache[msgid] = value
+        if value is None:
+            return default
+        return value
 
 
 def gettext(value: str) -> str:
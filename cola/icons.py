@@ -71,7 +71,7 @@ def name_from_basename(basename: str) -> str:
     return 'icons:' + basename
 
 
-@decorators.memoize
+@decorators.memoize(max_size=512)
 def from_name(name: str) -> QtGui.QIcon:
     """Return a QIcon from an absolute filename or "icons:basename.svg" name"""
     return QtGui.QIcon(name)
@@ -1,6 +1,9 @@
 """The central cola model"""
 from __future__ import annotations
+import concurrent.futures
+import functools
 import os
+import threading
 from collections.abc import Callable
 from typing import TYPE_CHECKING
 from typing import Any
@@ -9,6 +12,7 @@ from qtpy import QtCore
 from qtpy.QtCore import Signal
 
 from .. import core
+from .. import decorators
 from .. import git
 from .. import gitcfg
 from .. import gitcmds
@@ -141,6 +145,8 @@ class MainModel(QtCore.QObject):
         self.local_branches = []
         self.remote_branches = []
         self.tags = []
+        # Ahead/behind counts keyed by the (branch, upstream) object IDs.
+        self.ahead_behind_cache: dict[tuple[str, str], tuple[int, int]] = {}
         if cwd:
             self.set_worktree(cwd)
 
@@ -178,6 +184,10 @@ class MainModel(QtCore.QObject):
         is_valid = self.git.is_valid()
         if is_valid:
             reset = last_worktree is None or last_worktree != worktree
+            if reset:
+                # Forget memoized results that belong to the previous repository.
+                decorators.clear_caches(decorators.REPOSITORY_SCOPE)
+                self.ahead_behind_cache = {}
             cwd = self.git.getcwd()
             self.project = os.path.basename(cwd)
             self.set_directory(cwd)
@@ -271,7 +281,11 @@ class MainModel(QtCore.QObject):
             self.file_type_changed.emit(file_type)
 
     def set_images(self, images: list[tuple[str, bool] | Any]) -> None:
-        """Update the images shown in the preview pane"""
+        """Update the images shown in the preview pane
+
+        Images are (path, unlink) tuples. Images that were extracted from git
+        have their blob ID as a third element.
+        """
         self.images = images
         self.images_changed.emit(images)
 
@@ -526,6 +540,44 @@ class MainModel(QtCore.QObject):
         self.update_refs()
         return result
 
+    def push_all(
+        self,
+        remotes: list[str],
+        jobs: int = 1,
+        callback: Callable[[str, tuple[int, str, str]], Any] | None = None,
+        **opts: Any,
+    ) -> dict[str, tuple[int, str, str]]:
+        """Push to several remotes concurrently and return the result for each remote
+
+        At most "jobs" pushes run at the same time. callback(remote, result)
+        is called from a worker thread as soon as each push finishes.
+        """
+        # The index lock is held once for all of the pushes so that they are
+        # serialized with cola's other commands but not with each other. Each
+        # push only updates the remote-tracking refs of its own remote.
+        # --prune deletes refs, which rewrites packed-refs, and --set-upstream
+        # writes to the git config, so those pushes share a lock.
+        if opts.get('prune') or opts.get('set_upstream'):
+            push_lock = threading.Lock()
+        else:
+            push_lock = None
+
+        def push_remote(remote):
+            lock = push_lock or threading.Lock()
+            push = functools.partial(self.git.push, _lock=lock)
+            result = run_remote_action(self.context, push, remote, PUSH, **opts)
+            if callback is not None:
+                callback(remote, result)
+            return result
+
+        with git.index_lock():
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, jobs)
+            ) as pool:
+                results = dict(zip(remotes, pool.map(push_remote, remotes)))
+        self.update_refs()
+        return results
+
     def pull(self, remote: str, **opts: dict[str, Any]) -> tuple[int, str, str]:
         result = run_remote_action(self.context, self.git.pull, remote, PULL, **opts)
         # Pull can result in merge conflicts
@@ -16,6 +16,8 @@ ASPELL_LANG = 'cola.aspell.lang'
 AUTOCOMPLETE_PATHS = 'cola.autocompletepaths'
 AUTODETECT_PROXY = 'cola.autodetectproxy'
 AUTOTEMPLATE = 'cola.autoloadcommittemplate'
+AVATAR_CACHE_DAYS = 'cola.avatarcachedays'
+AVATAR_CACHE_SIZE = 'cola.avatarcachesize'
 BACKGROUND_EDITOR = 'cola.backgroundeditor'
 BLAME_VIEWER = 'cola.blameviewer'
 BLOCK_CURSOR = 'cola.blockcursor'
@@ -26,6 +28,7 @@ CHECK_PUBLISHED_COMMITS = 'cola.checkpublishedcommits'
 COMMENT_CHAR = 'core.commentchar'
 COMMIT_CLEANUP = 'commit.cleanup'
 DICTIONARY = 'cola.dictionary'
+DIFF_CACHE = 'cola.diffcache'
 DIFFCONTEXT = 'gui.diffcontext'
 DIFFTOOL = 'diff.tool'
 OVERRIDE_DIFFTOOL = 'cola.difftool'
@@ -49,6 +52,7 @@ NOTIFY_ON_PUSH = 'cola.notifyonpush'
 LINEBREAK = 'cola.linebreak'
 LOAD_COMMITMSG_COUNT = 'cola.loadcommitmsgcount'
 LOGDATE = 'cola.logdate'
+LOG_LINES = 'cola.loglines'
 MAXRECENT = 'cola.maxrecent'
 MERGE_DIFFSTAT = 'merge.diffstat'
 MERGE_KEEPBACKUP = 'merge.keepbackup'
@@ -59,6 +63,7 @@ OVERRIDE_MERGETOOL = 'cola.mergetool'
 MOUSE_ZOOM = 'cola.mousezoom'
 PATCHES_DIRECTORY = 'cola.patchesdirectory'
 PULL_REBASE = 'pull.rebase'
+PUSH_JOBS = 'cola.pushjobs'
 REBASE_UPDATE_REFS = 'rebase.updaterefs'
 REFRESH_ON_FOCUS = 'cola.refreshonfocus'
 RESIZE_BROWSER_COLUMNS = 'cola.resizebrowsercolumns'
@@ -145,6 +150,8 @@ class Defaults:
     aspell_enabled = False
     autotemplate = False
     autodetect_proxy = True
+    avatar_cache_days = 7
+    avatar_cache_size = 16
     background_editor = ''
     blame_viewer = 'git gui blame'
     block_cursor = True
@@ -155,6 +162,7 @@ class Defaults:
     comment_char = '#'
     commit_cleanup = 'default'
     display_untracked = True
+    diff_cache = False
     diff_context = 5
     difftool = 'xxdiff'
     editor = 'gvim'
@@ -168,6 +176,7 @@ class Defaults:
     inotify = True
     inotify_delay = 888
     load_commitmsg_count = 10
+    log_lines = 10000
     notifyonpush = False
     linebreak = True
     maxrecent = 8
@@ -191,6 +200,7 @@ class Defaults:
     theme = 'default'
     hidpi = hidpi.Option.AUTO
     patches_directory = 'patches'
+    push_jobs = 4
     status_indent = False
     status_show_totals = False
     text_elide_mode = 'middle'
@@ -266,6 +276,21 @@ def check_published_commits(context) -> bool:
     )
 
 
+def avatar_cache_days(context) -> int:
+    """How many days are cached avatars used before they are revalidated?"""
+    return context.cfg.get(AVATAR_CACHE_DAYS, default=Defaults.avatar_cache_days)
+
+
+def avatar_cache_size(context) -> int:
+    """The maximum size of the on-disk avatar cache in megabytes"""
+    return context.cfg.get(AVATAR_CACHE_SIZE, default=Defaults.avatar_cache_size)
+
+
+def diff_cache(context) -> bool:
+    """Should we store the diffs of commits in the on-disk cache?"""
+    return context.cfg.get(DIFF_CACHE, default=Defaults.diff_cache)
+
+
 def display_untracked(context) -> bool:
     """Should we display untracked files?"""
     return context.cfg.get(DISPLAY_UNTRACKED, default=Defaults.display_untracked)
@@ -413,6 +438,16 @@ def logdate(context) -> str:
     return context.cfg.get(LOGDATE, default=Defaults.logdate)
 
 
+def log_lines(context) -> int:
+    """The maximum number of lines kept by the console log"""
+    value = context.cfg.get(LOG_LINES, default=Defaults.log_lines)
+    try:
+        result = max(1, int(value))
+    except (TypeError, ValueError):
+        result = Defaults.log_lines
+    return result
+
+
 def maxrecent(context) -> int:
     """Return the configured maximum number of Recent Repositories"""
     value = Defaults.maxrecent
@@ -456,6 +491,16 @@ def patches_directory(context) -> str:
     return context.cfg.get(PATCHES_DIRECTORY, default=Defaults.patches_directory)
 
 
+def push_jobs(context) -> int:
+    """The maximum number of remotes that are pushed to concurrently"""
+    value = context.cfg.get(PUSH_JOBS, default=Defaults.push_jobs)
+    try:
+        result = max(1, int(value))
+    except (TypeError, ValueError):
+        result = Defaults.push_jobs
+    return result
+
+
 def sort_bookmarks(context) -> bool:
     """Should we sort bookmarks by name?"""
     return context.cfg.get(SORT_BOOKMARKS, default=Defaults.sort_bookmarks)
@@ -1,13 +1,25 @@
+from __future__ import annotations
 import re
+from typing import Any
 
 from .. import cmds
 from .. import core
+from .. import diffcache
 from .. import gitcmds
 from ..git import STDOUT
 from ..i18n import N_
 from ..interaction import Interaction
 
 
+# Stashes are commits, so their diffs never change for a given configuration.
+_stash_diff_cache = diffcache.DiffCache(max_bytes=16 * 1024 * 1024)
+
+
+def stash_diff_cache() -> diffcache.DiffCache:
+    """Return the cache for the diffs of stashes"""
+    return _stash_diff_cache
+
+
 class StashModel:
     def __init__(self, context) -> None:
         self.context = context
@@ -28,22 +40,47 @@ class StashModel:
 
     def stash_info(
         self, revids=False, names=False
-    ) -> tuple[list[str], list[str], list[str], list[str]]:
+    ) -> tuple[list[str], list[str], list[str], list[str], list[str]]:
         """Parses "git stash list" and returns a list of stashes."""
-        stashes = self.stash_list(r'--format=%gd/%aD/%gs')
-        split_stashes = [s.split('/', 2) for s in stashes if s]
-        stashes = [f'{s[0]}: {s[2]}' for s in split_stashes]
+        stashes = self.stash_list(r'--format=%gd/%H/%aD/%gs')
+        split_stashes = [s.split('/', 3) for s in stashes if s]
+        stashes = [f'{s[0]}: {s[3]}' for s in split_stashes]
         revids = [s[0] for s in split_stashes]
-        author_dates = [s[1] for s in split_stashes]
-        names = [s[2] for s in split_stashes]
-
-        return stashes, revids, author_dates, names
-
-    def stash_diff(self, rev: str) -> str:
-        git = self.git
-        diffstat = git.stash('show', rev)[STDOUT]
-        diff = git.stash('show', '-p', '--no-ext-diff', rev)[STDOUT]
-        return diffstat + '\n\n' + diff
+        oids = [s[1] for s in split_stashes]
+        author_dates = [s[2] for s in split_stashes]
+        names = [s[3] for s in split_stashes]
+
+        return stashes, revids, author_dates, names, oids
+
+    def _stash_diff_key(self, oid: str) -> tuple[Any, ...]:
+        """Return the cache key for the diff of a stash commit"""
+        cfg = self.context.cfg
+        config = cfg.find('diff.*')
+        config.update(cfg.find('i18n.*'))
+        return ('stash', oid, cfg.gui_encoding(), tuple(sorted(config.items())))
+
+    def cached_stash_diff(self, oid: str) -> str | None:
+        """Return the diff for a stash commit when it is cached"""
+        if not oid:
+            return None
+        return _stash_diff_cache.peek(self._stash_diff_key(oid))
+
+    def stash_diff(self, rev: str, oid: str | None = None) -> str:
+        """Return the diffstat and patch for a stash
+
+        Diffs are cached by the stash's commit object ID when it is provided.
+        """
+        key = self._stash_diff_key(oid) if oid else None
+        if key is not None:
+            diff = _stash_diff_cache.get(key)
+            if diff is not None:
+                return diff
+        # The diffstat and the patch are produced by a single command.
+        args = ('show', '--stat', '-p', '--no-ext-diff', oid or rev)
+        status, diff, _ = self.git.stash(*args)
+        if status == 0 and key is not None:
+            _stash_diff_cache.put(key, diff)
+        return diff
 
 
 class ApplyStash(cmds.ContextCommand):
@@ -1,8 +1,11 @@
 from __future__ import annotations
 import io
+import itertools
 import os
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Callable
+from collections.abc import Iterator
 from typing import TYPE_CHECKING
 from typing import Any
 
@@ -169,6 +172,12 @@ class IOperations(ABC):
     ) -> tuple[int, core.UStr, core.UStr]:
         pass
 
+    @abstractmethod
+    def stream_command(
+        self, cmd: list[core.UStr | str], *args, **kwargs
+    ) -> core.CommandStream:
+        pass
+
     @abstractmethod
     def get_environ(
         self,
@@ -201,6 +210,11 @@ class IOperations(ABC):
 
 
 class LocalOperations(IOperations):
+    def __init__(self) -> None:
+        # Streams opened by remote clients using stream_open().
+        self.streams: dict[int, core.CommandStream] = {}
+        self.stream_ids = itertools.count(1)
+
     def is_remote(self) -> bool:
         return False
 
@@ -319,6 +333,44 @@ class LocalOperations(IOperations):
     ) -> tuple[int, core.UStr, core.UStr]:
         return core.run_command(cmd, *args, **kwargs)
 
+    def stream_command(
+        self, cmd: list[core.UStr | str], *args, **kwargs
+    ) -> core.CommandStream:
+        return core.stream_command(cmd, *args, **kwargs)
+
+    def stream_open(self, cmd: list[core.UStr | str], **kwargs) -> int:
+        """Start a command whose output is read using stream_read()"""
+        stream = core.stream_command(cmd, **kwargs)
+        stream_id = next(self.stream_ids)
+        self.streams[stream_id] = stream
+        return stream_id
+
+    def stream_read(self, stream_id: int) -> dict[str, Any]:
+        """Return the next batch of output from a stream"""
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            # The client cancelled the stream while this read was in flight.
+            return _closed_stream_state()
+        items: list[Any] = []
+        # Return as soon as some output is available.
+        while not items:
+            batch = stream.read()
+            if batch is None:
+                stream.close()
+                del self.streams[stream_id]
+                break
+            items.extend(batch)
+        return _stream_state(stream, items)
+
+    def stream_close(self, stream_id: int) -> dict[str, Any]:
+        """Close a stream, killing its command if it is still running"""
+        stream = self.streams.pop(stream_id, None)
+        if stream is None:
+            # The stream finished while the client was cancelling it.
+            return _closed_stream_state()
+        stream.close()
+        return _stream_state(stream, [])
+
     def get_environ(
         self,
     ) -> dict[str, str]:
@@ -349,11 +401,11 @@ class RemoteOperations(IOperations):
 
         server.check_dependencies()
         self.client = server.SyncSocketClient(socket_client)
-        self.seq_number = 0
+        # Streams are cancelled from other threads than the ones reading them.
+        self.seq_numbers = itertools.count()
 
     def _send_op(self, data: dict[str, Any]):
-        current_seq = self.seq_number
-        self.seq_number += 1
+        current_seq = next(self.seq_numbers)
 
         data['seq'] = current_seq
         received = self.client.send_message_msgpack(data)
@@ -369,6 +421,11 @@ class RemoteOperations(IOperations):
         except KeyError:
             raise ValueError(f'error: missing "result" in response: {received}')
 
+    def _post_op(self, data: dict[str, Any]) -> None:
+        """Send an operation without waiting for its result"""
+        data['seq'] = next(self.seq_numbers)
+        self.client.post_message_msgpack(data)
+
     def is_remote(self) -> bool:
         return True
 
@@ -711,6 +768,29 @@ class RemoteOperations(IOperations):
 
         return status, core.UStr(out, ENCODING), core.UStr(err, ENCODING)
 
+    def stream_command(self, cmd, *args, **kwargs) -> RemoteCommandStream:
+        supported_kwargs = {}
+
+        # Filter keyword arguments to those supported by the msgpack.
+        if 'cwd' in kwargs and isinstance(kwargs['cwd'], str):
+            supported_kwargs['cwd'] = kwargs['cwd']
+
+        if 'env' in kwargs and isinstance(kwargs['env'], dict):
+            supported_kwargs['env'] = dict(kwargs['env'])
+
+        for key in ('encoding', 'separator', 'max_bytes'):
+            if kwargs.get(key) is not None:
+                supported_kwargs[key] = kwargs[key]
+
+        data = {
+            'op': 'stream_open',
+            'args': [cmd],
+            'kwargs': supported_kwargs,
+        }
+        stream_id = self._send_op(data)
+
+        return RemoteCommandStream(self, stream_id, encoding=kwargs.get('encoding'))
+
     def get_environ(
         self,
     ) -> dict[str, str]:
@@ -768,3 +848,133 @@ class RemoteOperations(IOperations):
             'kwargs': {'label': label, 'suffix': suffix},
         }
         return self._send_op(data)
+
+
+class RemoteCommandStream:
+    """Read the output of a command that is run by a cola server
+
+    This is the remote equivalent of core.CommandStream. The output is fetched
+    from the server in batches as the stream is read. Closing the stream early
+    kills the command on the server.
+
+    """
+
+    def __init__(
+        self, ops: RemoteOperations, stream_id: int, encoding: str | None = None
+    ) -> None:
+        self.ops = ops
+        self.stream_id = stream_id
+        self.encoding = encoding
+        self.on_close: Callable[[RemoteCommandStream], None] | None = None
+        self.status: int | None = None
+        self.err = core.UStr('', ENCODING)
+        self.bytes_out = 0
+        self.closed = False
+        self.done = False
+        self.killed = False
+        self.truncated = False
+        self.cancelled = False
+
+    def __iter__(self) -> Iterator[core.UStr | bytes]:
+        try:
+            while True:
+                items = self.read()
+                if items is None:
+                    break
+                yield from items
+        finally:
+            self.close()
+
+    def __enter__(self) -> RemoteCommandStream:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def read(self) -> list[core.UStr | bytes] | None:
+        """Read the next batch of output from the server
+
+        None is returned once all of the output has been read.
+        """
+        if self.done or self.closed or self.cancelled:
+            return None
+        data = {
+            'op': 'stream_read',
+            'args': [],
+            'kwargs': {'stream_id': self.stream_id},
+        }
+        state = self.ops._send_op(data)
+        self._update(state)
+        return [
+            core.UStr(item, ENCODING) if isinstance(item, str) else item
+            for item in state['items']
+        ]
+
+    def cancel(self) -> None:
+        """Kill the command so that a read blocked in another thread returns
+
+        The server handles requests in order, so the command is killed once a
+        pending read has returned. The thread that reads the stream is still
+        responsible for closing it.
+        """
+        if self.done or self.closed or self.cancelled:
+            return
+        self.cancelled = True
+        self.killed = True
+        data = {
+            'op': 'stream_close',
+            'args': [],
+            'kwargs': {'stream_id': self.stream_id},
+        }
+        self.ops._post_op(data)
+
+    def close(self) -> int | None:
+        """Finish reading, killing the command if it is still running"""
+        if self.closed:
+            return self.status
+        self.closed = True
+        if not self.done and not self.cancelled:
+            data = {
+                'op': 'stream_close',
+                'args': [],
+                'kwargs': {'stream_id': self.stream_id},
+            }
+            self._update(self.ops._send_op(data))
+        if self.on_close is not None:
+            self.on_close(self)
+        return self.status
+
+    def _update(self, state: dict[str, Any]) -> None:
+        """Apply the state of the stream reported by the server"""
+        self.done = state['done']
+        self.status = state['status']
+        self.err = core.UStr(state['err'] or '', ENCODING)
+        self.bytes_out = state['bytes_out']
+        self.killed = state['killed']
+        self.truncated = state['truncated']
+
+
+def _closed_stream_state() -> dict[str, Any]:
+    """Return the state reported for a stream that was already closed"""
+    return {
+        'items': [],
+        'done': True,
+        'status': None,
+        'err': '',
+        'bytes_out': 0,
+        'killed': True,
+        'truncated': False,
+    }
+
+
+def _stream_state(stream: core.CommandStream, items: list[Any]) -> dict[str, Any]:
+    """Return the state of a stream that is sent to remote clients"""
+    return {
+        'items': items,
+        'done': stream.closed,
+        'status': stream.status,
+        'err': stream.err,
+        'bytes_out': stream.bytes_out,
+        'killed': stream.killed,
+        'truncated': stream.truncated,
+    }
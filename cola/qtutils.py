@@ -2,6 +2,7 @@
 from __future__ import annotations
 import os
 from collections.abc import Callable
+from functools import partial
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Union
@@ -25,6 +26,7 @@ except ImportError:
     AppKit = None
 
 from . import core
+from . import gitprofile
 from . import hotkeys
 from . import icons
 from . import utils
@@ -1132,8 +1134,13 @@ def create_dock(
     widget: QtWidgets.QWidget | None = None,
     func: Callable | None = None,
     hide_title: bool = False,
+    lazy: bool = False,
 ) -> QtWidgets.QDockWidget:
-    """Create a dock widget and set it up accordingly."""
+    """Create a dock widget and set it up accordingly.
+
+    Lazy docks defer calling func(dock) to create their widget until the dock
+    is first shown so that hidden docks do not slow down startup.
+    """
     dock = QtWidgets.QDockWidget(parent)
     dock.setWindowTitle(title)
     dock.setObjectName(name)
@@ -1143,13 +1150,23 @@ def create_dock(
     dock.topLevelChanged.connect(titlebar.set_floating)
     if hasattr(parent, 'dockwidgets'):
         parent.dockwidgets.append(dock)
-    if func:
+    if func and lazy:
+        dock.visibilityChanged.connect(partial(_create_dock_widget, dock, func))
+    elif func:
         widget = func(dock)
     if widget:
         dock.setWidget(widget)
     return dock
 
 
+def _create_dock_widget(
+    dock: QtWidgets.QDockWidget, func: Callable, visible: bool
+) -> None:
+    """Create the widget for a lazy dock when it is first shown"""
+    if visible and dock.widget() is None:
+        dock.setWidget(func(dock))
+
+
 def hide_dock(widget: QtWidgets.QWidget) -> None:
     widget.toggleViewAction().setChecked(False)
     widget.hide()
@@ -1320,12 +1337,16 @@ class Task(QtCore.QRunnable):
 
         self.channel = Channel()
         self.result: tuple[Any, ...] | None = None
+        # Git commands run by the task are profiled as part of the user
+        # action that created the task.
+        self.profile_action = gitprofile.current_action()
         # Python's garbage collector will try to double-free the task
         # once it's finished so disable the Qt auto-deletion.
         self.setAutoDelete(False)
 
     def run(self) -> None:
-        self.result = self.task()
+        with gitprofile.action(self.profile_action):
+            self.result = self.task()
         self.channel.result.emit(self.result)
         self.channel.finished.emit(self)
 
@@ -1410,6 +1431,64 @@ class RunTask(QtCore.QObject):
         self.start(task)
 
 
+class LatestTaskRunner(QtCore.QObject):
+    """Run tasks one at a time, keeping only the latest request
+
+    A request replaces the request that is waiting to run. The result of a
+    task is discarded once a newer request has been submitted or the runner
+    has been cancelled. Tasks can check is_current() to stop early.
+    """
+
+    finished = Signal()
+
+    def __init__(
+        self, context: ApplicationContext, parent: QtCore.QObject | None = None
+    ) -> None:
+        super().__init__(parent)
+        self.context = context
+        self.generation = 0
+        self.task: tuple[Task, Callable | None] | None = None
+        self.pending: tuple[Task, Callable | None] | None = None
+
+    def submit(self, task: Task, callback: Callable | None = None) -> None:
+        """Run a task and pass its result to callback unless it is superseded"""
+        self.generation += 1
+        task.generation = self.generation
+        self.pending = (task, callback)
+        self.start()
+
+    def cancel(self) -> None:
+        """Discard the pending request and the result of the running task"""
+        self.generation += 1
+        self.pending = None
+
+    def is_current(self, task: Task) -> bool:
+        """Has the task not been superseded?"""
+        return getattr(task, 'generation', None) == self.generation
+
+    def tasks(self) -> list[Task]:
+        """Return the running and pending tasks"""
+        return [entry[0] for entry in (self.task, self.pending) if entry is not None]
+
+    def start(self) -> None:
+        """Start the pending task unless a task is already running"""
+        if self.task is not None or self.pending is None:
+            return
+        self.task = self.pending
+        self.pending = None
+        # The runtask is looked up late because it is created after the views.
+        self.context.runtask.start(self.task[0], finish=self.finish)
+
+    def finish(self, task: Task) -> None:
+        """Deliver the result of the finished task and start the pending task"""
+        _, callback = self.task
+        self.task = None
+        if callback is not None and self.is_current(task):
+            callback(task.result)
+        self.start()
+        self.finished.emit()
+
+
 # Syntax highlighting
 
 
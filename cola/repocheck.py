@@ -0,0 +1,180 @@
+"""Check whether bookmarked and recent repositories still exist
+
+Paths on network mounts or unplugged drives can block for seconds when they
+are probed, so every path is checked in its own daemon thread and callers
+only wait for the results up to a timeout. The last known result for each
+path is cached along with a signature from stat() so that repositories that
+have not changed are not probed again.
+"""
+from __future__ import annotations
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+
+from . import core
+from . import git
+from . import operations
+
+# Repository states
+CHECKING = 'checking'
+MISSING = 'missing'
+TIMEOUT = 'timeout'
+VALID = 'valid'
+
+
+def is_git_worktree(path: str) -> bool:
+    """Is the path a git worktree on the local filesystem?"""
+    return git.is_git_worktree(operations.LocalOperations(), path)
+
+
+def signature(path: str) -> tuple[Any, ...] | None:
+    """Return the stat() details that change when a repository changes"""
+    result = []
+    for filename in (path, os.path.join(path, '.git')):
+        try:
+            stat = core.stat(filename)
+        except (OSError, ValueError):
+            result.append(None)
+            continue
+        result.append((stat.st_dev, stat.st_ino, stat.st_mtime_ns))
+    if result[0] is None:
+        return None
+    return tuple(result)
+
+
+class RepoChecker:
+    """Check repositories concurrently and cache the results"""
+
+    timeout = 3.0
+
+    def __init__(
+        self, verify: Callable[[str], bool] | None = None, timeout: float | None = None
+    ) -> None:
+        self.verify = verify or is_git_worktree
+        if timeout is not None:
+            self.timeout = timeout
+        self.lock = threading.Lock()
+        # Map paths to their (signature, valid) details.
+        self.cache: dict[str, tuple[tuple[Any, ...] | None, bool]] = {}
+        # Map the paths that are being checked to the queues that want the result.
+        self.pending: dict[str, list[queue.SimpleQueue]] = {}
+
+    def state(self, path: str) -> str:
+        """Return the last known state of a path without touching the filesystem"""
+        with self.lock:
+            entry = self.cache.get(path)
+        if entry is None:
+            return CHECKING
+        return VALID if entry[1] else MISSING
+
+    def check(
+        self,
+        paths: Iterable[str],
+        callback: Callable[[str, str], Any],
+        timeout: float | None = None,
+    ) -> None:
+        """Check paths in the background and call callback(path, state) for each
+
+        The callback runs in a background thread. Paths that are not checked
+        before the timeout are reported with the TIMEOUT state.
+        """
+        paths = list(paths)
+        if not paths:
+            return
+        thread = threading.Thread(
+            target=self._report, args=(paths, callback, timeout), daemon=True
+        )
+        thread.start()
+
+    def wait(
+        self, paths: Iterable[str], timeout: float | None = None
+    ) -> dict[str, str]:
+        """Check paths concurrently and return their states
+
+        Paths that are not checked before the timeout have the TIMEOUT state.
+        """
+        result = {}
+        self._report(list(paths), result.__setitem__, timeout)
+        return result
+
+    def _report(
+        self,
+        paths: list[str],
+        callback: Callable[[str, str], Any],
+        timeout: float | None,
+    ) -> None:
+        """Start checking paths and report their states as they finish"""
+        if timeout is None:
+            timeout = self.timeout
+        results: queue.SimpleQueue = queue.SimpleQueue()
+        remaining = set(paths)
+        for path in remaining:
+            self._start(path, results)
+
+        deadline = time.monotonic() + timeout
+        while remaining:
+            try:
+                path, state = results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if path in remaining:
+                remaining.discard(path)
+                callback(path, state)
+
+        for path in paths:
+            if path in remaining:
+                remaining.discard(path)
+                callback(path, TIMEOUT)
+
+    def _start(self, path: str, results: queue.SimpleQueue) -> None:
+        """Check a path in a new thread unless it is already being checked"""
+        with self.lock:
+            listeners = self.pending.get(path)
+            if listeners is not None:
+                listeners.append(results)
+                return
+            self.pending[path] = [results]
+        thread = threading.Thread(target=self._check_path, args=(path,), daemon=True)
+        thread.start()
+
+    def _check_path(self, path: str) -> None:
+        """Check a path and send its state to everyone that is waiting for it"""
+        state = MISSING
+        try:
+            if self._is_valid(path):
+                state = VALID
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self.lock:
+                listeners = self.pending.pop(path, [])
+            for results in listeners:
+                results.put((path, state))
+
+    def _is_valid(self, path: str) -> bool:
+        """Check a path, reusing the cached result when it has not changed"""
+        path_signature = signature(path)
+        with self.lock:
+            entry = self.cache.get(path)
+        if (
+            entry is not None
+            and path_signature is not None
+            and entry[0] == path_signature
+        ):
+            return entry[1]
+        valid = bool(self.verify(path))
+        with self.lock:
+            self.cache[path] = (path_signature, valid)
+        return valid
+
+
+_checker = RepoChecker()
+
+
+def checker() -> RepoChecker:
+    """Return the shared repository checker"""
+    return _checker
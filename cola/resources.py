@@ -4,14 +4,20 @@ import os
 import sys
 import webbrowser
 from collections.abc import Callable
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
+from typing import Any
+from typing import TypeVar
 
 from . import compat
 from . import core
+from . import utils
 
 if TYPE_CHECKING:
     from .types import TextType
 
+T = TypeVar('T')
+
 # Default git-cola icon theme
 _default_icon_theme = 'light'
 
@@ -184,6 +190,12 @@ def xdg_data_home(*args) -> TextType:
     return os.path.join(config, *args)
 
 
+def xdg_cache_home(*args) -> TextType:
+    """Return the XDG_CACHE_HOME cache directory, e.g. ~/.cache"""
+    cache = core.getenv('XDG_CACHE_HOME', os.path.join(core.expanduser('~'), '.cache'))
+    return os.path.join(cache, *args)
+
+
 def xdg_data_dirs() -> list[TextType]:
     """Return the current set of XDG data directories
 
@@ -220,3 +232,69 @@ def find_first(
 def config_home(*args) -> str:
     """Return git-cola's configuration directory, e.g. ~/.config/git-cola"""
     return xdg_config_home('git-cola', *args)
+
+
+def cache_home(*args) -> TextType:
+    """Return git-cola's cache directory, e.g. ~/.cache/git-cola"""
+    return xdg_cache_home('git-cola', *args)
+
+
+def load_compiled(
+    category: str,
+    identity: str,
+    sources: Iterable[Any],
+    suffix: str,
+    compile_data: Callable[[], bytes],
+    open_path: Callable[[str], T],
+    from_data: Callable[[bytes], T],
+) -> T:
+    """Load compiled data from the cache, compiling and storing it when needed
+
+    Cache files are named after the identity of the data and the signatures of
+    the sources it is compiled from. Stale files for the same identity are
+    removed when the data is recompiled. The compiled data is used directly
+    when the cache is not writable.
+    """
+    prefix = utils.sha256hex(identity)[:16] + '-'
+    key = utils.sha256hex(repr(list(sources)))
+    path = cache_home(category, prefix + key + suffix)
+    try:
+        return open_path(path)
+    except (OSError, ValueError):
+        pass
+
+    data = compile_data()
+    cache_dir = os.path.dirname(path)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        if not core.isdir(cache_dir):
+            core.makedirs(cache_dir)
+        with core.xopen(tmp_path, 'wb') as fh:
+            fh.write(data)
+        os.replace(core.mkpath(tmp_path), core.mkpath(path))
+        result = open_path(path)
+    except (OSError, ValueError):
+        if core.exists(tmp_path):
+            core.remove(tmp_path)
+        return from_data(data)
+    _prune_compiled(cache_dir, prefix, suffix, path)
+    return result
+
+
+def _prune_compiled(cache_dir: str, prefix: str, suffix: str, current: str) -> None:
+    """Remove cache files that were compiled from older versions of the sources"""
+    try:
+        filenames = core.listdir(cache_dir)
+    except OSError:
+        return
+    current_filename = os.path.basename(current)
+    for filename in filenames:
+        if (
+            filename != current_filename
+            and filename.startswith(prefix)
+            and filename.endswith(suffix)
+        ):
+            try:
+                core.remove(os.path.join(cache_dir, filename))
+            except OSError:
+                pass
@@ -10,11 +10,14 @@ from typing import Any
 
 from cola import app  # prints a message if Qt cannot be found
 from cola import core
+from cola import decorators
 from cola import difftool
 from cola import gitcmds
 from cola import hotkeys
 from cola import icons
 from cola import qtutils
+from cola import resources
+from cola import settings
 from cola import utils
 from cola.i18n import N_
 from cola.models import dag
@@ -160,6 +163,10 @@ class Editor(QtWidgets.QWidget):
     cancel = Signal()
     rebase = Signal()
 
+    # The number of commits queried by each git process. This matches the
+    # argument-size heuristic from utils.slice_func().
+    BATCH_SIZE = 128
+
     def __init__(self, context: ApplicationContext, filename: str, parent=None) -> None:
         super().__init__(parent)
 
@@ -234,6 +241,8 @@ class Editor(QtWidgets.QWidget):
         # selected paths the GUI freezes for a while on a big enough sequence. This
         # cache is used (commit ID to paths tuple) to minimize calls to git.
         self.oid_to_paths = {}
+        # Commits are immutable so their paths are persisted across rebase sessions.
+        self.changed_files_cache = ChangedFilesCache()
         self.task: SimpleTask | None = None  # A task fills the cache in the background.
         self.running = False  # This flag stops it.
 
@@ -247,8 +256,9 @@ class Editor(QtWidgets.QWidget):
         self.parse_sequencer_instructions(insns)
 
         # Assume that the tree is filled at this point.
+        oids = [item.oid for item in self.tree.items() if item.is_commit()]
         self.running = True
-        self.task = qtutils.SimpleTask(self.calculate_oid_to_paths)
+        self.task = qtutils.SimpleTask(self.calculate_oid_to_paths, oids)
         self.context.runtask.start(self.task)
 
     def stop(self) -> None:
@@ -294,12 +304,42 @@ class Editor(QtWidgets.QWidget):
 
         return paths
 
-    def calculate_oid_to_paths(self) -> None:
-        """Fills the oid_to_paths cache in the background"""
-        for item in self.tree.items():
-            if not self.running:
-                return
-            self.paths_touched_by_oid(item.oid)
+    def calculate_oid_to_paths(self, oids: list[str]) -> None:
+        """Fills the oid_to_paths cache in the background
+
+        Commits are queried in batches so that oid_to_paths is filled incrementally
+        and the task can be stopped between batches.
+        """
+        cache = self.changed_files_cache
+        cache.load()
+
+        # The cache is shared across repositories so it is only queried using the
+        # full object IDs from this repository.
+        full_oids = dict(zip(oids, gitcmds.parse_refs(self.context, oids)))
+        pending = []
+        for oid in oids:
+            if oid in self.oid_to_paths:
+                continue
+            paths = cache.get(full_oids[oid])
+            if paths is None:
+                pending.append(oid)
+            else:
+                self.oid_to_paths[oid] = paths
+
+        batch_size = self.BATCH_SIZE
+        while pending and self.running:
+            batch = pending[:batch_size]
+            pending = pending[batch_size:]
+            oid_to_paths = gitcmds.changed_files_batch(self.context, batch)
+            cache.update(oid_to_paths)
+            for oid in batch:
+                paths = oid_to_paths.get(full_oids[oid])
+                if paths is None:
+                    # The batch failed, e.g. due to an unknown object.
+                    paths = gitcmds.changed_files(self.context, oid)
+                self.oid_to_paths[oid] = paths
+
+        cache.save()
 
     def parse_sequencer_instructions(self, insns: str) -> None:
         idx = 1
@@ -386,6 +426,57 @@ class Editor(QtWidgets.QWidget):
         return status
 
 
+class ChangedFilesCache:
+    """Persistent cache of the paths changed by each commit
+
+    Entries are keyed by full object IDs so that they can be shared across
+    repositories and rebase sessions. Abbreviated object IDs must be resolved
+    by the repository before they are looked up. The least recently used entries
+    are discarded when the cache grows larger than max_entries.
+    """
+
+    def __init__(self, path: str | None = None, max_entries: int = 10000) -> None:
+        if path is None:
+            path = resources.cache_home('sequence-editor', 'changed-files.json')
+        self.path = path
+        self.max_entries = max_entries
+        self.values = decorators.LRUCache(max_size=max_entries)
+        self.modified = False
+
+    def load(self) -> None:
+        """Load the cached values from disk"""
+        self.values = decorators.LRUCache(max_size=self.max_entries)
+        for oid, paths in settings.read_json(self.path).items():
+            if isinstance(paths, list) and all(isinstance(x, str) for x in paths):
+                self.values.put(oid, paths)
+        self.modified = False
+
+    def save(self) -> None:
+        """Write the cached values to disk"""
+        if not self.modified:
+            return
+        path_tmp = self.path + '.tmp'
+        if settings.write_json(dict(self.values.items()), path_tmp, sync=False):
+            if core.exists(self.path):
+                settings.remove_path(self.path)
+            settings.rename_path(path_tmp, self.path)
+        self.modified = False
+
+    def get(self, oid: str) -> list[str] | None:
+        """Return the paths for a full object ID
+
+        Reading an entry marks it as recently used. The new order is saved along
+        with the next update.
+        """
+        return self.values.get(oid)
+
+    def update(self, values: dict[str, list[str]]) -> None:
+        """Add entries to the cache"""
+        for oid, paths in values.items():
+            self.values.put(oid, paths)
+            self.modified = True
+
+
 class RebaseTreeWidget(standard.DraggableTreeWidget):
     commits_selected = Signal(object)
     external_diff = Signal()
@@ -144,8 +144,10 @@ class SocketClient:
         if self.websocket is None:
             raise RuntimeError('WebSocket is not connected')
 
-        await self.websocket.send(message)
+        # Hold the lock while sending so that messages sent from several
+        # threads are answered in the order in which they are received.
         async with self._recv_lock:
+            await self.websocket.send(message)
             result = msgpack.unpackb(await self.websocket.recv())
             while result.get('seq', -1) != seq_number:
                 result = msgpack.unpackb(await self.websocket.recv())
@@ -172,6 +174,12 @@ class SyncSocketClient:
     def send_message_msgpack(self, message: dict[str, Any]):
         return self._run(self.client.send_message_msgpack(message))
 
+    def post_message_msgpack(self, message: dict[str, Any]) -> None:
+        """Send a message without waiting for the response"""
+        asyncio.run_coroutine_threadsafe(
+            self.client.send_message_msgpack(message), self.loop
+        )
+
     def send_message(self, message: str, seq_number: int):
         return self._run(self.client.send_message(message, seq_number))
 
@@ -9,7 +9,7 @@ from typing import Any
 
 from . import core
 from . import display
-from . import git
+from . import repocheck
 from . import resources
 
 if TYPE_CHECKING:
@@ -91,7 +91,7 @@ class Settings:
     recent = property(lambda self: mklist(self.values['recent']))
     copy_formats = property(lambda self: mklist(self.values['copy_formats']))
 
-    def __init__(self, verify: Callable = git.is_git_worktree) -> None:
+    def __init__(self, verify: Callable | None = None) -> None:
         """Load existing settings if they exist"""
         self.values: dict[str, Any] = {
             'bookmarks': [],
@@ -99,31 +99,32 @@ class Settings:
             'recent': [],
             'copy_formats': [],
         }
-        self.verify = verify
+        if verify is None:
+            self.checker = repocheck.checker()
+        else:
+            self.checker = repocheck.RepoChecker(verify=verify)
 
     def remove_missing_bookmarks(self) -> None:
         """Remove "favorites" bookmarks that no longer exist"""
-        missing_bookmarks = []
-        for bookmark in self.bookmarks:
-            if not self.verify(bookmark['path']):
-                missing_bookmarks.append(bookmark)
-
-        for bookmark in missing_bookmarks:
-            try:
-                self.bookmarks.remove(bookmark)
-            except ValueError:
-                pass
+        self._remove_missing(self.bookmarks)
 
     def remove_missing_recent(self) -> None:
         """Remove "recent" repositories that no longer exist"""
-        missing_recent = []
-        for recent in self.recent:
-            if not self.verify(recent['path']):
-                missing_recent.append(recent)
+        self._remove_missing(self.recent)
+
+    def _remove_missing(self, entries: list[dict[str, str]]) -> None:
+        """Remove entries for repositories that no longer exist
 
-        for recent in missing_recent:
+        Repositories are checked concurrently. Entries that cannot be checked
+        before the timeout, e.g. on an unresponsive network mount, are kept.
+        """
+        states = self.checker.wait(entry['path'] for entry in entries)
+        missing = [
+            entry for entry in entries if states[entry['path']] == repocheck.MISSING
+        ]
+        for entry in missing:
             try:
-                self.recent.remove(recent)
+                entries.remove(entry)
             except ValueError:
                 pass
 
@@ -243,7 +244,7 @@ class Settings:
         return True
 
     @staticmethod
-    def read(verify: Callable = git.is_git_worktree) -> Settings:
+    def read(verify: Callable | None = None) -> Settings:
         """Load settings from disk"""
         settings = Settings(verify=verify)
         settings.load()
@@ -1,7 +1,14 @@
 from __future__ import annotations
-import collections
+import array
+import bisect
 import glob
+import io
+import mmap
 import os
+import struct
+import sys
+import zlib
+from collections.abc import Iterable
 from collections.abc import Iterator
 from typing import Any
 
@@ -13,60 +20,233 @@ __copyright__ = """
 2013-2026 David Aguilar <davvid@gmail.com>
 """
 
-
-class GlobalState:
-    ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
-    LETTERS = set(ALPHABET)
-
-    @classmethod
-    def train(
-        cls, features: Any, model: dict[str, int], all_train_words: set[str]
-    ) -> dict[str, int]:
-        """Add words to the model"""
-        for word in features:
-            if word not in all_train_words:
-                all_train_words.add(word)
-                model[word] += 1
-                for letter in word:
-                    cls.LETTERS.add(letter)
-        return model
-
-    @classmethod
-    def update(cls) -> None:
-        """Update the alphabet after all dictionaries have been loaded"""
-        cls.ALPHABET = ''.join(sorted(cls.LETTERS))
-
-
-def edits1(word: str) -> set[str]:
-    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
-    deletes = [a + b[1:] for a, b in splits if b]
-    transposes = [a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1]
-    replaces = [a + c + b[1:] for a, b in splits for c in GlobalState.ALPHABET if b]
-    inserts = [a + c + b for a, b in splits for c in GlobalState.ALPHABET]
-    return set(deletes + transposes + replaces + inserts)
-
-
-def known_edits2(word: str, words: Any) -> set[str]:
-    return {e2 for e1 in edits1(word) for e2 in edits1(e1) if e2 in words}
-
-
-def known(word: Any, words: Any) -> set[str]:
-    return {w for w in word if w in words}
-
-
-def suggest(word: str, words: Any) -> set[str] | list[str]:
-    candidates = (
-        known([word], words)
-        or known(edits1(word), words)
-        or known_edits2(word, words)
-        or [word]
+# Suggestions are limited to words within this many edits of the input.
+MAX_EDIT_DISTANCE = 2
+# Only the leading characters of each word are indexed. This bounds the number of
+# deletions stored per word. Candidates are verified against the full word.
+PREFIX_LENGTH = 7
+
+# The compiled dictionary file format is a fixed-size header followed by four
+# sections: word offsets, deletion hashes, deletion word ids and the word data.
+# The sorted deletion hashes are bisected to find candidate words and the sorted
+# word data is bisected through the offsets table to check words.
+_MAGIC = b'COLASPEL'
+_VERSION = 1
+# magic, version, max edit distance, prefix length, words, index entries, data size
+_HEADER = struct.Struct('=8sIIIIII')
+_TYPECODE = 'I'
+_ITEMSIZE = array.array(_TYPECODE).itemsize
+
+
+def deletes(
+    word: str, max_distance: int = MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH
+) -> set[str]:
+    """Return the strings produced by deleting up to max_distance characters"""
+    prefix = word[:prefix_length]
+    result = {prefix}
+    edits = [prefix]
+    for _ in range(max_distance):
+        next_edits = []
+        for edit in edits:
+            for idx in range(len(edit)):
+                delete = edit[:idx] + edit[idx + 1 :]
+                if delete not in result:
+                    result.add(delete)
+                    next_edits.append(delete)
+        edits = next_edits
+    return result
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """Return the edit distance between two strings, including transpositions
+
+    Distances larger than max_distance are reported as max_distance + 1.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    previous_row = None
+    row = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        previous_row, prior_row = row, previous_row
+        row = [i] + [0] * len(target)
+        for j, target_char in enumerate(target, 1):
+            cost = 0 if source_char == target_char else 1
+            value = min(row[j - 1] + 1, previous_row[j] + 1, previous_row[j - 1] + cost)
+            if (
+                prior_row is not None
+                and j > 1
+                and source_char == target[j - 2]
+                and source[i - 2] == target_char
+            ):
+                value = min(value, prior_row[j - 2] + 1)
+            row[j] = value
+        if min(row) > max_distance:
+            return max_distance + 1
+    return min(row[-1], max_distance + 1)
+
+
+def _encode(word: str) -> bytes:
+    """Encode a word for storage in a compiled dictionary"""
+    return word.encode('utf-8', 'ignore')
+
+
+def _hash(value: str) -> int:
+    """Return a stable 32-bit hash for indexing deletions"""
+    return zlib.crc32(_encode(value))
+
+
+def compile_dictionary(
+    words: Iterable[str],
+    max_distance: int = MAX_EDIT_DISTANCE,
+    prefix_length: int = PREFIX_LENGTH,
+) -> bytes:
+    """Compile words into the binary format read by CompiledDictionary"""
+    encoded_words = sorted({_encode(word) for word in words if word})
+    offsets = array.array(_TYPECODE, [0])
+    position = 0
+    for word in encoded_words:
+        position += len(word)
+        offsets.append(position)
+
+    # Partition the deletion entries by their high byte so that they can be sorted
+    # in small batches. The (hash, word id) pairs are packed into one integer.
+    buckets = [array.array('Q') for _ in range(256)]
+    for word_id, word in enumerate(encoded_words):
+        for delete in deletes(word.decode('utf-8'), max_distance, prefix_length):
+            key = _hash(delete)
+            buckets[key >> 24].append(key << 32 | word_id)
+    for idx, bucket in enumerate(buckets):
+        buckets[idx] = array.array('Q', sorted(bucket))
+
+    index_size = sum(len(bucket) for bucket in buckets)
+    data = b''.join(encoded_words)
+    output = io.BytesIO()
+    output.write(
+        _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            max_distance,
+            prefix_length,
+            len(encoded_words),
+            index_size,
+            len(data),
+        )
     )
-    return candidates
+    output.write(offsets.tobytes())
+    for bucket in buckets:
+        output.write(array.array(_TYPECODE, [key >> 32 for key in bucket]).tobytes())
+    for bucket in buckets:
+        word_ids = array.array(_TYPECODE, [key & 0xFFFFFFFF for key in bucket])
+        output.write(word_ids.tobytes())
+    output.write(data)
+    return output.getvalue()
+
+
+class CompiledDictionary:
+    """A read-only word list with a precomputed deletion index for suggestions
+
+    The data is typically a memory-mapped cache file so that opening a dictionary
+    costs the same regardless of its size. Pages are read in on demand.
+    """
+
+    def __init__(self, data: Any) -> None:
+        if len(data) < _HEADER.size:
+            raise ValueError('spellcheck: truncated dictionary')
+        (
+            magic,
+            version,
+            max_distance,
+            prefix_length,
+            word_count,
+            index_size,
+            data_size,
+        ) = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('spellcheck: invalid dictionary')
+
+        offsets_start = _HEADER.size
+        hashes_start = offsets_start + (word_count + 1) * _ITEMSIZE
+        word_ids_start = hashes_start + index_size * _ITEMSIZE
+        data_start = word_ids_start + index_size * _ITEMSIZE
+        if len(data) != data_start + data_size:
+            raise ValueError('spellcheck: truncated dictionary')
+
+        view = memoryview(data)
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.word_count = word_count
+        self._data = data
+        self._offsets = view[offsets_start:hashes_start].cast(_TYPECODE)
+        self._hashes = view[hashes_start:word_ids_start].cast(_TYPECODE)
+        self._word_ids = view[word_ids_start:data_start].cast(_TYPECODE)
+        self._words = view[data_start:]
 
-
-def correct(word: str, words: Any) -> Any:
-    candidates = suggest(word, words)
-    return max(candidates, key=words.get)
+    @classmethod
+    def open(cls, path: str) -> CompiledDictionary:
+        """Memory-map a compiled dictionary file"""
+        with core.xopen(path, 'rb') as fh:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data)
+
+    def _word_bytes(self, word_id: int) -> bytes:
+        return bytes(self._words[self._offsets[word_id] : self._offsets[word_id + 1]])
+
+    def word(self, word_id: int) -> str:
+        """Return the word stored at the specified index"""
+        return self._word_bytes(word_id).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def __contains__(self, word: str) -> bool:
+        value = _encode(word)
+        low = 0
+        high = self.word_count
+        while low < high:
+            mid = (low + high) // 2
+            if self._word_bytes(mid) < value:
+                low = mid + 1
+            else:
+                high = mid
+        return low < self.word_count and self._word_bytes(low) == value
+
+    def lookup(self, word: str) -> list[tuple[int, str]]:
+        """Return (distance, word) pairs for words within max_distance of word"""
+        hashes = self._hashes
+        size = len(hashes)
+        word_ids = set()
+        for delete in deletes(word, self.max_distance, self.prefix_length):
+            key = _hash(delete)
+            idx = bisect.bisect_left(hashes, key)
+            while idx < size and hashes[idx] == key:
+                word_ids.add(self._word_ids[idx])
+                idx += 1
+
+        results = []
+        for word_id in word_ids:
+            candidate = self.word(word_id)
+            distance = edit_distance(word, candidate, self.max_distance)
+            if distance <= self.max_distance:
+                results.append((distance, candidate))
+        return results
+
+
+def suggest(
+    word: str, dictionary: CompiledDictionary, extra_words: Iterable[str] = ()
+) -> list[str]:
+    """Return the closest known words for the specified word"""
+    if word in dictionary or word in extra_words:
+        return [word]
+    max_distance = dictionary.max_distance
+    results = dictionary.lookup(word)
+    for extra_word in extra_words:
+        distance = edit_distance(word, extra_word, max_distance)
+        if distance <= max_distance:
+            results.append((distance, extra_word))
+    if not results:
+        return [word]
+    best_distance = min(distance for distance, _ in results)
+    return sorted({value for distance, value in results if distance == best_distance})
 
 
 class NorvigSpellCheck:
@@ -78,7 +258,7 @@ class NorvigSpellCheck:
         data_dirs = resources.xdg_data_dirs()
         self.dictwords = resources.find_first(words, data_dirs)
         self.propernames = resources.find_first(propernames, data_dirs)
-        self.words = collections.defaultdict(lambda: 1)
+        self.dictionary = None
         self.extra_words = set()
         self.extra_dictionaries = set()
         self.initialized = False
@@ -95,15 +275,51 @@ class NorvigSpellCheck:
         if self.initialized:
             return
         self.initialized = True
+        self.dictionary = self.load_dictionary()
+
+    def load_dictionary(self) -> CompiledDictionary:
+        """Load the compiled dictionary from the cache, compiling it when needed
+
+        Cached dictionaries are keyed by the signatures of the word lists they
+        were compiled from so that they are rebuilt, and the stale dictionary
+        removed, when a word list changes.
+        """
+        return resources.load_compiled(
+            'spellcheck',
+            repr(self.identity()),
+            self.sources(),
+            '.dict',
+            lambda: compile_dictionary(self.read_words()),
+            CompiledDictionary.open,
+            CompiledDictionary,
+        )
 
-        all_train_words = set()
+    def identity(self) -> tuple[Any, ...]:
+        """Return the aspell languages and word lists that the dictionary uses"""
+        aspell_langs = sorted(self.aspell_langs) if self.aspell_enabled else None
+        paths = [self.dictwords, self.propernames] + sorted(self.extra_dictionaries)
+        return (aspell_langs, paths)
+
+    def sources(self) -> list[tuple[Any, ...]]:
+        """Return the signatures of the inputs that the dictionary is compiled from"""
+        sources = [
+            ('format', _VERSION, MAX_EDIT_DISTANCE, PREFIX_LENGTH, sys.byteorder),
+        ]
         if self.aspell_enabled:
-            GlobalState.train(self.read_aspell_words(), self.words, all_train_words)
-        if not self.aspell_ok:
-            GlobalState.train(self.read(), self.words, all_train_words)
-        GlobalState.train(self.extra_words, self.words, all_train_words)
+            aspell_langs = sorted(self.aspell_langs)
+            sources.append(('aspell', aspell_langs, _get_aspell_signature()))
+        paths = [self.dictwords, self.propernames] + sorted(self.extra_dictionaries)
+        for path in paths:
+            if path:
+                sources.append(('file', path, _get_file_signature(path)))
+        return sources
 
-        GlobalState.update()
+    def read_words(self) -> Iterator[str]:
+        """Read words from aspell or from the dictionary files"""
+        if self.aspell_enabled:
+            yield from self.read_aspell_words()
+        if not self.aspell_ok:
+            yield from self.read()
 
     def set_aspell_enabled(self, enabled: bool) -> None:
         """Enable aspell support"""
@@ -116,14 +332,27 @@ class NorvigSpellCheck:
     def add_word(self, word: str) -> None:
         self.extra_words.add(word)
 
-    def suggest(self, word: str) -> list[str] | set[str]:
+    def suggest(self, word: str) -> list[str]:
         self.init()
-        return suggest(word, self.words)
+        if self.dictionary is None:
+            return [word]
+        return suggest(word, self.dictionary, self.extra_words)
 
     def check(self, word: str) -> bool:
         self.init()
+        dictionary = self.dictionary
+        if dictionary is None:
+            # init() is loading the dictionary in another thread or the
+            # dictionary could not be loaded. Do not flag words until it is ready.
+            return True
         word = word.replace('.', '')
-        return word in self.words or word.lower() in self.words
+        lower_word = word.lower()
+        return (
+            word in self.extra_words
+            or lower_word in self.extra_words
+            or word in dictionary
+            or lower_word in dictionary
+        )
 
     def read(self, use_common_files: bool = True) -> Iterator[str]:
         """Read dictionary words"""
@@ -189,6 +418,32 @@ class NorvigSpellCheck:
             yield from self.read(use_common_files=False)
 
 
+def _get_file_signature(path: str) -> tuple[int, int] | None:
+    """Return the (mtime, size) signature for a file"""
+    try:
+        st = core.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _get_aspell_signature() -> list[tuple[str, tuple[int, int] | None]] | None:
+    """Return the signatures of the files in aspell's dictionary directory"""
+    cmd = ['aspell', 'config', 'dict-dir']
+    status, out, _ = core.run_command(cmd)
+    dict_dir = out.strip()
+    if status != 0 or not dict_dir:
+        return None
+    try:
+        filenames = sorted(core.listdir(dict_dir))
+    except OSError:
+        return None
+    return [
+        (filename, _get_file_signature(os.path.join(dict_dir, filename)))
+        for filename in filenames
+    ]
+
+
 def _get_default_aspell_langs() -> list[str]:
     cmd = ['aspell', 'dicts']
     status, out, _ = core.run_command(cmd)
@@ -2,6 +2,7 @@
 from __future__ import annotations
 import copy
 import hashlib
+import importlib
 import os
 import re
 import shlex
@@ -509,6 +510,21 @@ def strip_prefixes_from_keys(values: dict[str, str], prefix: str) -> dict[str, s
     return strip_prefixes_and_suffixes_from_keys(values, prefix, '')
 
 
+def lazy_function(module: str, name: str) -> Callable[..., Any]:
+    """Return a function that imports a module and calls module.name()
+
+    The module is imported the first time that the function is called so that
+    modules that are only used by menu actions stay out of the startup path.
+    """
+
+    def call(*args, **kwargs) -> Any:
+        func = getattr(importlib.import_module(module), name)
+        return func(*args, **kwargs)
+
+    call.__name__ = name
+    return call
+
+
 class Proxy:
     """Wrap an object and override attributes"""
 
@@ -1,12 +1,8 @@
 """Provide git-cola's version number"""
 from __future__ import annotations
 
-try:
-    from importlib import metadata
-except (ImportError, OSError):
-    metadata = None
-
 from ._version import VERSION
+from .decorators import REPOSITORY_SCOPE
 from .decorators import memoize
 from .git import STDOUT
 
@@ -41,6 +37,8 @@ _versions = {
     'config-show-scope': '2.26.0',
     # git config --show-origin was introduced in 2.8.0
     'config-show-origin': '2.8.0',
+    # git var GIT_CONFIG_SYSTEM was introduced in 2.42.0
+    'var-config-system': '2.42.0',
     # git for-each-ref --sort=version:refname
     'version-sort': '2.7.0',
     # Qt support for QT_AUTO_SCREEN_SCALE_FACTOR and QT_SCALE_FACTOR
@@ -51,6 +49,8 @@ _versions = {
     'rebase-update-refs': '2.38.0',
     # git rev-parse --show-superproject-working-tree was added in 2.13.0
     'show-superproject-working-tree': '2.13.0',
+    # git for-each-ref --format=%(upstream:track,nobracket) was added in 2.13.0
+    'upstream-track-nobracket': '2.13.0',
 }
 
 
@@ -65,7 +65,10 @@ def version() -> str:
         return SCM_VERSION
 
     pkg_version = VERSION
-    if metadata is None:
+    # importlib.metadata is slow to import and is not needed during startup.
+    try:
+        from importlib import metadata
+    except (ImportError, OSError):
         return pkg_version
 
     try:
@@ -85,7 +88,7 @@ def builtin_version() -> str:
     return VERSION
 
 
-@memoize
+@memoize(max_size=128)
 def check_version(min_ver: str, ver: str) -> bool:
     """Check whether ver is greater or equal to min_ver"""
     min_ver_list = version_to_list(min_ver)
@@ -93,7 +96,7 @@ def check_version(min_ver: str, ver: str) -> bool:
     return min_ver_list <= ver_list
 
 
-@memoize
+@memoize(max_size=128)
 def check(key: str, ver: str) -> bool:
     """Checks if a version is greater than the known version for <what>"""
     return check_version(get(key), ver)
@@ -116,14 +119,14 @@ def version_to_list(value: str) -> list[int]:
     return ver_list
 
 
-@memoize
+@memoize(scope=REPOSITORY_SCOPE)
 def git_version_str(context) -> str:
     """Returns the current GIT version"""
     git = context.git
     return git.version(_readonly=True)[STDOUT].strip()
 
 
-@memoize
+@memoize(scope=REPOSITORY_SCOPE)
 def git_version(context) -> str:
     """Returns the current GIT version"""
     parts = git_version_str(context).split()
@@ -12,6 +12,7 @@ from .. import git
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
+from .. import repocheck
 from .. import utils
 from ..i18n import N_
 from ..interaction import Interaction
@@ -181,8 +182,27 @@ def disable_rename(_path, _name, _new_name):
     return False
 
 
+def set_repo_state(item, state):
+    """Display the state of a bookmarked or recent repository"""
+    path = item.path
+    if state == repocheck.CHECKING:
+        tooltip = path + '\n' + N_('Checking...')
+    elif state == repocheck.MISSING:
+        tooltip = path + '\n' + N_('Repository not found')
+    elif state == repocheck.TIMEOUT:
+        tooltip = path + '\n' + N_('The repository is not responding')
+    else:
+        tooltip = path
+    item.setToolTip(tooltip)
+    font = item.font()
+    font.setStrikeOut(state == repocheck.MISSING)
+    font.setItalic(state == repocheck.TIMEOUT)
+    item.setFont(font)
+
+
 class BookmarksTreeView(standard.TreeView):
     default_changed = Signal()
+    repo_checked = Signal(object, object)
     toggle_switcher = Signal(bool)
     # this signal will be emitted when some key pressed while focusing on tree view
     switcher_text = Signal(QtGui.QKeyEvent)
@@ -271,10 +291,12 @@ class BookmarksTreeView(standard.TreeView):
         proxy_model.dataChanged.connect(self.item_changed)
         self.selectionModel().selectionChanged.connect(self.item_selection_changed)
 
+        self.repo_checked.connect(self.set_repo_state, type=Qt.QueuedConnection)
         if style == RECENT_REPOS:
             context.model.worktree_changed.connect(
                 self.refresh, type=Qt.QueuedConnection
             )
+        self.check_repos()
 
     def keyPressEvent(self, event):
         """
@@ -318,6 +340,28 @@ class BookmarksTreeView(standard.TreeView):
         for item in items:
             self.items.append(item)
             self.root_model.appendRow(item)
+        self.check_repos()
+
+    def check_repos(self):
+        """Display the last known state of each repository and check them again"""
+        checker = self.context.settings.checker
+        with qtutils.BlockSignals(self.root_model):
+            for item in self.items:
+                set_repo_state(item, checker.state(item.path))
+        checker.check([item.path for item in self.items], self._repo_checked)
+
+    def _repo_checked(self, path, state):
+        """Forward the result of a repository check from a background thread"""
+        utils.catch_runtime_error(self.repo_checked.emit, path, state)
+
+    def set_repo_state(self, path, state):
+        """Display the state of a repository once it has been checked"""
+        # Signals are blocked so that the changes are not treated as renames.
+        with qtutils.BlockSignals(self.root_model):
+            for item in self.items:
+                if item.path == path:
+                    set_repo_state(item, state)
+        self.viewport().update()
 
     def contextMenuEvent(self, event):
         menu = qtutils.create_menu(N_('Actions'), self)
@@ -12,7 +12,6 @@ from .. import gitcmds
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
-from ..git import STDOUT
 from ..i18n import N_
 from ..interaction import Interaction
 from ..models import main as main_mod
@@ -151,6 +150,7 @@ class BranchesTreeWidget(standard.TreeWidget):
         self._visible = False
         self._needs_refresh = False
         self._branch_details_in_progress = False
+        self._branch_details_stale = False
         self._tree_states = None
         self._name_filter = ''
 
@@ -393,22 +393,29 @@ class BranchesTreeWidget(standard.TreeWidget):
         if item is not None:
             expand_item_parents(item)
             item.setIcon(0, icons.star())
-            if self._branch_details_in_progress:
-                return
-            self._branch_details_in_progress = True
-            branch_details_task = BranchDetailsTask(
-                context, current_branch, self.git_helper
-            )
-            self.runtask.start(
-                branch_details_task, finish=self._update_branches_finished
-            )
+        if self._branch_details_in_progress:
+            # Query again once the current task completes.
+            self._branch_details_stale = True
+            return
+        self._branch_details_in_progress = True
+        self._branch_details_stale = False
+        branch_details_task = BranchDetailsTask(context)
+        self.runtask.start(branch_details_task, finish=self._update_branches_finished)
 
     def _update_branches_finished(self, task):
         """Update the UI with the branch details once the background task completes"""
-        current_branch, tracked_branch, ahead, behind = task.result
+        self._branch_details_in_progress = False
+        if self._branch_details_stale:
+            self._update_branches()
+            return
         top_item = self.topLevelItem(0)
-        item = find_by_refname(top_item, current_branch)
-        if current_branch and tracked_branch and item is not None:
+        if top_item is None:
+            return
+        items = find_refname_items(top_item)
+        for branch, (_, ahead, behind) in task.result.items():
+            item = items.get(branch)
+            if item is None:
+                continue
             status_str = ''
             if ahead > 0:
                 status_str += f'{chr(0x2191)}{ahead}'
@@ -417,8 +424,7 @@ class BranchesTreeWidget(standard.TreeWidget):
                 status_str += f'  {chr(0x2193)}{behind}'
 
             if status_str:
-                item.setText(0, f'{item.text(0)}\t{status_str}')
-        self._branch_details_in_progress = False
+                item.setText(0, f'{item.name}\t{status_str}')
 
     def git_action_async(
         self,
@@ -570,32 +576,13 @@ class BranchesTreeWidget(standard.TreeWidget):
 class BranchDetailsTask(qtutils.Task):
     """Lookup branch details in a background task"""
 
-    def __init__(self, context, current_branch, git_helper):
+    def __init__(self, context):
         super().__init__()
         self.context = context
-        self.current_branch = current_branch
-        self.git_helper = git_helper
 
     def task(self):
-        """Query git for branch details"""
-        tracked_branch = gitcmds.tracked_branch(self.context, self.current_branch)
-        ahead = 0
-        behind = 0
-
-        if self.current_branch and tracked_branch:
-            origin = tracked_branch + '..' + self.current_branch
-            our_commits = self.git_helper.log(origin)[STDOUT]
-            ahead = our_commits.count('\n')
-            if our_commits:
-                ahead += 1
-
-            origin = self.current_branch + '..' + tracked_branch
-            their_commits = self.git_helper.log(origin)[STDOUT]
-            behind = their_commits.count('\n')
-            if their_commits:
-                behind += 1
-
-        return self.current_branch, tracked_branch, ahead, behind
+        """Query git for the ahead/behind counts of all local branches"""
+        return gitcmds.ahead_behind(self.context)
 
 
 class ItemType(Enum):
@@ -795,6 +782,17 @@ def find_by_refname(item, refname):
     return result
 
 
+def find_refname_items(item):
+    """Return a dict mapping full names to the children found recursively"""
+    result = {}
+    for i in range(item.childCount()):
+        child = item.child(i)
+        if child.refname:
+            result[child.refname] = child
+        result.update(find_refname_items(child))
+    return result
+
+
 def get_toplevel_item(item):
     """Returns top-most item found by traversing up the specified item"""
     parents = [item]
@@ -860,9 +858,6 @@ class GitHelper:
         self.context = context
         self.git = context.git
 
-    def log(self, origin):
-        return self.git.log(origin, abbrev=7, pretty='format:%h', _readonly=True)
-
     def push(self, remote, branch, **kwarg):
         return self.git.push(remote, branch, verbose=True, **kwarg)
 
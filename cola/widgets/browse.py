@@ -10,7 +10,6 @@ from qtpy.QtCore import Signal
 from .. import cmds
 from .. import core
 from .. import difftool
-from .. import gitcmds
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
@@ -23,6 +22,7 @@ from ..models.browse import GitRepoNameItem
 from ..models.selection import State
 from . import common
 from . import defs
+from . import selectcommits
 from . import standard
 from .selectcommits import select_commits
 
@@ -538,9 +538,9 @@ class RepoTreeView(standard.TreeView):
         context = self.context
         paths = self.selected_tracked_paths()
         args = ['--'] + paths
-        revs, summaries = gitcmds.log_helper(context, all=False, extra_args=args)
+        model = selectcommits.Model(context, extra_args=args)
         commits = select_commits(
-            context, N_('Select Previous Version'), revs, summaries, multiselect=False
+            context, N_('Select Previous Version'), model, multiselect=False
         )
         if not commits:
             return
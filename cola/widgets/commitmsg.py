@@ -10,7 +10,6 @@ from qtpy.QtCore import Signal
 from .. import actions
 from .. import cmds
 from .. import display
-from .. import gitcmds
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
@@ -24,6 +23,7 @@ from ..models import dag
 from ..models import prefs
 from ..qtutils import get
 from . import defs
+from . import selectcommits
 from . import standard
 from .selectcommits import select_commits
 from .spellcheck import SpellCheckLineEdit
@@ -695,10 +695,8 @@ class CommitMessageEditor(QtWidgets.QFrame):
 
     def choose_commit(self, cmd):
         context = self.context
-        revs, summaries = gitcmds.log_helper(context)
-        oids = select_commits(
-            context, N_('Select Commit'), revs, summaries, multiselect=False
-        )
+        model = selectcommits.Model(context)
+        oids = select_commits(context, N_('Select Commit'), model, multiselect=False)
         if not oids:
             return
         oid = oids[0]
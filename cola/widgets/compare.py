@@ -7,6 +7,7 @@ from .. import difftool
 from .. import gitcmds
 from .. import icons
 from .. import qtutils
+from ..decorators import LRUCache
 from ..i18n import N_
 from ..qtutils import connect_button
 from . import defs
@@ -20,6 +21,78 @@ class FileItem(QtWidgets.QTreeWidgetItem):
         self.setIcon(0, icon)
 
 
+class CompareCache:
+    """Cache merge-bases and changed files by the commits they were computed from
+
+    Branch names are resolved to object IDs each time they are used, so the
+    cached results remain valid when branches move.
+    """
+
+    max_entries = 128
+
+    def __init__(self):
+        self.merge_bases = LRUCache(max_size=self.max_entries)
+        self.filenames = LRUCache(max_size=self.max_entries)
+
+    def merge_base(self, context, head, ref):
+        """Return the merge-base of head and ref"""
+        oids = resolve_commits(context, head, ref)
+        if oids is None:
+            return gitcmds.merge_base(context, head, ref)
+        merge_base = self.merge_bases.get(oids)
+        if merge_base is None:
+            merge_base = gitcmds.merge_base(context, *oids)
+            if merge_base:
+                self.merge_bases.put(oids, merge_base)
+        return merge_base
+
+    def diff_filenames(self, context, start, end):
+        """Return the files that differ between start and end"""
+        oids = resolve_commits(context, start, end)
+        if oids is None:
+            return gitcmds.diff_filenames(context, start, end)
+        filenames = self.filenames.get(oids)
+        if filenames is None:
+            filenames = tuple(gitcmds.diff_filenames(context, *oids))
+            self.filenames.put(oids, filenames)
+        return list(filenames)
+
+
+def resolve_commits(context, *names):
+    """Resolve names to commit object IDs using a single git command
+
+    Returns a tuple of object IDs or None when any of the names is invalid.
+    """
+    status, out, _ = context.git.rev_parse(
+        *[name + '^{commit}' for name in names], _readonly=True
+    )
+    oids = tuple(out.split())
+    if status != 0 or len(oids) != len(names):
+        return None
+    return oids
+
+
+_cache = CompareCache()
+
+
+def compare_cache():
+    """Return the cache that is shared by the compare dialogs"""
+    return _cache
+
+
+class DiffFilesTask(qtutils.Task):
+    """Compute the files that differ between the selected branches"""
+
+    def __init__(self, dialog, left, right):
+        qtutils.Task.__init__(self)
+        self.dialog = dialog
+        self.left = left
+        self.right = right
+
+    def task(self):
+        return self.dialog.diff_files_for(self.left, self.right)
+
+
 def compare_branches(context):
     """Launches a dialog for comparing a pair of branches"""
     view = CompareBranchesDialog(context, qtutils.active_window())
@@ -39,6 +112,10 @@ class CompareBranchesDialog(standard.Dialog):
         self.use_sandbox = False
         self.start = None
         self.end = None
+        self.cache = compare_cache()
+        # The file list is computed in the background. Only one task runs at
+        # a time and only the result for the latest selection is displayed.
+        self.runner = qtutils.LatestTaskRunner(context, parent=self)
 
         self.setWindowTitle(N_('Branch Diff Viewer'))
 
@@ -146,35 +223,51 @@ class CompareBranchesDialog(standard.Dialog):
         """Updates the list of files whenever the selection changes"""
         # Left and Right refer to the comparison pair (l,r)
         left_item, right_item = self.selection()
+        self.runner.cancel()
+        self.set_diff_state((), False, None, None, [])
         if not left_item or not right_item or left_item == right_item:
-            self.set_diff_files([])
             return
+        task = DiffFilesTask(self, left_item, right_item)
+        self.runner.submit(task, self.finish_task)
+
+    def finish_task(self, result):
+        """Display the file list computed for the latest selection"""
+        if result is not None:
+            self.set_diff_state(*result)
+
+    def diff_files_for(self, left_item, right_item):
+        """Return the diff state for a pair of selected items
+
+        This runs in a background thread.
+        """
         left_item = self.remote_ref(left_item)
         right_item = self.remote_ref(right_item)
+        context = self.context
 
         # If any of the selection includes sandbox then we
         # generate the same diff, regardless.  This means we don't
         # support reverse diffs against sandbox aka worktree.
         if self.SANDBOX in (left_item, right_item):
-            self.use_sandbox = True
+            use_sandbox = True
             if left_item == self.SANDBOX:
-                self.diff_arg = (right_item,)
+                diff_arg = (right_item,)
             else:
-                self.diff_arg = (left_item,)
+                diff_arg = (left_item,)
+            files = gitcmds.diff_index_filenames(context, diff_arg[0])
         else:
-            self.diff_arg = (left_item, right_item)
-            self.use_sandbox = False
+            use_sandbox = False
+            diff_arg = (left_item, right_item)
+            files = self.cache.diff_filenames(context, left_item, right_item)
 
         # start and end as in 'git diff start end'
-        self.start = left_item
-        self.end = right_item
-
-        context = self.context
-        if len(self.diff_arg) == 1:
-            files = gitcmds.diff_index_filenames(context, self.diff_arg[0])
-        else:
-            files = gitcmds.diff_filenames(context, *self.diff_arg)
-
+        return (diff_arg, use_sandbox, left_item, right_item, files)
+
+    def set_diff_state(self, diff_arg, use_sandbox, start, end, files):
+        """Display the files for a comparison"""
+        self.diff_arg = diff_arg
+        self.use_sandbox = use_sandbox
+        self.start = start
+        self.end = end
         self.set_diff_files(files)
 
     def set_diff_files(self, files):
@@ -191,17 +284,17 @@ class CompareBranchesDialog(standard.Dialog):
             branch = gitcmds.current_branch(context)
             tracked_branch = gitcmds.tracked_branch(context)
             if tracked_branch:
-                return gitcmds.merge_base(context, branch, tracked_branch)
-            remote_branches = gitcmds.branch_list(context, remote=True)
+                return self.cache.merge_base(context, branch, tracked_branch)
+            remote_branches = self.remote_branches
             remote_branch = f'origin/{branch}'
             if remote_branch in remote_branches:
-                return gitcmds.merge_base(context, branch, remote_branch)
+                return self.cache.merge_base(context, branch, remote_branch)
 
             if 'origin/main' in remote_branches:
-                return gitcmds.merge_base(context, branch, 'origin/main')
+                return self.cache.merge_base(context, branch, 'origin/main')
 
             if 'origin/master' in remote_branches:
-                return gitcmds.merge_base(context, branch, 'origin/master')
+                return self.cache.merge_base(context, branch, 'origin/master')
             return 'HEAD'
         # Compare against the remote branch
         return branch
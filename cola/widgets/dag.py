@@ -1,4 +1,5 @@
 from __future__ import annotations
+import array
 import collections
 import enum
 import itertools
@@ -1819,10 +1820,10 @@ class GitDAG(standard.MainWindow):
             self.commits[commit_obj.oid] = commit_obj
             for tag in commit_obj.tags:
                 self.commits[tag] = commit_obj
-        # The treewidget is quick to update.  The graphview is slower when updating
-        # incrementally so it is updated just once at thread_end() once all commits have
-        # been gathered.
+        # The graphview lays out commits incrementally so both views are updated
+        # as batches of commits arrive from the reader thread.
         self.treewidget.add_commits(commits)
+        self.graphview.add_commits(commits)
 
     def thread_begin(self):
         """The reader thread has begun"""
@@ -1832,7 +1833,6 @@ class GitDAG(standard.MainWindow):
 
     def thread_end(self):
         """The reader thread has completed"""
-        self.graphview.add_commits(self.commit_list)
         self.restore_selection()
 
     def thread_status(self, successful):
@@ -2001,53 +2001,22 @@ class Cache:
 class Edge(QtWidgets.QGraphicsItem):
     item_type = qtutils.standard_item_type_value(1)
 
-    def __init__(self, source, dest):
+    def __init__(self, source, dest, color, commit):
         QtWidgets.QGraphicsItem.__init__(self)
 
         self.setAcceptedMouseButtons(Qt.NoButton)
         self.source = source
         self.dest = dest
-        self.commit = source.commit
+        self.commit = commit
         self.setZValue(-2)
 
-        self.recompute_bound()
-        self.path = None
-        self.path_valid = False
-
-        # Choose a new color for new branch edges
-        if self.source.x() < self.dest.x():
-            color = EdgeColor.cycle()
-            line = Qt.SolidLine
-        elif self.source.x() != self.dest.x():
-            color = EdgeColor.current()
-            line = Qt.SolidLine
-        else:
-            color = EdgeColor.current()
-            line = Qt.SolidLine
-
-        self.pen = QtGui.QPen(color, 2.0, line, Qt.SquareCap, Qt.RoundJoin)
-
-    def recompute_bound(self):
-        dest_pt = Commit.item_bbox.center()
-
-        self.source_pt = self.mapFromItem(self.source, dest_pt)
-        self.dest_pt = self.mapFromItem(self.dest, dest_pt)
-        self.line = QtCore.QLineF(self.source_pt, self.dest_pt)
-
-        width = self.dest_pt.x() - self.source_pt.x()
-        height = self.dest_pt.y() - self.source_pt.y()
-        rect = QtCore.QRectF(self.source_pt, QtCore.QSizeF(width, height))
+        width = dest.x() - source.x()
+        height = dest.y() - source.y()
+        rect = QtCore.QRectF(source, QtCore.QSizeF(width, height))
         self.bound = rect.normalized()
+        self.path = None
 
-    def commits_were_invalidated(self):
-        self.recompute_bound()
-        self.prepareGeometryChange()
-        # The path should not be recomputed immediately because just small part
-        # of DAG is actually shown at same time. It will be recomputed on
-        # demand in course of 'paint' method.
-        self.path_valid = False
-        # Hence, just queue redrawing.
-        self.update()
+        self.pen = QtGui.QPen(color, 2.0, Qt.SolidLine, Qt.SquareCap, Qt.RoundJoin)
 
     # Qt overrides
     def type(self):
@@ -2100,10 +2069,11 @@ class Edge(QtWidgets.QGraphicsItem):
             path.lineTo(point4)
 
         self.path = path
-        self.path_valid = True
 
     def paint(self, painter, _option, _widget):
-        if not self.path_valid:
+        # The path is computed on demand because only a small part of the DAG
+        # is painted at the same time.
+        if self.path is None:
             self.recompute_path()
         painter.setPen(self.pen)
         painter.drawPath(self.path)
@@ -2225,7 +2195,6 @@ class Commit(QtWidgets.QGraphicsItem):
 
         self.pressed = False
         self.dragged = False
-        self.edges = {}
 
     def itemChange(self, change, value):
         if change == QtWidgets.QGraphicsItem.ItemSelectedHasChanged:
@@ -2400,6 +2369,498 @@ class Label(QtWidgets.QGraphicsItem):
             current_width += text_rect.width() + spacing
 
 
+class GraphLayout:
+    """Assign grid cells to the commits displayed by the GraphView
+
+    The layout is incremental. Commits that were already placed keep their
+    cells and only the new commits are placed when commits are added.
+    """
+
+    def __init__(self, x_off):
+        self.x_off = x_off
+        self.commits = []
+        self.columns = {}
+        self.max_column = 0
+        self.min_column = 0
+        self.frontier = {}
+        self.tagged_cells = set()
+        self.children_seen = {}
+
+    def reset(self):
+        """Forget the commits that were placed and reset the grid"""
+        # Some children of displayed commits might not be accounted in
+        # 'commits' list. It is common case during loading of big graph.
+        # But, they are assigned a column that must be reset. Hence, use
+        # depth-first traversal to reset all columns assigned.
+        for node in self.commits:
+            if node.column is None:
+                continue
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                node.column = None
+                for child in node.children:
+                    if child.column is not None:
+                        stack.append(child)
+
+        self.reset_columns()
+        self.reset_rows()
+        self.commits = []
+        self.children_seen = {}
+
+    # Commit node layout technique
+    #
+    # Nodes are aligned by a mesh. Columns and rows are distributed using
+    # algorithms described below.
+    #
+    # Row assignment algorithm
+    #
+    # The algorithm aims consequent.
+    #     1. A commit should be above all its parents.
+    #     2. No commit should be at right side of a commit with a tag in same row.
+    # This prevents overlapping of tag labels with commits and other labels.
+    #     3. Commit density should be maximized.
+    #
+    #     The algorithm requires that all parents of a commit were assigned column.
+    # Nodes must be traversed in generation ascend order. This guarantees that all
+    # parents of a commit were assigned row. So, the algorithm may operate in
+    # course of column assignment algorithm.
+    #
+    #    Row assignment uses frontier. A frontier is a dictionary that contains
+    # minimum available row index for each column. It propagates during the
+    # algorithm. Set of cells with tags is also maintained to meet second aim.
+    #
+    #    Initialization is performed by reset_rows method. Each new column should
+    # be declared using declare_column method. Getting row for a cell is
+    # implemented in alloc_cell method. Frontier must be propagated for any child
+    # of fork commit which occupies different column. This meets first aim.
+    #
+    # Column assignment algorithm
+    #
+    #     The algorithm traverses nodes in generation ascend order. This guarantees
+    # that a node will be visited after all its parents.
+    #
+    #     The set of occupied columns are maintained during work. Initially it is
+    # empty and no node occupied a column. Empty columns are allocated on demand.
+    # Free index for column being allocated is searched in following way.
+    #     1. Start from desired column and look towards graph center (0 column).
+    #     2. Start from center and look in both directions simultaneously.
+    # Desired column is defaulted to 0. Fork node should set desired column for
+    # children equal to its one. This prevents branch from jumping too far from
+    # its fork.
+    #
+    #     Initialization is performed by reset_columns method. Column allocation is
+    # implemented in alloc_column method. The main loop is in add_commits and
+    # place_node methods. The latter also embeds row assignment algorithm by
+    # implementation.
+    #
+    #     Commits are added in batches while the graph is loaded. Each batch is
+    # traversed in generation ascend order after the commits that are already
+    # placed, which keep their cells. Commits arrive after their parents, but a
+    # parent may have been placed before a child was loaded. Such a child is
+    # allocated a column near its parent's column and the frontier is propagated
+    # with respect to the parent when the child is placed.
+    #
+    # Actions for each node are follow.
+    #     1. If the node was not assigned a column then it is assigned empty one.
+    #     2. Allocate row.
+    #     3. Allocate columns for children.
+    #     If a child have a column assigned then it should no be overridden. One of
+    # children is assigned same column as the node. If the node is a fork then the
+    # child is chosen in generation descent order. This is a heuristic and it only
+    # affects resulting appearance of the graph. Other children are assigned empty
+    # columns in same order. It is the heuristic too.
+    #     4. If no child occupies column of the node then leave it.
+    #     It is possible in consequent situations.
+    #     4.1 The node is a leaf.
+    #     4.2 The node is a fork and all its children are already assigned side
+    # column. It is possible if all the children are merges.
+    #     4.3 Single node child is a merge that is already assigned a column.
+    #     5. Propagate frontier with respect to this node.
+    #     Each frontier entry corresponding to column occupied by any node's child
+    # must be gather than node row index. This meets first aim of the row
+    # assignment algorithm.
+    #     Note that frontier of child that occupies same row was propagated during
+    # step 2. Hence, it must be propagated for children on side columns.
+
+    def reset_columns(self):
+        self.columns = {}
+        self.max_column = 0
+        self.min_column = 0
+
+    def reset_rows(self):
+        self.frontier = {}
+        self.tagged_cells = set()
+
+    def declare_column(self, column):
+        if self.frontier:
+            # Align new column frontier by frontier of nearest column. If all
+            # columns were left then select maximum frontier value.
+            if not self.columns:
+                self.frontier[column] = max(self.frontier.values())
+                return
+            # This is heuristic that mostly affects roots. Note that the
+            # frontier values for fork children will be overridden in course of
+            # propagate_frontier.
+            for offset in itertools.count(1):
+                for value in (column + offset, column - offset):
+                    if value not in self.columns:
+                        # Column is not occupied.
+                        continue
+                    try:
+                        frontier = self.frontier[value]
+                    except KeyError:
+                        # Column 'c' was never allocated.
+                        continue
+
+                    frontier -= 1
+                    # The frontier of the column may be higher because of
+                    # tag overlapping prevention performed for previous head.
+                    try:
+                        if self.frontier[column] >= frontier:
+                            break
+                    except KeyError:
+                        pass
+
+                    self.frontier[column] = frontier
+                    break
+                else:
+                    continue
+                break
+        else:
+            # First commit must be assigned 0 row.
+            self.frontier[column] = 0
+
+    def alloc_column(self, column=0):
+        columns = self.columns
+        # First, look for free column by moving from desired column to graph
+        # center (column 0).
+        for col in range(column, 0, -1 if column > 0 else 1):
+            if col not in columns:
+                if col > self.max_column:
+                    self.max_column = col
+                elif col < self.min_column:
+                    self.min_column = col
+                break
+        else:
+            # If no free column was found between graph center and desired
+            # column then look for free one by moving from center along both
+            # directions simultaneously.
+            for col in itertools.count(0):
+                if col not in columns:
+                    self.max_column = max(self.max_column, col)
+                    break
+                col = -col
+                if col not in columns:
+                    self.min_column = min(self.min_column, col)
+                    break
+        self.declare_column(col)
+        columns[col] = 1
+        return col
+
+    def alloc_cell(self, column, tags):
+        # Get empty cell from frontier.
+        cell_row = self.frontier[column]
+
+        if tags:
+            # Prevent overlapping of tag with cells already allocated a row.
+            if self.x_off > 0:
+                can_overlap = list(range(column + 1, self.max_column + 1))
+            else:
+                can_overlap = list(range(column - 1, self.min_column - 1, -1))
+            for value in can_overlap:
+                frontier = self.frontier[value]
+                cell_row = max(cell_row, frontier)
+
+        # Avoid overlapping with tags of commits at cell_row.
+        if self.x_off > 0:
+            can_overlap = range(self.min_column, column)
+        else:
+            can_overlap = range(self.max_column, column, -1)
+        for cell_row in itertools.count(cell_row):
+            for value in can_overlap:
+                if (value, cell_row) in self.tagged_cells:
+                    # Overlapping. Try next row.
+                    break
+            else:
+                # No overlapping was found.
+                break
+            # Note that all checks should be made for new cell_row value.
+
+        if tags:
+            self.tagged_cells.add((column, cell_row))
+
+        # Propagate frontier.
+        self.frontier[column] = cell_row + 1
+        return cell_row
+
+    def propagate_frontier(self, column, value):
+        current = self.frontier[column]
+        if current < value:
+            self.frontier[column] = value
+
+    def leave_column(self, column):
+        count = self.columns[column]
+        if count == 1:
+            del self.columns[column]
+        else:
+            self.columns[column] = count - 1
+
+    def add_commits(self, commits):
+        """Place new commits on the grid and return them"""
+        children_seen = self.children_seen
+        nodes = sort_by_generation(
+            [commit for commit in commits if commit.oid not in children_seen]
+        )
+        for node in nodes:
+            self.place_node(node)
+        self.commits.extend(nodes)
+        return nodes
+
+    def place_node(self, node):
+        """Allocate a cell for a node and columns for its children"""
+        children_seen = self.children_seen
+        for parent in node.parents:
+            # Parents that were placed before this node was loaded have not
+            # allocated a column for it or propagated the frontier.
+            seen = children_seen.get(parent.oid)
+            if seen is None or node in parent.children[:seen]:
+                continue
+            if node.column is None:
+                node.column = self.alloc_column(parent.column)
+            self.propagate_frontier(node.column, parent.row + 1)
+
+        if node.column is None:
+            # Node is either root or its parent is not in items. This
+            # happens when tree loading is in progress. Allocate new
+            # columns for such nodes.
+            node.column = self.alloc_column()
+
+        node.row = self.alloc_cell(node.column, node.tags)
+
+        # Allocate columns for children which are still without one. Also
+        # propagate frontier for children.
+        if node.is_fork():
+            sorted_children = sorted(
+                node.children, key=lambda c: c.generation, reverse=True
+            )
+            citer = iter(sorted_children)
+            for child in citer:
+                if child.column is None:
+                    # Top most child occupies column of parent.
+                    child.column = node.column
+                    # Note that frontier is propagated in course of
+                    # alloc_cell.
+                    break
+                self.propagate_frontier(child.column, node.row + 1)
+            else:
+                # No child occupies same column.
+                self.leave_column(node.column)
+                # Note that the loop below will pass no iteration.
+
+            # Rest children are allocated new column.
+            for child in citer:
+                if child.column is None:
+                    child.column = self.alloc_column(node.column)
+                self.propagate_frontier(child.column, node.row + 1)
+        elif node.children:
+            child = node.children[0]
+            if child.column is None:
+                child.column = node.column
+                # Note that frontier is propagated in course of alloc_cell.
+            elif child.column != node.column:
+                # Child node have other parents and occupies column of one
+                # of them.
+                self.leave_column(node.column)
+                # But frontier must be propagated with respect to this
+                # parent.
+                self.propagate_frontier(child.column, node.row + 1)
+        else:
+            # This is a leaf node.
+            self.leave_column(node.column)
+
+        children_seen[node.oid] = len(node.children)
+
+
+class GraphIndex:
+    """Spatial index over the grid cells of the commits shown by the GraphView
+
+    Node cells and the edges between them are kept in compact arrays. Nodes
+    and edges are bucketed by row so that the items intersecting a region of
+    the grid are found without visiting the whole graph.
+    """
+
+    bucket_rows = 64
+
+    def __init__(self):
+        self.nodes = []
+        self.indexes = {}
+        self.columns = array.array('i')
+        self.rows = array.array('i')
+        self.node_buckets = {}
+        self.edge_parents = array.array('i')
+        self.edge_children = array.array('i')
+        self.edge_colors = array.array('B')
+        self.edge_buckets = {}
+        self.lanes = {}
+        self.lane_levels = {}
+        self.min_column = 0
+        self.max_column = 0
+        self.max_row = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def reset(self):
+        """Forget all of the nodes and edges"""
+        self.__init__()
+
+    def find(self, oid):
+        """Return the index of the node for an oid or ref"""
+        return self.indexes.get(oid)
+
+    def add_node(self, node):
+        """Add a node that was placed on the grid and return its index"""
+        idx = len(self.nodes)
+        column = node.column
+        row = node.row
+        self.nodes.append(node)
+        self.columns.append(column)
+        self.rows.append(row)
+        self.indexes[node.oid] = idx
+        for tag in node.tags:
+            self.indexes[tag] = idx
+
+        bucket = row // self.bucket_rows
+        _bucket_entries(self.node_buckets, bucket).append(idx)
+        self.add_lane(bucket, column)
+
+        if idx == 0:
+            self.min_column = self.max_column = column
+        else:
+            self.min_column = min(self.min_column, column)
+            self.max_column = max(self.max_column, column)
+        self.max_row = max(self.max_row, row)
+        return idx
+
+    def add_edge(self, parent, child, color):
+        """Add an edge between the nodes at the parent and child indexes"""
+        edge = len(self.edge_parents)
+        self.edge_parents.append(parent)
+        self.edge_children.append(child)
+        self.edge_colors.append(color)
+
+        # The vertical run of an edge is drawn in the column of the child.
+        column = self.columns[child]
+        row_min, row_max = sorted((self.rows[parent], self.rows[child]))
+        for bucket in self.bucket_range(row_min, row_max):
+            _bucket_entries(self.edge_buckets, bucket).append(edge)
+            self.add_lane(bucket, column)
+        return edge
+
+    def add_lane(self, bucket, column):
+        """Record that a column is occupied within a bucket"""
+        columns = _bucket_columns(self.lanes, bucket)
+        if column not in columns:
+            columns.add(column)
+            self.lane_levels.clear()
+
+    def bucket_range(self, row_min, row_max):
+        """Return the range of buckets that cover the rows"""
+        return range(row_min // self.bucket_rows, row_max // self.bucket_rows + 1)
+
+    def estimate_nodes(self, row_min, row_max):
+        """Return an upper bound for the number of nodes within the rows"""
+        buckets = self.node_buckets
+        return sum(
+            len(buckets.get(bucket, ()))
+            for bucket in self.bucket_range(row_min, row_max)
+        )
+
+    def nodes_in(self, column_min, column_max, row_min, row_max):
+        """Return the indexes of the nodes within the grid region"""
+        columns = self.columns
+        rows = self.rows
+        buckets = self.node_buckets
+        result = []
+        for bucket in self.bucket_range(row_min, row_max):
+            for idx in buckets.get(bucket, ()):
+                if (
+                    column_min <= columns[idx] <= column_max
+                    and row_min <= rows[idx] <= row_max
+                ):
+                    result.append(idx)
+        return result
+
+    def edges_in(self, column_min, column_max, row_min, row_max):
+        """Return the edges that cross the grid region"""
+        columns = self.columns
+        rows = self.rows
+        parents = self.edge_parents
+        children = self.edge_children
+        buckets = self.edge_buckets
+        result = set()
+        for bucket in self.bucket_range(row_min, row_max):
+            for edge in buckets.get(bucket, ()):
+                if edge in result:
+                    continue
+                parent = parents[edge]
+                child = children[edge]
+                if (
+                    min(columns[parent], columns[child]) <= column_max
+                    and max(columns[parent], columns[child]) >= column_min
+                    and min(rows[parent], rows[child]) <= row_max
+                    and max(rows[parent], rows[child]) >= row_min
+                ):
+                    result.add(edge)
+        return result
+
+    def node_at(self, column, row):
+        """Return the index of the node at a grid cell"""
+        columns = self.columns
+        rows = self.rows
+        for idx in self.node_buckets.get(row // self.bucket_rows, ()):
+            if columns[idx] == column and rows[idx] == row:
+                return idx
+        return None
+
+    def lanes_in(self, level, row_min, row_max):
+        """Return the occupied columns for the buckets of a coarser level
+
+        Each bucket at a level covers 2**level buckets of the index.
+        The result is a list of (row_min, row_max, columns) tuples.
+        """
+        levels = self.lane_levels.get(level)
+        if levels is None:
+            levels = self.lane_levels[level] = {}
+            for bucket, columns in self.lanes.items():
+                _bucket_columns(levels, bucket >> level).update(columns)
+
+        size = self.bucket_rows << level
+        result = []
+        for bucket in range(row_min // size, row_max // size + 1):
+            columns = levels.get(bucket)
+            if columns:
+                result.append((bucket * size, (bucket + 1) * size, columns))
+        return result
+
+
+def _bucket_entries(buckets, bucket):
+    """Return the array of entries for a bucket"""
+    entries = buckets.get(bucket)
+    if entries is None:
+        buckets[bucket] = entries = array.array('i')
+    return entries
+
+
+def _bucket_columns(buckets, bucket):
+    """Return the set of columns for a bucket"""
+    columns = buckets.get(bucket)
+    if columns is None:
+        buckets[bucket] = columns = set()
+    return columns
+
+
 class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
     commits_selected = Signal(object)
     diff_commits = Signal(object, object)
@@ -2411,6 +2872,13 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
     x_off = -18
     y_off = -20
 
+    # Padding for the labels to the right of the nodes.
+    x_margin = 256
+    # Nodes are painted as lanes when more nodes would be materialised.
+    max_items = 4000
+    # Minimum height in pixels of the lanes painted when zoomed out.
+    lane_height = 4.0
+
     def __init__(self, context, parent):
         QtWidgets.QGraphicsView.__init__(self, parent)
         ViewerMixin.__init__(self)
@@ -2422,16 +2890,17 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         Commit.selected_outline_color = highlight.darker()
 
         self.context = context
-        self.columns = {}
         self.menu_actions = None
         self.commits = []
         self.items = {}
+        self.edges = {}
+        self.index = GraphIndex()
+        self.layout = GraphLayout(self.x_off)
+        self.layout_count = 0
+        self.materialised_rect = None
+        self.overview = False
         self.mouse_start = [0, 0]
         self.saved_matrix = self.transform()
-        self.max_column = 0
-        self.min_column = 0
-        self.frontier = {}
-        self.tagged_cells = set()
 
         self.x_start = 24
         self.x_min = 24
@@ -2444,6 +2913,12 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         self.zoom = 2
         self.setDragMode(QtWidgets.QGraphicsView.DragMode.RubberBandDrag)
 
+        # Items are materialised for the visible part of the graph only.
+        self.viewport_timer = QtCore.QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(0)
+        self.viewport_timer.timeout.connect(self.update_viewport)
+
         scene = QtWidgets.QGraphicsScene(self)
         scene.setItemIndexMethod(QtWidgets.QGraphicsScene.BspTreeIndex)
         scene.selectionChanged.connect(self.selection_changed, type=Qt.QueuedConnection)
@@ -2507,9 +2982,15 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         self.scene().clear()
         self.scene().invalidate()
         self.items.clear()
+        self.edges.clear()
         self.x_offsets.clear()
         self.x_min = 24
         self.commits = []
+        self.index.reset()
+        self.layout.reset()
+        self.layout_count = 0
+        self.materialised_rect = None
+        self.overview = False
 
     # ViewerMixin interface
     def selected_items(self):
@@ -2540,9 +3021,8 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         """Select the item for the oids"""
         self.scene().clearSelection()
         for oid in oids:
-            try:
-                item = self.items[oid]
-            except KeyError:
+            item = self.commit_item(oid)
+            if item is None:
                 continue
             item.setSelected(True)
             item_rect = item.sceneTransform().mapRect(item.boundingRect())
@@ -2557,10 +3037,7 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
             if generation is None or criteria_func(generation, commit.generation):
                 oid = commit.oid
                 generation = commit.generation
-        try:
-            return self.items[oid]
-        except KeyError:
-            return None
+        return self.commit_item(oid)
 
     def _oldest_item(self, commits):
         """Return the item for the commit with the oldest generation number"""
@@ -2643,9 +3120,11 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
 
         if not selected and self.commits:
             commit = self.commits[-1]
-            items.append(self.items[commit.oid])
+            item = self.commit_item(commit.oid)
+            if item is not None:
+                items.append(item)
 
-        bounds = self.scene().itemsBoundingRect()
+        bounds = self.graph_bounds()
         bounds.adjust(-64, 0, 0, 0)
         self.setSceneRect(bounds)
         self.fit_view_to_items(items)
@@ -2657,7 +3136,7 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
 
     def fit_view_to_items(self, items):
         if not items:
-            rect = self.scene().itemsBoundingRect()
+            rect = self.graph_bounds()
         else:
             x_min = y_min = maxsize
             x_max = y_max = -maxsize
@@ -2721,6 +3200,7 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
 
         self.setTransformationAnchor(QtWidgets.QGraphicsView.NoAnchor)
         self.setTransform(matrix)
+        self.viewport_changed()
 
     def wheel_zoom(self, event):
         """Handle mouse wheel zooming."""
@@ -2737,6 +3217,7 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         self.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorUnderMouse)
         self.zoom = zoom
         self.scale(zoom, zoom)
+        self.viewport_changed()
 
     def wheel_pan(self, event):
         """Handle mouse wheel panning."""
@@ -2747,6 +3228,7 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         matrix = self.transform().translate(tx * factor, ty * factor)
         self.setTransformationAnchor(QtWidgets.QGraphicsView.NoAnchor)
         self.setTransform(matrix)
+        self.viewport_changed()
 
     def scale_view(self, scale):
         factor = (
@@ -2783,344 +3265,223 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
             scrollbar_range = maximum - minimum
             value = minimum + int(float(scrollbar_range) * scrollbar_offset)
             scrollbar.setValue(value)
+        self.viewport_changed()
 
     def add_commits(self, commits):
         """Traverse commits and add them to the view."""
         self.commits.extend(commits)
-        scene = self.scene()
-        for commit in commits:
-            item = Commit(commit)
-            self.items[commit.oid] = item
-            for ref in commit.tags:
-                self.items[ref] = item
-            scene.addItem(item)
-
         self.layout_commits()
-        self.link(commits)
-
-    def link(self, commits):
-        """Create edges linking commits with their parents"""
-        scene = self.scene()
-        for commit in commits:
-            try:
-                commit_item = self.items[commit.oid]
-            except KeyError:
-                continue  # The history is truncated.
-            for parent in reversed(commit.parents):
-                try:
-                    parent_item = self.items[parent.oid]
-                except KeyError:
-                    continue  # The history is truncated.
-                try:
-                    edge = parent_item.edges[commit.oid]
-                except KeyError:
-                    edge = Edge(parent_item, commit_item)
-                else:
-                    continue
-                parent_item.edges[commit.oid] = edge
-                commit_item.edges[parent.oid] = edge
-                scene.addItem(edge)
+        self.scene().setSceneRect(self.graph_bounds())
+        self.materialised_rect = None
+        self.viewport_changed()
 
     def layout_commits(self):
-        positions = self.position_nodes()
-
-        # Each edge is accounted in two commits. Hence, accumulate invalid
-        # edges to prevent double edge invalidation.
-        invalid_edges = set()
-
-        for oid, (x_val, y_val) in positions.items():
-            item = self.items[oid]
-
-            pos = item.pos()
-            if pos != (x_val, y_val):
-                item.setPos(x_val, y_val)
-
-                for edge in item.edges.values():
-                    invalid_edges.add(edge)
-
-        for edge in invalid_edges:
-            edge.commits_were_invalidated()
-
-    # Commit node layout technique
-    #
-    # Nodes are aligned by a mesh. Columns and rows are distributed using
-    # algorithms described below.
-    #
-    # Row assignment algorithm
-    #
-    # The algorithm aims consequent.
-    #     1. A commit should be above all its parents.
-    #     2. No commit should be at right side of a commit with a tag in same row.
-    # This prevents overlapping of tag labels with commits and other labels.
-    #     3. Commit density should be maximized.
-    #
-    #     The algorithm requires that all parents of a commit were assigned column.
-    # Nodes must be traversed in generation ascend order. This guarantees that all
-    # parents of a commit were assigned row. So, the algorithm may operate in
-    # course of column assignment algorithm.
-    #
-    #    Row assignment uses frontier. A frontier is a dictionary that contains
-    # minimum available row index for each column. It propagates during the
-    # algorithm. Set of cells with tags is also maintained to meet second aim.
-    #
-    #    Initialization is performed by reset_rows method. Each new column should
-    # be declared using declare_column method. Getting row for a cell is
-    # implemented in alloc_cell method. Frontier must be propagated for any child
-    # of fork commit which occupies different column. This meets first aim.
-    #
-    # Column assignment algorithm
-    #
-    #     The algorithm traverses nodes in generation ascend order. This guarantees
-    # that a node will be visited after all its parents.
-    #
-    #     The set of occupied columns are maintained during work. Initially it is
-    # empty and no node occupied a column. Empty columns are allocated on demand.
-    # Free index for column being allocated is searched in following way.
-    #     1. Start from desired column and look towards graph center (0 column).
-    #     2. Start from center and look in both directions simultaneously.
-    # Desired column is defaulted to 0. Fork node should set desired column for
-    # children equal to its one. This prevents branch from jumping too far from
-    # its fork.
-    #
-    #     Initialization is performed by reset_columns method. Column allocation is
-    # implemented in alloc_column method. Initialization and main loop are in
-    # recompute_grid method. The method also embeds row assignment algorithm by
-    # implementation.
-    #
-    # Actions for each node are follow.
-    #     1. If the node was not assigned a column then it is assigned empty one.
-    #     2. Allocate row.
-    #     3. Allocate columns for children.
-    #     If a child have a column assigned then it should no be overridden. One of
-    # children is assigned same column as the node. If the node is a fork then the
-    # child is chosen in generation descent order. This is a heuristic and it only
-    # affects resulting appearance of the graph. Other children are assigned empty
-    # columns in same order. It is the heuristic too.
-    #     4. If no child occupies column of the node then leave it.
-    #     It is possible in consequent situations.
-    #     4.1 The node is a leaf.
-    #     4.2 The node is a fork and all its children are already assigned side
-    # column. It is possible if all the children are merges.
-    #     4.3 Single node child is a merge that is already assigned a column.
-    #     5. Propagate frontier with respect to this node.
-    #     Each frontier entry corresponding to column occupied by any node's child
-    # must be gather than node row index. This meets first aim of the row
-    # assignment algorithm.
-    #     Note that frontier of child that occupies same row was propagated during
-    # step 2. Hence, it must be propagated for children on side columns.
-
-    def reset_columns(self):
-        # Some children of displayed commits might not be accounted in
-        # 'commits' list. It is common case during loading of big graph.
-        # But, they are assigned a column that must be reset. Hence, use
-        # depth-first traversal to reset all columns assigned.
-        for node in self.commits:
-            if node.column is None:
-                continue
-            stack = [node]
-            while stack:
-                node = stack.pop()
-                node.column = None
-                for child in node.children:
-                    if child.column is not None:
-                        stack.append(child)
-
-        self.columns = {}
-        self.max_column = 0
-        self.min_column = 0
-
-    def reset_rows(self):
-        self.frontier = {}
-        self.tagged_cells = set()
-
-    def declare_column(self, column):
-        if self.frontier:
-            # Align new column frontier by frontier of nearest column. If all
-            # columns were left then select maximum frontier value.
-            if not self.columns:
-                self.frontier[column] = max(self.frontier.values())
-                return
-            # This is heuristic that mostly affects roots. Note that the
-            # frontier values for fork children will be overridden in course of
-            # propagate_frontier.
-            for offset in itertools.count(1):
-                for value in (column + offset, column - offset):
-                    if value not in self.columns:
-                        # Column is not occupied.
-                        continue
-                    try:
-                        frontier = self.frontier[value]
-                    except KeyError:
-                        # Column 'c' was never allocated.
-                        continue
-
-                    frontier -= 1
-                    # The frontier of the column may be higher because of
-                    # tag overlapping prevention performed for previous head.
-                    try:
-                        if self.frontier[column] >= frontier:
-                            break
-                    except KeyError:
-                        pass
-
-                    self.frontier[column] = frontier
-                    break
-                else:
-                    continue
-                break
-        else:
-            # First commit must be assigned 0 row.
-            self.frontier[column] = 0
-
-    def alloc_column(self, column=0):
-        columns = self.columns
-        # First, look for free column by moving from desired column to graph
-        # center (column 0).
-        for col in range(column, 0, -1 if column > 0 else 1):
-            if col not in columns:
-                if col > self.max_column:
-                    self.max_column = col
-                elif col < self.min_column:
-                    self.min_column = col
-                break
+        """Place the new commits and add them to the graph index"""
+        nodes = self.layout.add_commits(self.commits[self.layout_count :])
+        self.layout_count = len(self.commits)
+
+        index = self.index
+        for node in nodes:
+            idx = index.add_node(node)
+            self.x_min = min(self.x_min, self.node_pos(idx)[0])
+            self.link(idx)
+
+    def link(self, idx):
+        """Create edges linking a node with the parents and children placed so far"""
+        index = self.index
+        node = index.nodes[idx]
+        for parent in reversed(node.parents):
+            parent_idx = index.find(parent.oid)
+            if parent_idx is not None:
+                self.add_edge(parent_idx, idx)
+        # RepoReader reverses "git log --topo-order" so parents are usually
+        # placed before their children. Link the children that were placed by
+        # earlier batches so that those edges are not lost.
+        for child in node.children:
+            child_idx = index.find(child.oid)
+            if child_idx is not None:
+                self.add_edge(idx, child_idx)
+
+    def add_edge(self, parent_idx, child_idx):
+        """Add an edge to the index and choose its color"""
+        # Choose a new color for new branch edges
+        if self.node_pos(parent_idx)[0] < self.node_pos(child_idx)[0]:
+            EdgeColor.cycle()
         else:
-            # If no free column was found between graph center and desired
-            # column then look for free one by moving from center along both
-            # directions simultaneously.
-            for col in itertools.count(0):
-                if col not in columns:
-                    self.max_column = max(self.max_column, col)
-                    break
-                col = -col
-                if col not in columns:
-                    self.min_column = min(self.min_column, col)
-                    break
-        self.declare_column(col)
-        columns[col] = 1
-        return col
-
-    def alloc_cell(self, column, tags):
-        # Get empty cell from frontier.
-        cell_row = self.frontier[column]
-
-        if tags:
-            # Prevent overlapping of tag with cells already allocated a row.
-            if self.x_off > 0:
-                can_overlap = list(range(column + 1, self.max_column + 1))
-            else:
-                can_overlap = list(range(column - 1, self.min_column - 1, -1))
-            for value in can_overlap:
-                frontier = self.frontier[value]
-                cell_row = max(cell_row, frontier)
+            EdgeColor.current()
+        self.index.add_edge(parent_idx, child_idx, EdgeColor.current_color_index)
+
+    def node_pos(self, idx):
+        """Return the scene position of the node at an index"""
+        index = self.index
+        x_val = self.x_start + index.columns[idx] * self.x_off
+        y_val = self.y_off + index.rows[idx] * self.y_off
+        return (x_val, y_val)
+
+    def grid_region(self, rect):
+        """Return the columns and rows of the grid covered by a scene rect"""
+        columns = (
+            (rect.left() - self.x_start) / self.x_off,
+            (rect.right() - self.x_start) / self.x_off,
+        )
+        rows = (rect.top() / self.y_off - 1, rect.bottom() / self.y_off - 1)
+        return (
+            math.floor(min(columns)),
+            math.ceil(max(columns)),
+            math.floor(min(rows)),
+            math.ceil(max(rows)),
+        )
+
+    def graph_bounds(self):
+        """Return the scene rect covered by the graph"""
+        index = self.index
+        if not index:
+            return QtCore.QRectF()
+        x_values = (
+            self.x_start + index.min_column * self.x_off,
+            self.x_start + index.max_column * self.x_off,
+        )
+        y_values = (self.y_off, self.y_off + index.max_row * self.y_off)
+        radius = Commit.commit_radius
+        rect = QtCore.QRectF(
+            min(x_values) - radius,
+            min(y_values) - radius,
+            max(x_values) - min(x_values) + radius * 2 + self.x_margin,
+            max(y_values) - min(y_values) + radius * 2,
+        )
+        return rect
+
+    def commit_item(self, oid):
+        """Return the item for an oid or ref, materialising it when needed"""
+        idx = self.index.find(oid)
+        if idx is None:
+            return None
+        return self.node_item(idx)
 
-        # Avoid overlapping with tags of commits at cell_row.
-        if self.x_off > 0:
-            can_overlap = range(self.min_column, column)
-        else:
-            can_overlap = range(self.max_column, column, -1)
-        for cell_row in itertools.count(cell_row):
-            for value in can_overlap:
-                if (value, cell_row) in self.tagged_cells:
-                    # Overlapping. Try next row.
-                    break
-            else:
-                # No overlapping was found.
-                break
-            # Note that all checks should be made for new cell_row value.
+    def node_item(self, idx):
+        """Return the item for the node at an index"""
+        commit = self.index.nodes[idx]
+        item = self.items.get(commit.oid)
+        if item is None:
+            item = Commit(commit)
+            item.setPos(*self.node_pos(idx))
+            self.items[commit.oid] = item
+            self.scene().addItem(item)
+        return item
 
-        if tags:
-            self.tagged_cells.add((column, cell_row))
+    def edge_item(self, edge):
+        """Return the item for an edge, materialising it when needed"""
+        item = self.edges.get(edge)
+        if item is None:
+            index = self.index
+            parent = index.edge_parents[edge]
+            child = index.edge_children[edge]
+            color = EdgeColor.colors[index.edge_colors[edge]]
+            item = Edge(
+                QtCore.QPointF(*self.node_pos(parent)),
+                QtCore.QPointF(*self.node_pos(child)),
+                color,
+                index.nodes[parent],
+            )
+            self.edges[edge] = item
+            self.scene().addItem(item)
+        return item
+
+    def node_item_at(self, pos):
+        """Return the item for the node under a viewport position"""
+        scene_pos = self.mapToScene(pos)
+        column = round((scene_pos.x() - self.x_start) / self.x_off)
+        row = round(scene_pos.y() / self.y_off - 1)
+        idx = self.index.node_at(column, row)
+        if idx is None:
+            return None
+        x_val, y_val = self.node_pos(idx)
+        radius = Commit.commit_radius / 2.0
+        if abs(scene_pos.x() - x_val) > radius or abs(scene_pos.y() - y_val) > radius:
+            return None
+        return self.node_item(idx)
 
-        # Propagate frontier.
-        self.frontier[column] = cell_row + 1
-        return cell_row
+    def viewport_changed(self):
+        """Schedule an update of the items materialised for the viewport"""
+        self.viewport_timer.start()
 
-    def propagate_frontier(self, column, value):
-        current = self.frontier[column]
-        if current < value:
-            self.frontier[column] = value
+    def update_viewport(self):
+        """Materialise the items that intersect the viewport
 
-    def leave_column(self, column):
-        count = self.columns[column]
-        if count == 1:
-            del self.columns[column]
+        Items are created for the visible nodes and edges plus a margin.
+        Items that scrolled out of range are removed unless they are selected.
+        When zoomed out too far the graph is painted as lanes instead.
+        """
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        materialised = self.materialised_rect
+        if (
+            materialised is not None
+            and materialised.contains(visible)
+            and materialised.width() <= visible.width() * 3.0
+        ):
+            return
+        x_margin = visible.width() / 2.0
+        y_margin = visible.height() / 2.0
+        rect = visible.adjusted(-x_margin, -y_margin, x_margin, y_margin)
+        self.materialised_rect = rect
+
+        index = self.index
+        column_min, column_max, row_min, row_max = self.grid_region(rect)
+        overview = index.estimate_nodes(row_min, row_max) > self.max_items
+        if overview:
+            nodes = []
+            edges = set()
         else:
-            self.columns[column] = count - 1
-
-    def recompute_grid(self):
-        self.reset_columns()
-        self.reset_rows()
-
-        for node in sort_by_generation(list(self.commits)):
-            if node.column is None:
-                # Node is either root or its parent is not in items. This
-                # happens when tree loading is in progress. Allocate new
-                # columns for such nodes.
-                node.column = self.alloc_column()
-
-            node.row = self.alloc_cell(node.column, node.tags)
-
-            # Allocate columns for children which are still without one. Also
-            # propagate frontier for children.
-            if node.is_fork():
-                sorted_children = sorted(
-                    node.children, key=lambda c: c.generation, reverse=True
-                )
-                citer = iter(sorted_children)
-                for child in citer:
-                    if child.column is None:
-                        # Top most child occupies column of parent.
-                        child.column = node.column
-                        # Note that frontier is propagated in course of
-                        # alloc_cell.
-                        break
-                    self.propagate_frontier(child.column, node.row + 1)
-                else:
-                    # No child occupies same column.
-                    self.leave_column(node.column)
-                    # Note that the loop below will pass no iteration.
-
-                # Rest children are allocated new column.
-                for child in citer:
-                    if child.column is None:
-                        child.column = self.alloc_column(node.column)
-                    self.propagate_frontier(child.column, node.row + 1)
-            elif node.children:
-                child = node.children[0]
-                if child.column is None:
-                    child.column = node.column
-                    # Note that frontier is propagated in course of alloc_cell.
-                elif child.column != node.column:
-                    # Child node have other parents and occupies column of one
-                    # of them.
-                    self.leave_column(node.column)
-                    # But frontier must be propagated with respect to this
-                    # parent.
-                    self.propagate_frontier(child.column, node.row + 1)
-            else:
-                # This is a leaf node.
-                self.leave_column(node.column)
+            nodes = index.nodes_in(column_min, column_max, row_min, row_max)
+            edges = index.edges_in(column_min, column_max, row_min, row_max)
 
-    def position_nodes(self):
-        self.recompute_grid()
+        scene = self.scene()
+        wanted = {index.nodes[idx].oid for idx in nodes}
+        for oid, item in list(self.items.items()):
+            if oid not in wanted and not item.isSelected():
+                scene.removeItem(item)
+                del self.items[oid]
+        for edge, item in list(self.edges.items()):
+            if edge not in edges:
+                scene.removeItem(item)
+                del self.edges[edge]
+
+        for idx in nodes:
+            self.node_item(idx)
+        for edge in edges:
+            self.edge_item(edge)
+
+        if overview or overview != self.overview:
+            self.overview = overview
+            self.resetCachedContent()
+            self.viewport().update()
+
+    def draw_lanes(self, painter, rect):
+        """Paint the occupied columns of the graph when zoomed out"""
+        column_min, column_max, row_min, row_max = self.grid_region(rect)
+        row_height = abs(self.y_off * self.transform().m22())
+        level = 0
+        while (GraphIndex.bucket_rows << level) * row_height < self.lane_height:
+            level += 1
 
         x_start = self.x_start
-        x_min = self.x_min
         x_off = self.x_off
         y_off = self.y_off
-
-        positions = {}
-
-        for node in self.commits:
-            x_val = x_start + node.column * x_off
-            y_val = y_off + node.row * y_off
-
-            positions[node.oid] = (x_val, y_val)
-            x_min = min(x_min, x_val)
-
-        self.x_min = x_min
-
-        return positions
+        lines = []
+        for top, bottom, columns in self.index.lanes_in(level, row_min, row_max):
+            y_top = y_off + top * y_off
+            y_bottom = y_off + bottom * y_off
+            for column in columns:
+                if column_min <= column <= column_max:
+                    x_val = x_start + column * x_off
+                    lines.append(QtCore.QLineF(x_val, y_top, x_val, y_bottom))
+
+        color = QtGui.QColor(self.palette().color(QtGui.QPalette.Text))
+        color.setAlpha(128)
+        pen = QtGui.QPen(color, 2.0)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawLines(lines)
 
     # Qt overrides
     def contextMenuEvent(self, event):
@@ -3138,6 +3499,9 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
             return
         if event.button() == Qt.LeftButton:
             self.pressed = True
+        # Materialise the node under the mouse so that the scene can select it
+        # when the graph is painted as lanes.
+        self.node_item_at(event.pos())
         self.handle_event(QtWidgets.QGraphicsView.mousePressEvent, event)
 
     def mouseMoveEvent(self, event):
@@ -3164,6 +3528,26 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
         else:
             self.wheel_pan(event)
 
+    def itemAt(self, pos):
+        """Return the item at a viewport position using the graph index"""
+        item = self.node_item_at(pos)
+        if item is None:
+            item = super().itemAt(pos)
+        return item
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.viewport_changed()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_changed()
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        if self.overview:
+            self.draw_lanes(painter, rect)
+
     def fitInView(self, rect, flags=Qt.IgnoreAspectRatio):
         """Override fitInView to remove unwanted margins
 
@@ -3184,6 +3568,7 @@ class GraphView(QtWidgets.QGraphicsView, ViewerMixin):
             xratio = yratio = max(xratio, yratio)
         self.scale(xratio, yratio)
         self.centerOn(rect.center())
+        self.viewport_changed()
 
 
 def sort_by_generation(commits):
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import math
 import os
 import re
 import time
@@ -27,6 +28,7 @@ from .. import utils
 from ..editpatch import edit_patch
 from ..i18n import N_
 from ..interaction import Interaction
+from ..models import dag
 from ..models import main
 from ..models import prefs
 from ..qtutils import get
@@ -45,6 +47,9 @@ if TYPE_CHECKING:
 
 ENABLE_INTRALINE_DIFF = True
 
+# Decoded images and composited tiles for the image diff viewer.
+_image_cache = imageview.ImageCache()
+
 
 class DiffSyntaxHighlighter(QtGui.QSyntaxHighlighter):
     """Implements the diff syntax highlighting"""
@@ -272,9 +277,15 @@ class DiffTextEdit(VimHintedPlainTextEdit):
 
         self._current_diff_text: str = ''
 
-        self.diff_lines = diffparse.DiffLines()
+        # Diffs larger than max_diff_size are displayed a window of pages at a time.
+        self.diff_lines = diffparse.DiffLineTable()
+        self.pages = diffparse.DiffPages('')
+        self.page_window = (0, 0)
+        self.page_key = None  # Identifies the diff that page_window belongs to.
+        self.line_offset = 0  # The diff line of the first line in the document.
+        self._paging = False
         if numbers:
-            self.numbers = DiffLineNumbers(context, self, diff_lines=self.diff_lines)
+            self.numbers = DiffLineNumbers(context, self)
             if not numbers_visible:
                 self.numbers.hide()
         else:
@@ -290,6 +301,17 @@ class DiffTextEdit(VimHintedPlainTextEdit):
         )
         self.copy_diff_action.setEnabled(False)
         self.menu_actions.append(self.copy_diff_action)
+
+        qtutils.add_action(self, N_('Next File'), self.next_file, hotkeys.NEXT_FILE)
+        qtutils.add_action(
+            self, N_('Previous File'), self.previous_file, hotkeys.PREVIOUS_FILE
+        )
+        qtutils.add_action(self, N_('Next Hunk'), self.next_hunk, hotkeys.NEXT_HUNK)
+        qtutils.add_action(
+            self, N_('Previous Hunk'), self.previous_hunk, hotkeys.PREVIOUS_HUNK
+        )
+
+        self.verticalScrollBar().valueChanged.connect(self._scrolled)
         self.cursorPositionChanged.connect(self._cursor_changed)
         self.selectionChanged.connect(self._selection_changed)
         self.mouse_zoomed.connect(self.update_block_cursor)
@@ -355,23 +377,125 @@ class DiffTextEdit(VimHintedPlainTextEdit):
             scrollbar.setValue(scrollvalue)
         self.scrollvalue = None
 
-    def set_diff(self, diff):
-        """Set the diff text and restore the scrollbar position post-update"""
+    def set_diff(self, diff, key=None):
+        """Set the diff text and restore the scrollbar position post-update
+
+        The key identifies the diff, e.g. the file that it was generated for.
+        The displayed pages are kept when a diff with the same key is refreshed.
+        """
         diff = diff.rstrip('\n')  # diffs include two empty newlines
-        diff = _truncate_diff(diff, self.max_diff_size)
 
         self.save_scrollbar()
 
-        lines = self.diff_lines.parse(diff)
+        # The line number table is shared with self.numbers and the diffstat.
+        self.diff_lines = diffparse.DiffLineTable(diff)
+        # A window of two pages holds at most max_diff_size megabytes.
+        max_size = self.max_diff_size * 1024 * 1024
+        if len(diff) > max_size > 0:
+            page_size = max_size // 2
+        else:
+            page_size = 0
+        self.pages = diffparse.DiffPages(diff, page_size)
+        # Keep displaying the same pages when the diff is refreshed.
+        if key is not None and key == self.page_key:
+            first = min(self.page_window[0], len(self.pages) - 1)
+        else:
+            first = 0
+        self.page_key = key
+        self._show_pages(first, first + 1)
+
+        self.restore_scrollbar()
+
+    def _show_pages(self, first, last):
+        """Display a window of pages from the current diff"""
+        pages = self.pages
+        first = max(0, first)
+        last = min(max(first, last), len(pages) - 1)
+        self.page_window = (first, last)
+        self.line_offset = pages.page_lines[first]
+        diff = pages.text_for_pages(first, last)
+
         if self.numbers:
-            # The diff_lines parser is shared with self.numbers and updated above.
-            self.numbers.set_diff(diff, lines=lines)
+            self.numbers.set_diff(
+                diff, table=self.diff_lines, line_offset=self.line_offset
+            )
 
-        self.set_value(diff)
+        self._paging = True
+        try:
+            self.set_value(diff)
+        finally:
+            self._paging = False
         self._current_diff_text = diff
         self.update_intraline_diff_spans()
 
-        self.restore_scrollbar()
+    def _scrolled(self, value):
+        """Display the next or previous page when scrolled to the edge"""
+        if self._paging or len(self.pages) < 2:
+            return
+        first, last = self.page_window
+        scrollbar = self.verticalScrollBar()
+        if value >= scrollbar.maximum() and last + 1 < len(self.pages):
+            self._move_window(last, last + 1)
+        elif value <= scrollbar.minimum() and first > 0:
+            self._move_window(first - 1, first)
+
+    def _move_window(self, first, last):
+        """Display different pages while keeping the visible lines in place"""
+        top_line = self.line_offset + self.firstVisibleBlock().blockNumber()
+        cursor_line = self.line_offset + self.textCursor().blockNumber()
+        self._show_pages(first, last)
+        self._scroll_to_line(top_line, cursor_line=cursor_line)
+
+    def current_diff_line(self):
+        """Return the diff line beneath the text cursor"""
+        return self.line_offset + self.textCursor().blockNumber()
+
+    def jump_to_line(self, line):
+        """Move the cursor to a diff line, displaying its page if needed"""
+        pages = self.pages
+        page = pages.page_for_line(line)
+        first, last = self.page_window
+        if not first <= page <= last:
+            first = min(page, max(0, len(pages) - 2))
+            self._show_pages(first, first + 1)
+        self._scroll_to_line(line, cursor_line=line)
+
+    def _scroll_to_line(self, line, cursor_line=None):
+        """Scroll a diff line to the top and optionally place the cursor"""
+        document = self.document()
+        if cursor_line is not None:
+            block = document.findBlockByNumber(cursor_line - self.line_offset)
+            if block.isValid():
+                cursor = self.textCursor()
+                cursor.setPosition(block.position())
+                self.setTextCursor(cursor)
+        block = document.findBlockByNumber(line - self.line_offset)
+        if block.isValid():
+            self._paging = True
+            try:
+                self.verticalScrollBar().setValue(block.firstLineNumber())
+            finally:
+                self._paging = False
+
+    def next_file(self):
+        """Move the cursor to the next file in the diff"""
+        self._jump(self.pages.next_file(self.current_diff_line()))
+
+    def previous_file(self):
+        """Move the cursor to the previous file in the diff"""
+        self._jump(self.pages.previous_file(self.current_diff_line()))
+
+    def next_hunk(self):
+        """Move the cursor to the next hunk in the diff"""
+        self._jump(self.pages.next_hunk(self.current_diff_line()))
+
+    def previous_hunk(self):
+        """Move the cursor to the previous hunk in the diff"""
+        self._jump(self.pages.previous_hunk(self.current_diff_line()))
+
+    def _jump(self, line):
+        if line is not None:
+            self.jump_to_line(line)
 
     # vvv inline-diff highlight begin vvv
     def update_intraline_diff_spans(self) -> None:
@@ -547,34 +671,14 @@ def _strip_diff(value):
     return value
 
 
-def _truncate_diff(value, size):
-    """Truncate the diff to the specified number of megabytes"""
-    if size == 0:  # Unlimited
-        return value
-
-    # Technically size represents the number of unicode tokens not bytes, but it's good
-    # enough given that usually we're dealing with utf-8 text.
-    count = size * 1024 * 1024
-    if len(value) <= count:
-        return value
-
-    # Find the last newline starting from size so that the last line is a full, complete
-    # line rather than an invalid truncated invalid diff value.
-    newline = value.rfind('\n', 0, count)
-    if newline == -1:
-        return value[:count]
-
-    return value[:newline]
-
-
 class DiffLineNumbers(TextDecorator):
     """The diff viewer's line number display"""
 
-    def __init__(self, context, parent, diff_lines=None):
+    def __init__(self, context, parent):
         TextDecorator.__init__(self, parent)
         self.highlight_line = -1
-        self.lines = None
-        self.parser = diff_lines or diffparse.DiffLines()
+        self.table = diffparse.DiffLineTable()
+        self.line_offset = 0  # The table line of the first block.
         self.formatter = diffparse.FormatDigits()
 
         font = qtutils.diff_font(context)
@@ -600,26 +704,27 @@ class DiffLineNumbers(TextDecorator):
             self.refresh_palette()
         super().changeEvent(event)
 
-    def set_diff(self, diff, lines=None):
+    def set_diff(self, diff, table=None, line_offset=0):
         """Update to a new diff display"""
-        if lines is None:
-            lines = self.parser.parse(diff)
-        self.lines = lines
-        self.formatter.set_digits(self.parser.digits())
+        if table is None:
+            table = diffparse.DiffLineTable(diff)
+        self.table = table
+        self.line_offset = line_offset
+        self.formatter.set_digits(table.digits())
 
     def width_hint(self):
         if not self.isVisible():
             return 0
-        parser = self.parser
+        table = self.table
 
-        if parser.merge:
+        if table.merge:
             columns = 3
             extra = 3  # one space in-between, one space after
         else:
             columns = 2
             extra = 2  # one space in-between, one space after
 
-        digits = parser.digits() * columns
+        digits = table.digits() * columns
 
         return defs.margin + (self._char_width * (digits + extra))
 
@@ -628,27 +733,28 @@ class DiffLineNumbers(TextDecorator):
         self.highlight_line = line_number
 
     def current_line(self):
-        lines = self.lines
-        if lines and self.highlight_line >= 0:
+        table = self.table
+        if table and self.highlight_line >= 0:
+            highlight_line = self.highlight_line + self.line_offset
             # Find the next valid line
-            for i in range(self.highlight_line, len(lines)):
+            for i in range(highlight_line, len(table)):
                 # take the "new" line number: last value in tuple
-                line_number = lines[i][-1]
+                line_number = table.numbers(i)[-1]
                 if line_number > 0:
                     return line_number
 
             # Find the previous valid line
-            for i in range(self.highlight_line - 1, -1, -1):
+            for i in range(highlight_line - 1, -1, -1):
                 # take the "new" line number: last value in tuple
-                if i < len(lines):
-                    line_number = lines[i][-1]
+                if i < len(table):
+                    line_number = table.numbers(i)[-1]
                     if line_number > 0:
                         return line_number
         return None
 
     def paintEvent(self, event):
         """Paint the line number"""
-        if not self.lines:
+        if not self.table:
             return
 
         painter = QtGui.QPainter(self)
@@ -668,12 +774,13 @@ class DiffLineNumbers(TextDecorator):
         disabled = self._disabled
 
         fmt = self.formatter
-        lines = self.lines
-        num_lines = len(lines)
+        table = self.table
+        num_lines = len(table)
+        line_offset = self.line_offset
 
         while block.isValid():
             block_number = block.blockNumber()
-            if block_number >= num_lines:
+            if block_number + line_offset >= num_lines:
                 break
             block_geom = editor.blockBoundingGeometry(block)
             rect = block_geom.translated(content_offset).toRect()
@@ -686,7 +793,8 @@ class DiffLineNumbers(TextDecorator):
             else:
                 painter.setPen(disabled)
 
-            line = lines[block_number]
+            # Line numbers are only resolved for the visible blocks.
+            line = table.numbers(block_number + line_offset)
             if len(line) == 2:
                 a, b = line
                 text = fmt.value(a, b)
@@ -718,8 +826,16 @@ class Viewer(QtWidgets.QFrame):
         self.context = context
         self.model = model = context.model
         self.images = []
-        self.pixmaps = []
+        self.retired_images = []
         self.sources = []
+        self.layers = []
+        self.comp_mode = None
+        self.comp_level = 0
+        self.comp_size = QtCore.QSize()
+        self.image_loader = ImageLoader(context, self)
+        self.tile_loader = ImageLoader(context, self)
+        self.image_loader.finished.connect(self.cleanup)
+        self.tile_loader.finished.connect(self.cleanup)
         italic_font = self.font()
         italic_font.setItalic(True)
 
@@ -891,8 +1007,8 @@ class Viewer(QtWidgets.QFrame):
         """Update the diffstat display in reponse to the new diff"""
         filename = self.context.selection.filename()
         if filename:
-            removals = self.text.diff_lines.removals.count
-            additions = self.text.diff_lines.additions.count
+            removals = self.text.diff_lines.removals
+            additions = self.text.diff_lines.additions
             diffstat = f'-{removals}  +{additions}'
         else:
             diffstat = ''
@@ -948,35 +1064,50 @@ class Viewer(QtWidgets.QFrame):
         self.text.set_word_wrapping(enabled, update=update)
 
     def reset(self):
+        self.image_loader.cancel()
+        self.tile_loader.cancel()
+        self.layers = []
         self.image.pixmap = QtGui.QPixmap()
+        self.retire_images()
         self.cleanup()
 
-    def cleanup(self):
-        for image, unlink in self.images:
-            if unlink and self.context.ops.exists(image):
-                self.context.ops.unlink(image)
+    def retire_images(self):
+        """Schedule the temporary files of the current images for removal"""
+        self.retired_images.extend(image for image in self.images if image[1])
         self.images = []
 
+    def cleanup(self):
+        """Remove the temporary files of images that are no longer in use"""
+        busy = self.image_loader.paths() | self.tile_loader.paths()
+        retired_images = []
+        for image in self.retired_images:
+            path = image[0]
+            if path in busy:
+                retired_images.append(image)
+            elif self.context.ops.exists(path):
+                self.context.ops.unlink(path)
+        self.retired_images = retired_images
+
     def set_images(self, images):
+        self.retire_images()
         self.images = images
-        self.pixmaps = []
         self.sources = []
+        self.layers = []
         if not images:
             self.reset()
             return False
 
-        # In order to comp, we first have to load all the images. SVGs are kept
-        # as renderers so they can be re-rasterised crisply at display size.
-        sources = [load_image_source(image[0]) for image in images]
-        sources = [source for source in sources if source is not None]
-        if not sources:
-            self.reset()
-            return False
+        # SVGs are kept as renderers so they can be re-rasterised crisply at
+        # display size. Raster images are decoded in the background.
+        paths = [image[0] for image in images]
+        if any(imageview.looks_like_svg(path) for path in paths):
+            sources = [load_image_source(path) for path in paths]
+            sources = [source for source in sources if source is not None]
+            if not sources:
+                self.reset()
+                return False
+            self.sources = sources
 
-        self.sources = sources
-        self.pixmaps = [
-            source for source in sources if isinstance(source, QtGui.QPixmap)
-        ]
         self.render()
         self.cleanup()
         return True
@@ -984,7 +1115,7 @@ class Viewer(QtWidgets.QFrame):
     def render(self):
         # Update images
         mode = self.options.image_mode.currentIndex()
-        if self.sources and any(is_svg_source(source) for source in self.sources):
+        if self.sources:
             # Vector sources: hand the view a re-rasterising callback so the
             # image stays sharp at any zoom level or device-pixel-ratio.
             sources = self.sources
@@ -992,22 +1123,64 @@ class Viewer(QtWidgets.QFrame):
             self.image.set_image_source(
                 lambda scale: render_comp_image(sources, mode, scale), logical
             )
-        elif self.pixmaps:
-            if mode == self.options.SIDE_BY_SIDE:
-                image = self.render_side_by_side()
-            elif mode == self.options.DIFF:
-                image = self.render_diff()
-            elif mode == self.options.XOR:
-                image = self.render_xor()
-            elif mode == self.options.PIXEL_XOR:
-                image = self.render_pixel_xor()
-            else:
-                image = self.render_side_by_side()
-            self.image.pixmap = image
+            self.apply_zoom()
+        elif self.images:
+            # Raster images are composited at the resolution of the view.
+            self.tile_loader.cancel()
+            viewport = self.image.viewport()
+            device_size = viewport.size() * viewport.devicePixelRatioF()
+            task = ImageCompositeTask(self.images, self.layers, mode, device_size)
+            self.image_loader.submit(task, self.set_composite)
         else:
             self.image.pixmap = QtGui.QPixmap()
+            self.apply_zoom()
+
+    def set_composite(self, result):
+        """Display the coarse composite image computed by an ImageCompositeTask"""
+        layers, mode, level, size, image = result
+        if image is None:
+            self.reset()
+            return
+        self.layers = layers
+        self.comp_mode = mode
+        self.comp_level = level
+        self.comp_size = size
+        pixmap = QtGui.QPixmap.fromImage(image)
+        self.image.set_tiled_source(pixmap, level, size, self.request_tiles)
+        self.apply_zoom()
+
+    def request_tiles(self, scale, rect):
+        """Refine the visible region of the composite when zooming in"""
+        level = image_level(scale)
+        if level >= self.comp_level or not self.layers:
+            self.tile_loader.cancel()
+            self.image.clear_tiles()
+            return
+        layers = self.layers
+        mode = self.comp_mode
+        tiles = []
+        missing = []
+        for tile in tile_range(self.comp_size, level, rect):
+            image = _image_cache.get(tile_cache_key(layers, mode, level, tile))
+            if image is None:
+                missing.append(tile)
+            else:
+                tiles.append((tile, image))
+        self.image.add_tiles(level, tiles, TILE_SIZE)
+        if missing:
+            task = ImageTilesTask(layers, mode, level, self.comp_size, missing)
+            self.tile_loader.submit(task, self.set_tiles)
+        else:
+            self.tile_loader.cancel()
 
-        # Apply zoom
+    def set_tiles(self, result):
+        """Display the tiles computed by an ImageTilesTask"""
+        layers, mode, level, tiles = result
+        if layers is self.layers and mode == self.comp_mode:
+            self.image.add_tiles(level, tiles, TILE_SIZE)
+
+    def apply_zoom(self):
+        """Apply the zoom level selected in the options"""
         zoom_mode = self.options.zoom_mode.currentIndex()
         zoom_factor = self.options.zoom_factors[zoom_mode][1]
         if zoom_factor > 0.0:
@@ -1015,58 +1188,10 @@ class Viewer(QtWidgets.QFrame):
             self.image.scale(zoom_factor, zoom_factor)
             poly = self.image.mapToScene(self.image.viewport().rect())
             self.image.last_scene_roi = poly.boundingRect()
-        # Re-rasterise any vector source at the resulting fixed-zoom scale.
+        # Re-rasterise any vector source and refine any tiled source at the
+        # resulting fixed-zoom scale.
         self.image.update_render_resolution()
 
-    def render_side_by_side(self):
-        # Side-by-side lineup comp
-        pixmaps = self.pixmaps
-        width = sum(pixmap.width() for pixmap in pixmaps)
-        height = max(pixmap.height() for pixmap in pixmaps)
-        image = create_image(width, height)
-
-        # Paint each pixmap
-        painter = create_painter(image)
-        x = 0
-        for pixmap in pixmaps:
-            painter.drawPixmap(x, 0, pixmap)
-            x += pixmap.width()
-        painter.end()
-
-        return image
-
-    def render_comp(self, comp_mode):
-        # Get the max size to use as the render canvas
-        pixmaps = self.pixmaps
-        if len(pixmaps) == 1:
-            return pixmaps[0]
-
-        width = max(pixmap.width() for pixmap in pixmaps)
-        height = max(pixmap.height() for pixmap in pixmaps)
-        image = create_image(width, height)
-
-        painter = create_painter(image)
-        for pixmap in (pixmaps[0], pixmaps[-1]):
-            x = (width - pixmap.width()) // 2
-            y = (height - pixmap.height()) // 2
-            painter.drawPixmap(x, y, pixmap)
-            painter.setCompositionMode(comp_mode)
-        painter.end()
-
-        return image
-
-    def render_diff(self):
-        comp_mode = QtGui.QPainter.CompositionMode_Difference
-        return self.render_comp(comp_mode)
-
-    def render_xor(self):
-        comp_mode = QtGui.QPainter.CompositionMode_Xor
-        return self.render_comp(comp_mode)
-
-    def render_pixel_xor(self):
-        comp_mode = QtGui.QPainter.RasterOp_SourceXorDestination
-        return self.render_comp(comp_mode)
-
 
 def create_image(width, height):
     size = QtCore.QSize(width, height)
@@ -1187,6 +1312,253 @@ def render_comp_image(sources, mode, scale):
     return pixmap
 
 
+class ImageLayer:
+    """An image that takes part in an image diff"""
+
+    def __init__(self, path, key, size):
+        self.path = path
+        self.key = key
+        self.size = size
+
+
+def image_cache_key(image):
+    """Return the key for caching the decoded versions of an image
+
+    Images extracted from git are keyed by their blob ID so that flipping
+    between revisions does not decode them again. Files in the worktree
+    are keyed by their modification time and size.
+    """
+    path = image[0]
+    oid = image[2] if len(image) > 2 else None
+    if oid:
+        return ('blob', oid)
+    try:
+        stat = core.stat(path)
+    except OSError:
+        return ('file', path)
+    return ('file', path, stat.st_mtime_ns, stat.st_size)
+
+
+def load_image_layers(images):
+    """Read the sizes of the images and return the images that can be decoded"""
+    layers = []
+    for image in images:
+        path = image[0]
+        size = imageview.read_image_size(path)
+        if size is None:
+            # The size is not known until the image has been decoded.
+            decoded = imageview.decode_image(path)
+            if decoded.isNull():
+                continue
+            size = decoded.size()
+        layers.append(ImageLayer(path, image_cache_key(image), size))
+    return layers
+
+
+def image_level(scale):
+    """Return the pyramid level that has at least "scale" pixels per image pixel
+
+    Level 0 is the full resolution and each level halves the resolution.
+    """
+    if scale >= 1.0:
+        return 0
+    return math.floor(math.log2(1.0 / scale))
+
+
+def level_size(size, level):
+    """Return the size of an image at a pyramid level"""
+    factor = 1 << level
+    return QtCore.QSize(
+        max(1, -(-size.width() // factor)), max(1, -(-size.height() // factor))
+    )
+
+
+def fit_level(size, device_size):
+    """Return the coarsest pyramid level that fills the view when zoomed to fit"""
+    if size.isEmpty() or device_size.isEmpty():
+        return 0
+    scale = min(
+        device_size.width() / size.width(), device_size.height() / size.height()
+    )
+    return image_level(scale)
+
+
+def comp_layout(sizes, mode):
+    """Return the composited size and the (index, position) of each image"""
+    if mode == Options.SIDE_BY_SIDE:
+        size = QtCore.QSize(
+            sum(size.width() for size in sizes), max(size.height() for size in sizes)
+        )
+        placements = []
+        x = 0
+        for idx, image_size in enumerate(sizes):
+            placements.append((idx, QtCore.QPoint(x, 0)))
+            x += image_size.width()
+        return size, placements
+
+    size = QtCore.QSize(
+        max(size.width() for size in sizes), max(size.height() for size in sizes)
+    )
+    if len(sizes) == 1:
+        indexes = [0]
+    else:
+        indexes = [0, len(sizes) - 1]
+    placements = []
+    for idx in indexes:
+        x = (size.width() - sizes[idx].width()) // 2
+        y = (size.height() - sizes[idx].height()) // 2
+        placements.append((idx, QtCore.QPoint(x, y)))
+    return size, placements
+
+
+# Levels whose decoded size is below this limit are decoded whole and cached.
+# Finer levels of large images decode only the region that is displayed.
+MAX_LEVEL_PIXELS = 4096 * 4096
+
+
+def decode_layer(layer, level, clip_rect):
+    """Decode a region of an image at a pyramid level"""
+    size = level_size(layer.size, level)
+    if size.width() * size.height() > MAX_LEVEL_PIXELS:
+        return imageview.decode_image(layer.path, size, clip_rect)
+    key = (layer.key, level)
+    image = _image_cache.get(key)
+    if image is None:
+        image = imageview.decode_image(layer.path, size)
+        if image.isNull():
+            return image
+        _image_cache.put(key, image)
+    if clip_rect == image.rect():
+        return image
+    return image.copy(clip_rect)
+
+
+def render_comp_region(layers, mode, level, rect):
+    """Composite the images over a region of a pyramid level
+
+    The region is specified in the pixels of the composite at that level.
+    """
+    _, placements = comp_layout([layer.size for layer in layers], mode)
+    if mode == Options.SIDE_BY_SIDE:
+        comp_mode = None
+    else:
+        comp_mode = _comp_mode(mode)
+    image = create_image(rect.width(), rect.height())
+    painter = create_painter(image)
+    for idx, pos in placements:
+        layer = layers[idx]
+        layer_rect = QtCore.QRect(
+            QtCore.QPoint(pos.x() >> level, pos.y() >> level),
+            level_size(layer.size, level),
+        )
+        area = layer_rect.intersected(rect)
+        if not area.isEmpty():
+            clip_rect = area.translated(-layer_rect.topLeft())
+            part = decode_layer(layer, level, clip_rect)
+            if not part.isNull():
+                painter.drawImage(area.topLeft() - rect.topLeft(), part)
+        if comp_mode is not None:
+            painter.setCompositionMode(comp_mode)
+    painter.end()
+    return image
+
+
+# The size of the tiles, in pixels, that refine the composite when zooming in.
+TILE_SIZE = 512
+
+
+def tile_rect(size, level, tile):
+    """Return the rect covered by a tile in the pixels of a pyramid level"""
+    column, row = tile
+    rect = QtCore.QRect(column * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    return rect.intersected(QtCore.QRect(QtCore.QPoint(0, 0), level_size(size, level)))
+
+
+def tile_range(size, level, rect):
+    """Return the (column, row) of the tiles that cover a scene rect"""
+    comp_size = level_size(size, level)
+    span = TILE_SIZE * (1 << level)
+    left = max(0, int(rect.left() // span))
+    top = max(0, int(rect.top() // span))
+    right = min((comp_size.width() - 1) // TILE_SIZE, int(rect.right() // span))
+    bottom = min((comp_size.height() - 1) // TILE_SIZE, int(rect.bottom() // span))
+    return [
+        (column, row)
+        for row in range(top, bottom + 1)
+        for column in range(left, right + 1)
+    ]
+
+
+def tile_cache_key(layers, mode, level, tile):
+    """Return the key for caching a tile of a composite"""
+    return ('tile', tuple(layer.key for layer in layers), mode, level, tile)
+
+
+class ImageLoader(qtutils.LatestTaskRunner):
+    """Decode and composite images in the background, one task at a time"""
+
+    def paths(self):
+        """Return the paths of the images used by the running and pending tasks"""
+        result = set()
+        for task in self.tasks():
+            result.update(task.paths)
+        return result
+
+
+class ImageCompositeTask(qtutils.Task):
+    """Decode images and composite them at the resolution of the view"""
+
+    def __init__(self, images, layers, mode, device_size):
+        qtutils.Task.__init__(self)
+        self.images = images
+        self.layers = layers
+        self.mode = mode
+        self.device_size = device_size
+        self.generation = 0
+        self.paths = {image[0] for image in images}
+
+    def task(self):
+        layers = self.layers or load_image_layers(self.images)
+        if not layers:
+            return (layers, self.mode, 0, QtCore.QSize(), None)
+        size, _ = comp_layout([layer.size for layer in layers], self.mode)
+        level = fit_level(size, self.device_size)
+        rect = QtCore.QRect(QtCore.QPoint(0, 0), level_size(size, level))
+        image = render_comp_region(layers, self.mode, level, rect)
+        return (layers, self.mode, level, size, image)
+
+
+class ImageTilesTask(qtutils.Task):
+    """Composite the tiles that refine the visible region of an image diff"""
+
+    def __init__(self, layers, mode, level, size, tiles):
+        qtutils.Task.__init__(self)
+        self.layers = layers
+        self.mode = mode
+        self.level = level
+        self.size = size
+        self.tiles = tiles
+        self.generation = 0
+        self.paths = {layer.path for layer in layers}
+
+    def task(self):
+        layers = self.layers
+        mode = self.mode
+        level = self.level
+        # Decode the region covered by all of the tiles at once.
+        rects = [tile_rect(self.size, level, tile) for tile in self.tiles]
+        region = QtCore.QRect()
+        for rect in rects:
+            region = region.united(rect)
+        image = render_comp_region(layers, mode, level, region)
+        result = []
+        for tile, rect in zip(self.tiles, rects):
+            tile_image = image.copy(rect.translated(-region.topLeft()))
+            _image_cache.put(tile_cache_key(layers, mode, level, tile), tile_image)
+            result.append((tile, tile_image))
+        return (layers, mode, level, result)
+
+
 class Options(QtWidgets.QWidget):
     """Provide the options widget used by the editor
 
@@ -1232,14 +1604,17 @@ class Options(QtWidgets.QWidget):
             self, N_('Enable word wrapping'), self.set_word_wrapping, True
         )
         self.max_diff_label = QtWidgets.QLabel(
-            N_('Maximum diff size in megabytes (MB)'), self
+            N_('Diff page size in megabytes (MB)'), self
         )
         self.max_diff_spinbox = standard.SpinBox(
             value=1,
             mini=0,
             maxi=9999,
             suffix='\tMB',
-            tooltip=N_('The maximum diff size in megabytes (MB)'),
+            tooltip=N_(
+                'Larger diffs are displayed a page at a time and more pages '
+                'are loaded while scrolling'
+            ),
             parent=self,
         )
         self.max_diff_spinbox.setSpecialValueText(N_('Unlimited'))
@@ -1541,7 +1916,7 @@ class DiffEditor(DiffTextEdit):
         self.move_up = actions.move_up(self)
         self.move_down = actions.move_down(self)
 
-        model.diff_text_updated.connect(self.set_diff, type=Qt.QueuedConnection)
+        model.diff_text_updated.connect(self.set_model_diff, type=Qt.QueuedConnection)
         model.mode_changed.connect(self.update_actions, type=Qt.QueuedConnection)
 
         selection_model.selection_changed.connect(
@@ -1563,6 +1938,10 @@ class DiffEditor(DiffTextEdit):
             self.context, parent, numbers=numbers, numbers_visible=numbers
         )
 
+    def set_model_diff(self, diff):
+        """Display the diff for the selected file"""
+        self.set_diff(diff, key=(self.model.mode, self.model.filename))
+
     def set_max_diff_size(self, value):
         """Set the max diff state on the diff widget"""
         self.max_diff_size = value
@@ -1852,6 +2231,9 @@ class DiffEditor(DiffTextEdit):
 
     def extract_patch(self, reverse=False):
         first_line_idx, last_line_idx = self.selected_lines()
+        # The document only contains the displayed pages of large diffs.
+        first_line_idx += self.line_offset
+        last_line_idx += self.line_offset
         patch = diffparse.Patch.parse(self.model.filename, self.model.diff_text)
         if self.has_selection():
             return patch.extract_subset(first_line_idx, last_line_idx, reverse=reverse)
@@ -2155,6 +2537,10 @@ class CommitDiffWidget(QtWidgets.QWidget):
         # after the selection has moved on is dropped instead of stomping the
         # view.
         self._diff_token = 0
+        # Diffs for the commits around the selection are computed in the
+        # background once the diff for the selected commit has been displayed.
+        self.prefetcher = DiffPrefetcher(context, self)
+        self._prefetch_commit = None
 
         author_font = QtGui.QFont(self.font())
         author_font.setPointSize(int(author_font.pointSize() * 1.1))
@@ -2220,11 +2606,16 @@ class CommitDiffWidget(QtWidgets.QWidget):
     def start_diff_task(self, task):
         """Clear the display and start a diff-gathering task"""
         self.diff.save_scrollbar()
-        cmds.do(cmds.DiffLoading, self.context)
         # Stamp the task so that a result arriving after the selection has
         # already moved on can be discarded in set_diff().
         self._diff_token += 1
         token = self._diff_token
+        # Commit diffs are immutable. Display cached diffs immediately.
+        diff = task.cached()
+        if diff is not None:
+            self.set_diff(diff, token)
+            return
+        cmds.do(cmds.DiffLoading, self.context)
         self.context.runtask.start(task, result=lambda diff: self.set_diff(diff, token))
 
     def set_diff_oid(self, oid, filename=None):
@@ -2238,9 +2629,12 @@ class CommitDiffWidget(QtWidgets.QWidget):
 
     def commits_selected(self, commits):
         """Display an appropriate diff when commits are selected"""
+        # Foreground diffs take priority over prefetching.
+        self.prefetcher.cancel()
         if not commits:
             self._diff_timer.stop()
             self._pending_diff = None
+            self._prefetch_commit = None
             self.clear()
             return
         commit = commits[-1]
@@ -2259,13 +2653,31 @@ class CommitDiffWidget(QtWidgets.QWidget):
             self._pending_diff = ('range', start.oid, end.oid)
             self.oid_start = start
             self.oid_end = end
+            self._prefetch_commit = None
         else:
             self._pending_diff = ('oid', oid)
             self.oid_start = None
             self.oid_end = None
+            self._prefetch_commit = commit
+        if self._pending_diff_is_cached():
+            # Cached diffs are cheap to display so they are not debounced.
+            self._diff_timer.stop()
+            self._load_pending_diff()
+            return
         # (Re)start the debounce; the diff loads once the selection settles.
         self._diff_timer.start()
 
+    def _pending_diff_is_cached(self):
+        """Is the diff for the pending selection in the diff cache?"""
+        pending = self._pending_diff
+        if pending[0] == 'range':
+            _, start, end = pending
+            start += '~'
+        else:
+            _, end = pending
+            start = end + '~'
+        return gitcmds.is_diff_range_cached(self.context, start, end)
+
     def _load_pending_diff(self):
         """Load the diff for the most recently selected commit(s)"""
         pending = self._pending_diff
@@ -2285,6 +2697,10 @@ class CommitDiffWidget(QtWidgets.QWidget):
         if token is not None and token != self._diff_token:
             return
         self.diff.set_diff(diff)
+        commit = self._prefetch_commit
+        if token is not None and commit is not None:
+            self._prefetch_commit = None
+            self.prefetcher.prefetch(commit)
 
     def set_details(self, oid, author, email, date, summary):
         template_args = {'author': author, 'email': email}
@@ -2347,6 +2763,97 @@ class DiffPanel(QtWidgets.QWidget):
         self.search_widget.setFocus()
 
 
+class DiffPrefetcher(qtutils.LatestTaskRunner):
+    """Compute the diffs of the commits around the selection in the background
+
+    The diffs of the next commits in the direction that the selection is
+    moving are computed into the commit diff cache so that stepping through
+    the history displays them immediately. Prefetching runs one low-priority
+    task at a time and stops when the selection changes.
+    """
+
+    count = 4
+
+    def __init__(self, context, parent=None):
+        super().__init__(context, parent)
+        self.commit = None
+
+    def prefetch(self, commit):
+        """Prefetch the diffs for the commits around the selected commit"""
+        previous = self.commit
+        self.commit = commit
+        if previous is not None and previous in commit.children:
+            direction = -1  # Moving towards the parents.
+        elif previous is not None and previous in commit.parents:
+            direction = 1  # Moving towards the children.
+        else:
+            direction = 0  # The selection jumped.
+
+        self.cancel()
+        oids = self.neighbors(commit, direction)
+        if oids:
+            self.submit(DiffPrefetchTask(self, oids))
+
+    def neighbors(self, commit, direction):
+        """Return the oids of the commits to prefetch, nearest first"""
+        count = self.count
+        if direction == 0:
+            count = (count + 1) // 2
+        parents = []
+        children = []
+        if direction <= 0:
+            parents = _walk_commits(commit, 'parents', count)
+        if direction >= 0:
+            children = _walk_commits(commit, 'children', count)
+        oids = []
+        for idx in range(max(len(parents), len(children))):
+            for commits in (parents, children):
+                if idx < len(commits):
+                    oids.append(commits[idx].oid)
+        return oids
+
+
+def _walk_commits(commit, attr, count):
+    """Follow the first parent or child of a commit"""
+    result = []
+    for _ in range(count):
+        commits = getattr(commit, attr, None)
+        if not commits:
+            break
+        commit = commits[0]
+        if commit.oid in (dag.STAGE, dag.WORKTREE):
+            break
+        result.append(commit)
+    return result
+
+
+class DiffPrefetchTask(qtutils.Task):
+    """Compute the diffs of commits into the commit diff cache"""
+
+    def __init__(self, prefetcher, oids):
+        qtutils.Task.__init__(self)
+        self.prefetcher = prefetcher
+        self.context = prefetcher.context
+        self.oids = oids
+        self.generation = prefetcher.generation
+
+    def task(self):
+        thread = QtCore.QThread.currentThread()
+        priority = thread.priority()
+        thread.setPriority(QtCore.QThread.LowestPriority)
+        context = self.context
+        try:
+            for oid in self.oids:
+                # Stop as soon as the selection has moved on.
+                if not self.prefetcher.is_current(self):
+                    break
+                if not gitcmds.is_diff_range_cached(context, oid + '~', oid):
+                    gitcmds.diff_info(context, oid)
+        finally:
+            thread.setPriority(priority)
+        return ()
+
+
 class DiffInfoTask(qtutils.Task):
     """Gather diffs for a single commit"""
 
@@ -2356,6 +2863,13 @@ class DiffInfoTask(qtutils.Task):
         self.oid = oid
         self.filename = filename
 
+    def cached(self):
+        """Return the diff when it is cached"""
+        oid = self.oid
+        return gitcmds.cached_diff_range(
+            self.context, oid + '~', oid, filename=self.filename
+        )
+
     def task(self):
         context = self.context
         oid = self.oid
@@ -2372,6 +2886,12 @@ class DiffRangeTask(qtutils.Task):
         self.end = end
         self.filename = filename
 
+    def cached(self):
+        """Return the diff when it is cached"""
+        return gitcmds.cached_diff_range(
+            self.context, self.start, self.end, filename=self.filename
+        )
+
     def task(self):
         context = self.context
         return gitcmds.diff_range(context, self.start, self.end, filename=self.filename)
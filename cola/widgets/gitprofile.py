@@ -0,0 +1,132 @@
+"""Display the git commands recorded by the git command profiler"""
+
+from qtpy import QtWidgets
+from qtpy.QtCore import Qt
+
+from .. import gitprofile
+from .. import qtutils
+from ..i18n import N_
+from . import defs
+from .standard import Dialog
+
+
+def show_git_profile(context, parent=None):
+    """Show the git command profile"""
+    if parent is None:
+        parent = qtutils.active_window()
+    view = GitProfile(context, parent=parent)
+    view.show()
+    return view
+
+
+class GitProfile(Dialog):
+    """Show the git commands that each user action spent the most time on"""
+
+    def __init__(self, context, parent=None):
+        Dialog.__init__(self, parent=parent)
+        self.context = context
+        self.profiler = gitprofile.profiler()
+        self.setWindowTitle(N_('Git Command Profile'))
+
+        self.tree = QtWidgets.QTreeWidget(self)
+        self.tree.setHeaderLabels([
+            N_('Action / Call Site'),
+            N_('Commands'),
+            N_('Total (ms)'),
+            N_('Lock Wait (ms)'),
+            N_('Spawn (ms)'),
+            N_('Run (ms)'),
+            N_('Decode (ms)'),
+            N_('Output (KiB)'),
+        ])
+        self.tree.setAlternatingRowColors(True)
+        self.tree.setUniformRowHeights(True)
+
+        self.summary = QtWidgets.QLabel(self)
+
+        self.refresh_button = qtutils.refresh_button()
+        self.clear_button = qtutils.create_button(text=N_('Clear'))
+        self.export_json_button = qtutils.create_button(text=N_('Export JSON...'))
+        self.export_trace_button = qtutils.create_button(
+            text=N_('Export Chrome Trace...')
+        )
+        self.close_button = qtutils.close_button()
+
+        self.button_layout = qtutils.hbox(
+            defs.no_margin,
+            defs.button_spacing,
+            self.refresh_button,
+            self.clear_button,
+            self.summary,
+            qtutils.STRETCH,
+            self.export_json_button,
+            self.export_trace_button,
+            self.close_button,
+        )
+        self.main_layout = qtutils.vbox(
+            defs.margin, defs.spacing, self.tree, self.button_layout
+        )
+        self.setLayout(self.main_layout)
+
+        qtutils.connect_button(self.refresh_button, self.refresh)
+        qtutils.connect_button(self.clear_button, self.clear)
+        qtutils.connect_button(self.export_json_button, self.export_json)
+        qtutils.connect_button(self.export_trace_button, self.export_chrome_trace)
+        qtutils.connect_button(self.close_button, self.accept)
+
+        self.init_size(parent=parent)
+        self.refresh()
+
+    def refresh(self):
+        """Display the latest summary from the profiler"""
+        self.tree.clear()
+        summary = self.profiler.summary()
+        for action in summary:
+            name = action['name'] or N_('(unknown)')
+            item = _create_item(name, action)
+            for site in action['sites']:
+                item.addChild(_create_item(site['name'], site))
+            self.tree.addTopLevelItem(item)
+        count = sum(action['count'] for action in summary)
+        self.summary.setText(N_('%d git commands') % count)
+        for column in range(self.tree.columnCount()):
+            self.tree.resizeColumnToContents(column)
+
+    def clear(self):
+        """Forget the recorded commands"""
+        self.profiler.clear()
+        self.refresh()
+
+    def export_json(self):
+        """Save the recorded commands and their summary as JSON"""
+        path = qtutils.save_as('git-cola-profile.json', N_('Export JSON'))
+        if path:
+            self.profiler.write_json(path)
+
+    def export_chrome_trace(self):
+        """Save the recorded commands in the Chrome trace event format"""
+        path = qtutils.save_as('git-cola-trace.json', N_('Export Chrome Trace'))
+        if path:
+            self.profiler.write_chrome_trace(path)
+
+
+def _create_item(name, totals):
+    """Create a tree item that displays the totals for an action or call site"""
+    item = QtWidgets.QTreeWidgetItem([
+        name,
+        str(totals['count']),
+        _milliseconds(totals['wall']),
+        _milliseconds(totals['lock_wait']),
+        _milliseconds(totals['spawn']),
+        _milliseconds(totals['run']),
+        _milliseconds(totals['decode']),
+        f'{totals["bytes_out"] / 1024.0:.1f}',
+    ])
+    item.setToolTip(0, name)
+    for column in range(1, item.columnCount()):
+        item.setTextAlignment(column, int(Qt.AlignRight | Qt.AlignVCenter))
+    return item
+
+
+def _milliseconds(seconds):
+    return f'{seconds * 1000.0:.1f}'
@@ -61,6 +61,8 @@ class GrepThread(QtCore.QThread):
     """Gather `git grep` results in a background thread"""
 
     result = Signal(object, object, object)
+    # Broad searches stop reading results after this many bytes.
+    max_bytes = 8 * 1024 * 1024
 
     def __init__(self, context, parent):
         QtCore.QThread.__init__(self, parent)
@@ -78,11 +80,32 @@ class GrepThread(QtCore.QThread):
             args = utils.shell_split(query)
         else:
             args = [query]
-        status, out, err = git.grep(self.regexp_mode, n=True, _readonly=True, *args)
-        if query == self.query:
-            self.result.emit(status, out, err)
-        else:
+        lines = []
+        with git.stream(
+            'grep',
+            self.regexp_mode,
+            *args,
+            n=True,
+            _readonly=True,
+            _separator='\n',
+            _max_bytes=self.max_bytes
+        ) as stream:
+            for line in stream:
+                # Stop searching as soon as the query changes.
+                if query != self.query:
+                    break
+                lines.append(line)
+        if query != self.query:
             self.run()
+            return
+        status = stream.status
+        err = stream.err
+        if stream.truncated:
+            status = 0
+            err = '\n' + N_('Only the first %d MiB of results are shown.') % (
+                self.max_bytes // (1024 * 1024)
+            )
+        self.result.emit(status, '\n'.join(lines), err)
 
 
 class Grep(Dialog):
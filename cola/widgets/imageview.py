@@ -45,6 +45,7 @@ except ImportError:
     have_numpy = False
 
 from .. import qtcompat
+from ..decorators import LRUCache
 
 main_loop_type = 'qt'
 
@@ -88,6 +89,50 @@ def render_svg_to_pixmap(renderer, logical_size, scale):
     return pixmap
 
 
+def image_nbytes(image):
+    """Return the number of bytes used by a QImage"""
+    try:
+        return image.sizeInBytes()
+    except AttributeError:
+        return image.byteCount()
+
+
+def read_image_size(path):
+    """Read the size of an image from its header without decoding it"""
+    reader = QtGui.QImageReader(path)
+    size = reader.size()
+    if size.isValid() and not size.isEmpty():
+        return size
+    return None
+
+
+def decode_image(path, scaled_size=None, clip_rect=None):
+    """Decode an image at a reduced size and optionally only a region of it
+
+    ``scaled_size`` is the size of the whole decoded image and ``clip_rect``
+    selects a region of the scaled image. Image formats that can decode at a
+    reduced size, such as JPEG, do so without decoding the full image.
+    A null QImage is returned when the image cannot be decoded.
+    """
+    reader = QtGui.QImageReader(path)
+    if scaled_size is not None:
+        reader.setScaledSize(scaled_size)
+    if clip_rect is not None:
+        reader.setScaledClipRect(clip_rect)
+    return reader.read()
+
+
+class ImageCache(LRUCache):
+    """A least-recently-used cache of decoded images that is bounded by size
+
+    QImage is safe to share between threads so images are decoded into the
+    cache by background tasks and displayed from it on the main thread.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        super().__init__(max_bytes=max_bytes, sizeof=image_nbytes)
+
+
 class ImageView(QtWidgets.QGraphicsView):
     image_changed = Signal()
 
@@ -115,6 +160,13 @@ class ImageView(QtWidgets.QGraphicsView):
         self._max_render_pixels = 4096
         self._rendering = False
 
+        # Optional tiled source. A coarse pixmap covers the whole image and
+        # finer tiles are requested for the visible region when zooming in.
+        self._tile_fn = None
+        self._tile_level = None
+        self.tiles = {}
+        self.max_tiles = 96
+
         CHECK_MEDIUM = 8
         CHECK_GRAY = 0x80
         CHECK_LIGHT = 0xCC
@@ -164,6 +216,7 @@ class ImageView(QtWidgets.QGraphicsView):
         # A directly-assigned pixmap is a fixed raster; drop any vector source
         # so resize/zoom does not try to re-rasterise stale content.
         self._render_fn = None
+        self.clear_tiled_source()
         pixmap = None
         if have_numpy and isinstance(image, np.ndarray):
             if image.ndim == 3:
@@ -237,6 +290,7 @@ class ImageView(QtWidgets.QGraphicsView):
         pixels per logical unit with its device-pixel-ratio set to ``scale``.
         The image is re-rasterised as the on-screen size changes.
         """
+        self.clear_tiled_source()
         self._render_fn = render_fn
         self._logical_size = logical_size
         self._render_scale = 1.0
@@ -248,8 +302,81 @@ class ImageView(QtWidgets.QGraphicsView):
         self.graphics_pixmap.update()
         self.image_changed.emit()
 
+    def set_tiled_source(self, pixmap, level, logical_size, tile_fn):
+        """Display a coarse image that is refined with tiles when zooming in
+
+        ``pixmap`` covers the whole image at ``2 ** level`` logical units per
+        pixel. ``tile_fn(scale, rect)`` is called with the device pixels per
+        logical unit and the visible scene rect whenever the view changes.
+        """
+        self._render_fn = None
+        self.clear_tiles()
+        self._tile_fn = tile_fn
+        self._logical_size = logical_size
+        self.graphics_pixmap.setPixmap(self._composite_checkerboard(pixmap))
+        self.graphics_pixmap.setScale(2.0**level)
+        self.update_scene_rect()
+        self.fitInView(self.image_scene_rect, flags=Qt.KeepAspectRatio)
+        self.graphics_pixmap.update()
+        self.image_changed.emit()
+
+    def clear_tiled_source(self):
+        """Stop refining the image with tiles"""
+        self._tile_fn = None
+        self.clear_tiles()
+        self.graphics_pixmap.setScale(1.0)
+
+    def add_tiles(self, level, tiles, tile_size):
+        """Display ``((column, row), image)`` tiles at a pyramid level"""
+        if level != self._tile_level:
+            self.clear_tiles()
+            self._tile_level = level
+        scale = 2.0**level
+        scene = self.scene()
+        for key, image in tiles:
+            item = self.tiles.pop(key, None)
+            if item is None:
+                pixmap = QtGui.QPixmap.fromImage(image)
+                item = QtWidgets.QGraphicsPixmapItem(
+                    self._composite_checkerboard(pixmap)
+                )
+                item.setScale(scale)
+                column, row = key
+                item.setPos(column * tile_size * scale, row * tile_size * scale)
+                scene.addItem(item)
+            self.tiles[key] = item
+        # Tiles are kept in least-recently-displayed order.
+        while len(self.tiles) > self.max_tiles:
+            key = next(iter(self.tiles))
+            scene.removeItem(self.tiles.pop(key))
+
+    def clear_tiles(self):
+        """Remove the tiles from the scene"""
+        scene = self.scene()
+        for item in self.tiles.values():
+            scene.removeItem(item)
+        self.tiles = {}
+        self._tile_level = None
+
+    def update_tiles(self):
+        """Request the tiles for the visible region at the current zoom level"""
+        if self._tile_fn is None:
+            return
+        scale = abs(self.transform().m11()) * self.viewport().devicePixelRatioF()
+        rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        rect = rect.intersected(self.sceneRect())
+        if scale > 0.0 and not rect.isEmpty():
+            self._tile_fn(scale, rect)
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.update_tiles()
+
     def update_render_resolution(self):
         """Re-rasterise the vector source to match the current on-screen size."""
+        if self._tile_fn is not None:
+            self.update_tiles()
+            return
         if self._render_fn is None or self._rendering:
             return
         logical_w = max(1.0, float(self._logical_size.width()))
@@ -280,22 +407,20 @@ class ImageView(QtWidgets.QGraphicsView):
     def image(self, image):
         self.pixmap = image
 
-    def update_scene_rect(self):
+    def image_scene_size(self):
+        """Return the size of the image in scene units"""
+        if self._tile_fn is not None:
+            return QtCore.QSizeF(self._logical_size)
         pixmap = self.pixmap
         dpr = pixmap.devicePixelRatio() or 1.0
-        self.setSceneRect(
-            QtCore.QRectF(
-                QtCore.QPointF(0, 0),
-                QtCore.QPointF(pixmap.width() / dpr, pixmap.height() / dpr),
-            )
-        )
+        return QtCore.QSizeF(pixmap.width() / dpr, pixmap.height() / dpr)
+
+    def update_scene_rect(self):
+        self.setSceneRect(QtCore.QRectF(QtCore.QPointF(0, 0), self.image_scene_size()))
 
     @property
     def image_scene_rect(self):
-        pixmap = self.pixmap
-        dpr = pixmap.devicePixelRatio() or 1.0
-        size = QtCore.QSizeF(pixmap.width() / dpr, pixmap.height() / dpr)
-        return QtCore.QRectF(self.graphics_pixmap.pos(), size)
+        return QtCore.QRectF(self.graphics_pixmap.pos(), self.image_scene_size())
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -1,5 +1,8 @@
+import collections
+import itertools
 import time
 
+from qtpy import QtCore
 from qtpy import QtGui
 from qtpy import QtWidgets
 from qtpy.QtCore import Qt
@@ -8,28 +11,74 @@ from qtpy.QtCore import Signal
 from .. import core
 from .. import qtutils
 from ..i18n import N_
+from ..models import prefs
 from . import defs
 from . import standard
 from . import text
 
 
+class LogModel:
+    """The most recent lines of the log in a ring buffer
+
+    Lines that have not been displayed yet are the newest "pending" lines.
+    Lines that are discarded before they are displayed are never displayed.
+    """
+
+    def __init__(self, max_lines):
+        self.lines = collections.deque(maxlen=max_lines)
+        self.pending = 0
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, msg, prefix=''):
+        """Add the lines of a message with a prefix before each line"""
+        lines = self.lines
+        for line in msg.split('\n'):
+            lines.append(prefix + line)
+        self.pending = min(self.pending + msg.count('\n') + 1, len(lines))
+
+    def take_pending(self):
+        """Return the lines that have not been displayed yet"""
+        lines = self.lines
+        start = len(lines) - self.pending
+        self.pending = 0
+        return list(itertools.islice(lines, start, None))
+
+    def clear(self):
+        self.lines.clear()
+        self.pending = 0
+
+
 class LogWidget(QtWidgets.QFrame):
-    """A simple dialog to display command logs."""
+    """A simple dialog to display command logs.
+
+    Messages are buffered in a LogModel and displayed in batches once per
+    event loop iteration. The text widget keeps as many lines as the model.
+    """
 
     channel = Signal(object)
 
     def __init__(self, context, parent=None, output=None, display_usage=True):
         QtWidgets.QFrame.__init__(self, parent)
 
+        self.model = LogModel(prefs.log_lines(context))
         self.output_text = text.VimTextEdit(context, parent=self)
+        # The document ends with an empty block after the last line.
+        self.output_text.setMaximumBlockCount(self.model.lines.maxlen + 1)
+        self.output_text.setUndoRedoEnabled(False)
         self.highlighter = LogSyntaxHighlighter(self.output_text.document())
         if output:
             self.set_output(output)
         self.main_layout = qtutils.vbox(defs.no_margin, defs.spacing, self.output_text)
         self.setLayout(self.main_layout)
         self.setFocusProxy(self.output_text)
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(0)
+        self.flush_timer.timeout.connect(self.flush)
         self.channel.connect(self.append, type=Qt.QueuedConnection)
-        clear_action = qtutils.add_action(self, N_('Clear'), self.output_text.clear)
+        clear_action = qtutils.add_action(self, N_('Clear'), self.clear)
         self.output_text.menu_actions.append(clear_action)
         if display_usage:
             self._display_usage()
@@ -44,9 +93,11 @@ class LogWidget(QtWidgets.QFrame):
         )
 
     def clear(self):
+        self.model.clear()
         self.output_text.clear()
 
     def set_output(self, output):
+        self.model.clear()
         self.output_text.set_value(output)
 
     def log_status(self, status, out, err=None):
@@ -64,13 +115,25 @@ class LogWidget(QtWidgets.QFrame):
         if not msg:
             return
         msg = core.decode(msg)
-        cursor = self.output_text.textCursor()
-        cursor.movePosition(QtGui.QTextCursor.End)
-        text_widget = self.output_text
         # NOTE: the ':  ' colon-SP-SP suffix is for the syntax highlighter
         prefix = core.decode(time.strftime('%Y-%m-%d %H:%M:%S:  '))  # ISO-8601
-        for line in msg.split('\n'):
-            cursor.insertText(prefix + line + '\n')
+        self.model.append(msg, prefix=prefix)
+        # Messages that arrive together are displayed with a single insert.
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        """Display the pending lines from the model"""
+        self.flush_timer.stop()
+        lines = self.model.take_pending()
+        if not lines:
+            return
+        text_widget = self.output_text
+        cursor = text_widget.textCursor()
+        cursor.beginEditBlock()
+        cursor.movePosition(QtGui.QTextCursor.End)
+        cursor.insertText('\n'.join(lines) + '\n')
+        cursor.endEditBlock()
         cursor.movePosition(QtGui.QTextCursor.End)
         text_widget.setTextCursor(cursor)
 
@@ -11,6 +11,7 @@ from .. import cmds
 from .. import core
 from .. import git
 from .. import gitcmds
+from .. import gitprofile
 from .. import guicmds
 from .. import hotkeys
 from .. import icons
@@ -23,32 +24,15 @@ from ..i18n import N_
 from ..interaction import Interaction
 from ..models import prefs
 from ..qtutils import get
-from . import about
-from . import action
-from . import archive
 from . import bookmarks
 from . import branch
 from . import browse
 from . import cfgactions
-from . import clone
 from . import commitmsg
 from . import common
-from . import compare
-from . import createbranch
-from . import createtag
-from . import dag
 from . import diff
-from . import editremotes
-from . import finder
-from . import grep
 from . import log
-from . import merge
-from . import prefs as prefs_widget
-from . import recent
-from . import remote
-from . import search
 from . import standard
-from . import stash
 from . import status
 from . import submodules
 from . import toolbar
@@ -82,10 +66,15 @@ class MainView(standard.MainWindow):
                 'Browser', N_('Browser'), self, widget=browser
             )
 
+        # The "Actions", "Favorites" and "Recent" docks are hidden by default.
+        # Their widgets are created when the docks are first shown.
+        self.actionswidget = None
+        self.bookmarkswidget = None
+        self.recentwidget = None
+
         # "Actions" widget
-        self.actionswidget = action.ActionButtons(context, self)
         self.actionsdock = create_dock(
-            'Actions', N_('Actions'), self, widget=self.actionswidget
+            'Actions', N_('Actions'), self, func=self.create_actions, lazy=True
         )
         qtutils.hide_dock(self.actionsdock)
 
@@ -103,20 +92,15 @@ class MainView(standard.MainWindow):
             'Favorites',
             N_('Favorites'),
             self,
-            func=lambda dock: bookmarks.bookmark(context, dock),
+            func=self.create_bookmarks,
+            lazy=True,
         )
-        self.bookmarkswidget = self.bookmarksdock.widget()
         qtutils.hide_dock(self.bookmarksdock)
 
         self.recentdock = create_dock(
-            'Recent',
-            N_('Recent'),
-            self,
-            func=lambda dock: bookmarks.recent(context, dock),
+            'Recent', N_('Recent'), self, func=self.create_recent, lazy=True
         )
-        self.recentwidget = self.recentdock.widget()
         qtutils.hide_dock(self.recentdock)
-        self.bookmarkswidget.connect_to(self.recentwidget)
 
         # "Branch" widgets
         self.branchdock = create_dock(
@@ -264,7 +248,7 @@ class MainView(standard.MainWindow):
         self.new_bare_repository_action.setIcon(icons.new())
 
         prefs_func = partial(
-            prefs_widget.preferences, context, parent=self, model=prefs_model
+            _lazy('prefs', 'preferences'), context, parent=self, model=prefs_model
         )
         self.preferences_action = qtutils.add_action(
             self, N_('Preferences'), prefs_func, QtGui.QKeySequence.Preferences
@@ -272,7 +256,9 @@ class MainView(standard.MainWindow):
         self.preferences_action.setIcon(icons.configure())
 
         self.edit_remotes_action = qtutils.add_action(
-            self, N_('Edit Remotes...'), partial(editremotes.editor, context)
+            self,
+            N_('Edit Remotes...'),
+            partial(_lazy('editremotes', 'editor'), context),
         )
         self.edit_remotes_action.setIcon(icons.edit())
 
@@ -287,7 +273,7 @@ class MainView(standard.MainWindow):
         self.find_files_action = qtutils.add_action(
             self,
             N_('Find Files'),
-            partial(finder.finder, context),
+            partial(_lazy('finder', 'finder'), context),
             hotkeys.FINDER,
         )
         self.find_files_action.setIcon(icons.search())
@@ -295,7 +281,7 @@ class MainView(standard.MainWindow):
         self.browse_recently_modified_action = qtutils.add_action(
             self,
             N_('Recently Modified Files...'),
-            partial(recent.browse_recent_files, context),
+            partial(_lazy('recent', 'browse_recent_files'), context),
             hotkeys.EDIT_SECONDARY,
         )
         self.browse_recently_modified_action.setIcon(icons.directory())
@@ -325,7 +311,9 @@ class MainView(standard.MainWindow):
         )
 
         self.save_tarball_action = qtutils.add_action(
-            self, N_('Save As Tarball/Zip...'), partial(archive.save_archive, context)
+            self,
+            N_('Save As Tarball/Zip...'),
+            partial(_lazy('archive', 'save_archive'), context),
         )
         self.save_tarball_action.setIcon(icons.file_zip())
 
@@ -334,12 +322,15 @@ class MainView(standard.MainWindow):
         )
 
         self.grep_action = qtutils.add_action(
-            self, N_('Grep'), partial(grep.grep, context), hotkeys.GREP
+            self, N_('Grep'), partial(_lazy('grep', 'grep'), context), hotkeys.GREP
         )
         self.grep_action.setIcon(icons.search())
 
         self.merge_local_action = qtutils.add_action(
-            self, N_('Merge...'), partial(merge.local_merge, context), hotkeys.MERGE
+            self,
+            N_('Merge...'),
+            partial(_lazy('merge', 'local_merge'), context),
+            hotkeys.MERGE,
         )
         self.merge_local_action.setIcon(icons.merge())
 
@@ -366,7 +357,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Fetch...'),
             N_('Fetch from one or more remotes using "git fetch"'),
-            partial(remote.fetch, context),
+            partial(_lazy('remote', 'fetch'), context),
             hotkeys.FETCH,
         )
         self.fetch_action.setIcon(icons.download())
@@ -375,7 +366,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Push...'),
             N_('Push to one or more remotes using "git push"'),
-            partial(remote.push, context),
+            partial(_lazy('remote', 'push'), context),
             hotkeys.PUSH,
         )
         self.push_action.setIcon(icons.push())
@@ -384,7 +375,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Pull...'),
             N_('Integrate changes using "git pull"'),
-            partial(remote.pull, context),
+            partial(_lazy('remote', 'pull'), context),
             hotkeys.PULL,
         )
         self.pull_action.setIcon(icons.pull())
@@ -405,7 +396,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Stash...'),
             N_('Temporarily stash away uncommitted changes using "git stash"'),
-            partial(stash.view, context),
+            partial(_lazy('stash', 'view'), context),
             hotkeys.STASH,
         )
         self.stash_action.setIcon(icons.commit())
@@ -459,7 +450,7 @@ class MainView(standard.MainWindow):
         self.restore_worktree_action.setIcon(icons.edit())
 
         self.clone_repo_action = qtutils.add_action(
-            self, N_('Clone...'), partial(clone.clone, context)
+            self, N_('Clone...'), partial(_lazy('clone', 'clone'), context)
         )
         self.clone_repo_action.setIcon(icons.repo())
 
@@ -471,7 +462,10 @@ class MainView(standard.MainWindow):
         )
 
         self.help_shortcuts_action = qtutils.add_action(
-            self, N_('Keyboard Shortcuts'), about.show_shortcuts, hotkeys.QUESTION
+            self,
+            N_('Keyboard Shortcuts'),
+            _lazy('about', 'show_shortcuts'),
+            hotkeys.QUESTION,
         )
 
         self.visualize_current_action = qtutils.add_action(
@@ -487,7 +481,7 @@ class MainView(standard.MainWindow):
         self.visualize_all_action.setIcon(icons.visualize())
 
         self.search_commits_action = qtutils.add_action(
-            self, N_('Search...'), partial(search.search, context)
+            self, N_('Search...'), partial(_lazy('search', 'search'), context)
         )
         self.search_commits_action.setIcon(icons.search())
 
@@ -511,7 +505,13 @@ class MainView(standard.MainWindow):
         self.load_commitmsg_template_action.setIcon(icons.style_dialog_apply())
 
         self.help_about_action = qtutils.add_action(
-            self, N_('About'), partial(about.about_dialog, context)
+            self, N_('About'), partial(_lazy('about', 'about_dialog'), context)
+        )
+
+        self.git_profile_action = qtutils.add_action(
+            self,
+            N_('Git Command Profile...'),
+            partial(_lazy('gitprofile', 'show_git_profile'), context, parent=self),
         )
 
         self.diff_against_commit_action = qtutils.add_action(
@@ -532,21 +532,23 @@ class MainView(standard.MainWindow):
         self.diff_expression_action.setIcon(icons.compare())
 
         self.branch_compare_action = qtutils.add_action(
-            self, N_('Branches...'), partial(compare.compare_branches, context)
+            self,
+            N_('Branches...'),
+            partial(_lazy('compare', 'compare_branches'), context),
         )
         self.branch_compare_action.setIcon(icons.compare())
 
         self.create_tag_action = qtutils.add_action(
             self,
             N_('Create Tag...'),
-            partial(createtag.create_tag, context),
+            partial(_lazy('createtag', 'create_tag'), context),
         )
         self.create_tag_action.setIcon(icons.tag())
 
         self.create_branch_action = qtutils.add_action(
             self,
             N_('Create...'),
-            partial(createbranch.create_new_branch, context),
+            partial(_lazy('createbranch', 'create_new_branch'), context),
             hotkeys.BRANCH,
         )
         self.create_branch_action.setIcon(icons.branch())
@@ -743,8 +745,6 @@ class MainView(standard.MainWindow):
             editor.summary,
             editor.description,
             self.diffeditor,
-            self.bookmarkswidget.tree,
-            self.recentwidget.tree,
             self.statuswidget.tree,
         )
         select_widgets = copy_widgets + (self.statuswidget.tree,)
@@ -886,6 +886,10 @@ class MainView(standard.MainWindow):
         self.help_menu.addAction(self.help_docs_action)
         self.help_menu.addAction(self.help_shortcuts_action)
         self.help_menu.addAction(self.help_about_action)
+        # The profile is only recorded when GIT_COLA_TRACE is set.
+        if gitprofile.enabled():
+            self.help_menu.addSeparator()
+            self.help_menu.addAction(self.git_profile_action)
 
         # Arrange dock widgets
         bottom = Qt.BottomDockWidgetArea
@@ -956,12 +960,21 @@ class MainView(standard.MainWindow):
         QtCore.QTimer.singleShot(0, self.initialize)
 
     def initialize(self):
-        context = self.context
-        git_version = version.git_version_str(context)
+        """Check the git version in the background to avoid delaying the first paint"""
+        task = qtutils.SimpleTask(self.get_versions)
+        self.context.runtask.start(task, result=self.check_versions)
+
+    def get_versions(self):
+        """Return the git and git-cola versions"""
+        return version.git_version_str(self.context), version.version()
+
+    def check_versions(self, versions):
+        """Log the versions and exit when git is unavailable"""
+        git_version, cola_version = versions
         if git_version:
             ok = True
             Interaction.log(
-                git_version + '\n' + N_('git cola version %s') % version.version()
+                git_version + '\n' + N_('git cola version %s') % cola_version
             )
         else:
             ok = False
@@ -1176,7 +1189,8 @@ class MainView(standard.MainWindow):
         self.refresh_window_title()
         self.commitdock.setToolTip(msg)
 
-        self.actionswidget.set_mode(self.mode)
+        if self.actionswidget is not None:
+            self.actionswidget.set_mode(self.mode)
         self.commiteditor.set_mode(self.mode)
         self.statuswidget.set_mode(self.mode)
 
@@ -1304,8 +1318,7 @@ class MainView(standard.MainWindow):
 
             def showdock(show, dockwidget=dockwidget):
                 if show:
-                    dockwidget.raise_()
-                    dockwidget.widget().setFocus()
+                    show_dock(dockwidget)
                 else:
                     self.setFocus()
 
@@ -1344,7 +1357,36 @@ class MainView(standard.MainWindow):
             hotkeys.FOCUS_DIFF,
         )
 
+    def create_actions(self, dock):
+        """Create the "Actions" widget when its dock is first shown"""
+        from . import action
+
+        self.actionswidget = action.ActionButtons(self.context, dock)
+        self.actionswidget.set_mode(self.mode)
+        return self.actionswidget
+
+    def create_bookmarks(self, dock):
+        """Create the "Favorites" widget when its dock is first shown"""
+        self.bookmarkswidget = bookmarks.bookmark(self.context, dock)
+        self._init_bookmarks_widget(self.bookmarkswidget, self.recentwidget)
+        return self.bookmarkswidget
+
+    def create_recent(self, dock):
+        """Create the "Recent" widget when its dock is first shown"""
+        self.recentwidget = bookmarks.recent(self.context, dock)
+        self._init_bookmarks_widget(self.recentwidget, self.bookmarkswidget)
+        return self.recentwidget
+
+    def _init_bookmarks_widget(self, widget, other):
+        """Connect a "Favorites" or "Recent" widget to the rest of the window"""
+        if other is not None:
+            widget.connect_to(other)
+        self.edit_proxy.add('copy', widget.tree)
+        self.edit_proxy.add('selectAll', widget.tree)
+
     def git_dag(self):
+        from . import dag
+
         self.dag = dag.git_dag(self.context, existing_view=self.dag)
 
     # Qt overrides
@@ -1354,8 +1396,15 @@ class MainView(standard.MainWindow):
         self.statuswidget.setFont(font)
         self.branchwidget.setFont(font)
         self.submoduleswidget.setFont(font)
-        self.recentwidget.setFont(font)
-        self.bookmarkswidget.setFont(font)
+        if self.recentwidget is not None:
+            self.recentwidget.setFont(font)
+        if self.bookmarkswidget is not None:
+            self.bookmarkswidget.setFont(font)
+
+
+def _lazy(module, name):
+    """Import a widget module when one of its actions is first triggered"""
+    return utils.lazy_function(f'{__package__}.{module}', name)
 
 
 class FocusProxy:
@@ -1368,6 +1417,10 @@ class FocusProxy:
     def override(self, name, widgets):
         self.overrides[name] = widgets
 
+    def add(self, name, widget):
+        """Add a widget to an override, e.g. for widgets that are created later"""
+        self.overrides[name] = self.overrides.get(name, self.widgets) + (widget,)
+
     def focus(self, name):
         """Return the currently focused widget"""
         widgets = self.overrides.get(name, self.widgets)
@@ -1405,7 +1458,9 @@ class FocusProxy:
 
 def show_dock(dockwidget):
     dockwidget.raise_()
-    dockwidget.widget().setFocus()
+    widget = dockwidget.widget()
+    if widget is not None:
+        widget.setFocus()
 
 
 def focus_dock(dockwidget):
@@ -110,6 +110,12 @@ class ActionTask(qtutils.Task):
         return self.model_action(self.remote, **self.kwargs)
 
 
+def _log_push_result(remote, result):
+    """Log the status of a push as soon as it finishes"""
+    command = f'git push {remote}'
+    Interaction.log(Interaction.format_command_status(command, result[0]))
+
+
 def _emit_push_notification(
     context, allow_popups, selected_remotes, pushed_remotes, unpushed_remotes
 ):
@@ -741,16 +747,22 @@ class RemoteActionDialog(standard.Dialog):
 
     # Actions
 
-    def push_to_all(self, _remote, *args, **kwargs):
+    def push_to_all(self, _remote, **kwargs):
         """Push to all selected remotes"""
         selected_remotes = self.selected_remotes
+        results = self.model.push_all(
+            selected_remotes,
+            jobs=prefs.push_jobs(self.context),
+            callback=_log_push_result,
+            **kwargs,
+        )
         all_results = None
 
         pushed_remotes = []
         unpushed_remotes = []
 
         for remote in selected_remotes:
-            result = self.model.push(remote, *args, **kwargs)
+            result = results[remote]
 
             if result[0] == 0:
                 pushed_remotes.append(remote)
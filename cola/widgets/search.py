@@ -1,16 +1,19 @@
 """A widget for searching git commits"""
+import contextlib
+import threading
 import time
 
 from qtpy import QtCore
 from qtpy import QtWidgets
 from qtpy.QtCore import Qt
+from qtpy.QtCore import Signal
 
+from .. import commitindex
 from .. import core
 from .. import gitcmds
 from .. import icons
 from .. import qtutils
 from .. import utils
-from ..git import STDOUT
 from ..i18n import N_
 from ..interaction import Interaction
 from ..qtutils import connect_button
@@ -61,6 +64,7 @@ class SearchWidget(standard.Dialog):
             text=N_('Search'), icon=icon, default=True
         )
         self.max_count = standard.SpinBox(value=500, mini=5, maxi=9995, step=5)
+        self.max_count.setToolTip(N_('Number of results to load at a time'))
 
         self.commit_list = QtWidgets.QListWidget()
         self.commit_list.setMinimumSize(QtCore.QSize(10, 10))
@@ -77,7 +81,12 @@ class SearchWidget(standard.Dialog):
         self.button_cherrypick = qtutils.create_button(
             text=N_('Cherry Pick'), icon=icons.cherry_pick()
         )
+        self.button_stop = qtutils.create_button(
+            text=N_('Stop'), icon=icons.close(), tooltip=N_('Stop searching')
+        )
+        self.button_stop.hide()
         self.button_close = qtutils.close_button()
+        self.status = QtWidgets.QLabel()
 
         self.top_layout = qtutils.hbox(
             defs.no_margin,
@@ -99,6 +108,8 @@ class SearchWidget(standard.Dialog):
         self.bottom_layout = qtutils.hbox(
             defs.no_margin,
             defs.spacing,
+            self.status,
+            self.button_stop,
             qtutils.STRETCH,
             self.button_close,
             self.button_export,
@@ -123,15 +134,18 @@ def search(context):
 
 
 class SearchEngine:
+    """Find commits and yield the results in batches as they are found"""
+
     def __init__(self, context, model):
         self.context = context
         self.model = model
+        self.stream = None
+        self.cancelled = False
 
     def rev_args(self):
-        max_count = self.model.max_count
         return {
             'no_color': True,
-            'max-count': max_count,
+            'z': True,
             'pretty': 'format:%H %aN - %s - %ar',
         }
 
@@ -139,72 +153,206 @@ class SearchEngine:
         return (self.model.query, self.rev_args())
 
     def search(self):
-        if self.validate():
-            return self.results()
-        return []
+        """Return the first max_count results"""
+        results = []
+        if not self.validate():
+            return results
+        max_count = self.model.max_count
+        with contextlib.closing(self.batches()) as batches:
+            for batch in batches:
+                results.extend(batch)
+                if len(results) >= max_count:
+                    break
+        return results[:max_count]
 
     def validate(self):
         return len(self.model.query) > 1
 
+    def cancel(self):
+        """Stop searching. This can be called from any thread."""
+        self.cancelled = True
+        stream = self.stream
+        if stream is not None:
+            stream.cancel()
+
     def revisions(self, *args, **kwargs):
+        """Yield the results from "git log" as it finds them"""
         git = self.context.git
-        revlist = git.log(*args, **kwargs)[STDOUT]
-        return gitcmds.parse_rev_list(revlist)
-
-    def results(self):
-        pass
+        self.stream = stream = git.stream(
+            'log', *args, _separator='\0', _readonly=True, **kwargs
+        )
+        with stream:
+            while not self.cancelled:
+                records = stream.read()
+                if records is None:
+                    break
+                results = gitcmds.parse_rev_list('\n'.join(records))
+                if results:
+                    yield results
+
+    def commit_index(self):
+        """Return the commit index after synchronizing it with the refs"""
+        index = commitindex.commit_index(self.context)
+        index.update()
+        return index
+
+    def batches(self):
+        """Yield lists of (oid, summary) results"""
+        return iter(())
 
 
 class RevisionSearch(SearchEngine):
-    def results(self):
+    def batches(self):
         query, opts = self.common_args()
         args = utils.shell_split(query)
         return self.revisions(*args, **opts)
 
 
 class PathSearch(SearchEngine):
-    def results(self):
+    def batches(self):
         query, args = self.common_args()
         paths = ['--'] + utils.shell_split(query)
         return self.revisions(all=True, *paths, **args)
 
 
-class MessageSearch(SearchEngine):
-    def results(self):
+class DiffSearch(SearchEngine):
+    def batches(self):
         query, kwargs = self.common_args()
-        return self.revisions(all=True, grep=query, **kwargs)
+        return self.revisions('-S' + query, all=True, **kwargs)
 
 
-class AuthorSearch(SearchEngine):
-    def results(self):
-        query, kwargs = self.common_args()
-        return self.revisions(all=True, author=query, **kwargs)
+class IndexSearch(SearchEngine):
+    """Search the commit index one page of max_count results at a time"""
 
+    def batches(self):
+        index = self.commit_index()
+        max_count = self.model.max_count
+        skip = 0
+        while not self.cancelled:
+            results = self.page(index, skip)
+            if results:
+                yield results
+            if len(results) < max_count:
+                break
+            skip += len(results)
+
+    def page(self, index, skip):
+        """Return a page of results from the commit index"""
+        return []
 
-class CommitterSearch(SearchEngine):
-    def results(self):
-        query, kwargs = self.common_args()
-        return self.revisions(all=True, committer=query, **kwargs)
 
+class MessageSearch(IndexSearch):
+    def page(self, index, skip):
+        return index.grep(self.model.query, self.model.max_count, skip=skip)
 
-class DiffSearch(SearchEngine):
-    def results(self):
-        git = self.context.git
-        query, kwargs = self.common_args()
-        return gitcmds.parse_rev_list(git.log('-S' + query, all=True, **kwargs)[STDOUT])
 
+class AuthorSearch(IndexSearch):
+    def page(self, index, skip):
+        return index.author(self.model.query, self.model.max_count, skip=skip)
+
+
+class CommitterSearch(IndexSearch):
+    def page(self, index, skip):
+        return index.committer(self.model.query, self.model.max_count, skip=skip)
+
+
+class DateRangeSearch(IndexSearch):
+    def __init__(self, context, model):
+        IndexSearch.__init__(self, context, model)
+        self.limits = None
 
-class DateRangeSearch(SearchEngine):
     def validate(self):
         return self.model.start_date < self.model.end_date
 
-    def results(self):
-        kwargs = self.rev_args()
-        start_date = self.model.start_date
-        end_date = self.model.end_date
-        return self.revisions(
-            date='iso', all=True, after=start_date, before=end_date, **kwargs
-        )
+    def page(self, index, skip):
+        if self.limits is None:
+            start_date = self.model.start_date
+            end_date = self.model.end_date
+            self.limits = commitindex.date_limits(self.context, start_date, end_date)
+            if self.limits is None:
+                return []
+        start, end = self.limits
+        return index.date_range(start, end, self.model.max_count, skip=skip)
+
+
+class SearchRun:
+    """The results of a search that are loaded one page at a time
+
+    Pages are loaded by SearchTask in the background. The engine's batches
+    are consumed incrementally so that the next page continues from where
+    the previous page stopped, e.g. without running "git log" again.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.leftover = []
+        self.count = 0
+        self.exhausted = False
+        self.cancelled = False
+        if engine.validate():
+            self.batches = engine.batches()
+        else:
+            self.batches = iter(())
+
+    def next_batch(self, limit):
+        """Return the next batch of at most "limit" results, or None when done"""
+        if self.cancelled:
+            return None
+        batch = self.leftover
+        if not batch:
+            batch = next(self.batches, None)
+            if batch is None:
+                self.exhausted = True
+                return None
+        self.leftover = batch[limit:]
+        return batch[:limit]
+
+    def cancel(self):
+        """Stop the search. This can be called from any thread."""
+        self.cancelled = True
+        self.engine.cancel()
+        # A page that is being loaded closes the search when it notices.
+        if self.lock.acquire(blocking=False):
+            try:
+                self.close()
+            finally:
+                self.lock.release()
+
+    def close(self):
+        """Release the resources used by the search, e.g. a running git command"""
+        close = getattr(self.batches, 'close', None)
+        if close is not None:
+            close()
+
+
+class SearchChannel(qtutils.Channel):
+    found = Signal(object, object)
+
+
+class SearchTask(qtutils.Task):
+    """Load the next page of a search in the background"""
+
+    def __init__(self, run, max_count):
+        qtutils.Task.__init__(self)
+        self.channel = SearchChannel()
+        self.run = run
+        self.max_count = max_count
+
+    def task(self):
+        run = self.run
+        count = 0
+        with run.lock:
+            while count < self.max_count:
+                batch = run.next_batch(self.max_count - count)
+                if batch is None:
+                    break
+                count += len(batch)
+                run.count += len(batch)
+                self.channel.found.emit(run, batch)
+            if run.cancelled or run.exhausted:
+                run.close()
+        return count
 
 
 class Search(SearchWidget):
@@ -226,6 +374,11 @@ class Search(SearchWidget):
         self.COMMITTER = N_('Search Committers')
         self.DATE_RANGE = N_('Search Date Range')
         self.results = []
+        self.search_run = None
+        self.task = None
+        # Cancelled tasks are kept alive until they finish.
+        self.tasks = set()
+        self.threadpool = QtCore.QThreadPool.globalInstance()
 
         # Each search type is handled by a distinct SearchEngine subclass
         self.engines = {
@@ -253,10 +406,14 @@ class Search(SearchWidget):
         connect_button(self.browse_button, self.browse_callback)
         connect_button(self.button_export, self.export_patch)
         connect_button(self.button_cherrypick, self.cherry_pick)
+        connect_button(self.button_stop, self.cancel_search)
         connect_button(self.button_close, self.accept)
 
         self.mode_combo.currentIndexChanged.connect(self.mode_changed)
+        self.query.textChanged.connect(self.cancel_search)
         self.commit_list.itemSelectionChanged.connect(self.display)
+        scrollbar = self.commit_list.verticalScrollBar()
+        scrollbar.valueChanged.connect(lambda _value: self.fetch_more())
 
         self.set_start_date(mkdate(time.time() - (87640 * 31)))
         self.set_end_date(mkdate(time.time() + 87640))
@@ -265,16 +422,12 @@ class Search(SearchWidget):
         self.query.setFocus()
 
     def mode_changed(self, _idx):
+        self.cancel_search()
         mode = self.mode()
         self.update_shown_widgets(mode)
         if mode == self.PATH:
             self.browse_callback()
 
-    def set_commits(self, commits):
-        widget = self.commit_list
-        widget.clear()
-        widget.addItems(commits)
-
     def set_start_date(self, datestr):
         set_date(self.start_date, datestr)
 
@@ -298,6 +451,7 @@ class Search(SearchWidget):
         return self.mode_combo.currentText()
 
     def search_callback(self, *args):
+        self.cancel_search()
         engineclass = self.engines[self.mode()]
         self.model.query = get(self.query)
         self.model.max_count = get(self.max_count)
@@ -305,12 +459,76 @@ class Search(SearchWidget):
         self.model.start_date = get(self.start_date)
         self.model.end_date = get(self.end_date)
 
-        self.results = engineclass(self.context, self.model).search()
-        if self.results:
-            self.display_results()
+        engine = engineclass(self.context, self.model)
+        self.search_run = SearchRun(engine)
+        self.results = []
+        self.commit_list.clear()
+        self.commit_text.setText('')
+        self.fetch_more(force=True)
+
+    def fetch_more(self, force=False):
+        """Load the next page of results when the end of the list is visible"""
+        run = self.search_run
+        if run is None or self.task is not None or run.exhausted:
+            return
+        if not force:
+            scrollbar = self.commit_list.verticalScrollBar()
+            if scrollbar.value() < scrollbar.maximum() - scrollbar.pageStep():
+                return
+        task = SearchTask(run, self.model.max_count)
+        task.channel.found.connect(self.add_results, type=Qt.QueuedConnection)
+        task.channel.finished.connect(self.finish_task, type=Qt.QueuedConnection)
+        self.task = task
+        self.tasks.add(task)
+        self.button_stop.show()
+        self.update_status()
+        self.threadpool.start(task)
+
+    def add_results(self, run, results):
+        """Display results unless the search has changed"""
+        if run is not self.search_run:
+            return
+        self.results.extend(results)
+        qtutils.add_items(self.commit_list, [result[1] for result in results])
+        self.update_status()
+
+    def finish_task(self, task):
+        """Load more results if the list still has room for them"""
+        self.tasks.discard(task)
+        if task is not self.task:
+            return
+        self.task = None
+        self.button_stop.hide()
+        self.update_status()
+        self.fetch_more()
+
+    def cancel_search(self, *args):
+        """Stop the running search and keep the results found so far"""
+        run = self.search_run
+        if run is None:
+            return
+        self.search_run = None
+        self.task = None
+        run.cancel()
+        self.button_stop.hide()
+        self.update_status()
+
+    def update_status(self):
+        """Report the progress of the search"""
+        run = self.search_run
+        count = len(self.results)
+        if run is None and not count:
+            text = ''
+        elif self.task is not None:
+            text = N_('Searching... %d commits found') % count
+        elif run is not None and not run.exhausted:
+            text = N_('%d commits found, scroll down for more') % count
         else:
-            self.commit_list.clear()
-            self.commit_text.setText('')
+            text = N_('%d commits found') % count
+        self.status.setText(text)
+
+    def dispose(self):
+        self.cancel_search()
 
     def browse_callback(self):
         paths = qtutils.open_files(N_('Choose Paths'))
@@ -331,10 +549,6 @@ class Search(SearchWidget):
         if query:
             self.search_callback()
 
-    def display_results(self):
-        commits = [result[1] for result in self.results]
-        self.set_commits(commits)
-
     def selected_revision(self):
         result = qtutils.selected_item(self.commit_list, self.results)
         return result[0] if result else None
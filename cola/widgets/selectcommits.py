@@ -1,5 +1,6 @@
 """A GUI for selecting commits"""
 
+from qtpy import QtCore
 from qtpy import QtWidgets
 from qtpy.QtCore import Qt
 
@@ -15,17 +16,15 @@ from .diff import DiffTextEdit
 from .standard import Dialog
 
 
-def select_commits(context, title, revs, summaries, multiselect=True):
-    """Use the SelectCommits to select commits from a list."""
-    model = Model(revs, summaries)
+def select_commits(context, title, model, multiselect=True):
+    """Use the SelectCommits to select commits from a log model."""
     parent = qtutils.active_window()
     dialog = SelectCommits(context, model, parent, title, multiselect=multiselect)
     return dialog.select_commits()
 
 
-def select_commits_and_output(context, title, revs, summaries, multiselect=True):
-    """Select commits from a list and output path"""
-    model = Model(revs, summaries)
+def select_commits_and_output(context, title, model, multiselect=True):
+    """Select commits from a log model and output path"""
     parent = qtutils.active_window()
     dialog = SelectCommitsAndOutput(
         context, model, parent, title, multiselect=multiselect
@@ -34,9 +33,98 @@ def select_commits_and_output(context, title, revs, summaries, multiselect=True)
 
 
 class Model:
-    def __init__(self, revs, summaries):
-        self.revisions = revs
-        self.summaries = summaries
+    """Commits from "git log" that are loaded one page at a time
+
+    Searches are performed by "git log --grep" and "git log -S" so that
+    searching does not require loading the whole history.
+    """
+
+    SEARCH_MESSAGE = 0
+    SEARCH_CHANGES = 1
+
+    page_size = 500
+
+    def __init__(self, context, all=False, extra_args=None):
+        self.context = context
+        self.all = all
+        self.extra_args = extra_args
+        self.search = ''
+        self.search_mode = self.SEARCH_MESSAGE
+        self.revisions = []
+        self.summaries = []
+        self.exhausted = False
+
+    def set_search(self, search, search_mode):
+        """Restart the log with a new search"""
+        self.search = search
+        self.search_mode = search_mode
+        self.revisions = []
+        self.summaries = []
+        self.exhausted = False
+
+    def fetch(self, skip, search='', search_mode=SEARCH_MESSAGE):
+        """Return the (revisions, summaries) for a page of the log"""
+        grep = None
+        pickaxe = None
+        if search_mode == self.SEARCH_CHANGES:
+            pickaxe = search
+        else:
+            grep = search
+        return gitcmds.log_helper(
+            self.context,
+            all=self.all,
+            extra_args=self.extra_args,
+            skip=skip,
+            max_count=self.page_size,
+            grep=grep,
+            pickaxe=pickaxe,
+        )
+
+    def fetch_more(self):
+        """Load the next page of the log"""
+        skip = len(self.revisions)
+        self.add_page(self.fetch(skip, self.search, self.search_mode))
+
+    def add_page(self, page):
+        """Add a page of (revisions, summaries) to the loaded commits"""
+        revs, summaries = page
+        self.revisions.extend(revs)
+        self.summaries.extend(summaries)
+        if len(revs) < self.page_size:
+            self.exhausted = True
+
+    def history(self, oids):
+        """Return the log without the search up to the last of the oids"""
+        wanted = set(oids)
+        if self.search:
+            revisions = []
+        else:
+            # The loaded pages are the start of the log so only the rest is fetched.
+            revisions = list(self.revisions)
+            wanted.difference_update(revisions)
+            if self.exhausted:
+                return revisions
+        while wanted:
+            revs, _ = self.fetch(len(revisions))
+            revisions.extend(revs)
+            wanted.difference_update(revs)
+            if len(revs) < self.page_size:
+                break
+        return revisions
+
+
+class LogPageTask(qtutils.Task):
+    """Load the next page of a log model in the background"""
+
+    def __init__(self, model):
+        qtutils.Task.__init__(self)
+        self.model = model
+        self.skip = len(model.revisions)
+        self.search = model.search
+        self.search_mode = model.search_mode
+
+    def task(self):
+        return self.model.fetch(self.skip, self.search, self.search_mode)
 
 
 class SelectCommits(Dialog):
@@ -66,7 +154,22 @@ class SelectCommits(Dialog):
         self.search_label.setText(N_('Search:'))
         self.search = QtWidgets.QLineEdit()
         self.search.setReadOnly(False)
-        self.search.textChanged.connect(self.search_list)
+        self.search_mode = qtutils.combo(
+            [N_('Commit Message'), N_('Changes')], parent=self
+        )
+        self.search_mode.setToolTip(
+            N_('Search commit messages (git log --grep) or changes (git log -S)')
+        )
+        # Searches run "git log" so they are deferred until typing pauses.
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.search_log)
+        self.search.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_mode.currentIndexChanged.connect(lambda _: self.search_log())
+        # Pages are loaded one at a time. A new search replaces the pending page.
+        self.page_loader = qtutils.LatestTaskRunner(context, parent=self)
+        self.fetching = False
 
         self.select_button = qtutils.ok_button(N_('Select'), enabled=False)
 
@@ -79,6 +182,7 @@ class SelectCommits(Dialog):
             defs.spacing,
             self.search_label,
             self.search,
+            self.search_mode,
             qtutils.STRETCH,
             self.revision_label,
             self.revision,
@@ -91,6 +195,10 @@ class SelectCommits(Dialog):
         self.setLayout(self.main_layout)
 
         commits.itemSelectionChanged.connect(self.commit_oid_selected)
+        # More commits are loaded when scrolling near the end of the list.
+        scrollbar = commits.verticalScrollBar()
+        scrollbar.valueChanged.connect(lambda _: self.fetch_more())
+        scrollbar.rangeChanged.connect(lambda _min, _max: self.fetch_more())
         commits.itemDoubleClicked.connect(self.commit_oid_double_clicked)
 
         qtutils.connect_button(self.select_button, self.accept)
@@ -109,6 +217,7 @@ class SelectCommits(Dialog):
         return qtutils.selected_items(self.commits, self.model.revisions)
 
     def select_commits(self):
+        self.model.fetch_more()
         summaries = self.model.summaries
         if not summaries:
             msg = N_('No commits exist in this branch.')
@@ -140,13 +249,32 @@ class SelectCommits(Dialog):
         if oid:
             self.accept()
 
-    def search_list(self, text):
-        if text:
-            for i in range(self.commits.count()):
-                self.commits.item(i).setHidden(True)
-        search_items = self.commits.findItems(text, Qt.MatchContains)
-        for items in search_items:
-            items.setHidden(False)
+    def search_log(self):
+        """Search the log for commits matching the search text"""
+        self.search_timer.stop()
+        self.page_loader.cancel()
+        self.model.set_search(self.search.text(), self.search_mode.currentIndex())
+        self.fetching = False
+        self.commits.clear()
+        self.fetch_more()
+
+    def fetch_more(self):
+        """Load more commits when the end of the list is visible"""
+        model = self.model
+        if self.fetching or model.exhausted:
+            return
+        scrollbar = self.commits.verticalScrollBar()
+        if scrollbar.value() < scrollbar.maximum() - scrollbar.pageStep():
+            return
+        self.fetching = True
+        self.page_loader.submit(LogPageTask(model), self.add_page)
+
+    def add_page(self, page):
+        """Display a page of commits for the current search"""
+        self.fetching = False
+        self.model.add_page(page)
+        qtutils.add_items(self.commits, page[1])
+        self.fetch_more()
 
 
 class SelectCommitsAndOutput(SelectCommits):
@@ -171,8 +299,12 @@ class SelectCommitsAndOutput(SelectCommits):
     def select_commits_and_output(self):
         to_export = SelectCommits.select_commits(self)
         output = self.output_dir
+        if to_export:
+            revs = self.model.history(to_export)
+        else:
+            revs = []
 
-        return {'to_export': to_export, 'output': output}
+        return {'to_export': to_export, 'output': output, 'revs': revs}
 
     def show_output_dialog(self):
         self.output_dir = qtutils.opendir_dialog(
@@ -4,6 +4,7 @@ from qtpy import QtCore
 from qtpy import QtGui
 from qtpy import QtWidgets
 from qtpy.QtCore import Qt
+from qtpy.QtCore import Signal
 
 from .. import cmds
 from .. import display
@@ -15,6 +16,7 @@ from .. import utils
 from .. import version
 from ..i18n import N_
 from ..models import prefs
+from . import bookmarks
 from . import clone
 from . import defs
 from . import standard
@@ -26,6 +28,8 @@ LIST_MODE = 1
 class StartupDialog(standard.Dialog):
     """Provides a GUI to Open or Clone a git repository."""
 
+    repo_checked = Signal(object, object)
+
     def __init__(self, context, parent=None):
         standard.Dialog.__init__(self, parent)
         self.context = context
@@ -134,10 +138,14 @@ class StartupDialog(standard.Dialog):
 
         qtutils.connect_button(self.remove_button, self.remove_selected)
         self.bookmarks.selectionModel().selectionChanged.connect(self.selection_changed)
+        self.repo_checked.connect(self.set_repo_state, type=Qt.QueuedConnection)
 
         self.init_state(settings, self.resize_widget)
         self.setFocusProxy(self.bookmarks)
         self.bookmarks.setFocus()
+        # Entries are displayed immediately and are checked in the background
+        # so that unresponsive network mounts do not delay the dialog.
+        self.check_repos()
 
         # Update the list mode
         list_mode = context.cfg.get('cola.startupmode', default='folder')
@@ -297,6 +305,28 @@ class StartupDialog(standard.Dialog):
         for item in items:
             bookmarks_model.appendRow(item)
             new_items.append(item)
+        self.check_repos()
+
+    def check_repos(self):
+        """Display the last known state of each repository and check them again"""
+        checker = self.context.settings.checker
+        with qtutils.BlockSignals(self.bookmarks_model):
+            for item in self.items:
+                bookmarks.set_repo_state(item, checker.state(item.path))
+        checker.check([item.path for item in self.items], self._repo_checked)
+
+    def _repo_checked(self, path, state):
+        """Forward the result of a repository check from a background thread"""
+        utils.catch_runtime_error(self.repo_checked.emit, path, state)
+
+    def set_repo_state(self, path, state):
+        """Display the state of a repository once it has been checked"""
+        # Signals are blocked so that the changes are not treated as renames.
+        with qtutils.BlockSignals(self.bookmarks_model):
+            for item in self.items:
+                if item.path == path:
+                    bookmarks.set_repo_state(item, state)
+        self.bookmarks.viewport().update()
 
 
 def get_all_repos(context, settings):
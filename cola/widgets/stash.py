@@ -33,6 +33,9 @@ class StashView(standard.Dialog):
         self.stashes = []
         self.revids = []
         self.names = []
+        self.oids = []
+        # Only the diff for the latest selection is loaded in the background.
+        self.diff_loader = qtutils.LatestTaskRunner(context, parent=self)
 
         self.setWindowTitle(N_('Stash'))
         if parent is not None:
@@ -196,13 +199,28 @@ class StashView(standard.Dialog):
         stash_list = self.names
         return qtutils.selected_item(list_widget, stash_list)
 
+    def selected_oid(self):
+        """Returns the commit object ID of the currently selected stash"""
+        return qtutils.selected_item(self.stash_list, self.oids)
+
     def item_selected(self):
         """Shows the current stash in the main view."""
         self.update_actions()
+        self.diff_loader.cancel()
         selection = self.selected_stash()
         if not selection:
             return
-        diff_text = self.model.stash_diff(selection)
+        oid = self.selected_oid()
+        # Stash diffs are immutable. Display cached diffs immediately.
+        diff_text = self.model.cached_stash_diff(oid)
+        if diff_text is not None:
+            self.set_diff(diff_text)
+            return
+        task = StashDiffTask(self.model, selection, oid)
+        self.diff_loader.submit(task, self.set_diff)
+
+    def set_diff(self, diff_text):
+        """Display the diff for the selected stash"""
         self.stash_text.setPlainText(diff_text)
 
     def update_actions(self):
@@ -225,10 +243,11 @@ class StashView(standard.Dialog):
 
     def update_from_model(self):
         """Initiates git queries on the model and updates the view"""
-        stashes, revids, author_dates, names = self.model.stash_info()
+        stashes, revids, author_dates, names, oids = self.model.stash_info()
         self.stashes = stashes
         self.revids = revids
         self.names = names
+        self.oids = oids
 
         displayed = False
         self.stash_list.clear()
@@ -356,6 +375,19 @@ class StashView(standard.Dialog):
         return result
 
 
+class StashDiffTask(qtutils.Task):
+    """Gather the diff for a stash"""
+
+    def __init__(self, model, rev, oid):
+        qtutils.Task.__init__(self)
+        self.model = model
+        self.rev = rev
+        self.oid = oid
+
+    def task(self):
+        return self.model.stash_diff(self.rev, oid=self.oid)
+
+
 def show_help(context):
     help_text = N_(
         """
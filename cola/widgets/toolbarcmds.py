@@ -1,21 +1,9 @@
 from .. import cmds
 from .. import difftool
 from .. import guicmds
-from ..widgets import archive
+from .. import utils
 from ..widgets import browse
-from ..widgets import compare
-from ..widgets import createbranch
-from ..widgets import createtag
-from ..widgets import dag
 from ..widgets import diff
-from ..widgets import editremotes
-from ..widgets import finder
-from ..widgets import grep
-from ..widgets import merge
-from ..widgets import recent
-from ..widgets import remote
-from ..widgets import search
-from ..widgets import stash
 
 COMMANDS = {
     'Others::LaunchEditor': {
@@ -60,17 +48,17 @@ COMMANDS = {
     },
     'File::FindFiles': {
         'title': 'Find Files',
-        'action': finder.finder,
+        'action': utils.lazy_function('cola.widgets.finder', 'finder'),
         'icon': 'zoom_in',
     },
     'File::EditRemotes': {
         'title': 'Edit Remotes...',
-        'action': editremotes.editor,
+        'action': utils.lazy_function('cola.widgets.editremotes', 'editor'),
         'icon': 'edit',
     },
     'File::RecentModified': {
         'title': 'Recently Modified Files...',
-        'action': recent.browse_recent_files,
+        'action': utils.lazy_function('cola.widgets.recent', 'browse_recent_files'),
         'icon': 'edit',
     },
     'File::ApplyPatches': {
@@ -85,7 +73,7 @@ COMMANDS = {
     },
     'File::SaveAsTarZip': {
         'title': 'Save As Tarball/Zip...',
-        'action': archive.save_archive,
+        'action': utils.lazy_function('cola.widgets.archive', 'save_archive'),
         'icon': 'file_zip',
     },
     # 'File::Preferences': {
@@ -93,13 +81,29 @@ COMMANDS = {
     #     'action': prefs.preferences,
     #     'icon': 'configure'
     # },
-    'Actions::Fetch': {'title': 'Fetch...', 'action': remote.fetch, 'icon': 'download'},
-    'Actions::Pull': {'title': 'Pull...', 'action': remote.pull, 'icon': 'pull'},
-    'Actions::Push': {'title': 'Push...', 'action': remote.push, 'icon': 'push'},
-    'Actions::Stash': {'title': 'Stash...', 'action': stash.view, 'icon': 'commit'},
+    'Actions::Fetch': {
+        'title': 'Fetch...',
+        'action': utils.lazy_function('cola.widgets.remote', 'fetch'),
+        'icon': 'download',
+    },
+    'Actions::Pull': {
+        'title': 'Pull...',
+        'action': utils.lazy_function('cola.widgets.remote', 'pull'),
+        'icon': 'pull',
+    },
+    'Actions::Push': {
+        'title': 'Push...',
+        'action': utils.lazy_function('cola.widgets.remote', 'push'),
+        'icon': 'push',
+    },
+    'Actions::Stash': {
+        'title': 'Stash...',
+        'action': utils.lazy_function('cola.widgets.stash', 'view'),
+        'icon': 'commit',
+    },
     'Actions::CreateTag': {
         'title': 'Create Tag...',
-        'action': createtag.create_tag,
+        'action': utils.lazy_function('cola.widgets.createtag', 'create_tag'),
         'icon': 'tag',
     },
     'Actions::CherryPick': {
@@ -109,7 +113,7 @@ COMMANDS = {
     },
     'Actions::Merge': {
         'title': 'Merge...',
-        'action': merge.local_merge,
+        'action': utils.lazy_function('cola.widgets.merge', 'local_merge'),
         'icon': 'merge',
     },
     'Actions::AbortMerge': {
@@ -154,12 +158,12 @@ COMMANDS = {
     },
     'Actions::Grep': {
         'title': 'Grep',
-        'action': grep.grep,
+        'action': utils.lazy_function('cola.widgets.grep', 'grep'),
         'icon': 'search',
     },
     'Actions::Search': {
         'title': 'Search...',
-        'action': search.search,
+        'action': utils.lazy_function('cola.widgets.search', 'search'),
         'icon': 'search',
     },
     'Commit::Stage': {
@@ -219,7 +223,7 @@ COMMANDS = {
     },
     'Diff::Branches': {
         'title': 'Branches...',
-        'action': compare.compare_branches,
+        'action': utils.lazy_function('cola.widgets.compare', 'compare_branches'),
         'icon': 'compare',
     },
     'Diff::Diffstat': {
@@ -234,7 +238,7 @@ COMMANDS = {
     },
     'Branch::Create': {
         'title': 'Create...',
-        'action': createbranch.create_new_branch,
+        'action': utils.lazy_function('cola.widgets.createbranch', 'create_new_branch'),
         'icon': 'branch',
     },
     'Branch::Checkout': {
@@ -282,7 +286,11 @@ COMMANDS = {
         'action': browse.worktree_browser,
         'icon': 'cola',
     },
-    'View::DAG': {'title': 'DAG...', 'action': dag.git_dag, 'icon': 'cola'},
+    'View::DAG': {
+        'title': 'DAG...',
+        'action': utils.lazy_function('cola.widgets.dag', 'git_dag'),
+        'icon': 'cola',
+    },
 }
 #     'Rebase::StartInteractive': {
 #         'title': 'Start Interactive Rebase...',
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Compare the search dialog's "git log" queries against the commit index
+
+Usage: contrib/search-benchmark.py [--commits N] [--repo PATH] [--repeat N]
+
+A synthetic repository with --commits commits is created with
+"git fast-import" unless an existing repository is specified with --repo.
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cola import commitindex
+from cola import core
+from cola import git
+from cola import gitcmds
+from cola import operations
+
+
+NAMES = ('Alice', 'Bob', 'Carol', 'Dave', 'Erin', 'Frank', 'Grace', 'Heidi')
+WORDS = (
+    'fix',
+    'add',
+    'update',
+    'remove',
+    'parser',
+    'widget',
+    'cache',
+    'docs',
+    'tests',
+    'search',
+    'diff',
+    'branch',
+)
+
+
+def fast_import_stream(count):
+    """Generate a "git fast-import" stream with "count" commits"""
+    rng = random.Random(1)
+    timestamp = 1500000000
+    for mark in range(1, count + 1):
+        timestamp += rng.randint(60, 7200)
+        author = rng.choice(NAMES)
+        committer = rng.choice(NAMES)
+        words = ' '.join(rng.choice(WORDS) for _ in range(4))
+        body = '\n'.join(
+            ' '.join(rng.choice(WORDS) for _ in range(8)) for _ in range(3)
+        )
+        message = f'{words} number {mark}\n\n{body}\n'.encode()
+        yield f'commit refs/heads/main\nmark :{mark}\n'.encode()
+        yield f'author {author} <{author.lower()}@example.com> '.encode()
+        yield f'{timestamp} +0000\n'.encode()
+        yield f'committer {committer} <{committer.lower()}@example.com> '.encode()
+        yield f'{timestamp} +0000\n'.encode()
+        yield b'data %d\n%s\n' % (len(message), message)
+        if mark > 1:
+            yield f'from :{mark - 1}\n'.encode()
+        yield b'\n'
+
+
+def create_repo(path, count):
+    """Create a repository with a synthetic history"""
+    subprocess.run(['git', 'init', '--quiet', path], check=True)
+    with subprocess.Popen(
+        ['git', 'fast-import', '--quiet'], cwd=path, stdin=subprocess.PIPE
+    ) as proc:
+        for chunk in fast_import_stream(count):
+            proc.stdin.write(chunk)
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise SystemExit('git fast-import failed')
+
+
+def timed(repeat, func, *args, **kwargs):
+    """Return the result and the best time out of "repeat" calls to func()"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commits', type=int, default=100000)
+    parser.add_argument('--repo', help='use an existing repository')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-count', type=int, default=500)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.repo
+    if not path:
+        tmp_dir = tempfile.mkdtemp(prefix='cola-search-benchmark-')
+        path = os.path.join(tmp_dir, 'repo')
+        print(f'creating {args.commits} commits in {path}')
+        create_repo(path, args.commits)
+    try:
+        with mock.patch.dict(
+            os.environ, {'XDG_CACHE_HOME': tmp_dir or tempfile.gettempdir()}
+        ):
+            benchmark(path, args)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir)
+
+
+def benchmark(path, args):
+    """Time the searches with "git log" and with the commit index"""
+    context = mock.Mock()
+    context.git = git.create(ops=operations.LocalOperations())
+    context.git.set_worktree(core.abspath(path))
+    max_count = args.max_count
+    pretty = 'format:%H %aN - %s - %ar'
+
+    def git_log(**kwargs):
+        out = context.git.log(
+            no_color=True, all=True, max_count=max_count, pretty=pretty, **kwargs
+        )[1]
+        return gitcmds.parse_rev_list(out)
+
+    index = commitindex.CommitIndex(context)
+    if core.exists(index.filename()):
+        core.remove(index.filename())
+    _, elapsed = timed(1, index.update)
+    print(f'build: {len(index)} commits in {elapsed:.3f}s')
+    _, elapsed = timed(1, commitindex.CommitIndex(context).update)
+    print(f'load: {elapsed:.3f}s')
+    _, elapsed = timed(args.repeat, index.update)
+    print(f'update (refs unchanged): {elapsed:.4f}s')
+    print()
+
+    after, before = '2017-09-01', '2017-10-01'
+    queries = [
+        ('grep', 'parser'),
+        ('grep', 'number 1\\(23\\|45\\)$'),
+        ('grep', 'no-such-text'),
+        ('author', 'Carol'),
+        ('committer', 'heidi@'),
+    ]
+    print(f'{"query":36} {"git log":>10} {"index":>10} {"results":>8}  same')
+    for method, query in queries:
+        label = f'--{method}={query}'
+        expect, git_time = timed(args.repeat, git_log, **{method: query})
+        search = getattr(index, method)
+        actual, index_time = timed(args.repeat, search, query, max_count)
+        print(
+            f'{label:36} {git_time:10.4f} {index_time:10.4f} '
+            f'{len(actual):8d}  {actual == expect}'
+        )
+
+    label = f'--after={after} --before={before}'
+    expect, git_time = timed(args.repeat, git_log, after=after, before=before)
+
+    def date_range():
+        limits = commitindex.date_limits(context, after, before)
+        return index.date_range(*limits, max_count)
+
+    actual, index_time = timed(args.repeat, date_range)
+    print(
+        f'{label:36} {git_time:10.4f} {index_time:10.4f} '
+        f'{len(actual):8d}  {actual == expect}'
+    )
+
+
+if __name__ == '__main__':
+    main()
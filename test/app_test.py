@@ -3,6 +3,8 @@ import sys
 import types
 from unittest.mock import MagicMock
 
+import pytest
+
 from cola import app
 from qtpy import QtCore
 
@@ -119,3 +121,55 @@ def test_set_application_name_swallows_cocoa_exceptions(monkeypatch):
     app.set_application_name('Test App')
     # Qt-side name still got set despite the AppKit explosion.
     assert QtCore.QCoreApplication.applicationName() == 'Test App'
+
+
+def test_timer_report():
+    """Timers are reported in the order in which they were started"""
+    timer = app.Timer()
+    timer.start('first')
+    timer.start('second')
+    timer.start('running')
+    timer.stop('second')
+    timer.stop('first')
+    assert timer.is_stopped('first')
+    assert not timer.is_stopped('running')
+    assert not timer.is_stopped('missing')
+    report = timer.report()
+    assert [key for key, _ in report] == ['first', 'second']
+    assert timer.total() == pytest.approx(timer.elapsed('first'))
+    assert timer.total() >= timer.elapsed('second') >= 0.0
+
+
+def test_startup_report_is_displayed_when_startup_is_done(capsys):
+    """--perf displays the startup phases once every phase has finished"""
+    context = MagicMock()
+    context.args.perf = True
+    context.timer = timer = app.Timer()
+    timer.start('init')
+    timer.stop('init')
+    timer.start('paint')
+    timer.start('status')
+
+    app.finish_startup_phase(context, 'status')
+    assert capsys.readouterr().out == ''
+
+    app.finish_startup_phase(context, 'paint')
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(':')[0] for line in lines] == [
+        'init',
+        'paint',
+        'status',
+        'total',
+    ]
+
+
+def test_startup_report_requires_perf(capsys):
+    """The startup phases are not displayed without --perf"""
+    context = MagicMock()
+    context.args.perf = False
+    context.timer = timer = app.Timer()
+    for phase in app.STARTUP_PHASES:
+        timer.start(phase)
+        app.finish_startup_phase(context, phase)
+    assert capsys.readouterr().out == ''
+    assert all(timer.is_stopped(phase) for phase in app.STARTUP_PHASES)
@@ -0,0 +1,209 @@
+"""Test the cola.commitindex module"""
+import os
+from unittest import mock
+
+import pytest
+
+from cola import commitindex
+from cola import gitcmds
+from cola.widgets import search
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Store the commit index in a temporary directory"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+
+def _commit(
+    message, day, author='A U Thor <author@example.com>', committer='Your Name'
+):
+    """Create an empty commit on the specified day of January 2020"""
+    date = f'2020-01-{day:02d}T12:00:00+0000'
+    with mock.patch.dict(os.environ, {'GIT_COMMITTER_DATE': date}):
+        helper.run_git(
+            '-c',
+            f'user.name={committer}',
+            'commit',
+            '--quiet',
+            '--allow-empty',
+            f'--author={author}',
+            f'--date={date}',
+            '-m',
+            message,
+        )
+
+
+def _make_history():
+    """Create a history with several authors and committers"""
+    _commit('initial commit', 1)
+    _commit('fix the parser\n\nThe parser crashed (sometimes).', 2)
+    _commit('add a widget', 3, author='Bob <bob@example.com>', committer='Carol')
+    helper.run_git('checkout', '--quiet', '-b', 'topic')
+    _commit('topic: fix the widget', 4, author='Bob <bob@example.com>')
+    helper.run_git('checkout', '--quiet', 'main')
+    _commit('update docs', 5)
+
+
+def _git_log(context, **kwargs):
+    """Return the results from "git log --all" in the search dialog's format"""
+    out = context.git.log(
+        no_color=True, all=True, pretty='format:%H %aN - %s - %ar', **kwargs
+    )[1]
+    return gitcmds.parse_rev_list(out)
+
+
+def test_searches_match_git_log(app_context):
+    """The index returns the same results as "git log --all" """
+    _make_history()
+    index = commitindex.CommitIndex(app_context)
+    assert index.update()
+    assert len(index) == 5
+
+    for query in ('fix', 'widget$', '^add', 'crashed (sometimes)', 'parser\\|docs'):
+        assert index.grep(query, 100) == _git_log(app_context, grep=query)
+    for query in ('Bob', 'bob@example', 'nobody'):
+        assert index.author(query, 100) == _git_log(app_context, author=query)
+    for query in ('Carol', 'Your Name'):
+        assert index.committer(query, 100) == _git_log(app_context, committer=query)
+
+    limits = commitindex.date_limits(app_context, '2000-01-01', '2100-01-01')
+    expect = _git_log(app_context, after='2000-01-01', before='2100-01-01')
+    assert index.date_range(*limits, 100) == expect
+    limits = commitindex.date_limits(app_context, '2020-01-02', '2020-01-04')
+    expect = _git_log(app_context, after='2020-01-02', before='2020-01-04')
+    assert len(expect) == 2
+    assert index.date_range(*limits, 100) == expect
+    limits = commitindex.date_limits(app_context, '2000-01-01', '2000-02-01')
+    assert index.date_range(*limits, 100) == []
+
+
+def test_max_count(app_context):
+    """Searches return at most max_count results, newest first"""
+    _make_history()
+    index = commitindex.CommitIndex(app_context)
+    index.update()
+    assert index.grep('', 2) == _git_log(app_context, max_count=2)
+    assert index.author('Bob', 1) == _git_log(app_context, author='Bob', max_count=1)
+
+
+def test_incremental_update(app_context):
+    """New commits are added without reading the whole history again"""
+    _make_history()
+    index = commitindex.CommitIndex(app_context)
+    index.update()
+    assert not index.update()
+
+    _commit('new feature', 6, author='Dave <dave@example.com>')
+    assert index.update()
+    assert index.builds == 1
+    assert index.updates == 1
+    assert len(index) == 6
+    assert index.author('Dave', 100) == _git_log(app_context, author='Dave')
+    assert index.grep('', 100) == _git_log(app_context)
+
+
+def test_rewritten_history_is_rebuilt(app_context):
+    """Commits that are no longer reachable are removed"""
+    _make_history()
+    index = commitindex.CommitIndex(app_context)
+    index.update()
+
+    # Deleting a merged branch does not require a rebuild.
+    helper.run_git('branch', 'merged', 'main~1')
+    index.update()
+    helper.run_git('branch', '-D', 'merged')
+    index.update()
+    assert index.builds == 1
+
+    helper.run_git('branch', '-D', 'topic')
+    assert index.update()
+    assert index.builds == 2
+    assert len(index) == 4
+    assert index.grep('topic', 100) == []
+
+
+def test_stored_index_is_reused(app_context):
+    """The index is loaded from disk and brought up to date with the refs"""
+    _make_history()
+    index = commitindex.CommitIndex(app_context)
+    index.update()
+    assert os.path.exists(index.filename())
+
+    _commit('new feature', 6, author='Dave <dave@example.com>')
+    index = commitindex.CommitIndex(app_context)
+    assert index.update()
+    assert index.builds == 0
+    assert index.loads == 1
+    assert len(index) == 6
+    assert index.grep('', 100) == _git_log(app_context)
+    assert index.author('Dave', 100) == _git_log(app_context, author='Dave')
+    limits = commitindex.date_limits(app_context, '2020-01-02', '2020-01-10')
+    expect = _git_log(app_context, after='2020-01-02', before='2020-01-10')
+    assert index.date_range(*limits, 100) == expect
+
+
+def test_invalid_stored_index_is_rebuilt(app_context):
+    """A stored index that cannot be read is ignored"""
+    _make_history()
+    index = commitindex.CommitIndex(app_context)
+    filename = index.filename()
+    os.makedirs(os.path.dirname(filename))
+    with open(filename, 'wb') as fh:
+        fh.write(b'garbage')
+    assert index.update()
+    assert index.loads == 0
+    assert index.builds == 1
+    assert index.grep('', 100) == _git_log(app_context)
+
+
+def test_search_engines_use_the_index(app_context):
+    """The search dialog's engines answer from the commit index"""
+    _make_history()
+    opts = search.SearchOptions()
+    opts.query = 'widget'
+    results = search.MessageSearch(app_context, opts).search()
+    assert results == _git_log(app_context, grep='widget')
+    index = commitindex.commit_index(app_context)
+    assert index.builds == 1
+
+    opts.query = 'Bob'
+    results = search.AuthorSearch(app_context, opts).search()
+    assert results == _git_log(app_context, author='Bob')
+    assert index.builds == 1
+
+    opts.start_date = '2000-01-01'
+    opts.end_date = '2100-01-01'
+    results = search.DateRangeSearch(app_context, opts).search()
+    assert results == _git_log(app_context, after='2000-01-01', before='2100-01-01')
+
+
+def test_compile_pattern():
+    """Basic regular expressions are translated into Python patterns"""
+    pattern = commitindex.compile_pattern('a+(b)\\|c')
+    assert pattern.search('a+(b)')
+    assert pattern.search('c')
+    assert not pattern.search('aab')
+    # Invalid expressions are matched literally.
+    assert commitindex.compile_pattern('[').search('a [ b')
+
+
+def test_relative_date():
+    """Relative dates are formatted like git's %ar format"""
+    now = 1000000000
+    day = 24 * 60 * 60
+    assert commitindex.relative_date(now - 1, now) == '1 second ago'
+    assert commitindex.relative_date(now - 600, now) == '10 minutes ago'
+    assert commitindex.relative_date(now - 3 * 60 * 60, now) == '3 hours ago'
+    assert commitindex.relative_date(now - 3 * day, now) == '3 days ago'
+    assert commitindex.relative_date(now - 21 * day, now) == '3 weeks ago'
+    assert commitindex.relative_date(now - 100 * day, now) == '3 months ago'
+    assert commitindex.relative_date(now - 400 * day, now) == '1 year, 1 month ago'
+    assert commitindex.relative_date(now - 3000 * day, now) == '8 years ago'
+    assert commitindex.relative_date(now + 10, now) == 'in the future'
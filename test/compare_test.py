@@ -0,0 +1,146 @@
+"""Tests for the compare branches dialog"""
+import sys
+import time
+
+import pytest
+from qtpy import QtWidgets
+
+from cola import gitcmds
+from cola import qtutils
+from cola.widgets import compare
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+def _make_branches():
+    """Create a "topic" branch that changes C and D relative to "main" """
+    helper.commit_files()
+    helper.run_git('checkout', '-q', '-b', 'topic')
+    helper.touch('C', 'D')
+    helper.run_git('add', 'C', 'D')
+    helper.run_git('commit', '-q', '-m', 'topic')
+    helper.run_git('checkout', '-q', 'main')
+
+
+def _count_calls(monkeypatch, name):
+    """Count the calls to a gitcmds function"""
+    calls = []
+    func = getattr(gitcmds, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args[1:])
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(gitcmds, name, wrapper)
+    return calls
+
+
+def test_diff_filenames_are_cached_by_oid(app_context, monkeypatch):
+    """File lists are cached by the object IDs of the branches"""
+    _make_branches()
+    calls = _count_calls(monkeypatch, 'diff_filenames')
+    cache = compare.CompareCache()
+
+    assert cache.diff_filenames(app_context, 'main', 'topic') == ['C', 'D']
+    assert cache.diff_filenames(app_context, 'main', 'topic') == ['C', 'D']
+    assert len(calls) == 1
+
+    # A branch that points to the same commit uses the cached result.
+    helper.run_git('branch', 'other', 'topic')
+    assert cache.diff_filenames(app_context, 'main', 'other') == ['C', 'D']
+    assert len(calls) == 1
+
+    # Moving a branch invalidates the cached result.
+    helper.run_git('branch', '-f', 'other', 'main')
+    assert cache.diff_filenames(app_context, 'main', 'other') == []
+    assert len(calls) == 2
+
+
+def test_merge_base_is_cached_by_oid(app_context, monkeypatch):
+    """Merge-bases are cached by the object IDs of the branches"""
+    _make_branches()
+    calls = _count_calls(monkeypatch, 'merge_base')
+    cache = compare.CompareCache()
+    expect = gitcmds.rev_parse(app_context, 'main')
+
+    assert cache.merge_base(app_context, 'main', 'topic') == expect
+    assert cache.merge_base(app_context, 'main', 'topic') == expect
+    assert len(calls) == 1
+    assert cache.merge_base(app_context, 'main', 'unknown') == ''
+
+
+def test_cache_is_bounded(app_context, monkeypatch):
+    """The least recently used entries are evicted"""
+    _make_branches()
+    monkeypatch.setattr(compare.CompareCache, 'max_entries', 1)
+    cache = compare.CompareCache()
+    cache.diff_filenames(app_context, 'main', 'topic')
+    cache.diff_filenames(app_context, 'topic', 'main')
+    assert len(cache.filenames) == 1
+
+
+def _wait_for_tasks(qapp, dialog):
+    """Process events until the dialog's tasks have finished"""
+    deadline = time.monotonic() + 10.0
+    while dialog.runner.tasks() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    qapp.processEvents()
+    assert not dialog.runner.tasks()
+
+
+def _select(widget, text):
+    """Select the item with the specified text"""
+    item = widget.findItems(text, compare.Qt.MatchExactly)[0]
+    widget.setCurrentItem(item)
+    item.setSelected(True)
+
+
+def _files(dialog):
+    """Return the files listed in the dialog"""
+    widget = dialog.diff_files
+    return [widget.topLevelItem(idx).path for idx in range(widget.topLevelItemCount())]
+
+
+def test_latest_selection_wins(qapp, app_context):
+    """Only the file list for the latest selection is displayed"""
+    _make_branches()
+    helper.run_git('checkout', '-q', '-b', 'third')
+    helper.touch('E')
+    helper.run_git('add', 'E')
+    helper.run_git('commit', '-q', '-m', 'third')
+    helper.run_git('checkout', '-q', 'main')
+
+    app_context.runtask = qtutils.RunTask()
+    dialog = compare.CompareBranchesDialog(app_context, None)
+    dialog.right_combo.setCurrentIndex(0)
+    _select(dialog.left_list, 'main')
+    _wait_for_tasks(qapp, dialog)
+
+    # Change the selection several times without waiting for the results.
+    _select(dialog.right_list, 'third')
+    _select(dialog.right_list, 'topic')
+    assert _files(dialog) == []
+    _wait_for_tasks(qapp, dialog)
+    assert _files(dialog) == ['C', 'D']
+    assert dialog.start == 'main'
+    assert dialog.end == 'topic'
+    assert not dialog.use_sandbox
+
+    # Selecting the same branch on both sides clears the list.
+    _select(dialog.right_list, 'main')
+    _wait_for_tasks(qapp, dialog)
+    assert _files(dialog) == []
@@ -1,9 +1,16 @@
 """Tests DAG functionality"""
+import sys
 from unittest.mock import patch
 
 import pytest
+from qtpy import QtCore
+from qtpy import QtGui
+from qtpy import QtWidgets
 
 from cola.models import dag
+from cola.widgets.dag import GraphIndex
+from cola.widgets.dag import GraphLayout
+from cola.widgets.dag import GraphView
 from cola.widgets.dag import _prepare_labels
 
 from .helper import app_context
@@ -202,3 +209,189 @@ def test_prepare_labels_two_groups_with_locals():
         ('remotes/origin/main', 'origin/main', 'origin/\u2026'),
         ('heads/main', 'main', None),
     ]
+
+
+def make_history(count):
+    """Create a history with forks, merges and tags in the order it is loaded"""
+    commits = []
+    for idx in range(count):
+        commit = dag.Commit(None, oid=f'{idx:040x}')
+        commit.summary = f'commit {idx}'
+        if idx % 7 == 3:
+            commit.parents = [commits[idx - 1], commits[idx - 3]]
+        elif idx % 5 == 4:
+            commit.parents = [commits[idx - 4]]
+        elif idx:
+            commit.parents = [commits[idx - 1]]
+        for parent in commit.parents:
+            parent.children.append(commit)
+        commit.generation = max((p.generation + 1 for p in commit.parents), default=0)
+        if idx % 11 == 0:
+            commit.tags.append(f'tags/v{idx}')
+        commits.append(commit)
+    return commits
+
+
+def assert_valid_layout(commits):
+    """Each commit has its own cell above the cells of its parents"""
+    cells = {(commit.column, commit.row) for commit in commits}
+    assert len(cells) == len(commits)
+    for commit in commits:
+        for parent in commit.parents:
+            assert commit.row > parent.row
+
+
+def test_graph_layout_single_batch():
+    """Adding all commits at once places each commit once"""
+    commits = make_history(200)
+    layout = GraphLayout(GraphView.x_off)
+    placed = layout.add_commits(commits)
+    assert len(placed) == len(commits)
+    assert_valid_layout(commits)
+
+
+def test_graph_layout_incremental():
+    """Adding commits in batches places only the new commits"""
+    commits = make_history(200)
+    layout = GraphLayout(GraphView.x_off)
+    cells = {}
+    for start in range(0, len(commits), 16):
+        batch = commits[start : start + 16]
+        placed = layout.add_commits(batch)
+        assert {commit.oid for commit in placed} == {commit.oid for commit in batch}
+        for commit in commits[:start]:
+            assert cells[commit.oid] == (commit.column, commit.row)
+        for commit in batch:
+            cells[commit.oid] = (commit.column, commit.row)
+        assert_valid_layout(commits[: start + 16])
+
+    assert layout.add_commits(commits[:16]) == []
+
+
+def test_graph_layout_reset():
+    """Resetting the layout places the commits again from scratch"""
+    commits = make_history(50)
+    layout = GraphLayout(GraphView.x_off)
+    layout.add_commits(commits)
+    expect = [(commit.column, commit.row) for commit in commits]
+
+    layout.reset()
+    assert len(layout.add_commits(commits)) == len(commits)
+    assert [(commit.column, commit.row) for commit in commits] == expect
+
+
+def test_graph_index():
+    """Nodes and edges are found by their grid region"""
+    commits = make_history(300)
+    GraphLayout(GraphView.x_off).add_commits(commits)
+    index = GraphIndex()
+    for commit in commits:
+        idx = index.add_node(commit)
+        for parent in commit.parents:
+            index.add_edge(index.find(parent.oid), idx, 0)
+
+    assert len(index) == len(commits)
+    assert index.find('tags/v11') == index.find(commits[11].oid)
+    for idx, commit in enumerate(commits):
+        assert index.node_at(commit.column, commit.row) == idx
+    assert index.node_at(index.max_column + 1, 0) is None
+
+    region = (index.min_column, index.max_column, 100, 150)
+    expect = [idx for idx, commit in enumerate(commits) if 100 <= commit.row <= 150]
+    assert index.nodes_in(*region) == expect
+    assert index.estimate_nodes(100, 150) >= len(expect)
+
+    edges = index.edges_in(*region)
+    for edge in range(len(index.edge_parents)):
+        rows = (
+            index.rows[index.edge_parents[edge]],
+            index.rows[index.edge_children[edge]],
+        )
+        assert (edge in edges) == (min(rows) <= 150 and max(rows) >= 100)
+
+    lanes = index.lanes_in(2, 0, index.max_row)
+    assert len(lanes) == 1
+    top, bottom, columns = lanes[0]
+    assert top == 0
+    assert bottom > index.max_row
+    assert columns == {commit.column for commit in commits}
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests"""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+@pytest.fixture
+def graphview(qapp, app_context):
+    """Provide a GraphView with a theme for painting"""
+    theme = app_context.app.theme
+    theme.is_dark = False
+    theme.is_palette_dark = False
+    theme.selection_color.return_value = QtGui.QColor(QtCore.Qt.blue)
+    theme.background_color_rgb.return_value = '#ffffff'
+    view = GraphView(app_context, None)
+    view.resize(400, 400)
+    yield view
+    view.clear()
+
+
+def test_graph_view_materialises_visible_items(graphview):
+    """Only the items near the viewport are added to the scene"""
+    commits = make_history(2000)
+    for start in range(0, len(commits), 256):
+        graphview.add_commits(commits[start : start + 256])
+    index = graphview.index
+    assert len(index) == len(commits)
+    # Edges that cross batches are linked.
+    assert len(index.edge_parents) == sum(len(c.parents) for c in commits)
+
+    graphview.fitInView(QtCore.QRectF(-200, -400, 400, 400), QtCore.Qt.KeepAspectRatio)
+    graphview.update_viewport()
+    assert not graphview.overview
+    assert 0 < len(graphview.items) < len(commits) // 4
+    assert 0 < len(graphview.edges) < len(index.edge_parents) // 4
+
+    # Selecting a commit far away materialises and keeps its item.
+    oldest = commits[0]
+    graphview.select([oldest.oid])
+    graphview.update_viewport()
+    item = graphview.items[oldest.oid]
+    assert item.isSelected()
+    assert graphview.selected_items() == [item]
+
+    # Items are found through the index.
+    pos = graphview.mapFromScene(item.pos())
+    assert graphview.itemAt(pos) is item
+
+    # Zooming out paints the graph as lanes instead of items.
+    graphview.max_items = 500
+    graphview.fitInView(graphview.graph_bounds(), QtCore.Qt.KeepAspectRatio)
+    graphview.update_viewport()
+    assert graphview.overview
+    assert list(graphview.items) == [oldest.oid]
+    assert not graphview.edges
+    graphview.grab()
+
+
+def test_graph_view_links_commits_across_batches(graphview):
+    """Commits are linked to parents and children from earlier batches"""
+    commits = make_history(100)
+    # A merge parent that is loaded after its children.
+    late = commits[50]
+    assert len(late.children) > 1
+    for start in range(0, len(commits), 16):
+        graphview.add_commits([c for c in commits[start : start + 16] if c is not late])
+    graphview.add_commits([late])
+
+    index = graphview.index
+    edges = set(zip(index.edge_parents, index.edge_children))
+    assert len(edges) == len(index.edge_parents)
+    assert len(edges) == sum(len(commit.parents) for commit in commits)
+    late_idx = index.find(late.oid)
+    linked = {index.nodes[child].oid for parent, child in edges if parent == late_idx}
+    assert linked == {child.oid for child in late.children}
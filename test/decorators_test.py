@@ -0,0 +1,109 @@
+"""Tests for the decorators module"""
+from cola import decorators
+
+
+def test_memoize():
+    """Results are cached by their arguments"""
+    calls = []
+
+    @decorators.memoize
+    def square(value, offset=0):
+        calls.append(value)
+        return value * value + offset
+
+    assert square(2) == 4
+    assert square(2) == 4
+    assert square(2, offset=1) == 5
+    assert calls == [2, 2]
+    assert square.cache.stats() == {
+        'hits': 1,
+        'misses': 2,
+        'evictions': 0,
+        'size': 2,
+        'max_size': None,
+    }
+
+
+def test_memoize_none_results():
+    """None is cached like any other result"""
+    calls = []
+
+    @decorators.memoize
+    def nothing(value):
+        calls.append(value)
+
+    assert nothing(1) is None
+    assert nothing(1) is None
+    assert calls == [1]
+
+
+def test_memoize_max_size():
+    """The least recently used results are evicted"""
+    calls = []
+
+    @decorators.memoize(max_size=2)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    double(1)
+    double(2)
+    double(1)  # 2 is now the least recently used result.
+    double(3)
+    assert len(double.cache) == 2
+    assert double.cache.evictions == 1
+    double(1)
+    assert calls == [1, 2, 3]
+    double(2)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_clear_caches_by_scope():
+    """Caches can be cleared by scope"""
+    calls = []
+
+    @decorators.memoize(scope='test-scope')
+    def scoped(value):
+        calls.append(value)
+        return value
+
+    @decorators.memoize
+    def unscoped(value):
+        calls.append(value)
+        return value
+
+    scoped(1)
+    unscoped(2)
+    decorators.clear_caches('test-scope')
+    assert len(scoped.cache) == 0
+    assert len(unscoped.cache) == 1
+    scoped(1)
+    unscoped(2)
+    assert calls == [1, 2, 1]
+
+    stats = decorators.cache_stats()
+    assert scoped.cache.name.endswith('test_clear_caches_by_scope.<locals>.scoped')
+    assert stats[scoped.cache.name]['misses'] == 2
+    assert stats[unscoped.cache.name]['hits'] == 1
+
+
+def test_lru_cache_max_bytes():
+    """Values are evicted when the cache grows larger than max_bytes"""
+    cache = decorators.LRUCache(max_bytes=10, sizeof=len)
+    cache.put('a', 'aaaa')
+    cache.put('b', 'bbbb')
+    assert cache.get('a') == 'aaaa'
+    cache.put('c', 'cccc')  # "b" is the least recently used value.
+    assert cache.get('b') is None
+    assert cache.items() == [('a', 'aaaa'), ('c', 'cccc')]
+    assert cache.size == 8
+    assert cache.evictions == 1
+
+    # Values larger than the cache are not cached.
+    cache.put('d', 'd' * 11)
+    assert cache.get('d') is None
+    assert len(cache) == 2
+
+    # Replacing a value updates the size.
+    cache.put('a', 'aa')
+    assert cache.size == 6
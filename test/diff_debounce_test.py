@@ -9,6 +9,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from cola import gitcmds
 from cola.widgets.diff import CommitDiffWidget
 from qtpy import QtWidgets
 
@@ -105,3 +106,23 @@ def test_set_diff_without_token_applies_immediately(qapp, app_context):
 
     widget.set_diff('direct diff')
     widget.diff.set_diff.assert_called_once_with('direct diff')
+
+
+def test_cached_diff_is_displayed_immediately(qapp, app_context):
+    """Re-selecting a commit with a cached diff skips the debounce and git."""
+    widget = _make_widget(app_context)
+    widget.diff = MagicMock()
+    widget.prefetcher = MagicMock()
+    oid = 'd' * 40
+    cache = gitcmds.diff_cache()
+    key = gitcmds._diff_cache_key(app_context, oid + '~', oid, None)
+    cache.put(key, 'cached diff')
+    try:
+        widget.commits_selected([_make_commit(oid)])
+    finally:
+        cache.clear()
+
+    assert not widget._diff_timer.isActive()
+    assert widget._pending_diff is None
+    app_context.runtask.start.assert_not_called()
+    widget.diff.set_diff.assert_called_once_with('cached diff')
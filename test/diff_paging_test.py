@@ -0,0 +1,133 @@
+"""Tests for displaying large diffs a page at a time"""
+import sys
+
+import pytest
+from qtpy import QtWidgets
+
+from cola.widgets import diff
+
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+def _make_diff(hunks, lines):
+    """Generate a single-file diff of roughly hunks * lines * 64 characters"""
+    diff_lines = ['diff --git a/file b/file', '--- a/file', '+++ b/file']
+    for hunk_idx in range(hunks):
+        start = hunk_idx * lines + 1
+        diff_lines.append(f'@@ -{start},{lines} +{start},{lines} @@')
+        for idx in range(start, start + lines):
+            diff_lines.append(f' {idx:063d}')
+    return '\n'.join(diff_lines)
+
+
+def _editor(app_context, max_diff_size=1):
+    editor = diff.DiffTextEdit(app_context, None, numbers=True, numbers_visible=True)
+    editor.max_diff_size = max_diff_size
+    editor.resize(640, 480)
+    return editor
+
+
+def test_small_diffs_are_displayed_in_full(qapp, app_context):
+    """Diffs below the page size are displayed in one piece"""
+    text = _make_diff(4, 10)
+    editor = _editor(app_context)
+    editor.set_diff(text + '\n\n')
+    assert len(editor.pages) == 1
+    assert editor.line_offset == 0
+    assert editor.value() == text
+
+
+def test_large_diffs_are_paged(qapp, app_context):
+    """Only a window of pages is displayed and jumps load other pages"""
+    text = _make_diff(24, 1000)  # About 1.5MB.
+    lines = text.split('\n')
+    editor = _editor(app_context)
+    editor.set_diff(text)
+    pages = editor.pages
+    assert len(pages) >= 3
+    assert editor.page_window == (0, 1)
+    assert editor.line_offset == 0
+    assert editor.value() == pages.text_for_pages(0, 1)
+    assert len(editor.value()) < len(text)
+    # The diffstat and line numbers cover the whole diff.
+    assert len(editor.diff_lines) == len(lines)
+
+    # Jump to the last hunk.
+    last_hunk = pages.hunk_lines[-1]
+    editor.jump_to_line(last_hunk)
+    first, last = editor.page_window
+    assert last == len(pages) - 1
+    assert editor.line_offset == pages.page_lines[first]
+    assert editor.current_diff_line() == last_hunk
+    assert editor.textCursor().block().text() == lines[last_hunk]
+    numbers = editor.numbers
+    assert numbers.line_offset == editor.line_offset
+    numbers.set_highlighted(editor.textCursor().blockNumber())
+    assert numbers.current_line() == 23001
+
+    # Hunk navigation crosses page boundaries.
+    editor.jump_to_line(0)
+    assert editor.page_window == (0, 1)
+    for _ in range(len(pages.hunk_lines)):
+        editor.next_hunk()
+    assert editor.current_diff_line() == last_hunk
+    editor.previous_hunk()
+    assert editor.current_diff_line() == pages.hunk_lines[-2]
+    editor.previous_file()
+    assert editor.current_diff_line() == 0
+    assert editor.page_window == (0, 1)
+
+
+def test_scrolling_loads_the_next_page(qapp, app_context):
+    """Scrolling to the end of the window displays the following page"""
+    text = _make_diff(24, 1000)
+    editor = _editor(app_context)
+    editor.show()
+    editor.set_diff(text)
+    qapp.processEvents()
+    scrollbar = editor.verticalScrollBar()
+    scrollbar.setValue(scrollbar.maximum())
+    assert editor.page_window == (1, 2)
+    top_line = editor.line_offset + editor.firstVisibleBlock().blockNumber()
+    assert top_line > editor.pages.page_lines[1]
+
+    scrollbar.setValue(scrollbar.minimum())
+    assert editor.page_window == (0, 1)
+    editor.hide()
+
+
+def test_new_diffs_are_displayed_from_the_first_page(qapp, app_context):
+    """Refreshing a diff keeps its pages and a different diff starts at the top"""
+    text = _make_diff(24, 1000)
+    other_text = _make_diff(24, 1000).replace('b/file', 'b/other')
+    editor = _editor(app_context)
+    editor.set_diff(text, key='file')
+    editor.jump_to_line(editor.pages.hunk_lines[-1])
+    window = editor.page_window
+    assert window != (0, 1)
+
+    # Refreshing the same diff keeps displaying the same pages.
+    editor.set_diff(text, key='file')
+    assert editor.page_window == window
+
+    # A different diff is displayed from its header.
+    editor.set_diff(other_text, key='other')
+    assert editor.page_window == (0, 1)
+    assert editor.line_offset == 0
+
+    # Diffs without a key are always displayed from the first page.
+    editor.jump_to_line(editor.pages.hunk_lines[-1])
+    editor.set_diff(text)
+    assert editor.page_window == (0, 1)
@@ -0,0 +1,139 @@
+"""Tests for prefetching the diffs around the selected commit"""
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from qtpy import QtWidgets
+
+from cola import git
+from cola import gitcmds
+from cola.models import dag
+from cola.widgets.diff import CommitDiffWidget
+from cola.widgets.diff import DiffPrefetcher
+from cola.widgets.diff import DiffPrefetchTask
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+def _make_history(count):
+    """Create a linear history of dag.Commit objects, oldest first"""
+    commits = []
+    for idx in range(count):
+        commit = dag.Commit(None, oid=f'{idx:040x}')
+        if commits:
+            commit.parents = [commits[-1]]
+            commits[-1].children.append(commit)
+        commits.append(commit)
+    return commits
+
+
+def test_prefetch_follows_direction_of_travel(qapp, app_context):
+    """Diffs ahead of the selection are prefetched in the direction of travel."""
+    app_context.runtask = runtask = MagicMock()
+    prefetcher = DiffPrefetcher(app_context)
+    commits = _make_history(20)
+    oids = [commit.oid for commit in commits]
+
+    # A jump prefetches both directions.
+    prefetcher.prefetch(commits[10])
+    task = runtask.start.call_args[0][0]
+    assert task.oids == [oids[9], oids[11], oids[8], oids[12]]
+
+    # Only one task runs at a time. Moving towards the parents prefetches
+    # older commits once the running task has finished.
+    prefetcher.prefetch(commits[9])
+    assert runtask.start.call_count == 1
+    assert prefetcher.pending[0].oids == [oids[8], oids[7], oids[6], oids[5]]
+
+    # Moving towards the children prefetches newer commits.
+    prefetcher.prefetch(commits[10])
+    assert prefetcher.pending[0].oids == oids[11:15]
+    prefetcher.finish(task)
+    task = runtask.start.call_args[0][0]
+    assert task.oids == oids[11:15]
+    assert runtask.start.call_count == 2
+    prefetcher.finish(task)
+
+    # The history ends at the root commit.
+    prefetcher.prefetch(commits[1])
+    prefetcher.prefetch(commits[0])
+    assert prefetcher.pending is None
+
+
+def test_prefetch_task_fills_diff_cache(qapp, app_context):
+    """Prefetched diffs are stored in the commit diff cache."""
+    oids = []
+    for idx in range(3):
+        helper.write_file('A', f'{idx}\n')
+        helper.run_git('commit', '-a', '-m', f'commit {idx}')
+        oids.append(helper.run_git('rev-parse', 'HEAD').strip())
+    cache = gitcmds.diff_cache()
+    cache.clear()
+
+    prefetcher = DiffPrefetcher(app_context)
+    task = DiffPrefetchTask(prefetcher, oids[:2])
+    # Prefetching does not wait for commands that hold the index lock.
+    with git._index_lock:
+        thread = threading.Thread(target=task.task)
+        thread.start()
+        thread.join(30)
+        assert not thread.is_alive()
+    for oid in oids[:2]:
+        assert gitcmds.cached_diff_range(app_context, oid + '~', oid) is not None
+
+    # Cancelled tasks stop before computing any more diffs.
+    task = DiffPrefetchTask(prefetcher, oids[2:])
+    prefetcher.cancel()
+    task.task()
+    assert gitcmds.cached_diff_range(app_context, oids[2] + '~', oids[2]) is None
+    cache.clear()
+
+
+def test_prefetch_starts_after_foreground_diff(qapp, app_context):
+    """Prefetching waits for the selected diff and stops when the selection moves."""
+    widget = CommitDiffWidget(app_context, None, is_commit=True)
+    app_context.runtask = MagicMock()
+    widget.diff = MagicMock()
+    widget.prefetcher = MagicMock()
+    commit = _make_history(2)[-1]
+
+    widget.commits_selected([commit])
+    widget.prefetcher.cancel.assert_called_once()
+    widget._load_pending_diff()
+    widget.prefetcher.prefetch.assert_not_called()
+
+    widget.set_diff('diff', widget._diff_token)
+    widget.prefetcher.prefetch.assert_called_once_with(commit)
+
+
+def test_cached_diffs_are_counted_once(qapp, app_context):
+    """Selecting a commit whose diff is cached counts a single cache hit"""
+    helper.commit_files()
+    helper.write_file('A', 'change\n')
+    helper.run_git('commit', '-a', '-m', 'change')
+    oid = helper.run_git('rev-parse', 'HEAD').strip()
+    cache = gitcmds.diff_cache()
+    cache.clear()
+    gitcmds.diff_info(app_context, oid)
+
+    widget = CommitDiffWidget(app_context, None, is_commit=True)
+    app_context.runtask = MagicMock()
+    widget.prefetcher = MagicMock()
+    widget.commits_selected([dag.Commit(None, oid=oid)])
+    app_context.runtask.start.assert_not_called()
+    assert cache.stats()['hits'] == 1
+    cache.clear()
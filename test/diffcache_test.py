@@ -0,0 +1,77 @@
+"""Test the cola.diffcache module"""
+import os
+import sys
+
+from cola import diffcache
+
+
+def test_diff_cache_memory_lru():
+    """The in-memory cache evicts the least recently used diffs"""
+    value_size = sys.getsizeof('a' * 100)
+    cache = diffcache.DiffCache(max_bytes=value_size * 2)
+    cache.put('a', 'a' * 100)
+    cache.put('b', 'b' * 100)
+    assert cache.get('a') == 'a' * 100
+    cache.put('c', 'c' * 100)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a' * 100
+    assert cache.get('c') == 'c' * 100
+    assert cache.stats() == {
+        'hits': 3,
+        'disk_hits': 0,
+        'misses': 1,
+        'evictions': 1,
+        'count': 2,
+        'size': value_size * 2,
+    }
+
+    # Values larger than the cache are not cached.
+    cache.put('d', 'd' * 1000)
+    assert cache.get('d') is None
+    assert cache.stats()['count'] == 2
+
+    cache.clear()
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_diff_cache_disk(tmp_path):
+    """Diffs are stored compressed on disk and reused by new caches"""
+    path = str(tmp_path)
+    key = ('a' * 40 + '~', 'a' * 40, None)
+    diff = 'diff --git a/f b/f\n+é\udcff\n' * 100
+    cache = diffcache.DiffCache(path=path)
+    cache.put(key, diff, disk=True)
+    filename = cache.filename(key)
+    assert os.path.exists(filename)
+    assert os.path.getsize(filename) < len(diff)
+
+    cache = diffcache.DiffCache(path=path)
+    assert cache.get(key) is None
+    assert cache.get(key, disk=True) == diff
+    assert cache.get(key) == diff
+    assert cache.stats()['disk_hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+    # Corrupt files are treated as cache misses.
+    with open(filename, 'wb') as fh:
+        fh.write(b'garbage')
+    cache = diffcache.DiffCache(path=path)
+    assert cache.get(key, disk=True) is None
+
+
+def test_diff_cache_disk_prune(tmp_path):
+    """The least recently used files are removed when the disk store is full"""
+    path = str(tmp_path)
+    cache = diffcache.DiffCache(path=path)
+    cache.max_disk_bytes = 1024
+    for idx in range(40):
+        cache.put(idx, os.urandom(64).hex(), disk=True)
+        os.utime(cache.filename(idx), ns=(idx * 10**9, idx * 10**9))
+
+    files = os.listdir(path)
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in files)
+    assert size <= cache.max_disk_bytes
+    assert os.path.exists(cache.filename(39))
+    assert not os.path.exists(cache.filename(0))
@@ -297,6 +297,186 @@ def test_diff_line_digits(difflines_data):
     assert parser.digits() == 3
 
 
+def _table_lines(table):
+    """Return every line's numbers from a DiffLineTable"""
+    return [table.numbers(line) for line in range(len(table))]
+
+
+def test_diff_line_table_matches_parse(difflines_data):
+    """The line number table matches the lines returned by parse()"""
+    parser = difflines_data.parser
+    text = difflines_data.text
+    expect = parser.parse(text)
+    for chunk_size in (1, 100, diffparse.DiffLineTable.chunk_size):
+        table = diffparse.DiffLineTable.__new__(diffparse.DiffLineTable)
+        table.chunk_size = chunk_size
+        table.__init__(text)
+        # The text ends in a newline so the last line is empty.
+        assert len(table) == len(expect) + 1
+        assert _table_lines(table)[:-1] == expect
+        assert not table.merge
+        assert table.digits() == parser.digits()
+        assert table.additions == parser.additions.count
+        assert table.removals == parser.removals.count
+
+
+def test_diff_line_table_for_merge():
+    """Merge diffs have three columns of line numbers"""
+    text = """@@@ -1,23 -1,33 +1,75 @@@
+++<<<<<<< upstream
+ +
+- a
+ -b
+--c
++ d
+  e
+\\ No newline at end of file
+diff --cc other"""
+    table = diffparse.DiffLineTable(text)
+    empty = table.EMPTY
+    assert table.merge
+    assert table.width == 3
+    assert _table_lines(table) == [
+        (table.DASH, table.DASH, table.DASH),
+        (empty, empty, 1),
+        (1, empty, 2),
+        (2, empty, empty),
+        (empty, 1, empty),
+        (3, 2, empty),
+        (empty, 3, 3),
+        (4, 4, 4),
+        (empty, empty, empty),
+        (empty, empty, empty),
+    ]
+    assert table.additions == 3
+    assert table.removals == 3
+    assert table.digits() == 2
+
+
+def test_diff_line_table_empty_lines():
+    """Empty lines inside of a hunk keep the following lines aligned"""
+    text = '@@ -1,3 +1,3 @@\n a\n\n-b\n+c\ndiff --git a/x b/x\n'
+    table = diffparse.DiffLineTable(text)
+    empty = table.EMPTY
+    assert _table_lines(table) == [
+        (table.DASH, table.DASH),
+        (1, 1),
+        (2, 2),
+        (3, empty),
+        (empty, 3),
+        (empty, empty),
+        (empty, empty),
+    ]
+    assert table.additions == 1
+    assert table.removals == 1
+
+
+def test_diff_line_table_resolves_lines_lazily():
+    """Only the chunks containing the requested lines are resolved"""
+    count = 50000
+    lines = ['--- a/generated', '+++ b/generated', f'@@ -1,{count} +1,{count} @@']
+    for idx in range(count):
+        lines.append(f'-old {idx}')
+        lines.append(f'+new {idx}')
+    table = diffparse.DiffLineTable('\n'.join(lines))
+    assert len(table) == len(lines)
+    assert table.additions == count
+    assert table.removals == count
+    assert table.digits() == 5
+    assert table.resolved == 0
+    chunk_count = len(table.chunk_offsets)
+    assert chunk_count > table.cache_size
+
+    last = len(lines) - 1
+    assert table.numbers(last) == (table.EMPTY, count)
+    assert table.numbers(last - 1) == (count, table.EMPTY)
+    assert table.resolved == 1
+    assert table.numbers(3) == (1, table.EMPTY)
+    assert table.numbers(4) == (table.EMPTY, 1)
+    assert table.resolved == 2
+
+    # Resolved chunks are cached up to a limit.
+    for line in range(3, len(table), 100):
+        idx, value = divmod(line - 3, 2)
+        assert table.numbers(line)[value] == idx + 1
+    assert table.resolved >= chunk_count
+    assert len(table.chunks) == table.cache_size
+
+    with pytest.raises(IndexError):
+        table.numbers(len(table))
+
+
+def _make_diff(files, hunks, lines):
+    """Generate a diff with the specified number of files, hunks and lines"""
+    diff = []
+    for file_idx in range(files):
+        diff.append(f'diff --git a/file{file_idx} b/file{file_idx}')
+        diff.append(f'--- a/file{file_idx}')
+        diff.append(f'+++ b/file{file_idx}')
+        for hunk_idx in range(hunks):
+            start = hunk_idx * 100 + 1
+            diff.append(f'@@ -{start},{lines} +{start},{lines} @@')
+            for idx in range(lines):
+                diff.append(f' line {idx}')
+    return '\n'.join(diff)
+
+
+def test_diff_pages_index_files_and_hunks():
+    """File and hunk headers are indexed by line"""
+    text = _make_diff(2, 2, 3)
+    pages = diffparse.DiffPages(text)
+    assert len(pages) == 1
+    assert pages.text_for_pages(0, 0) == text
+    assert list(pages.file_lines) == [0, 11]
+    assert list(pages.hunk_lines) == [3, 7, 14, 18]
+
+    assert pages.next_hunk(0) == 3
+    assert pages.next_hunk(3) == 7
+    assert pages.next_hunk(18) is None
+    assert pages.previous_hunk(18) == 14
+    assert pages.previous_hunk(3) is None
+    assert pages.next_file(5) == 11
+    assert pages.next_file(11) is None
+    assert pages.previous_file(11) == 0
+    assert pages.previous_file(0) is None
+
+
+def test_diff_pages_split_at_headers():
+    """Pages contain whole lines and prefer to end before a header"""
+    text = _make_diff(3, 4, 20)
+    pages = diffparse.DiffPages(text, 500)
+    assert len(pages) > 1
+    lines = text.split('\n')
+    page_lines = []
+    for page in range(len(pages)):
+        page_text = pages.text_for_pages(page, page)
+        assert len(page_text) <= 500 or page == len(pages) - 1
+        page_line = pages.page_lines[page]
+        assert (
+            page_text.split('\n')
+            == lines[page_line : page_line + len(page_text.split('\n'))]
+        )
+        assert lines[page_line].startswith(('diff ', '@@')) or page == 0
+        page_lines.extend(page_text.split('\n'))
+    assert page_lines == lines
+
+    # A range of pages is displayed as one contiguous text.
+    assert pages.text_for_pages(0, len(pages) - 1) == text
+    assert pages.page_for_line(0) == 0
+    assert pages.page_for_line(len(lines) - 1) == len(pages) - 1
+
+
+def test_diff_pages_split_long_hunks_at_lines():
+    """Hunks that are larger than a page are split at line boundaries"""
+    text = _make_diff(1, 1, 1000)
+    pages = diffparse.DiffPages(text, 1000)
+    assert len(pages) > 2
+    page_lines = []
+    for page in range(len(pages)):
+        page_lines.extend(pages.text_for_pages(page, page).split('\n'))
+    assert page_lines == text.split('\n')
+
+
 def test_format_basic():
     fmt = diffparse.FormatDigits()
     fmt.set_digits(2)
@@ -1,9 +1,12 @@
 """Test the cola.git module"""
 import os
 import pathlib
+import threading
+import time
 from unittest.mock import call
 from unittest.mock import patch
 
+from cola import core
 from cola import git
 from cola import operations
 from cola.git import STDOUT
@@ -429,6 +432,102 @@ def test_it_doesnt_deadlock():
     assert expect == actual
 
 
+def test_execute_stream_records(monkeypatch):
+    """Records are decoded individually even when split across reads"""
+    monkeypatch.setattr(core.CommandStream, 'chunk_size', 3)
+    code = r'import sys; sys.stdout.write("unic\u00f8de\0two\0\0last")'
+    stream = git.Git.execute_stream(['python', '-c', code], _separator='\0')
+    assert list(stream) == ['unicøde', 'two', '', 'last']
+    assert stream.closed
+    assert stream.status == 0
+    assert not stream.killed
+    assert not stream.truncated
+    assert stream.bytes_out == len(core.encode('unicøde\0two\0\0last'))
+
+
+def test_execute_stream_chunks(monkeypatch):
+    """Chunks are decoded incrementally"""
+    monkeypatch.setattr(core.CommandStream, 'chunk_size', 1)
+    code = r'import sys; sys.stdout.write("\u00f8" * 10)'
+    with git.Git.execute_stream(['python', '-c', code]) as stream:
+        chunks = list(stream)
+    assert ''.join(chunks) == 'ø' * 10
+    assert all(isinstance(chunk, core.UStr) for chunk in chunks)
+
+
+def test_execute_stream_max_bytes():
+    """Reading stops at the byte limit and the command is killed"""
+    code = r'import sys; sys.stdout.write("ab\n" * %d)' % BUFFER_SIZE
+    stream = git.Git.execute_stream(
+        ['python', '-c', code], _separator='\n', _max_bytes=10
+    )
+    assert list(stream) == ['ab', 'ab', 'ab']
+    assert stream.truncated
+    assert stream.bytes_out == 10
+
+    # Output that fits within the limit is not truncated.
+    stream = git.Git.execute_stream(
+        ['python', '-c', r'print("ab")'], _separator='\n', _max_bytes=3
+    )
+    assert list(stream) == ['ab']
+    assert not stream.truncated
+    assert stream.status == 0
+
+
+def test_execute_stream_early_termination():
+    """Closing a stream early kills the command"""
+    code = r'import sys, time;' r'sys.stdout.write("first\n");' r'sys.stdout.flush();' r'time.sleep(60)'
+    start_time = time.time()
+    with git.Git.execute_stream(['python', '-c', code], _separator='\n') as stream:
+        for line in stream:
+            assert line == 'first'
+            break
+    assert stream.closed
+    assert stream.killed
+    assert stream.status != 0
+    assert time.time() - start_time < 30
+
+
+def test_execute_stream_cancel():
+    """Cancelling a stream from another thread interrupts a blocked read"""
+    code = r'import sys, time;' r'sys.stdout.write("first\n");' r'sys.stdout.flush();' r'time.sleep(60)'
+    start_time = time.time()
+    stream = git.Git.execute_stream(['python', '-c', code], _separator='\n')
+    assert stream.read() == ['first']
+    timer = threading.Timer(0.2, stream.cancel)
+    timer.start()
+    assert list(stream) == []
+    timer.join()
+    assert stream.closed
+    assert stream.killed
+    assert stream.status != 0
+    assert time.time() - start_time < 30
+
+
+def test_execute_stream_index_lock():
+    """The index lock is held until the stream is closed"""
+    code = r'import sys; sys.stderr.write("\0" * %d); print("done")' % BUFFER_SIZE
+    stream = git.Git.execute_stream(['python', '-c', code], _separator='\n')
+    assert git._index_lock.locked()
+    assert list(stream) == ['done']
+    assert not git._index_lock.locked()
+    assert stream.err == '\0' * BUFFER_SIZE
+
+    stream = git.Git.execute_stream(['python', '-c', code], _readonly=True)
+    assert not git._index_lock.locked()
+    stream.close()
+
+
+def test_git_stream(tmp_path):
+    """Git.stream() runs git commands and streams their output"""
+    worktree = git.Git(worktree=str(tmp_path))
+    worktree.init(_readonly=True)
+    with worktree.stream('config', list=True, z=True, _separator='\0') as stream:
+        records = [record for record in stream if record]
+    assert any(record.startswith('core.bare\n') for record in records)
+    assert stream.status == 0
+
+
 def test_git_path_in_linked_worktree(tmp_path):
     """Per-worktree paths do not fall back to the main repository's git dir"""
     repo = tmp_path / 'repo'
@@ -1,6 +1,12 @@
 """Test the cola.gitcfg module."""
+import os
 import pathlib
 
+import pytest
+
+from cola import core
+from cola import gitcfg
+
 from . import helper
 from .helper import app_context
 
@@ -147,3 +153,145 @@ def test_hooks_path_lowercase(app_context):
     expect = str(pathlib.Path('/test/hooks-lowercase/example'))
     actual = app_context.cfg.hooks_path('example')
     assert expect == actual
+
+
+@pytest.fixture
+def config_home(tmp_path, monkeypatch):
+    """Isolate the global config and disable the system config"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / '.config'))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    for name in ('GIT_CONFIG', 'GIT_CONFIG_COUNT', 'GIT_CONFIG_GLOBAL'):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
+
+
+def read_config_with_git(context):
+    """Read the config using git config and merge continuation lines"""
+    entries = []
+    for scope, key, value, continuation in gitcfg._read_config_with_scope(
+        context, set(), {}
+    ):
+        if continuation:
+            entries[-1] = (scope, key, value, False)
+        else:
+            entries.append((scope, key, value, False))
+    return entries
+
+
+def test_parse_config():
+    """parse_config() handles quoting, escapes, comments and continuations"""
+    text = '\n'.join([
+        '[Section "Sub Name"] Key = "quoted  value"  trailing   # comment',
+        '\tmulti = first \\',
+        '\t  second',
+        '\tescaped = "tab\\there\\n\\"q\\" \\\\"',
+        '\tflag',
+        '\tempty =',
+        '; comment',
+        '[Legacy.SubSection]',
+        '\tMixed-Case = 1 ; comment',
+        '',
+    ])
+    expect = [
+        ('section.Sub Name.key', 'quoted  value  trailing'),
+        ('section.Sub Name.multi', 'first    second'),
+        ('section.Sub Name.escaped', 'tab\there\n"q" \\'),
+        ('section.Sub Name.flag', None),
+        ('section.Sub Name.empty', ''),
+        ('legacy.subsection.mixed-case', '1'),
+    ]
+    assert gitcfg.parse_config(text) == expect
+
+
+def test_parse_config_errors():
+    """parse_config() rejects content that Git rejects"""
+    for text in (
+        'key = value\n',
+        '[section\n',
+        '[section "sub]\n',
+        '[section]\n\tkey = "unterminated\n',
+        '[section]\n\tkey = bad \\escape\n',
+        '[section]\n\tkey value\n',
+    ):
+        with pytest.raises(gitcfg.ConfigError):
+            gitcfg.parse_config(text)
+
+
+def test_wildmatch():
+    """wildmatch() implements Git's pathname wildcards"""
+    assert gitcfg.wildmatch('**/repo/**', '/tmp/repo/.git')
+    assert gitcfg.wildmatch('/tmp/**/.git', '/tmp/a/b/.git')
+    assert gitcfg.wildmatch('/tmp/**/.git', '/tmp/.git')
+    assert not gitcfg.wildmatch('/tmp/*/.git', '/tmp/a/b/.git')
+    assert gitcfg.wildmatch('feature/[a-c]?', 'feature/b1')
+    assert not gitcfg.wildmatch('feature/[!a-c]?', 'feature/b1')
+    assert gitcfg.wildmatch('REPO/**', 'repo/.git', icase=True)
+
+
+def test_read_config_files_matches_git(app_context, config_home):
+    """The in-process reader reports the same values as git config --list"""
+    helper.write_file(
+        str(config_home / '.gitconfig'),
+        '[user]\n\tname = Global Name\n[include]\n\tpath = ~/included.cfg\n',
+    )
+    helper.write_file(
+        str(config_home / 'included.cfg'),
+        '[Cola "Sub"]\n\tvalue = "a  b"\n\tvalue = c\n[include]\n\tpath = nested.cfg\n',
+    )
+    helper.write_file(str(config_home / 'nested.cfg'), '[nested]\n\tvalue = 42\n')
+    helper.write_file('gitdir.cfg', '[gitdir]\n\tvalue = yes\n')
+    helper.write_file('gitdiri.cfg', '[gitdiri]\n\tvalue = no\n')
+    helper.write_file('branch.cfg', '[branch]\n\tvalue = main\n')
+    helper.write_file('other.cfg', '[other]\n\tvalue = other\n')
+    worktree = os.path.basename(core.getcwd())
+    helper.append_file(
+        '.git/config',
+        f'[includeIf "gitdir:{worktree}/"]\n\tpath = ../gitdir.cfg\n'
+        f'[includeIf "gitdir/i:{worktree.upper()}/.GIT"]\n\tpath = ../gitdiri.cfg\n'
+        '[includeIf "onbranch:ma*"]\n\tpath = ../branch.cfg\n'
+        '[includeIf "onbranch:other"]\n\tpath = ../other.cfg\n'
+        '[test]\n\tmulti = "line\\none"\n\tflag\n',
+    )
+    reader = gitcfg.ConfigFileReader(app_context)
+    cache_paths = set()
+    renamed_keys = {}
+    actual = reader.read(cache_paths, renamed_keys)
+
+    assert actual == read_config_with_git(app_context)
+    assert ('local', 'branch.value', 'main', False) in actual
+    assert ('local', 'gitdiri.value', False, False) in actual
+    assert renamed_keys['cola.sub.value'] == 'cola.Sub.value'
+    assert str(config_home / 'nested.cfg') in cache_paths
+
+
+def test_read_config_files_parses_changed_files(app_context, config_home):
+    """Only the config files that changed are parsed again"""
+    helper.write_file(str(config_home / '.gitconfig'), '[user]\n\tname = Name\n')
+    reader = gitcfg.ConfigFileReader(app_context)
+    reader.read(set(), {})
+    global_config = str(config_home / '.gitconfig')
+    local_config = app_context.git.git_path('config')
+    global_entries = reader._parsed[global_config][1]
+    local_entries = reader._parsed[local_config][1]
+
+    helper.run_git('config', 'test.value', 'changed')
+    actual = reader.read(set(), {})
+
+    assert reader._parsed[global_config][1] is global_entries
+    assert reader._parsed[local_config][1] is not local_entries
+    assert ('local', 'test.value', 'changed', False) in actual
+
+
+def test_read_config_files_unsupported(app_context, config_home):
+    """Configs that cannot be read in-process are read using git config"""
+    helper.append_file(
+        '.git/config',
+        '[includeIf "hasconfig:remote.*.url:*"]\n\tpath = other.cfg\n'
+        '[test]\n\tvalue = git\n',
+    )
+    reader = gitcfg.ConfigFileReader(app_context)
+    assert reader.read(set(), {}) is None
+
+    app_context.cfg.reset()
+    assert app_context.cfg.get('test.value') == 'git'
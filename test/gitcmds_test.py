@@ -90,6 +90,77 @@ def test_tracked_branch_other(app_context):
     assert gitcmds.tracked_branch(app_context, 'other') == 'test/other/branch'
 
 
+def test_ahead_behind(app_context):
+    """Test ahead_behind() for all local branches"""
+    helper.commit_files()
+    helper.run_git('branch', 'feature')
+    helper.run_git('branch', 'other')
+    helper.run_git('branch', 'untracked')
+    helper.run_git('branch', '--set-upstream-to=main', 'feature')
+    helper.run_git('branch', '--set-upstream-to=main', 'other')
+    helper.run_git('commit', '--allow-empty', '-m', 'main commit')
+    helper.run_git('checkout', 'feature')
+    helper.run_git('commit', '--allow-empty', '-m', 'feature commit 1')
+    helper.run_git('commit', '--allow-empty', '-m', 'feature commit 2')
+
+    expect = {
+        'feature': ('main', 2, 1),
+        'other': ('main', 0, 1),
+    }
+    assert gitcmds.ahead_behind(app_context) == expect
+    assert len(app_context.model.ahead_behind_cache) == 2
+
+    # Cached values are used until the refs move.
+    helper.run_git('commit', '--allow-empty', '-m', 'feature commit 3')
+    expect['feature'] = ('main', 3, 1)
+    assert gitcmds.ahead_behind(app_context) == expect
+
+
+def test_upstream_track_parsing(app_context):
+    """Test the "for-each-ref %(upstream:track)" and rev-list code paths"""
+    helper.commit_files()
+    helper.run_git('branch', 'feature')
+    helper.run_git('branch', '--set-upstream-to=main', 'feature')
+    helper.run_git('commit', '--allow-empty', '-m', 'main commit')
+
+    tracked = gitcmds._upstream_track(app_context)
+    assert tracked['refs/heads/feature'] == (0, 1)
+    assert tracked['refs/heads/main'] == (0, 0)
+
+    counts = gitcmds._rev_list_left_right_count(
+        app_context, 'refs/heads/feature', 'refs/heads/main'
+    )
+    assert counts == (0, 1)
+
+
+def test_changed_files_batch(app_context):
+    """Test changed_files_batch() with root, merge and regular commits"""
+    helper.commit_files()
+    root = gitcmds.rev_parse(app_context, 'HEAD')
+    helper.run_git('checkout', '-b', 'side')
+    helper.touch('side file')
+    helper.run_git('add', 'side file')
+    helper.run_git('commit', '-m', 'side')
+    side = gitcmds.rev_parse(app_context, 'HEAD')
+    helper.run_git('checkout', 'main')
+    helper.touch('C')
+    helper.run_git('add', 'C')
+    helper.run_git('commit', '-m', 'main')
+    helper.run_git('merge', '--no-edit', 'side')
+    merge = gitcmds.rev_parse(app_context, 'HEAD')
+
+    oids = [merge[:7], side, root]
+    expect = {
+        merge: ['side file'],
+        side: ['side file'],
+        root: ['A', 'B'],
+    }
+    assert gitcmds.changed_files_batch(app_context, oids) == expect
+    assert gitcmds.changed_files(app_context, merge) == ['side file']
+    assert gitcmds.changed_files_batch(app_context, []) == {}
+    assert gitcmds.changed_files_batch(app_context, ['does-not-exist']) == {}
+
+
 def test_untracked_files(app_context):
     """Test untracked_files()."""
     helper.touch('C', 'D', 'E')
@@ -247,3 +318,52 @@ def test_diff_patch_with_stat(app_context):
     assert gitcmds.diff_patch_with_stat(app_context, ['A'], head=False) == ''
     actual = gitcmds.diff_patch_with_stat(app_context, ['A'], head=True)
     assert '+A change' in actual
+
+
+def test_diff_range_cache(app_context):
+    """Commit diffs are cached and worktree diffs are not"""
+    helper.commit_files()
+    oid = helper.run_git('rev-parse', 'HEAD').strip()
+    cache = gitcmds.diff_cache()
+    cache.clear()
+
+    assert gitcmds.cached_diff_range(app_context, oid + '~', oid) is None
+    diff = gitcmds.diff_info(app_context, oid)
+    assert 'A' in diff
+    assert gitcmds.diff_info(app_context, oid) == diff
+    # Checking whether a diff is cached is not counted as a hit.
+    assert gitcmds.is_diff_range_cached(app_context, oid + '~', oid)
+    assert cache.stats()['hits'] == 1
+    assert gitcmds.cached_diff_range(app_context, oid + '~', oid) == diff
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 2
+
+    # Diff options are part of the key.
+    gitcmds.update_diff_overrides(False, False, True, False)
+    try:
+        assert gitcmds.cached_diff_range(app_context, oid + '~', oid) is None
+    finally:
+        gitcmds.update_diff_overrides(False, False, False, False)
+
+    # Symbolic refs and the worktree are not cached.
+    assert gitcmds.diff_range(app_context, 'HEAD~', 'HEAD') == diff
+    assert gitcmds.cached_diff_range(app_context, 'HEAD~', 'HEAD') is None
+    assert cache.stats()['count'] == 1
+
+
+def test_log_helper_pages_and_searches(app_context):
+    """log_helper() returns pages of the log and searches with git"""
+    helper.commit_files()
+    for idx in range(4):
+        helper.write_file('A', f'value {idx}\n')
+        helper.run_git('commit', '-m', f'Change {idx}', 'A')
+
+    revs, summaries = gitcmds.log_helper(app_context, skip=1, max_count=2)
+    assert summaries == ['Change 2', 'Change 1']
+    assert len(revs) == 2
+
+    _, summaries = gitcmds.log_helper(app_context, grep='CHANGE 3')
+    assert summaries == ['Change 3']
+
+    _, summaries = gitcmds.log_helper(app_context, pickaxe='value 1')
+    assert summaries == ['Change 2', 'Change 1']
@@ -0,0 +1,135 @@
+"""Test the cola.gitprofile module"""
+import json
+import time
+
+import pytest
+
+from cola import cmds
+from cola import core
+from cola import gitcmds
+from cola import gitprofile
+from cola import qtutils
+
+from . import helper
+from .helper import app_context
+
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    """Enable profiling using a fresh profiler"""
+    result = gitprofile.Profiler(enabled=True)
+    monkeypatch.setattr(gitprofile, '_profiler', result)
+    return result
+
+
+def test_run_command_timings():
+    """core.run_command() reports its timings and output size"""
+    timings = {}
+    status, out, _ = core.run_command(['git', '--version'], timings=timings)
+    assert status == 0
+    assert timings['bytes_out'] == len(core.encode(out))
+    assert timings['bytes_err'] == 0
+    assert timings['spawn'] >= 0.0
+    assert timings['run'] >= 0.0
+    assert timings['decode'] >= 0.0
+
+
+def test_git_commands_are_recorded(app_context, profiler):
+    """Git commands are recorded when profiling is enabled"""
+    gitcmds.merge_base(app_context, 'HEAD', 'HEAD')
+    invocations = profiler.invocations()
+    assert len(invocations) == 1
+    invocation = invocations[0]
+    assert invocation.subcommand == 'merge-base'
+    assert invocation.caller == 'cola.gitcmds.merge_base'
+    assert invocation.status != 0
+    assert invocation.bytes_err > 0
+    assert invocation.wall >= invocation.run
+
+
+def test_git_commands_are_not_recorded_when_disabled(app_context, profiler):
+    """Nothing is recorded when profiling is disabled"""
+    profiler.enabled = False
+    app_context.git.version(_readonly=True)
+    assert profiler.invocations() == []
+
+
+def test_commands_are_grouped_by_action(app_context, profiler):
+    """Git commands are attributed to the outermost user action"""
+    helper.commit_files()
+    app_context.timestamp = time.time()
+    cmds.do(cmds.Checkout, app_context, ['-b', 'topic'])
+    with gitprofile.action('Outer'):
+        with gitprofile.action('Inner'):
+            gitcmds.merge_base(app_context, 'HEAD', 'topic')
+        gitcmds.all_files(app_context)
+    assert gitprofile.current_action() == ''
+
+    summary = profiler.summary()
+    actions = {action['name']: action for action in summary}
+    assert set(actions) == {'Checkout', 'Outer'}
+    outer = actions['Outer']
+    assert outer['count'] == 2
+    assert outer['wall'] == pytest.approx(sum(site['wall'] for site in outer['sites']))
+    assert {site['name'] for site in outer['sites']} == {
+        'cola.gitcmds.merge_base: git merge-base',
+        'cola.gitcmds.all_files: git ls-files',
+    }
+    assert [action['name'] for action in summary] == sorted(
+        actions, key=lambda name: actions[name]['wall'], reverse=True
+    )
+
+
+def test_tasks_inherit_the_action(app_context, profiler):
+    """Tasks run git commands on behalf of the action that created them"""
+    with gitprofile.action('Refresh'):
+        task = qtutils.SimpleTask(app_context.git.version, _readonly=True)
+    task.run()
+    assert [invocation.action for invocation in profiler.invocations()] == ['Refresh']
+
+
+def test_export(app_context, profiler, tmp_path):
+    """Invocations are exported as JSON and as Chrome trace events"""
+    gitcmds.all_files(app_context)
+    gitcmds.all_files(app_context)
+
+    json_path = str(tmp_path / 'profile.json')
+    profiler.write_json(json_path)
+    with open(json_path, encoding='utf-8') as fh:
+        data = json.load(fh)
+    assert len(data['invocations']) == 2
+    assert data['summary'][0]['count'] == 2
+
+    trace_path = str(tmp_path / 'trace.json')
+    profiler.write_chrome_trace(trace_path)
+    with open(trace_path, encoding='utf-8') as fh:
+        trace = json.load(fh)
+    events = trace['traceEvents']
+    assert [event['name'] for event in events] == ['git ls-files', 'git ls-files']
+    for event in events:
+        assert event['ph'] == 'X'
+        assert event['dur'] >= 0
+        assert event['args']['caller'] == 'cola.gitcmds.all_files'
+    assert events[1]['ts'] >= events[0]['ts']
+
+    profiler.clear()
+    assert profiler.summary() == []
+
+
+def test_streamed_commands_are_recorded(app_context, profiler):
+    """Streamed git commands are recorded once the stream is closed"""
+    helper.commit_files()
+    stream = app_context.git.stream('ls-files', z=True, _separator='\0', _readonly=True)
+    assert profiler.invocations() == []
+    assert list(stream) == ['A', 'B']
+
+    invocations = profiler.invocations()
+    assert len(invocations) == 1
+    invocation = invocations[0]
+    assert invocation.subcommand == 'ls-files'
+    assert invocation.status == 0
+    assert invocation.bytes_out == stream.bytes_out == 4
@@ -1,12 +1,19 @@
+import http.server
+import os
 import sys
+import threading
+import time
 from unittest.mock import MagicMock
 
 import pytest
 
 from cola import gravatar
 from cola.compat import ustr
+from cola.gravatar import Avatar
+from cola.gravatar import AvatarStore
 from cola.gravatar import Gravatar
 from cola.gravatar import GravatarLabel
+from qtpy import QtCore
 from qtpy import QtGui
 from qtpy import QtWidgets
 
@@ -59,8 +66,13 @@ class FakeReply:
     def error(self):
         return self._error
 
-    def rawHeader(self, _name):
-        return self._location.encode('utf-8')
+    def attribute(self, _attribute):
+        return 302 if self._location else 200
+
+    def rawHeader(self, name):
+        if name == b'Location':
+            return self._location.encode('utf-8')
+        return b''
 
     def readAll(self):
         return self._data
@@ -69,19 +81,31 @@ class FakeReply:
         self.deleted = True
 
 
-def _make_label(enable_gravatar=True):
+def _make_label(tmp_path, enable_gravatar=True):
     context = MagicMock()
     context.cfg.get.return_value = enable_gravatar
-    label = GravatarLabel(context)
+    store = AvatarStore(path=str(tmp_path))
     # Avoid real network traffic; capture requested URLs instead.
-    label.network = MagicMock()
-    return label
+    store.network = MagicMock()
+    return GravatarLabel(context, store=store)
+
+
+def _png_bytes(size):
+    """Return the PNG bytes for an image with the given size"""
+    pixmap = QtGui.QPixmap(size, size)
+    pixmap.fill(QtGui.QColor('red'))
+    byte_array = QtCore.QByteArray()
+    buf = QtCore.QBuffer(byte_array)
+    buf.open(QtCore.QIODevice.WriteOnly)
+    pixmap.save(buf, 'PNG')
+    buf.close()
+    return bytes(byte_array)
 
 
 def _real_avatar_reply(label, email):
     """A reply that returns an actual avatar (no Location redirect)."""
     url = Gravatar.url_for_email(email, label.imgsize)
-    return FakeReply(url, error=0, location='', data=b'\x89PNG real-avatar')
+    return FakeReply(url, error=0, location='', data=_png_bytes(label.imgsize))
 
 
 def _missing_avatar_reply(label, email):
@@ -90,58 +114,76 @@ def _missing_avatar_reply(label, email):
     return FakeReply(url, error=0, location='https://example.com/default.png')
 
 
-def test_successful_avatar_is_cached(qapp):
+def _failed_reply(label, email):
+    """A reply for a request that failed with a network error."""
+    url = Gravatar.url_for_email(email, label.imgsize)
+    return FakeReply(url, error=99, data=b'')
+
+
+def test_successful_avatar_is_cached(qapp, tmp_path):
     """A fetched avatar is cached and reused without re-requesting."""
-    label = _make_label()
+    label = _make_label(tmp_path)
+    store = label.store
     email = 'alice@example.com'
 
     label.set_email(email)
-    assert label.network.get.call_count == 1  # initial request
+    assert store.network.get.call_count == 1  # initial request
 
-    label.network_finished(_real_avatar_reply(label, email))
-    assert email in label.pixmaps
+    store.network_finished(_real_avatar_reply(label, email))
+    assert store.get(email, label.imgsize).data is not None
+    assert not label.pixmaps[email].isNull()
 
     # Revisiting the same author hits the cache; no new request.
     label.set_email(email)
-    assert label.network.get.call_count == 1
+    assert store.network.get.call_count == 1
 
 
-def test_missing_avatar_is_not_re_requested(qapp):
+def test_missing_avatar_is_not_re_requested(qapp, tmp_path):
     """An email with no avatar is remembered and not requested again."""
-    label = _make_label()
+    label = _make_label(tmp_path)
+    store = label.store
     email = 'noavatar@example.com'
 
     label.set_email(email)
-    assert label.network.get.call_count == 1
+    assert store.network.get.call_count == 1
 
     # Reply redirects to the default image -> recorded as a miss.
-    label.network_finished(_missing_avatar_reply(label, email))
-    assert email in label.failed
-    assert email not in label.pixmaps
+    store.network_finished(_missing_avatar_reply(label, email))
+    avatar = store.get(email, label.imgsize)
+    assert avatar is not None
+    assert avatar.data is None
+    assert label.pixmaps[email] is label.default_pixmap()
 
-    # Revisiting must not fire another request within the retry window.
+    # Revisiting must not fire another request while the miss is fresh.
     label.set_email(email)
-    assert label.network.get.call_count == 1
+    assert store.network.get.call_count == 1
 
 
-def test_missing_avatar_retried_after_window(qapp):
+def test_failed_request_retried_after_window(qapp, tmp_path):
     """A failed lookup is retried once the retry window elapses."""
-    label = _make_label()
-    email = 'noavatar@example.com'
+    label = _make_label(tmp_path)
+    store = label.store
+    email = 'alice@example.com'
+    key = (email, label.imgsize)
+
+    label.set_email(email)
+    store.network_finished(_failed_reply(label, email))
+    assert key in store.failed
+    assert store.get(email, label.imgsize) is None
 
     label.set_email(email)
-    label.network_finished(_missing_avatar_reply(label, email))
-    assert label.network.get.call_count == 1
+    assert store.network.get.call_count == 1
 
     # Age the failure beyond the retry window.
-    label.failed[email] -= label.RETRY_INTERVAL_SECONDS + 1
+    store.failed[key] -= store.retry_interval + 1
     label.set_email(email)
-    assert label.network.get.call_count == 2
+    assert store.network.get.call_count == 2
 
 
-def test_late_reply_for_previous_email_does_not_repaint(qapp):
+def test_late_reply_for_previous_email_does_not_repaint(qapp, tmp_path):
     """A reply for an old author must not overwrite the current avatar."""
-    label = _make_label()
+    label = _make_label(tmp_path)
+    store = label.store
     alice = 'alice@example.com'
     bob = 'bob@example.com'
 
@@ -154,57 +196,75 @@ def test_late_reply_for_previous_email_does_not_repaint(qapp):
     label.setPixmap = lambda pixmap: captured.append(pixmap)
 
     # Alice's (stale) reply arrives now.
-    label.network_finished(_real_avatar_reply(label, alice))
+    store.network_finished(_real_avatar_reply(label, alice))
     # Alice is still cached for later, but the visible label is not repainted.
-    assert alice in label.pixmaps
+    assert store.get(alice, label.imgsize) is not None
     assert captured == []
 
     # Bob's reply arrives and does repaint, since bob is current.
-    label.network_finished(_real_avatar_reply(label, bob))
+    store.network_finished(_real_avatar_reply(label, bob))
     assert bob in label.pixmaps
     assert len(captured) == 1
 
 
-def test_inflight_request_is_not_duplicated(qapp):
+def test_inflight_request_is_not_duplicated(qapp, tmp_path):
     """Revisiting an email whose request is still pending issues no duplicate."""
-    label = _make_label()
+    label = _make_label(tmp_path)
+    store = label.store
     email = 'alice@example.com'
 
     label.set_email(email)
-    assert label.network.get.call_count == 1
+    assert store.network.get.call_count == 1
 
     # Switch away and back while the first request is still in flight.
     label.set_email('bob@example.com')
     label.set_email(email)
     # alice's request is still pending, so no second alice request is sent;
     # bob's is the only additional request.
-    assert label.network.get.call_count == 2
+    assert store.network.get.call_count == 2
 
 
-def test_disabled_gravatar_uses_default_without_network(qapp):
+def test_labels_share_the_store(qapp, tmp_path):
+    """Labels that share a store do not request the same avatar twice."""
+    label = _make_label(tmp_path)
+    store = label.store
+    other = GravatarLabel(label.context, store=store)
+    email = 'alice@example.com'
+
+    label.set_email(email)
+    other.set_email(email)
+    assert store.network.get.call_count == 1
+
+    store.network_finished(_real_avatar_reply(label, email))
+    assert email in label.pixmaps
+    assert email in other.pixmaps
+
+
+def test_disabled_gravatar_uses_default_without_network(qapp, tmp_path):
     """With gravatar disabled, the default icon is cached and no request fires."""
-    label = _make_label(enable_gravatar=False)
+    label = _make_label(tmp_path, enable_gravatar=False)
     email = 'alice@example.com'
 
     label.set_email(email)
-    label.network.get.assert_not_called()
+    label.store.network.get.assert_not_called()
     assert email in label.pixmaps
     assert isinstance(label.pixmaps[email], QtGui.QPixmap)
 
 
-def test_switching_to_uncached_email_shows_default_not_stale_avatar(qapp):
+def test_switching_to_uncached_email_shows_default_not_stale_avatar(qapp, tmp_path):
     """Switching authors shows the default while loading, never the old face.
 
     Regression: holding the previous author's avatar during the fetch made a
     commit whose author has no gravatar display the wrong person's picture.
     """
-    label = _make_label()
+    label = _make_label(tmp_path)
+    store = label.store
     alice = 'alice@example.com'
     bob = 'bob@example.com'
 
     # Resolve alice so the label is showing alice's real avatar.
     label.set_email(alice)
-    label.network_finished(_real_avatar_reply(label, alice))
+    store.network_finished(_real_avatar_reply(label, alice))
     alice_pixmap = label.pixmaps[alice]
 
     painted = []
@@ -216,24 +276,25 @@ def test_switching_to_uncached_email_shows_default_not_stale_avatar(qapp):
     assert len(painted) == 1
     assert painted[0] is not alice_pixmap
     assert painted[0] is label.default_pixmap()
-    assert label.network.get.call_count == 2  # bob is requested
+    assert store.network.get.call_count == 2  # bob is requested
 
     # bob turns out to have no avatar -> the default stays (no stale alice).
-    label.network_finished(_missing_avatar_reply(label, bob))
+    store.network_finished(_missing_avatar_reply(label, bob))
     assert painted[-1] is label.default_pixmap()
 
 
-def test_revisiting_cached_miss_shows_default_not_stale_avatar(qapp):
+def test_revisiting_cached_miss_shows_default_not_stale_avatar(qapp, tmp_path):
     """An author with a known-missing avatar shows the default, not the prior face."""
-    label = _make_label()
+    label = _make_label(tmp_path)
+    store = label.store
     alice = 'alice@example.com'
     bob = 'bob@example.com'
 
     # alice has an avatar; bob is a known miss.
     label.set_email(alice)
-    label.network_finished(_real_avatar_reply(label, alice))
+    store.network_finished(_real_avatar_reply(label, alice))
     label.set_email(bob)
-    label.network_finished(_missing_avatar_reply(label, bob))
+    store.network_finished(_missing_avatar_reply(label, bob))
 
     # Show alice again (cached avatar), then bob again (cached miss).
     label.set_email(alice)
@@ -241,13 +302,142 @@ def test_revisiting_cached_miss_shows_default_not_stale_avatar(qapp):
     label.setPixmap = lambda pixmap: painted.append(pixmap)
     label.set_email(bob)
     # bob's miss is cached, so no new request and the default is shown.
-    assert label.network.get.call_count == 2
+    assert store.network.get.call_count == 2
     assert painted[-1] is label.default_pixmap()
 
 
-def test_default_pixmap_decoded_once(qapp):
+def test_default_pixmap_decoded_once(qapp, tmp_path):
     """The fallback icon is decoded a single time and reused."""
-    label = _make_label()
+    label = _make_label(tmp_path)
     first = label.default_pixmap()
     second = label.default_pixmap()
     assert first is second
+
+
+class AvatarHandler(http.server.BaseHTTPRequestHandler):
+    """Serve avatars the way gravatar.com does"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get('If-None-Match'))
+        email_hash = self.path.split('?')[0].rsplit('/', 1)[-1]
+        avatar = server.avatars.get(email_hash)
+        if avatar is None:
+            self.send_response(302)
+            self.send_header('Location', gravatar.DEFAULT_AVATAR_URL)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        data, etag = avatar
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Mon, 19 Oct 2026 00:00:00 GMT')
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def avatar_server():
+    """Run a local stand-in for gravatar.com"""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), AvatarHandler)
+    server.avatars = {}
+    server.requests = []
+    server.base_url = 'http://127.0.0.1:%d/avatar/' % server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_for_replies(qapp, store):
+    """Process events until the store's requests have finished"""
+    deadline = time.monotonic() + 10.0
+    while store.requested and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert not store.requested
+
+
+def test_avatars_are_reused_across_sessions(qapp, tmp_path, avatar_server):
+    """A new store reuses the disk cache without making any requests"""
+    alice = 'alice@example.com'
+    avatar_server.avatars[gravatar.sha256_hexdigest(alice)] = (b'alice', '"v1"')
+    store = AvatarStore(path=str(tmp_path), base_url=avatar_server.base_url)
+    changed = []
+    store.avatar_changed.connect(lambda email, size: changed.append((email, size)))
+
+    store.fetch(alice, 64)
+    store.fetch('nobody@example.com', 64)
+    _wait_for_replies(qapp, store)
+    assert len(avatar_server.requests) == 2
+    assert sorted(changed) == [(alice, 64), ('nobody@example.com', 64)]
+    assert store.get(alice, 64).data == b'alice'
+    assert store.get(alice, 64).etag == '"v1"'
+    assert store.get('nobody@example.com', 64).data is None
+
+    # A new session reads both results from disk and makes no requests.
+    store = AvatarStore(path=str(tmp_path), base_url=avatar_server.base_url)
+    store.fetch(alice, 64)
+    store.fetch('nobody@example.com', 64)
+    assert store.requested == {}
+    assert store.get(alice, 64).data == b'alice'
+    assert store.get('nobody@example.com', 64).data is None
+    assert len(avatar_server.requests) == 2
+
+
+def test_stale_avatars_are_revalidated(qapp, tmp_path, avatar_server):
+    """Stale avatars are revalidated using their ETag"""
+    alice = 'alice@example.com'
+    alice_hash = gravatar.sha256_hexdigest(alice)
+    avatar_server.avatars[alice_hash] = (b'alice', '"v1"')
+    store = AvatarStore(path=str(tmp_path), base_url=avatar_server.base_url)
+    store.ttl = 0
+    changed = []
+    store.avatar_changed.connect(lambda email, size: changed.append(email))
+
+    store.fetch(alice, 64)
+    _wait_for_replies(qapp, store)
+    fetched = store.get(alice, 64).fetched
+
+    # The avatar has not changed so the server replies with "304 Not Modified".
+    store.fetch(alice, 64)
+    _wait_for_replies(qapp, store)
+    assert avatar_server.requests == [None, '"v1"']
+    assert changed == [alice]
+    assert store.get(alice, 64).data == b'alice'
+    assert store.get(alice, 64).fetched >= fetched
+
+    # A changed avatar is downloaded again.
+    avatar_server.avatars[alice_hash] = (b'alice v2', '"v2"')
+    store.fetch(alice, 64)
+    _wait_for_replies(qapp, store)
+    assert avatar_server.requests == [None, '"v1"', '"v1"']
+    assert changed == [alice, alice]
+    store = AvatarStore(path=str(tmp_path))
+    assert store.get(alice, 64).data == b'alice v2'
+    assert store.get(alice, 64).etag == '"v2"'
+
+
+def test_disk_store_is_bounded(tmp_path):
+    """The least recently used avatars are removed from the disk store"""
+    store = AvatarStore(path=str(tmp_path))
+    store.max_disk_bytes = 4096
+    for idx in range(8):
+        store.write(('user%d@example.com' % idx, 64), Avatar(b'x' * 1024))
+    assert store.disk_size <= store.max_disk_bytes
+    files = [name for name in os.listdir(tmp_path) if name.endswith('.avatar')]
+    assert len(files) < 8
+    store = AvatarStore(path=str(tmp_path))
+    assert store.get('user7@example.com', 64) is not None
+    assert store.get('user0@example.com', 64) is None
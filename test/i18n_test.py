@@ -1,15 +1,18 @@
 """Tests for the i18n translation module"""
+import glob
 import os
 
 import pytest
 
 from cola import i18n
+from cola import resources
 from cola.i18n import N_
 
 
 @pytest.fixture(autouse=True)
-def i18n_context():
+def i18n_context(tmp_path, monkeypatch):
     """Perform cleanup/teardown of the i18n module"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
     yield
     i18n.uninstall()
 
@@ -75,3 +78,30 @@ def test_get_filename_for_locale():
 
     actual = i18n.get_filename_for_locale('ja_JP')
     assert os.path.basename(actual) == 'ja.po'
+
+
+@pytest.mark.parametrize(
+    'filename', sorted(glob.glob(resources.i18n('*.po'))), ids=os.path.basename
+)
+def test_compile_catalog(filename):
+    """Compiled catalogs contain the translations from each .po file"""
+    messages = i18n.read_po_messages(filename)
+    catalog = i18n.Catalog(i18n.compile_catalog(messages))
+    assert len(catalog) == len(messages) + 1  # The .mo header is the extra entry.
+    for msgid, msgstr in messages.items():
+        assert catalog.get(msgid) == msgstr
+    assert catalog.get('does not exist') is None
+
+
+def test_catalog_cache(monkeypatch):
+    """Compiled catalogs are reused without parsing the .po file"""
+    translation = i18n.Translation('de_DE')
+    assert translation.gettext('Commit@@verb') == 'Commit aufnehmen'
+
+    def read_po_messages(_filename):
+        raise AssertionError('the .po file should not be parsed')
+
+    monkeypatch.setattr(i18n, 'read_po_messages', read_po_messages)
+    translation = i18n.Translation('de_DE')
+    assert isinstance(translation.catalog, i18n.Catalog)
+    assert translation.gettext('Commit@@verb') == 'Commit aufnehmen'
@@ -1,12 +1,14 @@
-"""Tests for crisp SVG rendering in the image diff viewer.
+"""Tests for SVG rendering and background image decoding in the image diff viewer.
 
-These exercise the pure module-level helpers only (no widget event flow), so
-they stay deterministic in the full suite.
+These mostly exercise the module-level helpers and run the decoding tasks
+synchronously so that they stay deterministic in the full suite.
 """
 import sys
 
 import pytest
 
+from cola import qtutils
+from cola.widgets import diff
 from cola.widgets import imageview
 from cola.widgets.diff import Options
 from cola.widgets.diff import comp_logical_size
@@ -14,10 +16,16 @@ from cola.widgets.diff import is_svg_source
 from cola.widgets.diff import load_image_source
 from cola.widgets.diff import render_comp_image
 from cola.widgets.diff import source_logical_size
+from qtpy import QtCore
 from qtpy import QtGui
 from qtpy import QtSvg
 from qtpy import QtWidgets
 
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
 # A minimal SVG whose intrinsic size comes from viewBox alone (no width/height),
 # reproducing the syncthing.svg case that rendered blurry.
 SVG_BYTES = b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 118 118">' b'<circle cx="59" cy="59" r="59" fill="#0891d1"/></svg>'
@@ -118,3 +126,127 @@ def test_render_svg_to_pixmap_scales(qapp, svg_path):
     assert pixmap.devicePixelRatio() == 3.0
     assert pixmap.width() == 354
     assert pixmap.height() == 354
+
+
+def _write_png(path, width, height, color):
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32)
+    image.fill(QtGui.QColor(color))
+    image.setPixelColor(0, 0, QtGui.QColor('#ff0000'))
+    image.save(str(path))
+    return str(path)
+
+
+def _wait_for(loader, qapp):
+    """Process events until an ImageLoader has delivered its results"""
+    for _ in range(500):
+        if loader.task is None and loader.pending is None:
+            return
+        QtCore.QThreadPool.globalInstance().waitForDone(10)
+        qapp.processEvents()
+    raise AssertionError('image loader did not finish')
+
+
+def test_image_cache_evicts_least_recently_used(qapp):
+    first = QtGui.QImage(16, 16, QtGui.QImage.Format_ARGB32)
+    second = QtGui.QImage(16, 16, QtGui.QImage.Format_ARGB32)
+    third = QtGui.QImage(16, 16, QtGui.QImage.Format_ARGB32)
+    cache = imageview.ImageCache(max_bytes=imageview.image_nbytes(first) * 2)
+    cache.put('first', first)
+    cache.put('second', second)
+    assert cache.get('first') is not None
+    cache.put('third', third)
+    # "second" was the least recently used image.
+    assert cache.get('second') is None
+    assert cache.get('first') is not None
+    assert cache.get('third') is not None
+
+
+def test_image_level():
+    assert diff.image_level(2.0) == 0
+    assert diff.image_level(1.0) == 0
+    assert diff.image_level(0.5) == 1
+    assert diff.image_level(0.3) == 1
+    assert diff.image_level(0.25) == 2
+    size = diff.level_size(QtCore.QSize(1001, 3), 2)
+    assert (size.width(), size.height()) == (251, 1)
+
+
+def test_composite_task_decodes_at_view_resolution(qapp, tmp_path):
+    path = _write_png(tmp_path / 'large.png', 2000, 1000, '#00ff00')
+    images = [(path, False, 'a' * 40)]
+    task = diff.ImageCompositeTask(
+        images, [], Options.SIDE_BY_SIDE, QtCore.QSize(500, 500)
+    )
+    layers, _, level, size, image = task.task()
+    assert (size.width(), size.height()) == (2000, 1000)
+    assert level == 2
+    assert (image.width(), image.height()) == (500, 250)
+    # The decoded image is cached by its blob ID.
+    assert layers[0].key == ('blob', 'a' * 40)
+    assert diff._image_cache.get((('blob', 'a' * 40), 2)) is not None
+
+
+def test_composite_task_reuses_decoded_blobs(qapp, tmp_path):
+    oid = 'b' * 40
+    green = _write_png(tmp_path / 'green.png', 64, 64, '#00ff00')
+    blue = _write_png(tmp_path / 'blue.png', 64, 64, '#0000ff')
+    size = QtCore.QSize(64, 64)
+    task = diff.ImageCompositeTask([(green, True, oid)], [], Options.DIFF, size)
+    task.task()
+    # A different file with the same blob ID is not decoded again.
+    task = diff.ImageCompositeTask([(blue, True, oid)], [], Options.DIFF, size)
+    image = task.task()[-1]
+    assert image.pixelColor(32, 32) == QtGui.QColor('#00ff00')
+
+
+@pytest.mark.parametrize('mode', [Options.SIDE_BY_SIDE, Options.DIFF])
+def test_tiles_match_the_full_composite(qapp, tmp_path, mode):
+    before = _write_png(tmp_path / 'before.png', 700, 600, '#336699')
+    after = _write_png(tmp_path / 'after.png', 600, 700, '#996633')
+    images = [(before, False), (after, False)]
+    layers = diff.load_image_layers(images)
+    size, _ = diff.comp_layout([layer.size for layer in layers], mode)
+    full = diff.render_comp_region(
+        layers, mode, 0, QtCore.QRect(QtCore.QPoint(0, 0), size)
+    )
+    rect = QtCore.QRectF(0, 0, size.width(), size.height())
+    tiles = diff.tile_range(size, 0, rect)
+    expect_count = 3 * 2 if mode == Options.SIDE_BY_SIDE else 2 * 2
+    assert len(tiles) == expect_count
+    task = diff.ImageTilesTask(layers, mode, 0, size, tiles)
+    _, _, _, result = task.task()
+    for tile, image in result:
+        expect = full.copy(diff.tile_rect(size, 0, tile))
+        assert image == expect
+        key = diff.tile_cache_key(layers, mode, 0, tile)
+        assert diff._image_cache.get(key) is not None
+
+
+def test_viewer_refines_the_visible_region(qapp, app_context, tmp_path):
+    path = _write_png(tmp_path / 'large.png', 4000, 3000, '#00ff00')
+    blob = _write_png(tmp_path / 'blob.png', 4000, 3000, '#0000ff')
+    app_context.runtask = qtutils.RunTask()
+    viewer = diff.Viewer(app_context)
+    viewer.resize(400, 300)
+    viewer.set_images([(blob, True, 'c' * 40), (path, False)])
+    _wait_for(viewer.image_loader, qapp)
+    assert viewer.layers
+    assert viewer.comp_level > 0
+    pixmap = viewer.image.pixmap
+    assert not pixmap.isNull()
+    assert pixmap.width() < 4000
+    # The temporary file is kept while it can still be decoded.
+    assert app_context.ops.exists(blob)
+
+    # Zooming in replaces the coarse image with tiles for the visible region.
+    viewer.options.zoom_mode.set_index(3)  # 100%
+    viewer.apply_zoom()
+    _wait_for(viewer.tile_loader, qapp)
+    assert viewer.image.tiles
+    assert len(viewer.image.tiles) < len(
+        diff.tile_range(viewer.comp_size, 0, viewer.image.sceneRect())
+    )
+
+    # Temporary files are removed once the images are replaced.
+    viewer.set_images([])
+    assert not app_context.ops.exists(blob)
@@ -0,0 +1,87 @@
+"""Tests for the console log widget"""
+import sys
+
+import pytest
+from qtpy import QtWidgets
+
+from cola.widgets import log
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+def test_model_keeps_the_newest_lines():
+    """The model is a ring buffer that tracks the lines to display"""
+    model = log.LogModel(3)
+    model.append('a\nb', prefix='> ')
+    assert model.pending == 2
+    assert model.take_pending() == ['> a', '> b']
+    assert model.take_pending() == []
+
+    model.append('c')
+    model.append('d\ne\nf\ng')
+    assert len(model) == 3
+    assert model.pending == 3
+    assert model.take_pending() == ['e', 'f', 'g']
+
+    model.clear()
+    assert len(model) == 0
+    assert model.take_pending() == []
+
+
+def _lines(widget):
+    """Return the lines displayed by a log widget without their timestamps"""
+    value = widget.output_text.toPlainText()
+    return [line.split(':  ', 1)[-1] for line in value.splitlines()]
+
+
+def test_messages_are_displayed_in_batches(qapp, app_context, monkeypatch):
+    """Queued messages are displayed with one insert per event loop iteration"""
+    widget = log.LogWidget(app_context, display_usage=False)
+    batches = []
+    take_pending = widget.model.take_pending
+
+    def recording_take_pending():
+        lines = take_pending()
+        batches.append(len(lines))
+        return lines
+
+    monkeypatch.setattr(widget.model, 'take_pending', recording_take_pending)
+
+    for idx in range(100):
+        widget.log(f'line {idx}')
+    qapp.processEvents()
+    qapp.processEvents()
+    assert batches == [100]
+    assert _lines(widget) == [f'line {idx}' for idx in range(100)]
+
+
+def test_displayed_lines_are_bounded(qapp, app_context):
+    """The widget keeps at most cola.loglines lines"""
+    helper.run_git('config', 'cola.loglines', '5')
+    app_context.cfg.reset()
+    widget = log.LogWidget(app_context, display_usage=False)
+    assert widget.model.lines.maxlen == 5
+
+    for idx in range(3):
+        widget.append(f'first {idx}')
+    widget.flush()
+    widget.append('\n'.join(f'second {idx}' for idx in range(1000)))
+    widget.flush()
+    assert _lines(widget) == [f'second {idx}' for idx in range(995, 1000)]
+
+    widget.clear()
+    assert widget.output_text.toPlainText() == ''
+    assert len(widget.model) == 0
@@ -1,4 +1,5 @@
 import os
+import threading
 from unittest.mock import Mock
 
 import pytest
@@ -38,6 +39,19 @@ def test_project(app_context):
     assert app_context.model.project == project
 
 
+def test_set_worktree_clears_ahead_behind_cache(app_context, tmp_path):
+    """Ahead/behind counts are forgotten when switching repositories"""
+    model = app_context.model
+    model.ahead_behind_cache[('a' * 40, 'b' * 40)] = (1, 2)
+    model.set_worktree(core.getcwd())
+    assert model.ahead_behind_cache
+
+    other = str(tmp_path / 'other')
+    helper.run_git('init', '-q', other)
+    model.set_worktree(other)
+    assert model.ahead_behind_cache == {}
+
+
 def test_local_branches(app_context):
     """Test the 'local_branches' attribute."""
     helper.commit_files()
@@ -339,3 +353,104 @@ def test_run_remote_action(mock_context):
     assert kwargs['verbose']
     assert 'tags' not in kwargs
     assert 'rebase' not in kwargs
+
+
+def _add_bare_remotes(tmp_path, names, hook=''):
+    """Create bare repositories and add them as remotes"""
+    for name in names:
+        path = tmp_path / name
+        helper.run_git('init', '--quiet', '--bare', str(path))
+        if hook:
+            hook_path = path / 'hooks' / 'pre-receive'
+            hook_path.write_text('#!/bin/sh\n' + hook.replace('NAME', name))
+            hook_path.chmod(0o755)
+        helper.run_git('remote', 'add', name, str(path))
+
+
+def test_push_all(app_context, tmp_path):
+    """Each remote gets its own result and the refs are updated once"""
+    helper.commit_files()
+    remotes = ['one', 'two', 'three']
+    _add_bare_remotes(tmp_path, remotes)
+    helper.run_git('remote', 'add', 'missing', str(tmp_path / 'missing'))
+    app_context.cfg.reset()
+    finished = []
+
+    results = app_context.model.push_all(
+        remotes + ['missing'],
+        jobs=2,
+        callback=lambda remote, result: finished.append(remote),
+        local_branch='main',
+        remote_branch='main',
+    )
+    assert list(results) == remotes + ['missing']
+    assert sorted(finished) == sorted(results)
+    for remote in remotes:
+        assert results[remote][0] == 0
+        out = helper.run_git(f'--git-dir={tmp_path / remote}', 'rev-parse', 'main')
+        assert out.strip() == helper.run_git('rev-parse', 'main').strip()
+    assert results['missing'][0] != 0
+    assert app_context.model.remote_branches == [
+        'one/main',
+        'three/main',
+        'two/main',
+    ]
+
+
+def test_push_all_runs_concurrently(app_context, tmp_path):
+    """Pushes to several remotes overlap in time"""
+    helper.commit_files()
+    remotes = ['one', 'two', 'three']
+    markers = tmp_path / 'markers'
+    markers.mkdir()
+    hook = f'touch "{markers}/started-NAME"\n' 'sleep 1\n' f'ls "{markers}" >"{tmp_path}/seen-NAME"\n'
+    _add_bare_remotes(tmp_path, remotes, hook=hook)
+    app_context.cfg.reset()
+
+    results = app_context.model.push_all(
+        remotes, jobs=3, local_branch='main', remote_branch='main'
+    )
+    assert [result[0] for result in results.values()] == [0, 0, 0]
+    seen = [(tmp_path / f'seen-{remote}').read_text().split() for remote in remotes]
+    # Every push started before the first push finished.
+    assert [len(names) for names in seen] == [3, 3, 3]
+
+
+def test_push_all_serializes_pruning_pushes(app_context, tmp_path):
+    """Pushes that delete refs do not overlap"""
+    helper.commit_files()
+    remotes = ['one', 'two', 'three']
+    markers = tmp_path / 'markers'
+    markers.mkdir()
+    hook = f'touch "{markers}/started-NAME"\n' 'sleep 1\n' f'ls "{markers}" >"{tmp_path}/seen-NAME"\n'
+    _add_bare_remotes(tmp_path, remotes, hook=hook)
+    app_context.cfg.reset()
+
+    results = app_context.model.push_all(
+        remotes, jobs=3, local_branch='main', remote_branch='main', prune=True
+    )
+    assert [result[0] for result in results.values()] == [0, 0, 0]
+    seen = [(tmp_path / f'seen-{remote}').read_text().split() for remote in remotes]
+    assert sorted(len(names) for names in seen) == [1, 2, 3]
+
+
+def test_push_all_waits_for_the_index_lock(app_context, tmp_path):
+    """Pushes are serialized with the commands that hold the index lock"""
+    helper.commit_files()
+    _add_bare_remotes(tmp_path, ['one'])
+    app_context.cfg.reset()
+
+    results = {}
+    with git.index_lock():
+        thread = threading.Thread(
+            target=lambda: results.update(
+                app_context.model.push_all(
+                    ['one'], local_branch='main', remote_branch='main'
+                )
+            )
+        )
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+    thread.join(30)
+    assert results['one'][0] == 0
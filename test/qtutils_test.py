@@ -0,0 +1,86 @@
+"""Tests the cola.qtutils module"""
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from cola import qtutils
+from qtpy import QtWidgets
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(
+            sys.argv[:1] if sys.argv else ['git-cola-test']
+        )
+    yield instance
+
+
+def test_lazy_dock_creates_its_widget_when_shown(qapp):
+    """Lazy docks create their widget when they are first shown"""
+    window = QtWidgets.QMainWindow()
+    window.setCentralWidget(QtWidgets.QWidget(window))
+    created = []
+
+    def create_widget(dock):
+        widget = QtWidgets.QLabel('lazy', dock)
+        created.append(widget)
+        return widget
+
+    dock = qtutils.create_dock('Lazy', 'Lazy', window, func=create_widget, lazy=True)
+    window.addDockWidget(qtutils.Qt.RightDockWidgetArea, dock)
+    qtutils.hide_dock(dock)
+    window.show()
+    qapp.processEvents()
+    assert created == []
+    assert dock.widget() is None
+
+    dock.toggleViewAction().trigger()
+    qapp.processEvents()
+    assert len(created) == 1
+    assert dock.widget() is created[0]
+
+    # The widget is only created once.
+    qtutils.hide_dock(dock)
+    dock.toggleViewAction().trigger()
+    qapp.processEvents()
+    assert len(created) == 1
+    window.close()
+
+
+def test_dock_creates_its_widget_immediately(qapp):
+    """Docks that are not lazy create their widget immediately"""
+    window = QtWidgets.QMainWindow()
+    dock = qtutils.create_dock(
+        'Eager', 'Eager', window, func=lambda dock: QtWidgets.QLabel('eager', dock)
+    )
+    assert isinstance(dock.widget(), QtWidgets.QLabel)
+
+
+def test_latest_task_runner_keeps_the_latest_request(qapp):
+    """Only the latest pending task runs and superseded results are dropped"""
+    context = Mock()
+    runner = qtutils.LatestTaskRunner(context)
+    results = []
+    first = qtutils.SimpleTask(lambda: 'first')
+    second = qtutils.SimpleTask(lambda: 'second')
+    third = qtutils.SimpleTask(lambda: 'third')
+
+    runner.submit(first, results.append)
+    runner.submit(second, results.append)
+    runner.submit(third, results.append)
+    # One task runs at a time and the latest request replaces the pending one.
+    assert context.runtask.start.call_count == 1
+    assert runner.tasks() == [first, third]
+
+    first.run()
+    runner.finish(first)
+    assert results == []
+    assert context.runtask.start.call_args[0][0] is third
+    third.run()
+    runner.finish(third)
+    assert results == ['third']
+    assert runner.tasks() == []
@@ -108,3 +108,36 @@ def test_upstream_checkbox_toggled_enabling_skips_prompt_when_remembered():
     with patch('cola.widgets.remote.Interaction.confirm') as confirm:
         remote.Push.upstream_checkbox_toggled(dialog, True)
     confirm.assert_not_called()
+
+
+def test_push_to_all_combines_the_results():
+    dialog = DummyPushDialog()
+    dialog.selected_remotes = ['one', 'two', 'three']
+    dialog.close_on_completion_checkbox = FakeCheckbox(True)
+    dialog.remote_messages_checkbox = FakeCheckbox(False)
+    dialog.model = Mock()
+    dialog.model.push_all.return_value = {
+        'three': (0, 'out three', ''),
+        'two': (1, '', 'err two'),
+        'one': (0, 'out one', 'err one'),
+    }
+    with (
+        patch('cola.widgets.remote.prefs.notify_on_push', return_value=True),
+        patch('cola.widgets.remote.prefs.push_jobs', return_value=2),
+        patch('cola.widgets.remote.display.push_notification') as notification,
+    ):
+        result = remote.RemoteActionDialog.push_to_all(dialog, 'one', tags=True)
+
+    # The results are combined in the order that the remotes were selected,
+    # independently of the order in which the pushes finished.
+    expect = None
+    for name in dialog.selected_remotes:
+        expect = remote.combine(dialog.model.push_all.return_value[name], expect)
+    assert result == expect
+    assert result[0] == 1
+    args, kwargs = dialog.model.push_all.call_args
+    assert args == (['one', 'two', 'three'],)
+    assert kwargs['jobs'] == 2
+    assert kwargs['tags']
+    notification.assert_called_once()
+    assert notification.call_args[0][2] == 'Not pushed: two\t\tPushed: one, three'
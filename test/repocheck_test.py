@@ -0,0 +1,111 @@
+"""Test the cola.repocheck module"""
+import os
+import queue
+import threading
+
+from cola import repocheck
+
+from . import helper
+
+
+def _make_repos(tmp_path):
+    """Create a git worktree, a plain directory and a missing path"""
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    helper.run_git('init', '--quiet', str(repo))
+    plain = tmp_path / 'plain'
+    plain.mkdir()
+    missing = tmp_path / 'missing'
+    return str(repo), str(plain), str(missing)
+
+
+def test_wait(tmp_path):
+    """Repositories are reported as valid or missing"""
+    repo, plain, missing = _make_repos(tmp_path)
+    checker = repocheck.RepoChecker()
+    assert checker.state(repo) == repocheck.CHECKING
+
+    states = checker.wait([repo, plain, missing])
+    assert states == {
+        repo: repocheck.VALID,
+        plain: repocheck.MISSING,
+        missing: repocheck.MISSING,
+    }
+    assert checker.state(repo) == repocheck.VALID
+    assert checker.state(plain) == repocheck.MISSING
+
+
+def test_unresponsive_paths_time_out(tmp_path):
+    """Paths that block are reported as timed out without delaying the others"""
+    repo, plain, _ = _make_repos(tmp_path)
+    unblock = threading.Event()
+
+    def verify(path):
+        if path == plain:
+            unblock.wait()
+        return repocheck.is_git_worktree(path)
+
+    checker = repocheck.RepoChecker(verify=verify, timeout=0.2)
+    try:
+        states = checker.wait([repo, plain])
+        assert states == {repo: repocheck.VALID, plain: repocheck.TIMEOUT}
+        assert checker.state(plain) == repocheck.CHECKING
+    finally:
+        unblock.set()
+
+
+def test_check_calls_back_with_each_result(tmp_path):
+    """check() reports the results from a background thread"""
+    repo, plain, _ = _make_repos(tmp_path)
+    checker = repocheck.RepoChecker()
+    results = queue.SimpleQueue()
+    checker.check([repo, plain], lambda path, state: results.put((path, state)))
+
+    reported = {results.get(timeout=5.0), results.get(timeout=5.0)}
+    assert reported == {(repo, repocheck.VALID), (plain, repocheck.MISSING)}
+
+
+def test_unchanged_repositories_are_not_verified_again(tmp_path):
+    """The cached result is used until the repository's stat() details change"""
+    repo, _, _ = _make_repos(tmp_path)
+    calls = []
+
+    def verify(path):
+        calls.append(path)
+        return True
+
+    checker = repocheck.RepoChecker(verify=verify)
+    assert checker.wait([repo]) == {repo: repocheck.VALID}
+    assert checker.wait([repo]) == {repo: repocheck.VALID}
+    assert calls == [repo]
+
+    git_dir = os.path.join(repo, '.git')
+    mtime = os.stat(git_dir).st_mtime_ns + 1000000000
+    os.utime(git_dir, ns=(mtime, mtime))
+    checker.wait([repo])
+    assert calls == [repo, repo]
+
+
+def test_concurrent_checks_share_the_result(tmp_path):
+    """A path that is already being checked is not checked twice"""
+    repo, _, _ = _make_repos(tmp_path)
+    started = threading.Event()
+    unblock = threading.Event()
+    calls = []
+
+    def verify(path):
+        calls.append(path)
+        started.set()
+        unblock.wait()
+        return True
+
+    checker = repocheck.RepoChecker(verify=verify)
+    results = queue.SimpleQueue()
+    checker.check([repo], lambda path, state: results.put(state))
+    assert started.wait(timeout=5.0)
+    checker.check([repo], lambda path, state: results.put(state))
+    unblock.set()
+
+    assert results.get(timeout=5.0) == repocheck.VALID
+    assert results.get(timeout=5.0) == repocheck.VALID
+    assert calls == [repo]
@@ -0,0 +1,184 @@
+"""Tests for the search dialog"""
+import sys
+import time
+
+import pytest
+from qtpy import QtCore
+from qtpy import QtWidgets
+
+from cola.widgets import search
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Store the commit index in a temporary directory"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+
+def _make_history(count):
+    """Create commits that each add a file containing "needle" """
+    for idx in range(count):
+        filename = f'file{idx}'
+        with open(filename, 'w', encoding='utf-8') as fh:
+            fh.write(f'needle {idx}\n')
+        helper.run_git('add', filename)
+        helper.run_git('commit', '-q', '-m', f'commit {idx}')
+
+
+def _git_log(context, *args, **kwargs):
+    """Return the object IDs from "git log" """
+    out = context.git.log(no_color=True, pretty='format:%H', *args, **kwargs)[1]
+    return out.split()
+
+
+def _oids(results):
+    """Return the object IDs from search results
+
+    Relative dates such as "1 second ago" depend on when the results were
+    formatted so only the object IDs are compared.
+    """
+    return [oid for oid, _ in results]
+
+
+def _options(query, max_count=500):
+    opts = search.SearchOptions()
+    opts.query = query
+    opts.max_count = max_count
+    return opts
+
+
+def test_git_searches_return_the_first_page(app_context):
+    """Searches that run "git log" return the first max_count results"""
+    _make_history(4)
+    expect = _git_log(app_context, '-Sneedle', all=True)
+    assert len(expect) == 4
+    results = search.DiffSearch(app_context, _options('needle')).search()
+    assert _oids(results) == expect
+    assert results[0][1].startswith('Your Name - commit 3 - ')
+    results = search.DiffSearch(app_context, _options('needle', 3)).search()
+    assert _oids(results) == expect[:3]
+
+    results = search.PathSearch(app_context, _options('file1 file2')).search()
+    assert _oids(results) == _git_log(app_context, '--', 'file1', 'file2', all=True)
+    results = search.RevisionSearch(app_context, _options('HEAD~2..')).search()
+    assert _oids(results) == _git_log(app_context, 'HEAD~2..')
+
+
+def test_index_searches_are_paged(app_context):
+    """Searches that use the commit index return one page at a time"""
+    _make_history(5)
+    engine = search.MessageSearch(app_context, _options('commit', 2))
+    batches = list(engine.batches())
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    results = [result for batch in batches for result in batch]
+    assert _oids(results) == _git_log(app_context, all=True, grep='commit')
+
+
+class FakeSearch(search.SearchEngine):
+    """Return fixed batches and record when the search is closed"""
+
+    def __init__(self, context, model, batches):
+        search.SearchEngine.__init__(self, context, model)
+        self.fake_batches = batches
+        self.closed = False
+
+    def batches(self):
+        try:
+            yield from self.fake_batches
+        finally:
+            self.closed = True
+
+
+def test_search_run_pages_and_cancel():
+    """Batches are split into pages and cancelling closes the search"""
+    engine = FakeSearch(None, _options('query'), [[1, 2, 3], [4], [5, 6]])
+    run = search.SearchRun(engine)
+    assert run.next_batch(2) == [1, 2]
+    assert run.next_batch(2) == [3]
+    assert run.next_batch(2) == [4]
+    assert not engine.closed
+
+    run.cancel()
+    assert engine.cancelled
+    assert engine.closed
+    assert run.next_batch(2) is None
+
+
+def test_search_run_exhausted():
+    """The search is exhausted once all of the batches have been read"""
+    engine = FakeSearch(None, _options('query'), [[1, 2]])
+    run = search.SearchRun(engine)
+    assert run.next_batch(5) == [1, 2]
+    assert not run.exhausted
+    assert run.next_batch(5) is None
+    assert run.exhausted
+
+    # Invalid queries produce no results.
+    engine = FakeSearch(None, _options('q'), [[1, 2]])
+    run = search.SearchRun(engine)
+    assert run.next_batch(5) is None
+    assert run.exhausted
+
+
+def _wait_for_search(qapp, dialog):
+    """Process events until the dialog's search task has finished"""
+    deadline = time.monotonic() + 10.0
+    while dialog.task is not None and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    QtCore.QThreadPool.globalInstance().waitForDone(10000)
+    qapp.processEvents()
+    assert dialog.task is None
+
+
+def test_dialog_loads_results_in_the_background(qapp, app_context):
+    """Results are streamed into the list one page at a time"""
+    _make_history(12)
+    dialog = search.Search(app_context, search.SearchOptions(), None)
+    dialog.set_mode(dialog.DIFF)
+    dialog.query.setText('needle')
+    dialog.max_count.setValue(5)
+    dialog.search_callback()
+    _wait_for_search(qapp, dialog)
+
+    # The hidden list has room for more results so every page is loaded.
+    expect = _git_log(app_context, '-Sneedle', all=True)
+    assert _oids(dialog.results) == expect
+    assert dialog.commit_list.count() == len(expect)
+    assert dialog.search_run.exhausted
+    assert dialog.status.text() == '12 commits found'
+
+
+def test_dialog_cancels_the_search_when_the_query_changes(qapp, app_context):
+    """Changing the query stops the search and ignores its results"""
+    _make_history(3)
+    dialog = search.Search(app_context, search.SearchOptions(), None)
+    dialog.set_mode(dialog.DIFF)
+    dialog.query.setText('needle')
+    dialog.search_callback()
+    run = dialog.search_run
+    assert dialog.task is not None
+
+    dialog.query.setText('other')
+    assert run.cancelled
+    assert dialog.search_run is None
+    assert dialog.task is None
+    _wait_for_search(qapp, dialog)
+    assert dialog.results == []
+    assert dialog.commit_list.count() == 0
+    assert dialog.status.text() == ''
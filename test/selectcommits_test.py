@@ -0,0 +1,145 @@
+"""Tests for the paged commit chooser"""
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from cola.widgets import selectcommits
+from qtpy import QtWidgets
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(
+            sys.argv[:1] if sys.argv else ['git-cola-test']
+        )
+    yield instance
+
+
+def _make_history(count):
+    helper.commit_files()
+    for idx in range(count):
+        helper.run_git('commit', '--allow-empty', '-m', f'Commit {idx}')
+
+
+def test_model_loads_pages(app_context):
+    """The model loads the log one page at a time"""
+    _make_history(4)
+    model = selectcommits.Model(app_context)
+    model.page_size = 2
+
+    model.fetch_more()
+    assert model.summaries == ['Commit 3', 'Commit 2']
+    assert not model.exhausted
+    model.fetch_more()
+    model.fetch_more()
+    assert model.summaries[-1] == 'initial commit'
+    assert model.exhausted
+
+
+def test_model_history_ignores_the_search(app_context):
+    """The history used for exporting patches is not filtered"""
+    _make_history(4)
+    model = selectcommits.Model(app_context)
+    model.page_size = 2
+    model.set_search('Commit 1', model.SEARCH_MESSAGE)
+    model.fetch_more()
+    assert model.summaries == ['Commit 1']
+
+    oid = model.revisions[0]
+    history = model.history([oid])
+    # Whole pages are loaded until the commit is found.
+    assert len(history) == 4
+    assert oid in history
+
+
+def test_model_history_continues_from_the_loaded_pages(app_context, monkeypatch):
+    """Pages that are already loaded are not fetched again"""
+    _make_history(6)
+    model = selectcommits.Model(app_context)
+    model.page_size = 2
+    model.fetch_more()
+    loaded = list(model.revisions)
+
+    skips = []
+    fetch = model.fetch
+
+    def fetch_page(skip, *args, **kwargs):
+        skips.append(skip)
+        return fetch(skip, *args, **kwargs)
+
+    monkeypatch.setattr(model, 'fetch', fetch_page)
+    oid = fetch(4)[0][0]
+    history = model.history([loaded[0], oid])
+    assert skips == [2, 4]
+    assert history[:2] == loaded
+    assert history[4] == oid
+    assert len(history) == 6
+
+
+def _finish_started_task(dialog, runtask):
+    """Run the latest task started by the dialog and finish it"""
+    task = runtask.start.call_args[0][0]
+    task.result = task.task()
+    dialog.page_loader.finish(task)
+    return task
+
+
+def test_dialog_loads_more_commits(qapp, app_context):
+    """The next page is loaded in the background when the end is visible"""
+    _make_history(40)
+    model = selectcommits.Model(app_context)
+    model.page_size = 10
+    app_context.runtask = Mock()
+    dialog = selectcommits.SelectCommits(app_context, model)
+
+    model.fetch_more()
+    dialog.commits.addItems(model.summaries)
+    dialog.fetch_more()
+    assert app_context.runtask.start.call_count == 1
+    # Only one page is loaded at a time.
+    dialog.fetch_more()
+    assert app_context.runtask.start.call_count == 1
+
+    _finish_started_task(dialog, app_context.runtask)
+    assert dialog.commits.count() == 20
+    assert dialog.commits.item(19).text() == 'Commit 20'
+
+
+def test_dialog_search_discards_stale_pages(qapp, app_context):
+    """Searching restarts the log and ignores pages from earlier searches"""
+    _make_history(12)
+    model = selectcommits.Model(app_context)
+    model.page_size = 10
+    app_context.runtask = Mock()
+    dialog = selectcommits.SelectCommits(app_context, model)
+    dialog.fetch_more()
+    assert app_context.runtask.start.call_count == 1
+
+    # Searches made while a page is loading replace the pending search.
+    dialog.search.setText('Commit')
+    dialog.search_log()
+    dialog.search.setText('Commit 1')
+    dialog.search_log()
+    assert app_context.runtask.start.call_count == 1
+    assert dialog.page_loader.pending[0].search == 'Commit 1'
+
+    # The stale page is not displayed and the latest search is started.
+    _finish_started_task(dialog, app_context.runtask)
+    assert dialog.commits.count() == 0
+    assert app_context.runtask.start.call_count == 2
+
+    task = _finish_started_task(dialog, app_context.runtask)
+    assert task.search == 'Commit 1'
+    items = [dialog.commits.item(idx).text() for idx in range(dialog.commits.count())]
+    assert items == ['Commit 11', 'Commit 10', 'Commit 1']
+    assert app_context.runtask.start.call_count == 2
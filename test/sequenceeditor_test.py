@@ -0,0 +1,76 @@
+"""Tests for the cola.sequenceeditor module"""
+from unittest.mock import Mock
+
+from cola import gitcmds
+from cola import sequenceeditor
+
+from . import helper
+from .helper import app_context
+
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+def test_changed_files_cache(tmp_path):
+    """Cached paths are found by full object IDs and persisted"""
+    path = str(tmp_path / 'changed-files.json')
+    cache = sequenceeditor.ChangedFilesCache(path=path, max_entries=2)
+    cache.load()
+    cache.update({
+        'abc123': ['a.txt'],
+        'abd456': ['b.txt', 'c.txt'],
+    })
+    assert cache.get('abc123') == ['a.txt']
+    assert cache.get('abd456') == ['b.txt', 'c.txt']
+    assert cache.get('abd') is None  # Abbreviated object IDs are not matched.
+    assert cache.get('fff') is None
+
+    # "abc123" is the least recently used entry once "fed789" is added.
+    cache.update({'fed789': []})
+    cache.save()
+
+    cache = sequenceeditor.ChangedFilesCache(path=path, max_entries=2)
+    cache.load()
+    assert cache.get('abc123') is None
+    assert cache.get('abd456') == ['b.txt', 'c.txt']
+    assert cache.get('fed789') == []
+
+
+def test_changed_files_cache_reads_are_not_saved(tmp_path):
+    """Reading from the cache does not rewrite the cache file"""
+    path = str(tmp_path / 'changed-files.json')
+    cache = sequenceeditor.ChangedFilesCache(path=path)
+    cache.load()
+    cache.update({'abc123': ['a.txt']})
+    cache.save()
+    assert not cache.modified
+
+    cache.get('abc123')
+    assert not cache.modified
+
+
+def test_calculate_oid_to_paths_resolves_abbreviated_oids(app_context, tmp_path):
+    """Abbreviated object IDs only match cache entries for this repository"""
+    helper.commit_files()
+    oid = gitcmds.rev_parse(app_context, 'HEAD')
+    # An entry from another repository that shares the abbreviated prefix.
+    other_oid = oid[:7] + '0' * (len(oid) - 7)
+    if other_oid == oid:
+        other_oid = oid[:7] + '1' * (len(oid) - 7)
+
+    cache = sequenceeditor.ChangedFilesCache(path=str(tmp_path / 'cache.json'))
+    cache.update({other_oid: ['other.txt']})
+    cache.save()
+
+    editor = Mock()
+    editor.context = app_context
+    editor.oid_to_paths = {}
+    editor.changed_files_cache = cache
+    editor.running = True
+    editor.BATCH_SIZE = sequenceeditor.Editor.BATCH_SIZE
+    sequenceeditor.Editor.calculate_oid_to_paths(editor, [oid[:7]])
+
+    assert editor.oid_to_paths == {oid[:7]: ['A', 'B']}
+    assert cache.get(oid) == ['A', 'B']
+    assert cache.get(other_oid) == ['other.txt']
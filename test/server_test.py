@@ -336,3 +336,48 @@ def test_server_unsetenv():
         assert (service.ops_local.getenv('key_test') is None) == (
             service.ops_remote.getenv('key_test') is None
         )
+
+
+def test_server_stream_command():
+    with create_test_server() as service:
+        cmd = ['python', '-c', 'for i in range(2500): print(f"line {i} Café")']
+        local_stream = service.ops_local.stream_command(cmd, separator='\n')
+        remote_stream = service.ops_remote.stream_command(cmd, separator='\n')
+
+        assert list(local_stream) == list(remote_stream)
+        assert local_stream.status == remote_stream.status == 0
+        assert local_stream.bytes_out == remote_stream.bytes_out
+
+
+def test_server_stream_command_close():
+    with create_test_server() as service:
+        cmd = [
+            'python',
+            '-c',
+            'import sys, time; print("first"); sys.stdout.flush(); time.sleep(60)',
+        ]
+        with service.ops_remote.stream_command(cmd, separator='\n') as stream:
+            for line in stream:
+                assert line == 'first'
+                break
+
+        assert stream.closed
+        assert stream.killed
+
+
+def test_server_stream_command_cancel():
+    with create_test_server() as service:
+        cmd = [
+            'python',
+            '-c',
+            'import sys, time; print("first"); sys.stdout.flush(); time.sleep(60)',
+        ]
+        stream = service.ops_remote.stream_command(cmd, separator='\n')
+        assert stream.read() == ['first']
+        stream.cancel()
+        assert stream.read() is None
+        stream.close()
+        assert stream.closed
+        assert stream.killed
+        # The connection is still usable once the stream was closed.
+        assert service.ops_remote.getcwd() == service.ops_local.getcwd()
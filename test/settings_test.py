@@ -1,5 +1,6 @@
 """Test the cola.settings module"""
 import os
+import threading
 
 import pytest
 
@@ -87,3 +88,27 @@ def test_rename_bookmark():
     expect = ['a', 'test', 'c']
     actual = [i['name'] for i in settings.bookmarks]
     assert expect == actual
+
+
+def test_unresponsive_entries_are_kept():
+    """Entries that cannot be checked before the timeout are not removed"""
+    unblock = threading.Event()
+
+    def verify(path):
+        if path == '/tmp/unresponsive':
+            unblock.wait()
+            return False
+        return path == '/tmp/exists'
+
+    settings = Settings.read(verify=verify)
+    settings.checker.timeout = 0.2
+    settings.add_recent('/tmp/exists', 10)
+    settings.add_recent('/tmp/missing', 10)
+    settings.add_recent('/tmp/unresponsive', 10)
+    try:
+        settings.remove_missing_recent()
+    finally:
+        unblock.set()
+
+    paths = [entry['path'] for entry in settings.recent]
+    assert paths == ['/tmp/unresponsive', '/tmp/exists']
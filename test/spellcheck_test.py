@@ -1,3 +1,4 @@
+import os
 import sys
 from unittest.mock import MagicMock
 
@@ -32,6 +33,82 @@ def assert_spellcheck(check):
         assert isinstance(word, compat.ustr)
 
 
+@pytest.fixture
+def words_path(tmp_path, monkeypatch):
+    """Provide a small word list and an isolated cache directory"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    path = tmp_path / 'words'
+    path.write_text('hello\nworld\nspelling\nreceive\nunicøde\n', encoding='utf-8')
+    return str(path)
+
+
+def test_spellcheck_check_and_suggest(words_path):
+    """Words are checked and corrected using the compiled dictionary"""
+    check = spellcheck.NorvigSpellCheck(words=words_path, propernames='')
+    assert check.check('hello')
+    assert check.check('Hello.')
+    assert check.check('unicøde')
+    assert not check.check('helo')
+    assert check.suggest('helo') == ['hello']
+    assert check.suggest('recieve') == ['receive']
+    assert check.suggest('speling') == ['spelling']
+    assert check.suggest('qqqqqqqq') == ['qqqqqqqq']
+
+
+def test_spellcheck_extra_words(words_path):
+    """Words added at runtime are checked and suggested"""
+    check = spellcheck.NorvigSpellCheck(words=words_path, propernames='')
+    check.add_word('Aguilar')
+    assert check.check('Aguilar')
+    assert check.suggest('Agilar') == ['Aguilar']
+
+
+def test_spellcheck_dictionary_is_cached(words_path, tmp_path):
+    """Compiled dictionaries are reused until a word list is modified"""
+    check = spellcheck.NorvigSpellCheck(words=words_path, propernames='')
+    check.init()
+    cache_dir = tmp_path / 'cache' / 'git-cola' / 'spellcheck'
+    cache_files = list(cache_dir.iterdir())
+    assert len(cache_files) == 1
+
+    check = spellcheck.NorvigSpellCheck(words=words_path, propernames='')
+    check.read_words = MagicMock()
+    check.init()
+    assert not check.read_words.called
+    assert check.check('world')
+
+    with open(words_path, 'a', encoding='utf-8') as words_file:
+        words_file.write('extra\n')
+    stat = os.stat(words_path)
+    os.utime(words_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    check = spellcheck.NorvigSpellCheck(words=words_path, propernames='')
+    assert check.check('extra')
+    # The stale dictionary is replaced rather than left behind in the cache.
+    new_cache_files = list(cache_dir.iterdir())
+    assert len(new_cache_files) == 1
+    assert new_cache_files != cache_files
+
+
+def test_spellcheck_dictionary_cache_is_shared(words_path, tmp_path):
+    """Dictionaries for different word lists do not prune each other"""
+    other_path = tmp_path / 'other-words'
+    other_path.write_text('other\n', encoding='utf-8')
+    check = spellcheck.NorvigSpellCheck(words=words_path, propernames='')
+    check.init()
+    check = spellcheck.NorvigSpellCheck(words=str(other_path), propernames='')
+    check.init()
+    cache_dir = tmp_path / 'cache' / 'git-cola' / 'spellcheck'
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_spellcheck_edit_distance():
+    """Transpositions count as a single edit"""
+    assert spellcheck.edit_distance('receive', 'receive', 2) == 0
+    assert spellcheck.edit_distance('recieve', 'receive', 2) == 1
+    assert spellcheck.edit_distance('kitten', 'sitting', 5) == 3
+    assert spellcheck.edit_distance('kitten', 'sitting', 2) == 3
+
+
 @pytest.fixture(scope='module')
 def qapp():
     """Provide a QApplication for the widget tests."""
@@ -1,3 +1,4 @@
+from cola.models import stash
 from cola.models.stash import StashModel
 
 from . import helper
@@ -49,3 +50,46 @@ def test_stash_info_on_branch_with_slash(app_context):
         'On feature/a: some message',
         'On a: some message',
     )
+
+
+def _make_stashes(count):
+    """Create stashes that each change file A"""
+    helper.commit_files()
+    for idx in range(count):
+        helper.write_file('A', f'change {idx}\n')
+        helper.run_git('stash', 'push', '-m', f'stash {idx}')
+
+
+def test_stash_info_object_ids(app_context):
+    """The stash list includes the object IDs of the stash commits"""
+    _make_stashes(2)
+    oids = StashModel(app_context).stash_info()[4]
+    expect = helper.run_git('rev-parse', 'stash@{0}', 'stash@{1}').split()
+    assert oids == expect
+
+
+def test_stash_diff_runs_a_single_command(app_context, monkeypatch):
+    """The diffstat and patch come from one command and are cached by ID"""
+    _make_stashes(1)
+    stash.stash_diff_cache().clear()
+    model = StashModel(app_context)
+    oid = model.stash_info()[4][0]
+    calls = []
+    stash_cmd = app_context.git.stash
+
+    def recording_stash(*args, **kwargs):
+        calls.append(args)
+        return stash_cmd(*args, **kwargs)
+
+    monkeypatch.setattr(app_context.git, 'stash', recording_stash)
+
+    assert model.cached_stash_diff(oid) is None
+    diff = model.stash_diff('stash@{0}', oid=oid)
+    assert ' A | 1 +' in diff
+    assert '+change 0' in diff
+    assert diff.index(' 1 file changed') < diff.index('diff --git a/A b/A')
+    assert len(calls) == 1
+
+    assert model.stash_diff('stash@{0}', oid=oid) == diff
+    assert model.cached_stash_diff(oid) == diff
+    assert len(calls) == 1
@@ -0,0 +1,79 @@
+"""Tests for the stash dialog"""
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from qtpy import QtWidgets
+
+from cola.models import stash as stash_model
+from cola.widgets import stash
+
+from . import helper
+from .helper import app_context
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """Provide a QApplication for widget tests."""
+    instance = QtWidgets.QApplication.instance()
+    if instance is None:
+        instance = QtWidgets.QApplication(sys.argv[:1])
+    yield instance
+
+
+def _make_view(app_context, count):
+    """Create stashes and a stash dialog that records its diff tasks"""
+    helper.commit_files()
+    for idx in range(count):
+        helper.write_file('A', f'change {idx}\n')
+        helper.run_git('stash', 'push', '-m', f'stash {idx}')
+    stash_model.stash_diff_cache().clear()
+    app_context.runtask = MagicMock()
+    return stash.view(app_context, show=False)
+
+
+def _run_started_task(view, runtask):
+    """Run the latest task started by the dialog and finish it"""
+    task = runtask.start.call_args[0][0]
+    task.result = task.task()
+    view.diff_loader.finish(task)
+    return task
+
+
+def test_stash_diffs_are_loaded_in_the_background(qapp, app_context):
+    """Only the diff for the most recently selected stash is loaded"""
+    view = _make_view(app_context, 3)
+    # The first stash is selected when the dialog is created.
+    runtask = app_context.runtask
+    first_task = runtask.start.call_args[0][0]
+    assert first_task.oid == view.oids[0]
+
+    # Selections made while a diff is loading replace the pending task.
+    view.stash_list.setCurrentRow(1)
+    view.stash_list.setCurrentRow(2)
+    assert runtask.start.call_count == 1
+    assert view.diff_loader.pending[0].oid == view.oids[2]
+
+    # The first diff arrives late and is ignored.
+    _run_started_task(view, runtask)
+    assert '+change' not in view.stash_text.toPlainText()
+    assert runtask.start.call_count == 2
+    task = _run_started_task(view, runtask)
+    assert task.oid == view.oids[2]
+    assert '+change 0' in view.stash_text.toPlainText()
+    assert not view.diff_loader.tasks()
+
+
+def test_cached_stash_diffs_are_displayed_immediately(qapp, app_context):
+    """Stashes whose diff has been loaded do not start another task"""
+    view = _make_view(app_context, 2)
+    _run_started_task(view, app_context.runtask)
+    view.stash_list.setCurrentRow(1)
+    assert app_context.runtask.start.call_count == 2
+
+    view.stash_list.setCurrentRow(0)
+    assert app_context.runtask.start.call_count == 2
+    assert '+change 1' in view.stash_text.toPlainText()
@@ -1,5 +1,6 @@
 """Tests the cola.utils module."""
 import os
+import sys
 
 from cola import core
 from cola import operations
@@ -109,3 +110,12 @@ def test_select_directory_prefers_directories():
         assert expect == actual
     finally:
         os.remove(filename)
+
+
+def test_lazy_function(monkeypatch):
+    """lazy_function() imports its module when it is first called"""
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    rgb_to_hsv = utils.lazy_function('colorsys', 'rgb_to_hsv')
+    assert 'colorsys' not in sys.modules
+    assert rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert 'colorsys' in sys.modules